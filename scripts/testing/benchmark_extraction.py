@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Extraction Benchmark Suite (offline)
+Runs the Earth Engine extraction paths against the fake backend
+(fake_ee.py) and reports, per scenario, wall time, blocking calls
+(getInfo round trips) and payload bytes.
+
+Exits with status 1 when a scenario needs more round trips than recorded in
+extraction_benchmark_baseline.json, so a change that adds blocking calls is
+caught before it reaches the live service.
+
+Usage:
+    python scripts/testing/benchmark_extraction.py                   # all scenarios
+    python scripts/testing/benchmark_extraction.py mcd43a3 --latency 0.2
+    python scripts/testing/benchmark_extraction.py --update-baseline # after an intended change
+    python scripts/testing/benchmark_extraction.py mod10a1_15y --trace  # per-call-site profile
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+TESTING_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.normpath(os.path.join(TESTING_DIR, '..', '..'))
+APP_DIR = os.path.join(PROJECT_ROOT, 'streamlit_app')
+BASELINE_PATH = os.path.join(TESTING_DIR, 'extraction_benchmark_baseline.json')
+TRACE_DIR = os.path.join(PROJECT_ROOT, 'outputs', 'profiles', 'benchmark')
+
+# Latency per blocking call (s): a typical getInfo round trip without server work
+DEFAULT_LATENCY = 0.1
+
+_RESULT_PREFIX = 'BENCHMARK_RESULT '
+
+CUSTOM_QA_CONFIG = {
+    'basic_qa_threshold': 0,
+    'algorithm_flags': {'no_inland_water': True, 'no_clouds': True, 'no_shadows': True}
+}
+
+
+# ================================================================================
+# SCENARIOS
+# ================================================================================
+# Each runs in a fresh interpreter with the fake `ee` installed. 'path' is
+# 'root' (main codebase, src/ on sys.path) or 'app' (streamlit_app/): both
+# trees have a top-level `src` package and cannot share an interpreter.
+
+def _mod10a1_1y():
+    from data.extraction import extract_time_series_fast
+    df = extract_time_series_fast('2020-01-01', '2021-01-01')
+    return len(df)
+
+
+def _mod10a1_15y():
+    from data.extraction import extract_melt_season_data_yearly
+    df = extract_melt_season_data_yearly(2010, 2024)
+    return len(df)
+
+
+def _synthetic_glacier_file(n_glaciers):
+    """RGI-style GeoJSON: the Athabasca mask plus small outlines tiling the fake scene"""
+    import tempfile
+    from glacier_roi import get_glacier_roi
+
+    features = [{'type': 'Feature', 'properties': {'RGIId': 'athabasca', 'Name': 'Athabasca'},
+                 'geometry': get_glacier_roi().geojson['features'][0]['geometry']}]
+    for i in range(n_glaciers - 1):
+        x0, y0 = -117.31 + (i % 6) * 0.018, 52.145 + (i // 6) * 0.04
+        ring = [[x0, y0], [x0 + 0.015, y0], [x0 + 0.015, y0 + 0.03], [x0, y0 + 0.03], [x0, y0]]
+        features.append({'type': 'Feature', 'properties': {'RGIId': f'synthetic_{i + 1:02d}'},
+                         'geometry': {'type': 'Polygon', 'coordinates': [ring]}})
+    with tempfile.NamedTemporaryFile('w', suffix='.geojson', delete=False) as f:
+        json.dump({'type': 'FeatureCollection', 'features': features}, f)
+    return f.name
+
+
+def _mod10a1_glaciers_15y():
+    from data.extraction import extract_melt_season_data_yearly
+    path = _synthetic_glacier_file(10)
+    try:
+        df = extract_melt_season_data_yearly(2010, 2024, glaciers=path)
+    finally:
+        os.remove(path)
+    return len(df)
+
+
+def _mod10a1_custom_qa():
+    from data.extraction import extract_time_series_fast
+    df = extract_time_series_fast('2020-01-01', '2021-01-01', use_advanced_qa=True,
+                                  qa_level='cqa0', custom_qa_config=CUSTOM_QA_CONFIG)
+    return len(df)
+
+
+def _mod10a1_icefield():
+    import fake_ee
+    from config import COLUMBIA_ICEFIELD_BOUNDS
+    from data.extraction import extract_time_series_fast
+    fake_ee.set_scene(COLUMBIA_ICEFIELD_BOUNDS)
+    df = extract_time_series_fast('2020-07-01', '2020-07-08', region=COLUMBIA_ICEFIELD_BOUNDS, tile_cells=64)
+    return len(df)
+
+
+def _mcd43a3():
+    from src.data.mcd43a3_extraction import extract_mcd43a3_data_fixed
+    df = extract_mcd43a3_data_fixed(2020, 2024)
+    return len(df)
+
+
+def _pixels(product):
+    from src.utils.earth_engine import get_glacier_roi, get_modis_pixels_for_date
+    roi = get_glacier_roi().ee_geometry()
+    geojson = get_modis_pixels_for_date('2020-08-10', roi, product=product, silent=True)
+    return len((geojson or {}).get('features', []))
+
+
+def _pixels_mod10a1():
+    return _pixels('MOD10A1')
+
+
+def _pixels_mcd43a3():
+    return _pixels('MCD43A3')
+
+
+def _count_mod10a1():
+    from src.utils.earth_engine import get_glacier_roi, count_modis_pixels_for_date
+    roi = get_glacier_roi().ee_geometry()
+    return count_modis_pixels_for_date('2020-08-10', roi, product='MOD10A1')
+
+
+SCENARIOS = {
+    'mod10a1_1y': ('root', _mod10a1_1y, "extract_time_series_fast, one year (Terra/Aqua fusion)"),
+    'mod10a1_15y': ('root', _mod10a1_15y, "extract_melt_season_data_yearly, 2010-2024"),
+    'mod10a1_glaciers_15y': ('root', _mod10a1_glaciers_15y, "extract_melt_season_data_yearly, 2010-2024, 10 glaciers"),
+    'mod10a1_custom_qa': ('root', _mod10a1_custom_qa, "extract_time_series_fast, one year, custom QA flags"),
+    'mod10a1_icefield': ('root', _mod10a1_icefield, "extract_time_series_fast, Columbia Icefield box, 64-cell tiles"),
+    'mcd43a3': ('root', _mcd43a3, "extract_mcd43a3_data_fixed, 2020-2024 melt seasons"),
+    'pixels_mod10a1': ('app', _pixels_mod10a1, "get_modis_pixels_for_date, MOD10A1"),
+    'pixels_mcd43a3': ('app', _pixels_mcd43a3, "get_modis_pixels_for_date, MCD43A3"),
+    'count_mod10a1': ('app', _count_mod10a1, "count_modis_pixels_for_date, MOD10A1"),
+}
+
+
+# ================================================================================
+# RUNNER
+# ================================================================================
+
+def _run_in_process(name, latency, seed, trace_dir=None):
+    """Child side: install the fake, run one scenario, print its measurements"""
+    import contextlib
+    import io
+
+    sys.path.insert(0, TESTING_DIR)
+    import fake_ee
+    fake_ee.install(latency=latency, seed=seed)
+
+    path, scenario, _ = SCENARIOS[name]
+    if path == 'root':
+        sys.path[:0] = [os.path.join(PROJECT_ROOT, 'src'), PROJECT_ROOT]
+    else:
+        sys.path[:0] = [APP_DIR]
+
+    tracing = contextlib.nullcontext()
+    if trace_dir:
+        sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+        from ee_trace import trace_run
+        tracing = trace_run(f'benchmark_{name}', output_dir=trace_dir, print_summary=False)
+
+    log = io.StringIO()
+    error = None
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log), tracing as tracer:
+            output_size = scenario()
+    except Exception as e:
+        output_size, error = None, repr(e)
+    wall_time = time.perf_counter() - start
+
+    stats = fake_ee.stats()
+    print(_RESULT_PREFIX + json.dumps({
+        'scenario': name,
+        'wall_time_s': round(wall_time, 3),
+        'calls': stats['calls'],
+        'bytes': stats['bytes'],
+        'by_kind': stats['by_kind'],
+        'output_size': output_size,
+        'error': error,
+        'profile': getattr(tracer, 'profile_path', None) if trace_dir else None,
+        'top_sites': tracer.summary()['by_site'][:3] if trace_dir else []
+    }))
+
+
+def run_scenario(name, latency=DEFAULT_LATENCY, seed=0, trace_dir=None, timeout=1800):
+    """
+    Run one scenario in a fresh interpreter
+
+    Args:
+        trace_dir: Write an Earth Engine call profile (src/ee_trace.py) there
+
+    Returns:
+        dict: wall_time_s, calls, bytes, by_kind, output_size (rows or pixels
+              returned by the extraction), error (None on success), and with
+              tracing the profile path and the three slowest call sites
+    """
+    command = [sys.executable, os.path.abspath(__file__), '--run-scenario', name,
+               '--latency', str(latency), '--seed', str(seed)]
+    if trace_dir:
+        command += ['--trace-dir', trace_dir]
+    completed = subprocess.run(
+        command,
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=timeout
+    )
+    for line in completed.stdout.splitlines():
+        if line.startswith(_RESULT_PREFIX):
+            return json.loads(line[len(_RESULT_PREFIX):])
+    return {'scenario': name, 'wall_time_s': None, 'calls': None, 'bytes': None, 'by_kind': {},
+            'output_size': None, 'error': (completed.stderr.strip().splitlines() or ['no output'])[-1]}
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    baseline = load_baseline(path)
+    for result in results:
+        if result['error'] is None:
+            baseline[result['scenario']] = {'calls': result['calls'], 'bytes': result['bytes']}
+    with open(path, 'w') as f:
+        json.dump(dict(sorted(baseline.items())), f, indent=2)
+        f.write('\n')
+
+
+def compare_to_baseline(results, baseline):
+    """
+    Scenarios that regressed
+
+    Returns:
+        list: Messages for failed scenarios and scenarios with more blocking
+              calls than their baseline (payload growth is reported, not failed)
+    """
+    failures = []
+    for result in results:
+        name = result['scenario']
+        if result['error'] is not None:
+            failures.append(f"{name}: failed ({result['error']})")
+            continue
+        expected = baseline.get(name)
+        if expected and result['calls'] > expected['calls']:
+            failures.append(f"{name}: {result['calls']} blocking calls, baseline {expected['calls']}")
+    return failures
+
+
+def _format_bytes(n):
+    if n is None:
+        return '-'
+    return f"{n / 1024:.1f} KB" if n < 1024 * 1024 else f"{n / 1024 / 1024:.2f} MB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of the Earth Engine extraction paths")
+    parser.add_argument('scenarios', nargs='*', help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY, help="Seconds per blocking call")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic rasters")
+    parser.add_argument('--update-baseline', action='store_true', help="Record these results as the new baseline")
+    parser.add_argument('--trace', action='store_true', help="Profile the Earth Engine calls of each scenario")
+    parser.add_argument('--trace-dir', default=None, help="Directory of the call profiles (implies --trace)")
+    parser.add_argument('--run-scenario', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    trace_dir = args.trace_dir or (TRACE_DIR if args.trace else None)
+    if args.run_scenario:
+        _run_in_process(args.run_scenario, args.latency, args.seed, trace_dir)
+        return 0
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    baseline = load_baseline()
+    print(f"⏱️ Extraction benchmark (fake Earth Engine, {args.latency:.3f} s per blocking call)")
+    print(f"{'scenario':<20} {'wall time':>10} {'calls':>7} {'baseline':>9} {'payload':>10} {'output':>7}")
+
+    results = []
+    for name in names:
+        result = run_scenario(name, args.latency, args.seed, trace_dir)
+        results.append(result)
+        expected = baseline.get(name, {})
+        if result['error'] is not None:
+            print(f"{name:<20} ❌ {result['error']}")
+            continue
+        bytes_note = ''
+        if expected.get('bytes') and result['bytes'] > expected['bytes'] * 1.1:
+            bytes_note = f"  ⚠️ payload +{(result['bytes'] / expected['bytes'] - 1) * 100:.0f}%"
+        print(f"{name:<20} {result['wall_time_s']:>9.2f}s {result['calls']:>7} "
+              f"{expected.get('calls', '-'):>9} {_format_bytes(result['bytes']):>10} "
+              f"{result['output_size'] if result['output_size'] is not None else '-':>7}{bytes_note}")
+        for site in result.get('top_sites', []):
+            print(f"{'':<20} {site['share'] * 100:5.1f}% {site['calls']:>4} calls  {site['site']}")
+        if result.get('profile'):
+            print(f"{'':<20} 💾 {os.path.relpath(result['profile'], PROJECT_ROOT)}")
+
+    if args.update_baseline:
+        save_baseline(results)
+        print(f"\n💾 Baseline updated: {os.path.relpath(BASELINE_PATH, PROJECT_ROOT)}")
+        return 0
+
+    failures = compare_to_baseline(results, baseline)
+    if failures:
+        print("\n❌ Round-trip regressions:")
+        for failure in failures:
+            print(f"   {failure}")
+        return 1
+    print("\n✅ No scenario needs more blocking calls than its baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1648 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the Earth Engine client (`ee`)
+
+Implements the part of the ee API used by the extraction modules on top of
+synthetic MODIS-like rasters (MOD10A1/MYD10A1 snow albedo with QA bands,
+MCD43A3 BSA/WSA albedo with mandatory quality bands, SRTM elevation) on a
+~500 m lon/lat grid around the Athabasca glacier.
+
+Only getInfo() reaches the "server": each call is counted, its JSON payload
+measured and delayed by the configured latency, so extraction code can be
+profiled for round trips without credentials.
+
+Usage:
+    import fake_ee
+    fake_ee.install(latency=0.1)     # sys.modules['ee'] is now this module
+    ...run extraction code...
+    print(fake_ee.stats())
+
+Differences from the real service (kept small on purpose):
+    - images live on a lon/lat grid; crs / crsTransform / scale are accepted
+      and ignored
+    - Dictionary.get() of a missing key returns null instead of failing, so
+      extraction paths always run to the end (lookups are counted in
+      stats()['missing_keys'])
+    - reduceToVectors is not supported (raises EEException)
+"""
+
+import datetime as _dt
+import json
+import math
+import sys
+import threading
+import time
+
+import numpy as np
+
+
+# Default scene: MODIS-sized cells (463 m) around the Athabasca glacier mask
+DEFAULT_BOUNDS = (-117.32, 52.14, -117.20, 52.23)
+CELL_DEGREES = (0.00676, 0.00416)  # (lon, lat) at 52° N
+
+# Real Earth Engine refuses to return larger collections in one request
+MAX_COLLECTION_ELEMENTS = 5000
+
+_EPOCH = _dt.datetime(1970, 1, 1)
+_DAY_MS = 86400000
+
+
+class EEException(Exception):
+    """Same name as ee.EEException so callers' except clauses keep working"""
+
+
+# ================================================================================
+# BACKEND (latency, accounting, scene)
+# ================================================================================
+
+class _Backend:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.configure()
+
+    def configure(self, latency=0.0, bandwidth=None, seed=0, bounds=DEFAULT_BOUNDS):
+        """
+        Args:
+            latency: Seconds added to every blocking call
+            bandwidth: Bytes per second for payloads (None = unlimited)
+            seed: Seed of the synthetic rasters
+            bounds: (min_lon, min_lat, max_lon, max_lat) of the scene
+        """
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.scene = _Scene(bounds, seed)
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.calls = []
+            self.missing_keys = 0
+
+    def record(self, value, kind):
+        payload = len(json.dumps(value, default=str).encode('utf-8'))
+        delay = self.latency + (payload / self.bandwidth if self.bandwidth else 0.0)
+        if delay:
+            time.sleep(delay)
+        with self.lock:
+            self.calls.append({'kind': kind, 'bytes': payload})
+
+    def stats(self):
+        with self.lock:
+            return {
+                'calls': len(self.calls),
+                'bytes': sum(call['bytes'] for call in self.calls),
+                'by_kind': _count_by_kind(self.calls),
+                'missing_keys': self.missing_keys
+            }
+
+
+def _count_by_kind(calls):
+    counts = {}
+    for call in calls:
+        counts[call['kind']] = counts.get(call['kind'], 0) + 1
+    return counts
+
+
+class _Scene:
+    """Pixel grid of the synthetic rasters"""
+
+    def __init__(self, bounds, seed):
+        self.bounds = tuple(bounds)
+        self.seed = seed
+        min_lon, min_lat, max_lon, max_lat = bounds
+        dx, dy = CELL_DEGREES
+        self.nx = max(1, int(math.ceil((max_lon - min_lon) / dx)))
+        self.ny = max(1, int(math.ceil((max_lat - min_lat) / dy)))
+        self.lon = min_lon + (np.arange(self.nx) + 0.5) * dx
+        self.lat = max_lat - (np.arange(self.ny) + 0.5) * dy
+        self.lon_grid, self.lat_grid = np.meshgrid(self.lon, self.lat)
+        self.shape = (self.ny, self.nx)
+        # Synthetic elevation: terminus (1950 m) in the north-east, icefield (2500 m) to the south-west
+        u = (self.lon_grid - min_lon) / (max_lon - min_lon)
+        v = (self.lat_grid - min_lat) / (max_lat - min_lat)
+        self.elevation = 2500.0 - 550.0 * (0.5 * u + 0.5 * v)
+
+    def cell_of(self, lon, lat):
+        min_lon, _, _, max_lat = self.bounds
+        col = int(math.floor((lon - min_lon) / CELL_DEGREES[0]))
+        row = int(math.floor((max_lat - lat) / CELL_DEGREES[1]))
+        if 0 <= row < self.ny and 0 <= col < self.nx:
+            return row, col
+        return None
+
+
+_BACKEND = _Backend()
+
+
+def install(**kwargs):
+    """
+    Register this module as `ee` (sys.modules) and configure the backend
+
+    Must run before the extraction modules are imported. Keyword arguments
+    are those of configure().
+    """
+    _BACKEND.configure(**kwargs)
+    sys.modules['ee'] = sys.modules[__name__]
+    return sys.modules[__name__]
+
+
+def configure(**kwargs):
+    _BACKEND.configure(**kwargs)
+
+
+def set_scene(bounds=DEFAULT_BOUNDS):
+    """Replace the synthetic scene (e.g. a region-scale box), keeping latency and seed"""
+    _BACKEND.scene = _Scene(bounds, _BACKEND.scene.seed)
+
+
+def stats():
+    """Blocking calls, payload bytes and calls per kind since the last reset"""
+    return _BACKEND.stats()
+
+
+def reset_stats():
+    _BACKEND.reset()
+
+
+# ================================================================================
+# SYNTHETIC PRODUCTS
+# ================================================================================
+
+def _day_rng(seed, product, ordinal, salt=0):
+    key = sum(ord(c) * (i + 1) for i, c in enumerate(product))
+    return np.random.default_rng([seed, key, ordinal, salt])
+
+
+def _available(product, ordinal, seed):
+    """Whether the product has an image for the day (a few days are missing)"""
+    missing = {'MOD10A1': 0.02, 'MYD10A1': 0.04, 'MCD43A3': 0.01}[product]
+    return _day_rng(seed, product, ordinal, 1).random() >= missing
+
+
+def _snow_albedo(scene, day, rng):
+    """Broadband snow/ice albedo field: bright in spring, darkest in August, lower at the terminus"""
+    doy = day.timetuple().tm_yday
+    melt = math.exp(-((doy - 222) / 38.0) ** 2)
+    elevation_term = (scene.elevation - 2225.0) / 550.0
+    albedo = 0.80 - 0.36 * melt + 0.14 * melt * elevation_term
+    albedo = albedo - 0.002 * (day.year - 2010) * melt  # slow darkening trend
+    return np.clip(albedo + rng.normal(0, 0.03, scene.shape), 0.05, 0.95)
+
+
+def _mod10a1_bands(scene, product, day):
+    rng = _day_rng(scene.seed, product, day.toordinal())
+    albedo = _snow_albedo(scene, day, rng)
+    tile = np.round(albedo * 100)
+
+    basic_qa = rng.choice([0, 1, 2, 3], size=scene.shape, p=[0.45, 0.35, 0.15, 0.05]).astype(float)
+    cloudy = rng.random(scene.shape) < rng.beta(1.2, 2.5)
+    tile[cloudy] = 150  # cloud
+    basic_qa[cloudy] = 255
+
+    flags = np.zeros(scene.shape)
+    for bit, probability in enumerate([0.01, 0.05, 0.03, 0.25, 0.05, 0.10, 0.10, 0.08]):
+        flags += (rng.random(scene.shape) < probability) * (1 << bit)
+
+    return {
+        'NDSI_Snow_Cover': np.where(cloudy, 250, np.round(albedo * 100)),
+        'Snow_Albedo_Daily_Tile': tile,
+        'NDSI_Snow_Cover_Basic_QA': basic_qa,
+        'NDSI_Snow_Cover_Algorithm_Flags_QA': flags
+    }, None
+
+
+# Spectral response relative to the broadband (shortwave) albedo
+_MCD43A3_FACTORS = {
+    'Band1': 1.08, 'Band2': 0.88, 'Band3': 1.12, 'Band4': 1.10, 'Band5': 0.45,
+    'Band6': 0.12, 'Band7': 0.09, 'vis': 1.10, 'nir': 0.80, 'shortwave': 1.00
+}
+
+
+def _mcd43a3_bands(scene, product, day):
+    rng = _day_rng(scene.seed, product, day.toordinal())
+    albedo = _snow_albedo(scene, day, rng) * 0.92
+    quality = rng.choice([0, 1], size=scene.shape, p=[0.7, 0.3]).astype(float)
+    filled = rng.random(scene.shape) < 0.05  # no retrieval: masked, as Earth Engine does for fill values
+
+    values, masks = {}, {}
+    for band, factor in _MCD43A3_FACTORS.items():
+        bsa = np.clip(albedo * factor + rng.normal(0, 0.01, scene.shape), 0.0, 1.0)
+        values[f'Albedo_BSA_{band}'] = np.round(bsa * 1000)
+        values[f'Albedo_WSA_{band}'] = np.round(np.clip(bsa + 0.012, 0.0, 1.0) * 1000)
+        values[f'BRDF_Albedo_Band_Mandatory_Quality_{band}'] = quality.copy()
+    for band in values:
+        masks[band] = ~filled
+    return values, masks
+
+
+_PRODUCTS = {
+    'MODIS/061/MOD10A1': ('MOD10A1', _mod10a1_bands),
+    'MODIS/006/MOD10A1': ('MOD10A1', _mod10a1_bands),
+    'MODIS/061/MYD10A1': ('MYD10A1', _mod10a1_bands),
+    'MODIS/006/MYD10A1': ('MYD10A1', _mod10a1_bands),
+    'MODIS/061/MCD43A3': ('MCD43A3', _mcd43a3_bands),
+    'MODIS/006/MCD43A3': ('MCD43A3', _mcd43a3_bands)
+}
+_PRODUCT_START = _dt.date(2000, 2, 24)
+_PRODUCT_BAND_NAMES = {}
+
+
+def _product_band_names(collection_id):
+    if collection_id not in _PRODUCT_BAND_NAMES:
+        scene = _BACKEND.scene
+        values, _ = _PRODUCTS[collection_id][1](scene, _PRODUCTS[collection_id][0], _dt.date(2020, 1, 1))
+        _PRODUCT_BAND_NAMES[collection_id] = list(values)
+    return _PRODUCT_BAND_NAMES[collection_id]
+
+
+def _product_image(collection_id, day):
+    product, generator = _PRODUCTS[collection_id]
+    scene = _BACKEND.scene
+
+    def compute():
+        values, masks = generator(scene, product, day)
+        masks = masks or {}
+        return {band: (values[band], masks.get(band, np.ones(scene.shape, bool))) for band in values}
+
+    start_ms = int((_dt.datetime(day.year, day.month, day.day) - _EPOCH).total_seconds() * 1000)
+    properties = {
+        'system:index': day.strftime('%Y_%m_%d'),
+        'system:id': f"{collection_id}/{day.strftime('%Y_%m_%d')}",
+        'system:time_start': start_ms,
+        'system:time_end': start_ms + _DAY_MS
+    }
+    return Image._from(compute, _product_band_names(collection_id), properties)
+
+
+def _catalog_images(collection_id, start_ms, end_ms):
+    if collection_id not in _PRODUCTS:
+        raise EEException(f"ImageCollection.load: ImageCollection asset '{collection_id}' not found.")
+    product = _PRODUCTS[collection_id][0]
+    first = max(_PRODUCT_START, _to_datetime(start_ms).date()) if start_ms is not None else _PRODUCT_START
+    last = _to_datetime(end_ms).date() if end_ms is not None else _dt.date.today()
+
+    images = []
+    day = first
+    while day <= last:
+        day_ms = _date_ms(day)
+        if (start_ms is None or day_ms >= start_ms) and (end_ms is None or day_ms < end_ms):
+            if _available(product, day.toordinal(), _BACKEND.scene.seed):
+                images.append(_product_image(collection_id, day))
+        day += _dt.timedelta(days=1)
+    return images
+
+
+# ================================================================================
+# HELPERS
+# ================================================================================
+
+def _to_datetime(ms):
+    return _EPOCH + _dt.timedelta(milliseconds=ms)
+
+
+def _date_ms(day):
+    return int((_dt.datetime(day.year, day.month, day.day) - _EPOCH).total_seconds() * 1000)
+
+
+def _parse_date_ms(value):
+    if isinstance(value, Date):
+        return value._ms
+    value = _raw(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return int(value)
+    if isinstance(value, _dt.datetime):
+        return int((value - _EPOCH).total_seconds() * 1000)
+    if isinstance(value, _dt.date):
+        return _date_ms(value)
+    text = str(value)
+    for fmt in ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+        try:
+            return int((_dt.datetime.strptime(text, fmt) - _EPOCH).total_seconds() * 1000)
+        except ValueError:
+            continue
+    raise EEException(f"Date: Unable to parse '{text}'")
+
+
+def _raw(value):
+    """Plain Python value of a computed object (recursively for containers)"""
+    if isinstance(value, ComputedObject):
+        return value._value()
+    if isinstance(value, (list, tuple)):
+        return [_raw(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _raw(item) for key, item in value.items()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _encode(value):
+    """JSON-compatible result, as returned by getInfo()"""
+    value = _raw(value)
+    if isinstance(value, float):
+        return None if math.isnan(value) else value
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    return value
+
+
+def _wrap(value):
+    """Computed object around a plain value"""
+    if isinstance(value, ComputedObject) or value is None:
+        return value if value is not None else _Null()
+    if isinstance(value, bool):
+        return Number(int(value))
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return Number(value)
+    if isinstance(value, str):
+        return String(value)
+    if isinstance(value, (list, tuple)):
+        return List(list(value))
+    if isinstance(value, dict):
+        return Dictionary(value)
+    return value
+
+
+# ================================================================================
+# COMPUTED OBJECTS
+# ================================================================================
+
+class ComputedObject:
+    """Base of every fake server-side object; getInfo() is the only blocking call"""
+
+    def _value(self):
+        raise NotImplementedError
+
+    def getInfo(self):
+        value = _encode(self)
+        _BACKEND.record(value, type(self).__name__)
+        return value
+
+    def evaluate(self, callback):
+        callback(self.getInfo(), None)
+
+
+class _Null(ComputedObject):
+    """Null result (e.g. first() of an empty collection); every method returns null"""
+
+    def _value(self):
+        return None
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self
+
+
+class Number(ComputedObject):
+    def __init__(self, value):
+        value = _raw(value)
+        self._number = value.item() if isinstance(value, np.generic) else value
+
+    def _value(self):
+        return self._number
+
+    def _binary(self, other, op):
+        a, b = self._number, _raw(other)
+        if a is None or b is None:
+            return _Null()
+        return Number(op(a, b))
+
+    def add(self, other):
+        return self._binary(other, lambda a, b: a + b)
+
+    def subtract(self, other):
+        return self._binary(other, lambda a, b: a - b)
+
+    def multiply(self, other):
+        return self._binary(other, lambda a, b: a * b)
+
+    def divide(self, other):
+        return self._binary(other, lambda a, b: a / b if b else 0)
+
+    def gt(self, other):
+        return self._binary(other, lambda a, b: int(a > b))
+
+    def gte(self, other):
+        return self._binary(other, lambda a, b: int(a >= b))
+
+    def lt(self, other):
+        return self._binary(other, lambda a, b: int(a < b))
+
+    def lte(self, other):
+        return self._binary(other, lambda a, b: int(a <= b))
+
+    def eq(self, other):
+        return self._binary(other, lambda a, b: int(a == b))
+
+    def neq(self, other):
+        return self._binary(other, lambda a, b: int(a != b))
+
+    def And(self, other):
+        return self._binary(other, lambda a, b: int(bool(a) and bool(b)))
+
+    def Or(self, other):
+        return self._binary(other, lambda a, b: int(bool(a) or bool(b)))
+
+    def round(self):
+        return Number(round(self._number))
+
+    def int(self):
+        return Number(int(self._number))
+
+    toInt = int
+
+    def format(self, pattern='%s'):
+        return String(pattern % self._number)
+
+
+class String(ComputedObject):
+    def __init__(self, value):
+        self._string = str(_raw(value))
+
+    def _value(self):
+        return self._string
+
+    def cat(self, other):
+        return String(self._string + str(_raw(other)))
+
+    def length(self):
+        return Number(len(self._string))
+
+
+class List(ComputedObject):
+    def __init__(self, items):
+        self._items = list(items._items) if isinstance(items, List) else list(items)
+
+    def _value(self):
+        return [_raw(item) for item in self._items]
+
+    def size(self):
+        return Number(len(self._items))
+
+    length = size
+
+    def get(self, index):
+        return _wrap(self._items[int(_raw(index))])
+
+    def cat(self, other):
+        return List(self._items + list(other._items if isinstance(other, List) else other))
+
+    def map(self, function):
+        return List([function(_wrap(item)) for item in self._items])
+
+    def distinct(self):
+        seen, items = set(), []
+        for item in self._items:
+            key = json.dumps(_encode(item), sort_keys=True, default=str)
+            if key not in seen:
+                seen.add(key)
+                items.append(item)
+        return List(items)
+
+    def sort(self, keys=None):
+        return List(sorted(self._items, key=lambda item: _raw(item)))
+
+    def removeAll(self, values):
+        removed = [_raw(value) for value in _raw(values)]
+        return List([item for item in self._items if _raw(item) not in removed])
+
+    def contains(self, value):
+        return Number(int(_raw(value) in self._value()))
+
+    def slice(self, start, end=None):
+        return List(self._items[int(_raw(start)):None if end is None else int(_raw(end))])
+
+
+class Dictionary(ComputedObject):
+    def __init__(self, values=None):
+        self._dict = dict(values._dict if isinstance(values, Dictionary) else (values or {}))
+
+    def _value(self):
+        return {key: _raw(item) for key, item in self._dict.items()}
+
+    def get(self, key, defaultValue=None):
+        key = _raw(key)
+        if key not in self._dict:
+            if defaultValue is None:
+                with _BACKEND.lock:
+                    _BACKEND.missing_keys += 1
+            return _wrap(defaultValue)
+        return _wrap(self._dict[key])
+
+    def keys(self):
+        return List(list(self._dict))
+
+    def contains(self, key):
+        return Number(int(_raw(key) in self._dict))
+
+    def set(self, key, value):
+        values = dict(self._dict)
+        values[_raw(key)] = value
+        return Dictionary(values)
+
+    def combine(self, other, overwrite=True):
+        values = dict(self._dict)
+        for key, value in _raw(other).items():
+            if overwrite or key not in values:
+                values[key] = value
+        return Dictionary(values)
+
+
+class Date(ComputedObject):
+    def __init__(self, value, tz=None):
+        self._ms = value._ms if isinstance(value, Date) else _parse_date_ms(value)
+
+    def _value(self):
+        return {'type': 'Date', 'value': self._ms}
+
+    def millis(self):
+        return Number(self._ms)
+
+    def advance(self, delta, unit):
+        delta, unit = _raw(delta), _raw(unit).rstrip('s')
+        moment = _to_datetime(self._ms)
+        if unit in ('year', 'month'):
+            months = int(delta) * (12 if unit == 'year' else 1)
+            month_index = moment.month - 1 + months
+            year, month = moment.year + month_index // 12, month_index % 12 + 1
+            moment = moment.replace(year=year, month=month)
+        else:
+            seconds = {'week': 604800, 'day': 86400, 'hour': 3600, 'minute': 60, 'second': 1}[unit]
+            moment += _dt.timedelta(seconds=delta * seconds)
+        return Date(int((moment - _EPOCH).total_seconds() * 1000))
+
+    def format(self, pattern=None):
+        moment = _to_datetime(self._ms)
+        if pattern is None:
+            return String(moment.strftime('%Y-%m-%dT%H:%M:%S'))
+        # Joda patterns used in the codebase
+        text = _raw(pattern)
+        for joda, strf in (('YYYY', '%Y'), ('yyyy', '%Y'), ('MM', '%m'), ('dd', '%d'),
+                           ('DDD', '%j'), ('HH', '%H'), ('mm', '%M'), ('ss', '%S')):
+            text = text.replace(joda, strf)
+        return String(moment.strftime(text))
+
+    def get(self, unit):
+        moment = _to_datetime(self._ms)
+        return Number({'year': moment.year, 'month': moment.month, 'day': moment.day,
+                       'hour': moment.hour, 'minute': moment.minute,
+                       'second': moment.second}[_raw(unit)])
+
+    def getRelative(self, unit, relative_to):
+        moment = _to_datetime(self._ms)
+        unit, relative_to = _raw(unit), _raw(relative_to)
+        if unit == 'day' and relative_to == 'year':
+            return Number(moment.timetuple().tm_yday - 1)
+        if unit == 'month' and relative_to == 'year':
+            return Number(moment.month - 1)
+        if unit == 'week' and relative_to == 'year':
+            return Number((moment.timetuple().tm_yday - 1) // 7)
+        raise EEException(f"Date.getRelative: unsupported unit {unit}/{relative_to}")
+
+    def difference(self, start, unit):
+        seconds = {'day': 86400, 'week': 604800, 'hour': 3600, 'year': 365.25 * 86400}[_raw(unit)]
+        return Number((self._ms - Date(start)._ms) / 1000.0 / seconds)
+
+    @staticmethod
+    def fromYMD(year, month, day):
+        return Date(_date_ms(_dt.date(int(_raw(year)), int(_raw(month)), int(_raw(day)))))
+
+
+# ================================================================================
+# GEOMETRY
+# ================================================================================
+
+class Geometry(ComputedObject):
+    """Geometry backed by shapely (lon/lat)"""
+
+    def __init__(self, geo_json, proj=None, geodesic=None):
+        from shapely.geometry import shape
+        if isinstance(geo_json, Geometry):
+            self._shape = geo_json._shape
+        elif hasattr(geo_json, 'geom_type'):
+            self._shape = geo_json
+        else:
+            geo_json = _raw(geo_json)
+            if geo_json.get('type') == 'Feature':
+                geo_json = geo_json['geometry']
+            self._shape = shape(geo_json)
+        self._prepared = None
+        self._point_cache = {}
+        self._inside = None
+
+    @staticmethod
+    def Polygon(coords, proj=None, geodesic=None, maxError=None, evenOdd=None):
+        from shapely.geometry import Polygon as ShapelyPolygon
+        coords = _raw(coords)
+        rings = [coords] if isinstance(coords[0][0], (int, float)) else coords
+        return Geometry(ShapelyPolygon(rings[0], rings[1:]))
+
+    @staticmethod
+    def MultiPolygon(coords, proj=None, geodesic=None, maxError=None, evenOdd=None):
+        from shapely.geometry import MultiPolygon as ShapelyMultiPolygon, Polygon as ShapelyPolygon
+        polygons = []
+        for polygon in _raw(coords):
+            rings = [polygon] if isinstance(polygon[0][0], (int, float)) else polygon
+            polygons.append(ShapelyPolygon(rings[0], rings[1:]))
+        return Geometry(ShapelyMultiPolygon(polygons))
+
+    @staticmethod
+    def Point(coords, proj=None, *args):
+        from shapely.geometry import Point as ShapelyPoint
+        coords = _raw(coords)
+        if not isinstance(coords, (list, tuple)):
+            coords = [coords, _raw(proj)]
+        return Geometry(ShapelyPoint(coords[0], coords[1]))
+
+    @staticmethod
+    def Rectangle(coords, proj=None, geodesic=None, evenOdd=None):
+        from shapely.geometry import box
+        flat = np.ravel(_raw(coords)).tolist()
+        return Geometry(box(*flat[:4]))
+
+    def _value(self):
+        from shapely.geometry import mapping
+        return json.loads(json.dumps(mapping(self._shape)))
+
+    def toGeoJSON(self):
+        return self._value()
+
+    def toGeoJSONString(self):
+        return json.dumps(self._value())
+
+    def type(self):
+        return String(self._shape.geom_type)
+
+    def coordinates(self):
+        return List(self._value()['coordinates'])
+
+    def _contains_point(self, x, y):
+        key = (round(x, 9), round(y, 9))
+        if key not in self._point_cache:
+            from shapely.geometry import Point as ShapelyPoint
+            from shapely.prepared import prep
+            if self._prepared is None:
+                self._prepared = prep(self._shape)
+            self._point_cache[key] = self._prepared.contains(ShapelyPoint(x, y))
+        return self._point_cache[key]
+
+    def _scene_mask(self, scene):
+        """Scene pixels whose centers are inside the geometry"""
+        if self._inside is None or self._inside[0] is not scene:
+            import shapely
+            inside = shapely.contains_xy(self._shape, scene.lon_grid, scene.lat_grid)
+            self._inside = (scene, inside)
+        return self._inside[1]
+
+    def contains(self, right, maxError=None, proj=None):
+        other = right._shape if isinstance(right, Geometry) else Geometry(right)._shape
+        if other.geom_type == 'Point':
+            return Number(int(self._contains_point(other.x, other.y)))
+        return Number(int(self._shape.contains(other)))
+
+    def intersects(self, right, maxError=None, proj=None):
+        return Number(int(self._shape.intersects(Geometry(right)._shape)))
+
+    def intersection(self, right, maxError=None, proj=None):
+        return Geometry(self._shape.intersection(Geometry(right)._shape))
+
+    def union(self, right, maxError=None, proj=None):
+        return Geometry(self._shape.union(Geometry(right)._shape))
+
+    def centroid(self, maxError=None, proj=None):
+        return Geometry(self._shape.centroid)
+
+    def bounds(self, maxError=None, proj=None):
+        from shapely.geometry import box
+        return Geometry(box(*self._shape.bounds))
+
+    def buffer(self, distance, maxError=None, proj=None):
+        # Metres to degrees at the scene latitude, good enough for a stand-in
+        return Geometry(self._shape.buffer(_raw(distance) / 111320.0))
+
+    def area(self, maxError=None, proj=None):
+        try:
+            from pyproj import Geod
+            area, _ = Geod(ellps='WGS84').geometry_area_perimeter(self._shape)
+            return Number(abs(area))
+        except ImportError:
+            lat = math.radians(self._shape.centroid.y)
+            return Number(self._shape.area * 111320.0 ** 2 * math.cos(lat))
+
+
+# ================================================================================
+# FEATURES
+# ================================================================================
+
+class Feature(ComputedObject):
+    def __init__(self, geom, opt_properties=None):
+        if isinstance(geom, Feature):
+            self._geometry, self._properties = geom._geometry, dict(geom._properties)
+            return
+        if isinstance(geom, dict) and geom.get('type') == 'Feature':
+            opt_properties = geom.get('properties')
+            geom = geom.get('geometry')
+        self._geometry = None if geom is None else (geom if isinstance(geom, Geometry) else Geometry(geom))
+        properties = opt_properties._dict if isinstance(opt_properties, Dictionary) else (opt_properties or {})
+        self._properties = dict(properties)
+
+    def _value(self):
+        return {
+            'type': 'Feature',
+            'geometry': None if self._geometry is None else self._geometry._value(),
+            'id': str(_raw(self._properties.get('system:index', '0'))),
+            'properties': {key: _raw(value) for key, value in self._properties.items()
+                           if not key.startswith('system:')}
+        }
+
+    def _copy(self, properties):
+        feature = Feature(self._geometry)
+        feature._properties = properties
+        return feature
+
+    def set(self, *args):
+        properties = dict(self._properties)
+        if len(args) == 1:
+            properties.update(_as_dict(args[0]))
+        else:
+            for key, value in zip(args[::2], args[1::2]):
+                properties[_raw(key)] = value
+        return self._copy(properties)
+
+    def get(self, prop):
+        return _wrap(self._properties.get(_raw(prop)))
+
+    def geometry(self, maxError=None, proj=None, geodesics=None):
+        return self._geometry if self._geometry is not None else _Null()
+
+    def propertyNames(self):
+        return List(list(self._properties))
+
+    def toDictionary(self, properties=None):
+        keys = _raw(properties) if properties is not None else [
+            key for key in self._properties if not key.startswith('system:')]
+        return Dictionary({key: self._properties[key] for key in keys if key in self._properties})
+
+    def copyProperties(self, source=None, properties=None, exclude=None):
+        return self._copy(_copied_properties(self._properties, source, properties, exclude))
+
+    def select(self, propertySelectors, newProperties=None, retainGeometry=True):
+        keys = _raw(propertySelectors)
+        names = _raw(newProperties) or keys
+        feature = Feature(self._geometry if retainGeometry else None)
+        feature._properties = {new: self._properties.get(old) for old, new in zip(keys, names)}
+        return feature
+
+
+def _as_dict(value):
+    if isinstance(value, Dictionary):
+        return dict(value._dict)
+    return dict(value)
+
+
+def _copied_properties(target, source, properties, exclude):
+    merged = dict(target)
+    if source is None:
+        return merged
+    source_properties = source._properties
+    keys = _raw(properties) if properties is not None else [
+        key for key in source_properties if not key.startswith('system:')]
+    for key in keys:
+        if key in source_properties and key not in (_raw(exclude) or []):
+            merged[key] = source_properties[key]
+    return merged
+
+
+# ================================================================================
+# FILTERS AND REDUCERS
+# ================================================================================
+
+class Filter:
+    def __init__(self, predicate):
+        self._predicate = predicate
+
+    def __call__(self, element):
+        return self._predicate(element)
+
+    @staticmethod
+    def _compare(name, value, op):
+        def predicate(element):
+            actual = _raw(element._properties.get(_raw(name)))
+            return actual is not None and op(actual, _raw(value))
+        return Filter(predicate)
+
+    @staticmethod
+    def eq(name, value):
+        return Filter._compare(name, value, lambda a, b: a == b)
+
+    @staticmethod
+    def neq(name, value):
+        return Filter._compare(name, value, lambda a, b: a != b)
+
+    @staticmethod
+    def gt(name, value):
+        return Filter._compare(name, value, lambda a, b: a > b)
+
+    @staticmethod
+    def gte(name, value):
+        return Filter._compare(name, value, lambda a, b: a >= b)
+
+    @staticmethod
+    def lt(name, value):
+        return Filter._compare(name, value, lambda a, b: a < b)
+
+    @staticmethod
+    def lte(name, value):
+        return Filter._compare(name, value, lambda a, b: a <= b)
+
+    @staticmethod
+    def inList(name, values):
+        return Filter._compare(name, values, lambda a, b: a in b)
+
+    @staticmethod
+    def notNull(names):
+        return Filter(lambda element: all(_raw(element._properties.get(name)) is not None for name in _raw(names)))
+
+    @staticmethod
+    def date(start, end=None):
+        start_ms = _parse_date_ms(start)
+        end_ms = _parse_date_ms(end) if end is not None else None
+
+        def predicate(element):
+            moment = _raw(element._properties.get('system:time_start'))
+            return moment is not None and moment >= start_ms and (end_ms is None or moment < end_ms)
+        return Filter(predicate)
+
+    @staticmethod
+    def And(*filters):
+        return Filter(lambda element: all(f(element) for f in filters))
+
+    @staticmethod
+    def Or(*filters):
+        return Filter(lambda element: any(f(element) for f in filters))
+
+    @staticmethod
+    def metadata(name, operator, value):
+        op = {
+            'equals': lambda a, b: a == b, 'not_equals': lambda a, b: a != b,
+            'less_than': lambda a, b: a < b, 'greater_than': lambda a, b: a > b,
+            'not_less_than': lambda a, b: a >= b, 'not_greater_than': lambda a, b: a <= b
+        }[operator]
+        return Filter._compare(name, value, op)
+
+
+def _percentile(values, p):
+    return float(np.percentile(values, p, method='nearest')) if len(values) else None
+
+
+class Reducer:
+    """Reducer over a 1-D array of unmasked values, with named outputs"""
+
+    def __init__(self, outputs, functions):
+        self._outputs = list(outputs)
+        self._functions = list(functions)
+
+    def _reduce(self, values):
+        return [function(values) for function in self._functions]
+
+    @staticmethod
+    def mean():
+        return Reducer(['mean'], [lambda v: float(np.mean(v)) if len(v) else None])
+
+    @staticmethod
+    def median(maxBuckets=None, minBucketWidth=None, maxRaw=None):
+        return Reducer(['median'], [lambda v: _percentile(v, 50)])
+
+    @staticmethod
+    def count():
+        return Reducer(['count'], [lambda v: int(len(v))])
+
+    @staticmethod
+    def sum():
+        return Reducer(['sum'], [lambda v: float(np.sum(v))])
+
+    @staticmethod
+    def min(numInputs=1):
+        return Reducer(['min'], [lambda v: float(np.min(v)) if len(v) else None])
+
+    @staticmethod
+    def max(numInputs=1):
+        return Reducer(['max'], [lambda v: float(np.max(v)) if len(v) else None])
+
+    @staticmethod
+    def stdDev():
+        return Reducer(['stdDev'], [lambda v: float(np.std(v)) if len(v) else None])
+
+    @staticmethod
+    def first():
+        return Reducer(['first'], [lambda v: float(v[0]) if len(v) else None])
+
+    @staticmethod
+    def percentile(percentiles, outputNames=None, maxBuckets=None, minBucketWidth=None, maxRaw=None):
+        percentiles = _raw(percentiles)
+        names = _raw(outputNames) or [f'p{p:g}' for p in percentiles]
+        return Reducer(names, [lambda v, p=p: _percentile(v, p) for p in percentiles])
+
+    @staticmethod
+    def toList(tupleSize=None, numOptional=None):
+        reducer = Reducer(['list'], [lambda v: list(v)])
+        reducer._tuple_size = tupleSize
+        return reducer
+
+    def combine(self, reducer2, outputPrefix='', sharedInputs=False):
+        return Reducer(self._outputs + [outputPrefix + name for name in reducer2._outputs],
+                       self._functions + reducer2._functions)
+
+    def setOutputs(self, outputs):
+        return Reducer(_raw(outputs), self._functions)
+
+    def unweighted(self):
+        # Pixels are always selected by their centers here
+        return self
+
+
+def _region_results(reducer, band_values, single_output_key, band_prefix=True):
+    """
+    Reduction results named as Earth Engine does: one output -> key from
+    single_output_key(band, output), several outputs -> '<band>_<output>'
+    (just '<output>' without band_prefix, as reduceRegions on one band)
+    """
+    results = {}
+    for band, values in band_values.items():
+        reduced = reducer._reduce(values)
+        if len(reducer._outputs) == 1:
+            results[single_output_key(band, reducer._outputs[0])] = reduced[0]
+        else:
+            for output, value in zip(reducer._outputs, reduced):
+                results[f'{band}_{output}' if band_prefix else output] = value
+    return results
+
+
+# ================================================================================
+# IMAGES
+# ================================================================================
+
+def _broadcast_names(left, right):
+    if len(left) == 1 and len(right) > 1:
+        return list(right)
+    return list(left)
+
+
+class Image(ComputedObject):
+    """
+    Lazy image: band names and properties are known up front, pixel arrays
+    ({band: (values, mask)}) are computed on first use and memoized
+    """
+
+    def __init__(self, args=None):
+        scene = _BACKEND.scene
+        if isinstance(args, Image):
+            self._init(args._compute, args._bands, dict(args._properties))
+        elif args is None or isinstance(args, (int, float, Number)):
+            value = 0 if args is None else _raw(args)
+            if args is None:
+                self._init(lambda: {'constant': (np.zeros(scene.shape), np.zeros(scene.shape, bool))}, ['constant'], {})
+            else:
+                self._init(lambda: {'constant': (np.full(scene.shape, float(value)), np.ones(scene.shape, bool))},
+                           ['constant'], {})
+        elif isinstance(args, str) and args.startswith('USGS/SRTM'):
+            self._init(lambda: {'elevation': (scene.elevation.copy(), np.ones(scene.shape, bool))},
+                       ['elevation'], {'system:id': args, 'system:index': args.split('/')[-1]})
+        elif isinstance(args, (list, tuple)):
+            image = Image.cat(*[Image.constant(item) if not isinstance(item, Image) else item for item in args])
+            self._init(image._compute, image._bands, {})
+        else:
+            raise EEException(f"Image.load: Image asset '{args}' not found.")
+
+    def _init(self, compute, bands, properties):
+        self._compute = compute
+        self._bands = list(bands)
+        self._properties = properties
+        self._data = None
+
+    @classmethod
+    def _from(cls, compute, bands, properties):
+        image = cls.__new__(cls)
+        image._init(compute, bands, properties)
+        return image
+
+    def _pixels(self):
+        if self._data is None:
+            self._data = self._compute()
+        return self._data
+
+    def _derive(self, compute, bands=None, properties=None):
+        return Image._from(compute, self._bands if bands is None else bands,
+                           dict(self._properties) if properties is None else properties)
+
+    def _value(self):
+        return {
+            'type': 'Image',
+            'bands': [{'id': band, 'data_type': {'type': 'PixelType', 'precision': 'double'}} for band in self._bands],
+            'properties': {key: _raw(value) for key, value in self._properties.items()}
+        }
+
+    # ---- constructors ----
+
+    @staticmethod
+    def constant(value):
+        values = _raw(value)
+        values = values if isinstance(values, list) else [values]
+        scene = _BACKEND.scene
+        names = ['constant'] if len(values) == 1 else [f'constant_{i}' for i in range(len(values))]
+        return Image._from(
+            lambda: {name: (np.full(scene.shape, float(v)), np.ones(scene.shape, bool)) for name, v in zip(names, values)},
+            names, {}
+        )
+
+    @staticmethod
+    def cat(*images):
+        if len(images) == 1 and isinstance(images[0], (list, tuple)):
+            images = images[0]
+        images = [image if isinstance(image, Image) else Image.constant(image) for image in images]
+        result = images[0]
+        for image in images[1:]:
+            result = result.addBands(image)
+        return result
+
+    # ---- metadata ----
+
+    def bandNames(self):
+        return List(list(self._bands))
+
+    def propertyNames(self):
+        return List(list(self._properties))
+
+    def get(self, prop):
+        return _wrap(self._properties.get(_raw(prop)))
+
+    def set(self, *args):
+        properties = dict(self._properties)
+        if len(args) == 1:
+            properties.update(_as_dict(args[0]))
+        else:
+            for key, value in zip(args[::2], args[1::2]):
+                properties[_raw(key)] = value
+        return Image._from(self._compute, self._bands, properties)
+
+    def date(self):
+        return Date(_raw(self._properties.get('system:time_start')))
+
+    def id(self):
+        return _wrap(self._properties.get('system:id'))
+
+    def copyProperties(self, source=None, properties=None, exclude=None):
+        return Image._from(self._compute, self._bands,
+                           _copied_properties(self._properties, source, properties, exclude))
+
+    def projection(self):
+        return _Projection()
+
+    # ---- band selection ----
+
+    def select(self, *selectors, **kwargs):
+        if len(selectors) == 2 and isinstance(selectors[0], (list, tuple, List)) and isinstance(selectors[1], (list, tuple, List)):
+            names, new_names = _raw(selectors[0]), _raw(selectors[1])
+        else:
+            names = []
+            for selector in selectors or [kwargs.get('bandSelectors')]:
+                selector = _raw(selector)
+                names.extend(selector if isinstance(selector, list) else [selector])
+            new_names = names
+        for name in names:
+            if name not in self._bands:
+                raise EEException(f"Image.select: Pattern '{name}' did not match any bands.")
+
+        def compute():
+            pixels = self._pixels()
+            return {new: pixels[old] for old, new in zip(names, new_names)}
+        return self._derive(compute, new_names)
+
+    def rename(self, *names):
+        names = _raw(names[0]) if len(names) == 1 and isinstance(_raw(names[0]), list) else [_raw(n) for n in names]
+        if len(names) != len(self._bands):
+            raise EEException(f"Image.rename: Expected {len(self._bands)} band names, got {len(names)}.")
+
+        def compute():
+            pixels = self._pixels()
+            return {new: pixels[old] for old, new in zip(self._bands, names)}
+        return self._derive(compute, names)
+
+    def addBands(self, srcImg, names=None, overwrite=False):
+        others = srcImg if isinstance(srcImg, (list, tuple)) else [srcImg]
+        result = self
+        for other in others:
+            result = result._add_bands(other, overwrite)
+        return result
+
+    def _add_bands(self, other, overwrite):
+        new_names = []
+        for band in other._bands:
+            name = band
+            if not overwrite:
+                suffix = 1
+                while name in self._bands or name in new_names:
+                    name = f'{band}_{suffix}'
+                    suffix += 1
+            new_names.append(name)
+        bands = [band for band in self._bands if not (overwrite and band in new_names)] + new_names
+
+        def compute():
+            pixels = dict(self._pixels())
+            other_pixels = other._pixels()
+            for old, new in zip(other._bands, new_names):
+                pixels[new] = other_pixels[old]
+            return {band: pixels[band] for band in bands}
+        return self._derive(compute, bands)
+
+    # ---- pixel arithmetic ----
+
+    def _operand(self, other):
+        if isinstance(other, Image):
+            return other
+        return Image.constant(_raw(other))
+
+    def _binary(self, other, op, logical=False):
+        other = self._operand(other)
+        names = _broadcast_names(self._bands, other._bands)
+
+        def compute():
+            left, right = self._pixels(), other._pixels()
+            left_items, right_items = list(left.values()), list(right.values())
+            result = {}
+            for i, name in enumerate(names):
+                lv, lm = left_items[min(i, len(left_items) - 1)]
+                rv, rm = right_items[min(i, len(right_items) - 1)]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    values = op(lv, rv)
+                result[name] = (values.astype(float), lm & rm)
+            return result
+        return self._derive(compute, names)
+
+    def add(self, other):
+        return self._binary(other, np.add)
+
+    def subtract(self, other):
+        return self._binary(other, np.subtract)
+
+    def multiply(self, other):
+        return self._binary(other, np.multiply)
+
+    def divide(self, other):
+        return self._binary(other, np.divide)
+
+    def gt(self, other):
+        return self._binary(other, np.greater)
+
+    def gte(self, other):
+        return self._binary(other, np.greater_equal)
+
+    def lt(self, other):
+        return self._binary(other, np.less)
+
+    def lte(self, other):
+        return self._binary(other, np.less_equal)
+
+    def eq(self, other):
+        return self._binary(other, np.equal)
+
+    def neq(self, other):
+        return self._binary(other, np.not_equal)
+
+    def And(self, other):
+        return self._binary(other, lambda a, b: (a != 0) & (b != 0))
+
+    def Or(self, other):
+        return self._binary(other, lambda a, b: (a != 0) | (b != 0))
+
+    def bitwiseAnd(self, other):
+        return self._binary(other, lambda a, b: np.bitwise_and(a.astype(np.int64), b.astype(np.int64)))
+
+    def _unary(self, op):
+        def compute():
+            return {band: (op(values), mask) for band, (values, mask) in self._pixels().items()}
+        return self._derive(compute)
+
+    def Not(self):
+        return self._unary(lambda v: (v == 0).astype(float))
+
+    def abs(self):
+        return self._unary(np.abs)
+
+    def int(self):
+        return self._unary(np.trunc)
+
+    toInt = int
+    int16 = int
+    toInt16 = int
+
+    def float(self):
+        return self._unary(lambda v: v.astype(float))
+
+    toFloat = float
+    double = float
+
+    # ---- masks ----
+
+    def updateMask(self, mask):
+        mask = self._operand(mask)
+
+        def compute():
+            mask_items = list(mask._pixels().values())
+            result = {}
+            for i, (band, (values, current)) in enumerate(self._pixels().items()):
+                mask_values, mask_mask = mask_items[min(i, len(mask_items) - 1)]
+                result[band] = (values, current & mask_mask & (mask_values != 0))
+            return result
+        return self._derive(compute)
+
+    def mask(self, mask=None):
+        if mask is not None:
+            return self.updateMask(mask)
+
+        def compute():
+            return {band: (current.astype(float), np.ones_like(current)) for band, (_, current) in self._pixels().items()}
+        return self._derive(compute)
+
+    def unmask(self, value=None, sameFootprint=True):
+        other = value if isinstance(value, Image) else Image.constant(0 if value is None else _raw(value))
+
+        def compute():
+            other_items = list(other._pixels().values())
+            result = {}
+            for i, (band, (values, current)) in enumerate(self._pixels().items()):
+                other_values, other_mask = other_items[min(i, len(other_items) - 1)]
+                result[band] = (np.where(current, values, other_values), current | other_mask)
+            return result
+        return self._derive(compute)
+
+    def clip(self, geometry):
+        geometry = geometry if isinstance(geometry, Geometry) else Geometry(geometry)
+
+        def compute():
+            inside = geometry._scene_mask(_BACKEND.scene)
+            return {band: (values, current & inside) for band, (values, current) in self._pixels().items()}
+        return self._derive(compute)
+
+    clipToCollection = clip
+
+    # ---- reductions ----
+
+    def _region_values(self, geometry):
+        scene = _BACKEND.scene
+        inside = geometry._scene_mask(scene) if geometry is not None else np.ones(scene.shape, bool)
+        return {band: values[current & inside] for band, (values, current) in self._pixels().items()}
+
+    def reduceRegion(self, reducer, geometry=None, scale=None, crs=None, crsTransform=None,
+                     bestEffort=False, maxPixels=None, tileScale=None, **kwargs):
+        geometry = None if geometry is None else (geometry if isinstance(geometry, Geometry) else Geometry(geometry))
+        band_values = self._region_values(geometry)
+        return Dictionary(_region_results(reducer, band_values, lambda band, output: band))
+
+    def reduceRegions(self, collection, reducer, scale=None, crs=None, crsTransform=None, tileScale=None, **kwargs):
+        pixels = self._pixels()
+        scene = _BACKEND.scene
+        single_band = len(self._bands) == 1
+        features = []
+        for feature in collection._elements():
+            geometry = feature._geometry
+            if geometry._shape.geom_type == 'Point':
+                cell = scene.cell_of(geometry._shape.x, geometry._shape.y)
+                band_values = {band: (values[cell][None] if cell and current[cell] else values[:0])
+                               for band, (values, current) in pixels.items()} if cell else \
+                    {band: np.array([]) for band in pixels}
+            else:
+                band_values = self._region_values(geometry)
+            results = _region_results(
+                reducer, band_values,
+                lambda band, output: output if single_band else band,
+                band_prefix=not single_band
+            )
+            features.append(feature.set(results))
+        return FeatureCollection(features)
+
+    def sample(self, region=None, scale=None, projection=None, factor=None, numPixels=None,
+               seed=0, dropNulls=True, tileScale=None, geometries=False):
+        scene = _BACKEND.scene
+        region = None if region is None else (region if isinstance(region, Geometry) else Geometry(region))
+        inside = region._scene_mask(scene) if region is not None else np.ones(scene.shape, bool)
+        pixels = self._pixels()
+        valid = inside.copy()
+        if dropNulls:
+            for _, current in pixels.values():
+                valid &= current
+
+        features = []
+        for index, (row, col) in enumerate(zip(*np.nonzero(valid))):
+            properties = {band: float(values[row, col]) for band, (values, current) in pixels.items()
+                          if current[row, col]}
+            properties['system:index'] = str(index)
+            geometry = Geometry.Point([float(scene.lon[col]), float(scene.lat[row])]) if geometries else None
+            features.append(Feature(geometry, properties))
+        return FeatureCollection(features)
+
+    def reduceToVectors(self, *args, **kwargs):
+        raise EEException("Image.reduceToVectors is not supported by the fake Earth Engine backend")
+
+    def getDownloadURL(self, *args, **kwargs):
+        raise EEException("Image.getDownloadURL is not supported by the fake Earth Engine backend")
+
+
+class _Projection(ComputedObject):
+    def _value(self):
+        return {'type': 'Projection', 'crs': 'SR-ORG:6974', 'transform': [463.312716525, 0, 0, 0, -463.312716525, 0]}
+
+    def nominalScale(self):
+        return Number(463.312716525)
+
+
+# ================================================================================
+# COLLECTIONS
+# ================================================================================
+
+class Collection(ComputedObject):
+    """Eager list of elements; catalog collections materialize their images on first use"""
+
+    _type = 'FeatureCollection'
+
+    def _init_elements(self, elements):
+        self._items = list(elements)
+
+    def _elements(self):
+        return self._items
+
+    def _new(self, elements):
+        return type(self)._of(elements)
+
+    @classmethod
+    def _of(cls, elements):
+        collection = cls.__new__(cls)
+        collection._init_elements(elements)
+        return collection
+
+    def _value(self):
+        elements = self._elements()
+        if len(elements) > MAX_COLLECTION_ELEMENTS:
+            raise EEException(f"Collection query aborted after accumulating over {MAX_COLLECTION_ELEMENTS} elements.")
+        return {'type': self._type, 'features': [element._value() for element in elements]}
+
+    def size(self):
+        return Number(len(self._elements()))
+
+    def first(self):
+        elements = self._elements()
+        return elements[0] if elements else _Null()
+
+    def limit(self, maximum, opt_property=None, opt_ascending=True):
+        collection = self.sort(opt_property, opt_ascending) if opt_property else self
+        return self._new(collection._elements()[:int(_raw(maximum))])
+
+    def sort(self, prop, ascending=True):
+        prop = _raw(prop)
+        elements = sorted(self._elements(), key=lambda element: (_raw(element._properties.get(prop)) is None,
+                                                                   _raw(element._properties.get(prop)) or 0),
+                          reverse=not ascending)
+        return self._new(elements)
+
+    def filter(self, filter_):
+        return self._new([element for element in self._elements() if filter_(element)])
+
+    def filterMetadata(self, name, operator, value):
+        return self.filter(Filter.metadata(name, operator, value))
+
+    def filterDate(self, start, opt_end=None):
+        return self.filter(Filter.date(start, opt_end))
+
+    def filterBounds(self, geometry):
+        return self
+
+    def map(self, algorithm, opt_dropNulls=False):
+        results = [algorithm(element) for element in self._elements()]
+        if opt_dropNulls:
+            results = [result for result in results if not isinstance(result, _Null) and result is not None]
+        if results and all(isinstance(result, Image) for result in results):
+            return ImageCollection._of(results)
+        return FeatureCollection._of(results)
+
+    def merge(self, collection2):
+        return self._new(self._elements() + collection2._elements())
+
+    def flatten(self):
+        return FeatureCollection._of([feature for collection in self._elements()
+                                      for feature in collection._elements()])
+
+    def toList(self, count, offset=0):
+        offset = int(_raw(offset))
+        return List(self._elements()[offset:offset + int(_raw(count))])
+
+    def aggregate_array(self, prop):
+        prop = _raw(prop)
+        return List([element._properties[prop] for element in self._elements() if prop in element._properties])
+
+    def _property_values(self, prop):
+        values = [_raw(element._properties.get(prop)) for element in self._elements()]
+        return np.array([value for value in values if isinstance(value, (int, float)) and value is not None], float)
+
+    def aggregate_stats(self, prop):
+        values = self._property_values(_raw(prop))
+        n = len(values)
+        if not n:
+            return Dictionary({'max': None, 'mean': None, 'min': None, 'sample_sd': None, 'sample_var': None,
+                               'sum': 0, 'sum_sq': 0, 'total_count': 0, 'total_sd': None, 'total_var': None,
+                               'valid_count': 0, 'weight_sum': 0, 'weighted_sum': 0})
+        return Dictionary({
+            'max': float(values.max()), 'mean': float(values.mean()), 'min': float(values.min()),
+            'sample_sd': float(values.std(ddof=1)) if n > 1 else 0.0,
+            'sample_var': float(values.var(ddof=1)) if n > 1 else 0.0,
+            'sum': float(values.sum()), 'sum_sq': float((values ** 2).sum()),
+            'total_count': n, 'total_sd': float(values.std()), 'total_var': float(values.var()),
+            'valid_count': n, 'weight_sum': float(n), 'weighted_sum': float(values.sum())
+        })
+
+    def aggregate_mean(self, prop):
+        values = self._property_values(_raw(prop))
+        return Number(float(values.mean())) if len(values) else _Null()
+
+    def aggregate_count(self, prop):
+        return Number(len(self._property_values(_raw(prop))))
+
+    def reduceColumns(self, reducer, selectors, weightSelectors=None):
+        selectors = _raw(selectors)
+        rows = [[_raw(element._properties.get(name)) for name in selectors] for element in self._elements()]
+        if reducer._outputs == ['list']:
+            return Dictionary({'list': rows if len(selectors) > 1 else [row[0] for row in rows]})
+        values = np.array([row[0] for row in rows if row[0] is not None], float)
+        return Dictionary(dict(zip(reducer._outputs, reducer._reduce(values))))
+
+    def distinct(self, properties):
+        seen, elements = set(), []
+        for element in self._elements():
+            key = tuple(json.dumps(_raw(element._properties.get(p)), default=str) for p in np.ravel(_raw(properties)))
+            if key not in seen:
+                seen.add(key)
+                elements.append(element)
+        return self._new(elements)
+
+
+class FeatureCollection(Collection):
+    _type = 'FeatureCollection'
+
+    def __init__(self, args, opt_column=None):
+        if isinstance(args, Collection):
+            self._init_elements(args._elements())
+        elif isinstance(args, Feature):
+            self._init_elements([args])
+        elif isinstance(args, Geometry):
+            self._init_elements([Feature(args)])
+        elif isinstance(args, (list, tuple, List)):
+            items = args._items if isinstance(args, List) else args
+            self._init_elements([item if isinstance(item, (Feature, Collection)) else Feature(item)
+                                 for item in items])
+        elif isinstance(args, dict):
+            self._init_elements([Feature(feature) for feature in args.get('features', [])])
+        else:
+            raise EEException(f"FeatureCollection.load: asset '{args}' not found.")
+
+    def geometry(self, maxError=None):
+        from shapely.ops import unary_union
+        return Geometry(unary_union([f._geometry._shape for f in self._elements() if f._geometry is not None]))
+
+
+class ImageCollection(Collection):
+    _type = 'ImageCollection'
+
+    def __init__(self, args):
+        self._source = None
+        if isinstance(args, str):
+            if args not in _PRODUCTS:
+                raise EEException(f"ImageCollection.load: ImageCollection asset '{args}' not found.")
+            self._source = (args, None, None)
+            self._items = None
+        elif isinstance(args, Image):
+            self._init_elements([args])
+        elif isinstance(args, (list, tuple, List)):
+            items = args._items if isinstance(args, List) else args
+            self._init_elements([item for item in items if isinstance(item, Image)])
+        elif isinstance(args, Collection):
+            self._init_elements(args._elements())
+        else:
+            raise EEException(f"ImageCollection: unsupported argument {args!r}")
+
+    def _init_elements(self, elements):
+        self._source = None
+        self._items = list(elements)
+
+    def _elements(self):
+        if self._items is None:
+            collection_id, start, end = self._source
+            self._items = _catalog_images(collection_id, start, end)
+        return self._items
+
+    def filterDate(self, start, opt_end=None):
+        if self._source is not None and self._items is None:
+            # Narrow the catalog range instead of materializing 20+ years of images
+            collection_id, current_start, current_end = self._source
+            start_ms = _parse_date_ms(start)
+            end_ms = _parse_date_ms(opt_end) if opt_end is not None else None
+            collection = ImageCollection(collection_id)
+            collection._source = (
+                collection_id,
+                start_ms if current_start is None else max(current_start, start_ms),
+                end_ms if current_end is None else (current_end if end_ms is None else min(current_end, end_ms))
+            )
+            return collection
+        return super().filterDate(start, opt_end)
+
+    def filterBounds(self, geometry):
+        geometry = geometry if isinstance(geometry, Geometry) else Geometry(geometry)
+        from shapely.geometry import box
+        if not geometry._shape.intersects(box(*_BACKEND.scene.bounds)):
+            return self._new([])
+        return self
+
+    def _composite(self, combine):
+        elements = self._elements()
+        bands = elements[0]._bands if elements else ['constant']
+
+        def compute():
+            scene = _BACKEND.scene
+            if not elements:
+                return {band: (np.zeros(scene.shape), np.zeros(scene.shape, bool)) for band in bands}
+            stacks = [element._pixels() for element in elements]
+            result = {}
+            for i, band in enumerate(bands):
+                items = [list(stack.values())[i] for stack in stacks]
+                values = np.stack([item[0] for item in items])
+                masks = np.stack([item[1] for item in items])
+                result[band] = combine(values, masks)
+            return result
+        return Image._from(compute, bands, {})
+
+    def mosaic(self):
+        def combine(values, masks):
+            # Later images on top
+            result = np.zeros(values.shape[1:])
+            valid = np.zeros(values.shape[1:], bool)
+            for layer_values, layer_mask in zip(values, masks):
+                result = np.where(layer_mask, layer_values, result)
+                valid |= layer_mask
+            return result, valid
+        return self._composite(combine)
+
+    def qualityMosaic(self, band):
+        return self.mosaic()
+
+    def _masked_reduce(self, reducer):
+        def combine(values, masks):
+            masked = np.ma.masked_array(values, ~masks)
+            return np.ma.filled(reducer(masked, axis=0), 0.0).astype(float), masks.any(axis=0)
+        return self._composite(combine)
+
+    def mean(self):
+        return self._masked_reduce(np.ma.mean)
+
+    def median(self):
+        return self._masked_reduce(np.ma.median)
+
+    def min(self):
+        return self._masked_reduce(np.ma.min)
+
+    def max(self):
+        return self._masked_reduce(np.ma.max)
+
+    def sum(self):
+        return self._masked_reduce(np.ma.sum)
+
+
+# ================================================================================
+# MODULE-LEVEL API
+# ================================================================================
+
+class Algorithms:
+    @staticmethod
+    def If(condition, trueCase, falseCase=None):
+        return trueCase if _raw(condition) else falseCase
+
+    @staticmethod
+    def IsEqual(left, right):
+        return Number(int(_raw(left) == _raw(right)))
+
+
+class ServiceAccountCredentials:
+    def __init__(self, email=None, key_file=None, key_data=None):
+        self.email = email
+
+
+def Initialize(credentials=None, opt_url=None, project=None, **kwargs):
+    """No-op: the fake backend needs no authentication"""
+
+
+def Authenticate(*args, **kwargs):
+    return True
+
+
+def Reset():
+    _BACKEND.reset()
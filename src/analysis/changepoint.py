@@ -0,0 +1,335 @@
+"""
+Change-Point Detection Module for MODIS Albedo Data
+Implements the Pettitt test and binary segmentation of mean shifts
+Batched kernels: many series (annual, monthly, elevation bands, pixels) per call
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+
+def _as_2d(values):
+    """Return a float 2D array (n_series, n_times) from a 1D or 2D input"""
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[np.newaxis, :]
+    return values
+
+
+def pettitt_test_batch(values, alpha=0.05):
+    """
+    Vectorized Pettitt change-point test over many series at once
+
+    Uses the rank formulation U_t = 2 * sum(r_1..r_t) - t * (n + 1),
+    which is O(n log n) per series instead of the O(n²) sign matrix.
+    Missing values (NaN) are ignored; positions refer to the input columns.
+
+    Args:
+        values: Array (n_series, n_times) or 1D series, NaN for missing
+        alpha: Significance level
+
+    Returns:
+        dict of arrays (length n_series): change_point_index (last index of the
+        first segment, -1 if undefined), statistic (K), p_value, significant,
+        n_valid, mean_before, mean_after
+    """
+    values = _as_2d(values)
+    valid = np.isfinite(values)
+    n_valid = valid.sum(axis=1)
+
+    ranks = rankdata(np.where(valid, values, np.nan), axis=1, nan_policy='omit')
+    ranks = np.where(valid, ranks, 0.0)
+
+    cum_ranks = np.cumsum(ranks, axis=1)
+    cum_counts = np.cumsum(valid, axis=1)
+    u_stat = 2.0 * cum_ranks - cum_counts * (n_valid[:, np.newaxis] + 1.0)
+
+    # Only valid positions before the last observation can close a segment
+    candidate = valid & (cum_counts < n_valid[:, np.newaxis])
+    abs_u = np.where(candidate, np.abs(u_stat), -1.0)
+    change_index = np.argmax(abs_u, axis=1)
+    k_stat = np.take_along_axis(abs_u, change_index[:, np.newaxis], axis=1)[:, 0]
+
+    n = n_valid.astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_value = 2.0 * np.exp(-6.0 * k_stat ** 2 / (n ** 3 + n ** 2))
+    p_value = np.clip(p_value, 0.0, 1.0)
+
+    # Segment means on either side of the change point
+    filled = np.where(valid, values, 0.0)
+    cum_sum = np.cumsum(filled, axis=1)
+    rows = np.arange(values.shape[0])
+    sum_before = cum_sum[rows, change_index]
+    count_before = cum_counts[rows, change_index]
+    sum_after = cum_sum[:, -1] - sum_before
+    count_after = n_valid - count_before
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_before = sum_before / count_before
+        mean_after = sum_after / count_after
+
+    undefined = n_valid < 3
+    change_index = np.where(undefined, -1, change_index)
+    k_stat = np.where(undefined, 0.0, k_stat)
+    p_value = np.where(undefined, 1.0, p_value)
+    mean_before = np.where(undefined, np.nan, mean_before)
+    mean_after = np.where(undefined, np.nan, mean_after)
+
+    return {
+        'change_point_index': change_index,
+        'statistic': k_stat,
+        'p_value': p_value,
+        'significant': p_value < alpha,
+        'n_valid': n_valid,
+        'mean_before': mean_before,
+        'mean_after': mean_after
+    }
+
+
+def pettitt_test(data, alpha=0.05):
+    """
+    Perform Pettitt change-point test on a single series
+
+    Args:
+        data: Time series data (array-like)
+        alpha: Significance level
+
+    Returns:
+        dict: Change point index, K statistic, p-value and segment means
+    """
+    result = pettitt_test_batch(data, alpha=alpha)
+    return {
+        'change_point_index': int(result['change_point_index'][0]),
+        'statistic': float(result['statistic'][0]),
+        'p_value': float(result['p_value'][0]),
+        'significant': bool(result['significant'][0]),
+        'mean_before': float(result['mean_before'][0]),
+        'mean_after': float(result['mean_after'][0])
+    }
+
+
+def _segment_cost(prefix_end, prefix_start):
+    """L2 (mean-shift) cost and size of segments from stacked prefix sums (sum, sum², count)"""
+    s, q, c = prefix_end - prefix_start
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cost = q - np.where(c > 0, s ** 2 / c, 0.0)
+    return cost, c
+
+
+def estimate_noise_variance(values):
+    """
+    Robust per-series noise variance from first differences (MAD estimator)
+
+    Args:
+        values: Array (n_series, n_times), NaN for missing
+
+    Returns:
+        np.ndarray: Variance estimate per series
+    """
+    values = _as_2d(values)
+    diffs = np.diff(values, axis=1)
+    with np.errstate(invalid='ignore'):
+        mad = np.nanmedian(np.abs(diffs - np.nanmedian(diffs, axis=1, keepdims=True)), axis=1)
+    sigma = mad / (0.6745 * np.sqrt(2.0))
+    fallback = np.nanstd(values, axis=1)
+    sigma = np.where(np.isfinite(sigma) & (sigma > 0), sigma, fallback)
+    return np.nan_to_num(sigma ** 2)
+
+
+def binary_segmentation_batch(values, penalty=None, max_change_points=3, min_size=3):
+    """
+    Vectorized binary segmentation of mean shifts over many series at once
+
+    Each round splits, in every series, the segment whose best split gives the
+    largest cost reduction, as long as the reduction exceeds the penalty.
+    A round is O(n) per series via prefix sums, so the whole search is
+    O(max_change_points * n) instead of the O(n²) of exhaustive search.
+
+    Args:
+        values: Array (n_series, n_times) or 1D series, NaN for missing
+        penalty: Minimum cost reduction per change point; scalar or per-series
+            array. Defaults to a BIC-type penalty 2 * sigma² * log(n)
+        max_change_points: Maximum number of change points per series
+        min_size: Minimum number of valid observations per segment
+
+    Returns:
+        list of lists: Change point indices per series (last index of each
+        segment before a shift), sorted ascending
+    """
+    values = _as_2d(values)
+    n_series, n_times = values.shape
+    valid = np.isfinite(values)
+    filled = np.where(valid, values, 0.0)
+
+    # Stacked prefix sums (sum, sum of squares, count) with a leading zero column
+    prefix = np.stack([filled, filled ** 2, valid.astype(float)])
+    prefix = np.concatenate([np.zeros((3, n_series, 1)), np.cumsum(prefix, axis=2)], axis=2)
+
+    if penalty is None:
+        n_valid = np.maximum(valid.sum(axis=1), 2)
+        penalty = 2.0 * estimate_noise_variance(values) * np.log(n_valid)
+    penalty = np.broadcast_to(np.asarray(penalty, dtype=float), (n_series,))
+
+    # Boundary flags: split[:, t] is True when a segment starts at t (t > 0)
+    split = np.zeros((n_series, n_times + 1), dtype=bool)
+    active = np.ones(n_series, dtype=bool)
+    positions = np.arange(1, n_times)
+
+    for _ in range(max_change_points):
+        if not active.any():
+            break
+
+        # Start/end of the segment containing each candidate split position t
+        boundary = split.copy()
+        boundary[:, 0] = True
+        boundary[:, n_times] = True
+        idx = np.where(boundary, np.arange(n_times + 1), -1)
+        seg_start = np.maximum.accumulate(idx, axis=1)[:, positions - 1]
+        idx_rev = np.where(boundary, np.arange(n_times + 1), n_times + 1)
+        seg_end = np.minimum.accumulate(idx_rev[:, ::-1], axis=1)[:, ::-1][:, positions + 1]
+
+        at_start = np.take_along_axis(prefix, seg_start[np.newaxis], axis=2)
+        at_end = np.take_along_axis(prefix, seg_end[np.newaxis], axis=2)
+        at_cand = prefix[:, :, positions]
+
+        cost_full, _ = _segment_cost(at_end, at_start)
+        cost_left, n_left = _segment_cost(at_cand, at_start)
+        cost_right, n_right = _segment_cost(at_end, at_cand)
+
+        gain = cost_full - cost_left - cost_right
+        allowed = (n_left >= min_size) & (n_right >= min_size) & ~split[:, positions]
+        gain = np.where(allowed, gain, -np.inf)
+
+        best = np.argmax(gain, axis=1)
+        best_gain = gain[np.arange(n_series), best]
+        accept = active & np.isfinite(best_gain) & (best_gain > penalty)
+
+        split[np.nonzero(accept)[0], positions[best[accept]]] = True
+        active &= accept
+
+    change_points = [[] for _ in range(n_series)]
+    for row, col in zip(*np.nonzero(split)):
+        change_points[row].append(int(col) - 1)
+    return change_points
+
+
+def detect_change_points(df, value_column='albedo_mean', time_column='year',
+                         series_columns=None, alpha=0.05, max_change_points=3,
+                         min_size=3, penalty=None):
+    """
+    Run Pettitt and binary segmentation on every series of a long DataFrame
+
+    The table is pivoted to a (series × time) matrix once and both kernels run
+    on the whole matrix, so per-pixel or per-band batches cost a single call.
+
+    Args:
+        df: Long DataFrame with one row per (series, time) value
+        value_column: Column name for values
+        time_column: Column name for the time axis (e.g. 'year')
+        series_columns: Columns identifying a series (None for a single series)
+        alpha: Significance level for the Pettitt test
+        max_change_points: Maximum binary segmentation change points per series
+        min_size: Minimum segment size for binary segmentation
+        penalty: Binary segmentation penalty (None for BIC-type default)
+
+    Returns:
+        DataFrame: One row per series with Pettitt results and segmentation change points
+    """
+    if df.empty:
+        return pd.DataFrame()
+
+    series_columns = list(series_columns or [])
+    index = series_columns if series_columns else None
+    if index is None:
+        wide = df.groupby(time_column)[value_column].mean().to_frame().T
+    else:
+        wide = df.pivot_table(index=index, columns=time_column, values=value_column, aggfunc='mean')
+    wide = wide.sort_index(axis=1)
+    times = wide.columns.to_numpy()
+    matrix = wide.to_numpy(dtype=float)
+
+    pettitt = pettitt_test_batch(matrix, alpha=alpha)
+    segments = binary_segmentation_batch(matrix, penalty=penalty,
+                                         max_change_points=max_change_points,
+                                         min_size=min_size)
+
+    cp_index = pettitt['change_point_index']
+    result = pd.DataFrame({
+        'n_valid': pettitt['n_valid'],
+        'change_point': np.where(cp_index >= 0, times[np.maximum(cp_index, 0)], None),
+        'pettitt_k': pettitt['statistic'],
+        'p_value': pettitt['p_value'],
+        'significant': pettitt['significant'],
+        'mean_before': pettitt['mean_before'],
+        'mean_after': pettitt['mean_after'],
+        'shift': pettitt['mean_after'] - pettitt['mean_before'],
+        'segmentation_change_points': [[times[i] for i in cps] for cps in segments]
+    })
+
+    if index is not None:
+        keys = wide.index.to_frame(index=False)
+        result = pd.concat([keys, result], axis=1)
+
+    return result
+
+
+def analyze_change_points(df, value_column='albedo_mean', months=[6, 7, 8, 9],
+                          band_column='elevation_band', min_obs_per_year=5):
+    """
+    Change-point analysis of the annual, monthly and elevation band series
+
+    Args:
+        df: DataFrame with year, month and value data
+        value_column: Column name for values
+        months: Months for the per-month annual series
+        band_column: Optional elevation band column (used when present)
+        min_obs_per_year: Minimum observations per year for annual means
+
+    Returns:
+        dict: 'annual', 'monthly' and 'bands' DataFrames (missing keys when not applicable)
+    """
+    if df.empty:
+        return {}
+
+    print(f"\n🔀 CHANGE-POINT ANALYSIS")
+    print("=" * 40)
+
+    results = {}
+
+    annual = df.groupby('year')[value_column].agg(['mean', 'count']).reset_index()
+    annual = annual[annual['count'] >= min_obs_per_year]
+    if len(annual) >= 4:
+        results['annual'] = detect_change_points(annual, value_column='mean')
+
+    if 'month' in df.columns:
+        monthly = df[df['month'].isin(months)]
+        monthly = monthly.groupby(['month', 'year'])[value_column].agg(['mean', 'count']).reset_index()
+        monthly = monthly[monthly['count'] >= 3]
+        if not monthly.empty:
+            results['monthly'] = detect_change_points(monthly, value_column='mean',
+                                                      series_columns=['month'])
+
+    if band_column in df.columns:
+        bands = df.groupby([band_column, 'year'])[value_column].agg(['mean', 'count']).reset_index()
+        bands = bands[bands['count'] >= min_obs_per_year]
+        if not bands.empty:
+            results['bands'] = detect_change_points(bands, value_column='mean',
+                                                    series_columns=[band_column])
+
+    if 'annual' in results and not results['annual'].empty:
+        row = results['annual'].iloc[0]
+        print(f"   Pettitt change point: {row['change_point']} (p={row['p_value']:.4f})")
+        print(f"   Mean before/after: {row['mean_before']:.3f} → {row['mean_after']:.3f}")
+        if row['significant']:
+            print(f"   ✅ Significant regime shift detected!")
+        else:
+            print(f"   ⚠️  No significant regime shift")
+        if row['segmentation_change_points']:
+            print(f"   Segmentation change points: {', '.join(map(str, row['segmentation_change_points']))}")
+
+    if 'monthly' in results:
+        significant = results['monthly'][results['monthly']['significant']]
+        for _, row in significant.iterrows():
+            print(f"   Month {int(row['month'])}: shift after {row['change_point']} (p={row['p_value']:.3f})")
+
+    return results
@@ -1,23 +1,91 @@
 """
 Hypsometric Analysis Module (Elevation-based Analysis)
 Following Williamson & Menounos (2021) methodology
-Analyzes albedo trends by elevation bands (±100m around median elevation)
+Analyzes albedo trends by elevation bands (±100m around median elevation by default,
+or fixed-width, quantile and explicit band edges)
 """
 
 import pandas as pd
 import numpy as np
-from .statistics import mann_kendall_test, sens_slope_estimate, calculate_trend_statistics
+from .statistics import (
+    mann_kendall_test, sens_slope_estimate, calculate_trend_statistics,
+    calculate_trend_statistics_batch
+)
 
 
-def classify_elevation_bands(df, elevation_column='elevation', median_elevation=None):
+# Williamson & Menounos (2021) three-band scheme (±100m around median elevation)
+WILLIAMSON_BANDS = ['below_median', 'near_median', 'above_median']
+WILLIAMSON_BAND_NAMES = {
+    'above_median': 'Above Median (>100m)',
+    'near_median': 'Near Median (±100m)',
+    'below_median': 'Below Median (>100m)'
+}
+
+
+def compute_elevation_band_edges(elevations, scheme='median', median_elevation=None,
+                                 band_width=100, n_bands=3, edges=None):
     """
-    Classify data into elevation bands relative to glacier median elevation
-    Following Williamson & Menounos (2021): ±100m bands around median elevation
+    Compute the cut points and labels of an elevation band scheme
+    
+    Args:
+        elevations: Array of elevations (used for median, fixed and quantile schemes)
+        scheme: 'median' (±band_width around median), 'fixed' (band_width bins),
+                'quantile' (n_bands equal-count bins) or 'explicit' (given edges)
+        median_elevation: Median elevation for the 'median' scheme (calculated if None)
+        band_width: Band half-width ('median') or bin width ('fixed') in meters
+        n_bands: Number of bands for the 'quantile' scheme
+        edges: Cut points in meters for the 'explicit' scheme
+    
+    Returns:
+        tuple: (cut points array, band labels list ordered low to high)
+    """
+    elevations = np.asarray(elevations, dtype=float)
+    
+    if scheme == 'median':
+        if median_elevation is None:
+            median_elevation = np.nanmedian(elevations)
+        cuts = np.array([median_elevation - band_width, median_elevation + band_width])
+        return cuts, list(WILLIAMSON_BANDS)
+    
+    if scheme == 'fixed':
+        low = np.floor(np.nanmin(elevations) / band_width) * band_width
+        high = np.ceil(np.nanmax(elevations) / band_width) * band_width
+        cuts = np.arange(low + band_width, high, band_width)
+    elif scheme == 'quantile':
+        cuts = np.unique(np.nanquantile(elevations, np.linspace(0, 1, n_bands + 1)[1:-1]))
+    elif scheme == 'explicit':
+        if edges is None or len(edges) == 0:
+            raise ValueError("The 'explicit' scheme requires band edges")
+        cuts = np.unique(np.asarray(edges, dtype=float))
+    else:
+        raise ValueError(f"Unknown elevation band scheme: {scheme}")
+    
+    if len(cuts) == 0:
+        return cuts, ['all_elevations']
+    
+    labels = [f"<{cuts[0]:.0f}m"]
+    labels += [f"{low:.0f}-{high:.0f}m" for low, high in zip(cuts[:-1], cuts[1:])]
+    labels += [f"≥{cuts[-1]:.0f}m"]
+    return cuts, labels
+
+
+def classify_elevation_bands(df, elevation_column='elevation', median_elevation=None,
+                             scheme='median', band_width=100, n_bands=3, edges=None):
+    """
+    Classify data into elevation bands
+    Default: Williamson & Menounos (2021) ±100m bands around median elevation
+    
+    Vectorized (one searchsorted over the elevation column); the band column is
+    an ordered categorical so downstream groupbys stay compact on large tables.
     
     Args:
         df: DataFrame with elevation data
         elevation_column: Column name for elevation data
         median_elevation: Median elevation of glacier (if None, calculated from data)
+        scheme: 'median', 'fixed', 'quantile' or 'explicit' (see compute_elevation_band_edges)
+        band_width: Band half-width ('median') or bin width ('fixed') in meters
+        n_bands: Number of bands for the 'quantile' scheme
+        edges: Cut points in meters for the 'explicit' scheme
     
     Returns:
         DataFrame with added 'elevation_band' column
@@ -26,38 +94,69 @@ def classify_elevation_bands(df, elevation_column='elevation', median_elevation=
         return df
     
     df = df.copy()
+    elevations = df[elevation_column].to_numpy(dtype=float)
     
     # Calculate median elevation if not provided
     if median_elevation is None:
-        median_elevation = df[elevation_column].median()
+        median_elevation = np.nanmedian(elevations)
     
-    print(f"📏 Glacier median elevation: {median_elevation:.0f} m")
+    cuts, labels = compute_elevation_band_edges(
+        elevations, scheme, median_elevation, band_width, n_bands, edges
+    )
     
-    # Define elevation bands (following Williamson methodology)
-    def assign_elevation_band(elevation):
-        """Assign elevation band based on distance from median"""
-        diff = elevation - median_elevation
-        
-        if diff > 100:
-            return 'above_median'  # > 100m above median
-        elif diff < -100:
-            return 'below_median'  # > 100m below median
-        else:
-            return 'near_median'   # ±100m of median
+    if scheme == 'median':
+        # ±band_width inclusive on both sides of the median
+        diff = elevations - median_elevation
+        codes = (diff >= -band_width).astype(np.int8) + (diff > band_width).astype(np.int8)
+    else:
+        codes = np.searchsorted(cuts, elevations, side='right').astype(np.int16)
+    codes = np.where(np.isnan(elevations), -1, codes)
     
-    # Apply classification
-    df['elevation_band'] = df[elevation_column].apply(assign_elevation_band)
+    df['elevation_band'] = pd.Categorical.from_codes(codes, categories=labels, ordered=True)
     
     # Count pixels in each band
     band_counts = df['elevation_band'].value_counts()
-    print(f"📊 Elevation band distribution:")
-    print(f"   Above median (>{median_elevation+100:.0f}m): {band_counts.get('above_median', 0)} pixels")
-    print(f"   Near median ({median_elevation-100:.0f}-{median_elevation+100:.0f}m): {band_counts.get('near_median', 0)} pixels")
-    print(f"   Below median (<{median_elevation-100:.0f}m): {band_counts.get('below_median', 0)} pixels")
+    if scheme == 'median':
+        print(f"📏 Glacier median elevation: {median_elevation:.0f} m")
+        print(f"📊 Elevation band distribution:")
+        print(f"   Above median (>{median_elevation+band_width:.0f}m): {band_counts.get('above_median', 0)} pixels")
+        print(f"   Near median ({median_elevation-band_width:.0f}-{median_elevation+band_width:.0f}m): {band_counts.get('near_median', 0)} pixels")
+        print(f"   Below median (<{median_elevation-band_width:.0f}m): {band_counts.get('below_median', 0)} pixels")
+    else:
+        print(f"📊 Elevation band distribution ({scheme} scheme, {len(labels)} bands):")
+        for label in labels:
+            print(f"   {label}: {band_counts.get(label, 0)} pixels")
     
     return df
 
 
+def aggregate_elevation_band_statistics(df_classified, elevation_column='elevation',
+                                        value_column='albedo_mean'):
+    """
+    Annual statistics and elevation ranges for every band in one grouped pass
+    
+    Args:
+        df_classified: DataFrame with 'elevation_band' and 'year' columns
+        elevation_column: Column name for elevation
+        value_column: Column name for values
+    
+    Returns:
+        tuple: (annual stats DataFrame [elevation_band, year, mean, std, count],
+                band summary DataFrame indexed by band [min, max, mean, median, n_observations])
+    """
+    annual = (df_classified
+              .groupby(['elevation_band', 'year'], observed=True)[value_column]
+              .agg(['mean', 'std', 'count'])
+              .reset_index())
+    
+    band_summary = (df_classified
+                    .groupby('elevation_band', observed=True)[elevation_column]
+                    .agg(['min', 'max', 'mean', 'median', 'size'])
+                    .rename(columns={'size': 'n_observations'}))
+    
+    return annual, band_summary
+
+
 def get_elevation_range(df, elevation_column):
     """Get elevation range for a dataset"""
     if df.empty:
@@ -106,17 +205,25 @@ def analyze_elevation_band_trends(band_data, value_column='albedo_mean', min_obs
 
 
 def analyze_hypsometric_trends(df, elevation_column='elevation', value_column='albedo_mean', 
-                             median_elevation=None, min_obs_per_year=5):
+                             median_elevation=None, min_obs_per_year=5,
+                             scheme='median', band_width=100, n_bands=3, edges=None):
     """
     Perform comprehensive hypsometric (elevation-based) trend analysis
     Following Williamson & Menounos (2021) methodology
     
+    Bands are classified once, aggregated to annual statistics in a single
+    groupby, and all band trends are computed in one batched call.
+    
     Args:
         df: DataFrame with elevation, year, and albedo data
         elevation_column: Column name for elevation
         value_column: Column name for values to analyze
         median_elevation: Glacier median elevation (calculated if None)
         min_obs_per_year: Minimum observations per year
+        scheme: Band scheme ('median', 'fixed', 'quantile', 'explicit')
+        band_width: Band half-width ('median') or bin width ('fixed') in meters
+        n_bands: Number of bands for the 'quantile' scheme
+        edges: Cut points in meters for the 'explicit' scheme
     
     Returns:
         dict: Hypsometric trend analysis results by elevation band
@@ -128,37 +235,61 @@ def analyze_hypsometric_trends(df, elevation_column='elevation', value_column='a
     print(f"\n🏔️  HYPSOMETRIC TREND ANALYSIS")
     print("=" * 60)
     print("Following Williamson & Menounos (2021) methodology")
-    print("Elevation bands: ±100m around glacier median elevation")
+    if scheme == 'median':
+        print(f"Elevation bands: ±{band_width:.0f}m around glacier median elevation")
+    else:
+        print(f"Elevation bands: {scheme} scheme")
     
     # Classify into elevation bands
-    df_classified = classify_elevation_bands(df, elevation_column, median_elevation)
-    
-    # Analyze trends for each elevation band
+    df_classified = classify_elevation_bands(
+        df, elevation_column, median_elevation,
+        scheme=scheme, band_width=band_width, n_bands=n_bands, edges=edges
+    )
+    
+    # Annual statistics for every band at once
+    annual, band_summary = aggregate_elevation_band_statistics(
+        df_classified, elevation_column, value_column
+    )
+    annual = annual[annual['count'] >= min_obs_per_year]
+    
+    # Batched trend statistics over the (band × year) matrix
+    annual_means = annual.pivot(index='elevation_band', columns='year', values='mean')
+    trend_results = dict(zip(
+        annual_means.index,
+        calculate_trend_statistics_batch(annual_means.to_numpy(dtype=float), annual_means.columns.to_numpy())
+    ))
+    annual_by_band = {band: group.drop(columns='elevation_band').reset_index(drop=True)
+                      for band, group in annual.groupby('elevation_band', observed=True)}
+    
+    # Analyze trends for each elevation band (highest first)
     band_results = {}
-    band_names = {
-        'above_median': 'Above Median (>100m)',
-        'near_median': 'Near Median (±100m)', 
-        'below_median': 'Below Median (>100m)'
-    }
-    
-    for band, band_name in band_names.items():
-        band_data = df_classified[df_classified['elevation_band'] == band]
+    for band in reversed(df_classified['elevation_band'].cat.categories):
+        band_name = WILLIAMSON_BAND_NAMES.get(band, band) if scheme == 'median' else band
         
-        if band_data.empty:
+        if band not in band_summary.index:
             print(f"\n⚠️  No data for {band_name} elevation band")
             continue
         
+        band_info = band_summary.loc[band]
+        n_observations = int(band_info['n_observations'])
+        
         print(f"\n🎯 Analyzing {band_name} elevation band:")
-        print(f"   📊 {len(band_data)} total observations")
+        print(f"   📊 {n_observations} total observations")
         
-        # Perform annual trend analysis for this band
-        band_trends = analyze_elevation_band_trends(band_data, value_column, min_obs_per_year)
+        band_annual = annual_by_band.get(band)
+        band_trends = trend_results.get(band)
         
-        if band_trends:
+        if band_annual is not None and len(band_annual) >= 4 and band_trends:
+            band_trends['annual_data'] = band_annual
             band_results[band] = {
                 'band_name': band_name,
-                'elevation_range': get_elevation_range(band_data, elevation_column),
-                'n_observations': len(band_data),
+                'elevation_range': {
+                    'min': band_info['min'],
+                    'max': band_info['max'],
+                    'mean': band_info['mean'],
+                    'median': band_info['median']
+                },
+                'n_observations': n_observations,
                 'trend_analysis': band_trends
             }
             
@@ -180,16 +311,24 @@ def analyze_hypsometric_trends(df, elevation_column='elevation', value_column='a
     return band_results
 
 
+def ordered_bands(hypsometric_results):
+    """Band keys of analyze_hypsometric_trends() results from lowest to highest elevation"""
+    return sorted(hypsometric_results, key=lambda band: hypsometric_results[band]['elevation_range']['mean'])
+
+
 def compare_elevation_bands(hypsometric_results):
     """
     Compare trends between elevation bands
     Following Williamson & Menounos findings on transient snowline
     
+    Works for any band scheme: patterns are read from the bands ordered by
+    elevation (lowest, intermediate, highest), not from the band labels.
+    
     Args:
         hypsometric_results: Results from analyze_hypsometric_trends()
     
     Returns:
-        dict: Comparison analysis
+        dict: Comparison analysis (slopes_by_band ordered low to high)
     """
     if not hypsometric_results:
         return {}
@@ -197,11 +336,12 @@ def compare_elevation_bands(hypsometric_results):
     print(f"\n🔍 ELEVATION BAND COMPARISON")
     print("=" * 50)
     
-    # Extract slopes for comparison
+    # Extract slopes for comparison, lowest band first
     slopes = {}
     significance = {}
     
-    for band, results in hypsometric_results.items():
+    for band in ordered_bands(hypsometric_results):
+        results = hypsometric_results[band]
         if 'trend_analysis' in results:
             slopes[band] = results['trend_analysis']['sens_slope']['slope_per_year']
             significance[band] = results['trend_analysis']['mann_kendall']['p_value'] < 0.05
@@ -217,31 +357,25 @@ def compare_elevation_bands(hypsometric_results):
     print(f"📉 Strongest albedo decline in: {hypsometric_results[most_negative_band]['band_name']}")
     print(f"   Slope: {strongest_decline:.4f}/year")
     
-    # Check for "transient snowline" pattern (strongest decline near median)
-    near_median_slope = slopes.get('near_median', 0)
-    above_median_slope = slopes.get('above_median', 0)
-    below_median_slope = slopes.get('below_median', 0)
-    
-    transient_snowline_pattern = False
-    elevation_gradient_pattern = False
+    bands = list(slopes)
+    lowest, highest = bands[0], bands[-1]
     
-    if 'near_median' in slopes:
-        # Classic transient snowline: strongest decline near median elevation
-        if (near_median_slope < above_median_slope and 
-            near_median_slope < below_median_slope):
-            transient_snowline_pattern = True
+    # Classic transient snowline: strongest decline at intermediate elevation
+    # (near the median with the ±100m scheme)
+    transient_snowline_pattern = (
+        most_negative_band not in (lowest, highest) and
+        strongest_decline < slopes[lowest] and strongest_decline < slopes[highest]
+    )
     
     # Alternative pattern: elevation-dependent gradient
     # Stronger decline at lower elevations (more common in recent warming)
-    if ('below_median' in slopes and 'above_median' in slopes and 
-        below_median_slope < above_median_slope):
-        elevation_gradient_pattern = True
+    elevation_gradient_pattern = slopes[lowest] < slopes[highest]
     
     print(f"\n🎯 WILLIAMSON & MENOUNOS PATTERN CHECK:")
     
     if transient_snowline_pattern:
         print("✅ TRANSIENT SNOWLINE PATTERN DETECTED!")
-        print("   Strongest decline near median elevation suggests rising snowline")
+        print("   Strongest decline at intermediate elevation suggests rising snowline")
         print("   This matches Williamson & Menounos (2021) findings")
     elif elevation_gradient_pattern:
         print("🌡️ ELEVATION-DEPENDENT WARMING PATTERN DETECTED!")
@@ -252,6 +386,7 @@ def compare_elevation_bands(hypsometric_results):
         print("❓ Pattern differs from typical hypsometric signatures")
     
     # Summary statistics
+    band_names = {band: hypsometric_results[band]['band_name'] for band in bands}
     comparison = {
         'slopes_by_band': slopes,
         'significance_by_band': significance,
@@ -259,33 +394,38 @@ def compare_elevation_bands(hypsometric_results):
         'strongest_decline_value': strongest_decline,
         'transient_snowline_pattern': transient_snowline_pattern,
         'elevation_gradient_pattern': elevation_gradient_pattern,
-        'interpretation': interpret_elevation_pattern(slopes)
+        'interpretation': interpret_elevation_pattern(slopes, band_names)
     }
     
     return comparison
 
 
-def interpret_elevation_pattern(slopes):
-    """Interpret the elevation-based trend pattern"""
-    if not slopes:
-        return "Insufficient data for interpretation"
+def interpret_elevation_pattern(slopes, band_names=None):
+    """
+    Interpret the elevation-based trend pattern
     
-    # Get slopes for each band
-    above = slopes.get('above_median', 0)
-    near = slopes.get('near_median', 0)  
-    below = slopes.get('below_median', 0)
+    Args:
+        slopes: {band: Sen's slope} ordered from lowest to highest band
+        band_names: Display names by band (band keys if None)
+    """
+    if len(slopes) < 2:
+        return "Insufficient data for interpretation"
     
-    # Sort by magnitude of decline (most negative first)
-    sorted_slopes = sorted([(band, slope) for band, slope in slopes.items()], key=lambda x: x[1])
-    strongest_decline_band = sorted_slopes[0][0]
+    bands = list(slopes)
+    values = np.array([slopes[band] for band in bands], dtype=float)
+    strongest = int(np.argmin(values))
+    strongest_decline_band = bands[strongest]
+    # Strictly the strongest decline (no tie with another band)
+    unique_strongest = (values[strongest] < np.delete(values, strongest)).all()
     
-    if near < above and near < below:
-        return "Transient snowline rise (strongest decline near median elevation)"
-    elif below < near and below < above:
+    if unique_strongest and 0 < strongest < len(bands) - 1:
+        return "Transient snowline rise (strongest decline at intermediate elevation)"
+    elif unique_strongest and strongest == 0:
         return "Enhanced lower-elevation warming (strongest decline in ablation zone)"
-    elif above < near and above < below:
+    elif unique_strongest and strongest == len(bands) - 1:
         return "High-elevation sensitivity (strongest decline in accumulation zone)"
-    elif abs(above - near) < 0.0005 and abs(near - below) < 0.0005:
+    elif (np.abs(np.diff(values)) < 0.0005).all():
         return "Uniform glacier-wide decline (similar trends across elevation)"
     else:
-        return f"Complex pattern (strongest decline: {strongest_decline_band.replace('_', ' ')})" 
\ No newline at end of file
+        name = (band_names or {}).get(strongest_decline_band, str(strongest_decline_band).replace('_', ' '))
+        return f"Complex pattern (strongest decline: {name})"
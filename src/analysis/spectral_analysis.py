@@ -4,6 +4,8 @@ Following Williamson & Menounos (2021) methodology
 Handles trend analysis and spectral band comparisons
 """
 
+import json
+
 import pandas as pd
 import numpy as np
 
@@ -173,35 +175,286 @@ def detect_contamination_events(df, threshold_percentile=10):
     contamination_events = []
     
     # Check for low visible/NIR ratios (indication of light-absorbing particles)
+    checks = []
     if 'vis_nir_ratio' in df_ratios.columns:
-        threshold = np.percentile(df_ratios['vis_nir_ratio'].dropna(), threshold_percentile)
-        contaminated = df_ratios[df_ratios['vis_nir_ratio'] < threshold]
-        
-        for _, row in contaminated.iterrows():
-            contamination_events.append({
-                'date': row['date'],
-                'type': 'low_vis_nir_ratio',
-                'value': row['vis_nir_ratio'],
-                'threshold': threshold,
-                'severity': 'high' if row['vis_nir_ratio'] < threshold * 0.8 else 'moderate'
-            })
-    
-    # Check for unusual spectral patterns
+        checks.append(('vis_nir_ratio', 'low_vis_nir_ratio'))
+    
+    # Check for unusual spectral patterns (abnormally low visible albedo)
     if 'Albedo_BSA_vis' in df.columns and 'Albedo_BSA_nir' in df.columns:
-        # Abnormally low visible albedo
-        vis_threshold = np.percentile(df['Albedo_BSA_vis'].dropna(), threshold_percentile)
-        low_vis = df[df['Albedo_BSA_vis'] < vis_threshold]
+        checks.append(('Albedo_BSA_vis', 'low_visible_albedo'))
+    
+    for column, event_type in checks:
+        values = df_ratios[column]
+        threshold = np.percentile(values.dropna(), threshold_percentile)
+        flagged = values < threshold
+        contamination_events.append(pd.DataFrame({
+            'date': df_ratios.loc[flagged, 'date'].to_numpy(),
+            'type': event_type,
+            'value': values[flagged].to_numpy(),
+            'threshold': threshold,
+            'severity': np.where(values[flagged] < threshold * 0.8, 'high', 'moderate')
+        }))
+    
+    if not contamination_events:
+        return pd.DataFrame()
+    
+    return pd.concat(contamination_events, ignore_index=True)
+
+
+# ================================================================================
+# ROLLING DAY-OF-YEAR BASELINES (streaming contamination detection)
+# ================================================================================
+
+# Variables scored against their day-of-year baseline, with the event type
+# raised when they fall abnormally low
+BASELINE_VARIABLES = {
+    'Albedo_BSA_vis': 'low_visible_albedo',
+    'Albedo_BSA_nir': 'low_nir_albedo',
+    'vis_nir_ratio': 'low_vis_nir_ratio',
+    'red_nir_ratio': 'low_red_nir_ratio',
+    'blue_red_ratio': 'low_blue_red_ratio'
+}
+
+CONTAMINATION_EVENT_COLUMNS = {
+    'date': 'datetime64[ns]',
+    'doy': 'int16',
+    'variable': 'category',
+    'type': 'category',
+    'value': 'float64',
+    'baseline_mean': 'float64',
+    'baseline_std': 'float64',
+    'z_score': 'float64',
+    'severity': 'category'
+}
+
+
+def _empty_events_table():
+    """Typed, empty contamination events table"""
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in CONTAMINATION_EVENT_COLUMNS.items()})
+
+
+class SpectralBaseline:
+    """
+    Day-of-year climatology of spectral albedo and band ratios
+    
+    Stores per-DOY sufficient statistics (sum, sum of squares, count) for each
+    variable, so new MCD43A3 composites can be scored and folded in without
+    rescanning the history. The folded dates are kept, so data already in the
+    baseline (reruns, overlapping periods) is never counted twice. Baselines are smoothed with a circular ±window_days
+    window so early and late season are compared with their own period.
+    """
+    
+    N_DOY = 366
+    
+    def __init__(self, variables=None, window_days=16, min_count=5):
+        self.variables = list(variables or BASELINE_VARIABLES)
+        self.window_days = window_days
+        self.min_count = min_count
+        self.sums = np.zeros((self.N_DOY, len(self.variables)))
+        self.sumsq = np.zeros((self.N_DOY, len(self.variables)))
+        self.counts = np.zeros((self.N_DOY, len(self.variables)))
+        self.dates = set()
+        self.last_date = None
+    
+    def _matrix(self, df):
+        """DOY index and (rows × variables) value matrix, NaN where unavailable"""
+        df_ratios = calculate_spectral_ratios(df)
+        dates = pd.to_datetime(df_ratios['date'])
+        doy_index = dates.dt.dayofyear.to_numpy() - 1
+        values = np.column_stack([
+            df_ratios[var].to_numpy(dtype=float) if var in df_ratios.columns
+            else np.full(len(df_ratios), np.nan)
+            for var in self.variables
+        ]) if len(df_ratios) else np.empty((0, len(self.variables)))
+        values = np.where(np.isfinite(values), values, np.nan)
+        return dates, doy_index, values
+    
+    def update(self, df):
+        """
+        Fold observations into the per-DOY statistics
+        
+        Rows whose date is already in the baseline are skipped.
+        
+        Args:
+            df: DataFrame with 'date' and spectral albedo columns
+        
+        Returns:
+            SpectralBaseline: self (for chaining)
+        """
+        if df.empty:
+            return self
+        
+        dates, doy_index, values = self._matrix(df)
+        day_keys = dates.dt.strftime('%Y-%m-%d')
+        new = ~day_keys.isin(list(self.dates)).to_numpy()
+        if not new.any():
+            return self
+        dates, doy_index, values = dates[new], doy_index[new], values[new]
+        self.dates.update(day_keys[new])
+        
+        valid = np.isfinite(values)
+        filled = np.where(valid, values, 0.0)
+        
+        np.add.at(self.sums, doy_index, filled)
+        np.add.at(self.sumsq, doy_index, filled ** 2)
+        np.add.at(self.counts, doy_index, valid)
+        
+        latest = dates.max()
+        if self.last_date is None or latest > self.last_date:
+            self.last_date = latest
+        return self
+    
+    def baseline(self):
+        """
+        Rolling DOY baseline mean and standard deviation
+        
+        Returns:
+            tuple: (mean, std) arrays of shape (366, n_variables)
+        """
+        w = self.window_days
+        kernel_len = 2 * w + 1
+        stats = []
+        for arr in (self.sums, self.sumsq, self.counts):
+            # Circular box filter over DOY via prefix sums
+            wrapped = np.concatenate([arr[-w:], arr, arr[:w]]) if w > 0 else arr
+            cum = np.concatenate([np.zeros((1, arr.shape[1])), np.cumsum(wrapped, axis=0)])
+            stats.append(cum[kernel_len:] - cum[:-kernel_len])
+        s, q, n = stats
         
-        for _, row in low_vis.iterrows():
-            contamination_events.append({
-                'date': row['date'],
-                'type': 'low_visible_albedo',
-                'value': row['Albedo_BSA_vis'],
-                'threshold': vis_threshold,
-                'severity': 'high' if row['Albedo_BSA_vis'] < vis_threshold * 0.8 else 'moderate'
-            })
-    
-    return pd.DataFrame(contamination_events)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = s / n
+            var = (q - s ** 2 / n) / (n - 1)
+        std = np.sqrt(np.clip(var, 0.0, None))
+        insufficient = n < self.min_count
+        mean[insufficient] = np.nan
+        std[insufficient] = np.nan
+        return mean, std
+    
+    def score(self, df):
+        """
+        Z-scores of every observation against its DOY baseline
+        
+        Args:
+            df: DataFrame with 'date' and spectral albedo columns
+        
+        Returns:
+            DataFrame: date, doy and one z-score column per variable (z_<variable>)
+        """
+        dates, doy_index, values = self._matrix(df)
+        mean, std = self.baseline()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (values - mean[doy_index]) / std[doy_index]
+        
+        scores = pd.DataFrame(z, columns=[f'z_{var}' for var in self.variables], index=df.index)
+        scores.insert(0, 'doy', (doy_index + 1).astype(np.int16))
+        scores.insert(0, 'date', dates.to_numpy())
+        return scores
+    
+    def detect(self, df, z_threshold=2.0):
+        """
+        Flag observations falling more than z_threshold standard deviations
+        below their DOY baseline
+        
+        Args:
+            df: DataFrame with 'date' and spectral albedo columns
+            z_threshold: Number of standard deviations below baseline
+        
+        Returns:
+            DataFrame: Typed events table (see CONTAMINATION_EVENT_COLUMNS)
+        """
+        if df.empty:
+            return _empty_events_table()
+        
+        dates, doy_index, values = self._matrix(df)
+        mean, std = self.baseline()
+        base_mean = mean[doy_index]
+        base_std = std[doy_index]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (values - base_mean) / base_std
+        
+        rows, cols = np.nonzero(z < -z_threshold)
+        if len(rows) == 0:
+            return _empty_events_table()
+        
+        variables = np.asarray(self.variables)[cols]
+        z_flagged = z[rows, cols]
+        events = pd.DataFrame({
+            'date': dates.to_numpy()[rows],
+            'doy': doy_index[rows] + 1,
+            'variable': variables,
+            'type': [BASELINE_VARIABLES.get(var, f'low_{var}') for var in variables],
+            'value': values[rows, cols],
+            'baseline_mean': base_mean[rows, cols],
+            'baseline_std': base_std[rows, cols],
+            'z_score': z_flagged,
+            'severity': np.where(z_flagged < -1.5 * z_threshold, 'high', 'moderate')
+        })
+        events = events.astype(CONTAMINATION_EVENT_COLUMNS)
+        return events.sort_values(['date', 'variable']).reset_index(drop=True)
+    
+    def to_dict(self):
+        """Serializable representation of the baseline state"""
+        return {
+            'variables': self.variables,
+            'window_days': self.window_days,
+            'min_count': self.min_count,
+            'sums': self.sums.tolist(),
+            'sumsq': self.sumsq.tolist(),
+            'counts': self.counts.tolist(),
+            'dates': sorted(self.dates),
+            'last_date': self.last_date.isoformat() if self.last_date is not None else None
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild a baseline from to_dict() output"""
+        baseline = cls(state['variables'], state['window_days'], state['min_count'])
+        baseline.sums = np.asarray(state['sums'], dtype=float)
+        baseline.sumsq = np.asarray(state['sumsq'], dtype=float)
+        baseline.counts = np.asarray(state['counts'], dtype=float)
+        baseline.dates = set(state['dates'])
+        baseline.last_date = pd.Timestamp(state['last_date']) if state['last_date'] else None
+        return baseline
+    
+    def save(self, path):
+        """Save the baseline state as JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+    
+    @classmethod
+    def load(cls, path):
+        """Load a baseline state saved with save()"""
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+def detect_contamination_events_rolling(df, baseline=None, z_threshold=2.0, window_days=16, min_count=5):
+    """
+    Detect contamination events against rolling day-of-year baselines
+    
+    Every observation of df is scored. Dates not yet in the baseline (a new
+    baseline, or composites after a saved one) are folded in first, so a
+    rerun on the same data reports the same events and the saved history is
+    never rescanned.
+    
+    Args:
+        df: DataFrame with MCD43A3 spectral data ('date' and Albedo_BSA_* columns)
+        baseline: Existing SpectralBaseline (None to build one from df)
+        z_threshold: Number of standard deviations below baseline
+        window_days: Half-width of the DOY smoothing window (new baselines only)
+        min_count: Minimum observations in the DOY window (new baselines only)
+    
+    Returns:
+        tuple: (events DataFrame, updated SpectralBaseline)
+    """
+    if df.empty:
+        return _empty_events_table(), baseline or SpectralBaseline(window_days=window_days, min_count=min_count)
+    
+    if baseline is None:
+        baseline = SpectralBaseline(window_days=window_days, min_count=min_count)
+    
+    baseline.update(df)
+    return baseline.detect(df, z_threshold), baseline
 
 
 def analyze_seasonal_patterns(df):
@@ -229,31 +482,33 @@ def analyze_seasonal_patterns(df):
     
     seasonal_results = {}
     
-    # Monthly statistics for key bands
+    # Monthly statistics for key bands (one grouped pass for all bands)
     key_bands = ['Albedo_BSA_vis', 'Albedo_BSA_nir', 'Albedo_BSA_shortwave']
+    bands = [band for band in key_bands if band in melt_season.columns]
+    monthly = melt_season.groupby('month')[bands].agg(['mean', 'std', 'count', 'sum'])
     
-    for band in key_bands:
-        if band in melt_season.columns:
-            monthly_stats = melt_season.groupby('month')[band].agg(['mean', 'std', 'count']).reset_index()
-            seasonal_results[band] = monthly_stats.to_dict('records')
+    for band in bands:
+        monthly_stats = monthly[band][['mean', 'std', 'count']].reset_index()
+        seasonal_results[band] = monthly_stats.to_dict('records')
     
     # Calculate seasonal trends
     seasonal_trends = {}
-    for band in key_bands:
-        if band in melt_season.columns:
-            # Early vs late season comparison
-            early_season = melt_season[melt_season['month'].isin([6, 7])][band].mean()
-            late_season = melt_season[melt_season['month'].isin([8, 9])][band].mean()
-            
-            seasonal_change = late_season - early_season
-            seasonal_change_percent = (seasonal_change / early_season) * 100 if early_season > 0 else 0
-            
-            seasonal_trends[band] = {
-                'early_season_mean': early_season,
-                'late_season_mean': late_season,
-                'seasonal_change': seasonal_change,
-                'seasonal_change_percent': seasonal_change_percent
-            }
+    for band in bands:
+        # Early vs late season comparison, from the monthly sums and counts
+        early = monthly[band].loc[monthly.index.isin([6, 7])]
+        late = monthly[band].loc[monthly.index.isin([8, 9])]
+        early_season = early['sum'].sum() / early['count'].sum() if early['count'].sum() else np.nan
+        late_season = late['sum'].sum() / late['count'].sum() if late['count'].sum() else np.nan
+        
+        seasonal_change = late_season - early_season
+        seasonal_change_percent = (seasonal_change / early_season) * 100 if early_season > 0 else 0
+        
+        seasonal_trends[band] = {
+            'early_season_mean': early_season,
+            'late_season_mean': late_season,
+            'seasonal_change': seasonal_change,
+            'seasonal_change_percent': seasonal_change_percent
+        }
     
     return {
         'monthly_statistics': seasonal_results,
@@ -4,8 +4,8 @@ Implements Mann-Kendall test and Sen's slope estimation
 Following Williamson & Menounos (2021) methodology
 """
 
+import warnings
 import numpy as np
-from scipy.stats import kendalltau
 
 def mann_kendall_test(data):
     """
@@ -25,6 +25,7 @@ def mann_kendall_test(data):
     x = np.arange(n)
     
     # Calculate Kendall's tau and p-value
+    from scipy.stats import kendalltau
     tau, p_value = kendalltau(x, data)
     
     # Determine trend
@@ -113,4 +114,337 @@ def calculate_trend_statistics(values, years):
         'total_percent_change': total_percent_change,
         'significance': significance,
         'period': f"{years.min()}-{years.max()}"
-    } 
\ No newline at end of file
+    } 
+
+# ================================================================================
+# BATCHED TREND STATISTICS (many series at once)
+# ================================================================================
+
+_KENDALL_EXACT_CACHE = {}
+
+
+def _kendall_exact_cdf(n):
+    """
+    Cumulative null distribution of the number of concordant pairs for n untied values
+    (Kendall 1970, same recursion as scipy's exact Kendall p-value)
+    """
+    if n not in _KENDALL_EXACT_CACHE:
+        import math
+        tot = n * (n - 1) // 2
+        counts = np.zeros(tot + 1)
+        counts[0] = 1.0
+        for j in range(2, n + 1):
+            # Inserting the j-th value adds 0..j-1 inversions
+            cum = np.cumsum(counts)
+            shifted = np.zeros(tot + 1)
+            shifted[j:] = cum[:tot + 1 - j]
+            counts = cum - shifted
+        if n < 171:
+            cdf = np.cumsum(counts) / math.factorial(n)
+        else:
+            cdf = np.cumsum(counts / counts.sum())
+        _KENDALL_EXACT_CACHE[n] = cdf
+    return _KENDALL_EXACT_CACHE[n]
+
+
+def compact_series(values):
+    """
+    Move the valid (non-NaN) values of each row to the left, preserving order
+
+    Args:
+        values: Array (n_series, n_times) with NaN for missing
+
+    Returns:
+        tuple: (compacted values, order) where order maps compacted to original columns
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    order = np.argsort(~np.isfinite(values), axis=1, kind='stable')
+    return np.take_along_axis(values, order, axis=1), order
+
+
+def mann_kendall_batch(values, alpha=0.05):
+    """
+    Vectorized Mann-Kendall test over many series (rows), NaN-padded on the right
+
+    Reproduces mann_kendall_test (Kendall's tau-b against the time index) row by
+    row: exact p-values without ties, tie-corrected normal approximation otherwise.
+
+    Args:
+        values: Array (n_series, n_times), valid values first in each row
+        alpha: Significance level
+
+    Returns:
+        dict of arrays: trend, p_value, tau, s (concordant minus discordant), n
+    """
+    from scipy.stats import norm
+
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    n_series, n_times = values.shape
+    valid = np.isfinite(values)
+    n = valid.sum(axis=1)
+
+    upper = np.triu(np.ones((n_times, n_times), dtype=bool), k=1)
+    pair_valid = valid[:, :, np.newaxis] & valid[:, np.newaxis, :] & upper
+    with np.errstate(invalid='ignore'):
+        signs = np.sign(values[:, np.newaxis, :] - values[:, :, np.newaxis])
+    signs = np.where(pair_valid, signs, 0.0)
+    s_stat = signs.sum(axis=(1, 2))
+    discordant = (signs < 0).sum(axis=(1, 2))
+    ties_pairs = (pair_valid & (signs == 0)).sum(axis=(1, 2))
+
+    # Tie groups in the values: sum of t(t-1)(2t+5) over groups of size t
+    sorted_vals = np.sort(values, axis=1)
+    idx = np.arange(n_times)
+    is_start = np.ones((n_series, n_times), dtype=bool)
+    is_start[:, 1:] = sorted_vals[:, 1:] != sorted_vals[:, :-1]
+    is_start &= np.isfinite(sorted_vals)
+    run_start = np.maximum.accumulate(np.where(is_start, idx, 0), axis=1)
+    run_rank = idx - run_start
+    is_end = np.ones((n_series, n_times), dtype=bool)
+    is_end[:, :-1] = is_start[:, 1:] | ~np.isfinite(sorted_vals[:, 1:])
+    run_length = np.where(is_end & np.isfinite(sorted_vals), run_rank + 1, 0).astype(float)
+    tie_var = (run_length * (run_length - 1) * (2 * run_length + 5)).sum(axis=1)
+
+    nf = n.astype(float)
+    tot = n * (n - 1) // 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tau = s_stat / np.sqrt(tot) / np.sqrt(tot - ties_pairs)
+        tau = np.clip(tau, -1.0, 1.0)
+        m = nf * (nf - 1.0)
+        var = (m * (2 * nf + 5) - tie_var) / 18.0
+        z = s_stat / np.sqrt(var)
+        p_value = 2.0 * norm.sf(np.abs(z))
+
+    concordant = tot - ties_pairs - discordant
+    exact = (ties_pairs == 0) & ((n <= 33) | (np.minimum(discordant, tot - discordant) <= 1))
+    for row in np.nonzero(exact & (n >= 2))[0]:
+        c = int(min(concordant[row], tot[row] - concordant[row]))
+        if 4 * c == n[row] * (n[row] - 1):
+            p_value[row] = 1.0
+        else:
+            p_value[row] = min(1.0, 2.0 * _kendall_exact_cdf(int(n[row]))[c])
+
+    # All values tied: tau and p-value undefined (as scipy)
+    all_tied = ties_pairs == tot
+    tau = np.where(all_tied, np.nan, tau)
+    p_value = np.where(all_tied, np.nan, p_value)
+
+    short = n < 4
+    tau = np.where(short, 0.0, tau)
+    p_value = np.where(short, 1.0, p_value)
+
+    significant = p_value < alpha
+    trend = np.where(significant & (tau > 0), 'increasing',
+                     np.where(significant, 'decreasing', 'no_trend'))
+
+    return {'trend': trend, 'p_value': p_value, 'tau': tau, 's': s_stat, 'n': n}
+
+
+def sens_slope_batch(values):
+    """
+    Vectorized Sen's slope over many series (rows), NaN-padded on the right
+
+    Reproduces sens_slope_estimate row by row (slopes over index gaps).
+
+    Args:
+        values: Array (n_series, n_times), valid values first in each row
+
+    Returns:
+        dict of arrays: slope_per_year, intercept
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    n_times = values.shape[1]
+    valid = np.isfinite(values)
+    n = valid.sum(axis=1)
+
+    i, j = np.triu_indices(n_times, k=1)
+    with np.errstate(invalid='ignore'):
+        slopes = (values[:, j] - values[:, i]) / (j - i)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        slope = np.nanmedian(slopes, axis=1) if len(i) else np.full(len(values), np.nan)
+        median_value = np.nanmedian(values, axis=1)
+        mean_value = np.nanmean(values, axis=1)
+    median_index = (n - 1) / 2.0
+    intercept = median_value - slope * median_index
+
+    short = (n < 4) | ~np.isfinite(slope)
+    slope = np.where(short, 0.0, slope)
+    intercept = np.where(short, mean_value, intercept)
+
+    return {'slope_per_year': slope, 'intercept': intercept}
+
+
+
+def calculate_trend_statistics_batch(values, years):
+    """
+    Calculate trend statistics for many series sharing one time axis
+
+    Each row is compacted (missing years dropped) and analysed exactly as
+    calculate_trend_statistics would analyse that series on its own.
+
+    Args:
+        values: Array (n_series, n_years) with NaN for missing years
+        years: Array of the n_years column years
+
+    Returns:
+        list: One statistics dict per series (None for series with no data)
+    """
+    years = np.asarray(years)
+    compact, order = compact_series(values)
+    n = np.isfinite(compact).sum(axis=1)
+
+    mk = mann_kendall_batch(compact)
+    sens = sens_slope_batch(compact)
+
+    results = []
+    for row in range(compact.shape[0]):
+        n_row = int(n[row])
+        if n_row == 0:
+            results.append(None)
+            continue
+
+        row_years = years[order[row, :n_row]]
+        first_year_value = compact[row, 0]
+        last_year_value = compact[row, n_row - 1]
+        total_change = last_year_value - first_year_value
+        change_per_year = sens['slope_per_year'][row]
+        p_value = mk['p_value'][row]
+
+        results.append({
+            'mann_kendall': {
+                'trend': str(mk['trend'][row]),
+                'p_value': p_value,
+                'tau': mk['tau'][row]
+            },
+            'sens_slope': {
+                'slope_per_year': change_per_year,
+                'intercept': sens['intercept'][row]
+            },
+            'n_years': n_row,
+            'change_per_year': change_per_year,
+            'change_percent_per_year': (change_per_year / first_year_value) * 100,
+            'total_change': total_change,
+            'total_percent_change': (total_change / first_year_value) * 100,
+            'significance': "significant" if p_value < 0.05 else "not significant",
+            'period': f"{row_years.min()}-{row_years.max()}"
+        })
+
+    return results
+
+
+# ================================================================================
+# EVENT-YEAR PERMUTATION TESTS (fire years, dust events, ...)
+# ================================================================================
+
+def event_label_matrix(n_years, n_events, n_permutations=10000, max_exact=20000, seed=None):
+    """
+    Label matrix of event-year assignments for a permutation test
+
+    Enumerates every C(n_years, n_events) assignment when that number is at
+    most max_exact, otherwise draws n_permutations random assignments.
+
+    Args:
+        n_years: Total number of years
+        n_events: Number of event years
+        n_permutations: Random draws when enumeration is too large
+        max_exact: Largest number of combinations enumerated exactly
+        seed: Random seed for reproducible draws
+
+    Returns:
+        tuple: (labels bool array (n_labelings, n_years), exact flag)
+    """
+    import math
+    from itertools import combinations
+
+    n_combinations = math.comb(n_years, n_events)
+    if n_combinations <= max_exact:
+        chosen = np.array(list(combinations(range(n_years), n_events)), dtype=np.intp)
+        labels = np.zeros((n_combinations, n_years), dtype=bool)
+        if n_events:
+            np.put_along_axis(labels, chosen, True, axis=1)
+        return labels, True
+
+    rng = np.random.default_rng(seed)
+    chosen = np.argpartition(rng.random((n_permutations, n_years)), n_events - 1, axis=1)[:, :n_events]
+    labels = np.zeros((n_permutations, n_years), dtype=bool)
+    np.put_along_axis(labels, chosen, True, axis=1)
+    return labels, False
+
+
+def _event_mean_difference(year_sums, year_counts, labels, level):
+    """
+    Event minus non-event mean for every series (rows) and labeling (columns)
+
+    'daily' pools daily observations (weights by count); 'annual' compares
+    means of annual means. Years with no observations are ignored.
+    """
+    weights = labels.astype(float).T                      # (n_years, n_labelings)
+    if level == 'daily':
+        sums, counts = year_sums, year_counts
+    else:
+        valid = year_counts > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sums = np.where(valid, year_sums / year_counts, 0.0)
+        counts = valid.astype(float)
+
+    event_sum = sums @ weights
+    event_count = counts @ weights
+    other_sum = sums.sum(axis=1, keepdims=True) - event_sum
+    other_count = counts.sum(axis=1, keepdims=True) - event_count
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return event_sum / event_count - other_sum / other_count
+
+
+def permutation_test_event_years(year_sums, year_counts, event_mask, level='daily',
+                                 n_permutations=10000, max_exact=20000, alpha=0.05, seed=42):
+    """
+    Vectorized permutation test of event years against all other years
+
+    Event-year labels are permuted across whole years, so within-season
+    autocorrelation is preserved at both levels. Many series sharing the same
+    years can be tested at once against one label matrix.
+
+    Args:
+        year_sums: Array (n_series, n_years) or (n_years,) of per-year value sums
+        year_counts: Matching per-year observation counts
+        event_mask: Boolean array (n_years,) marking event years
+        level: 'daily' (pooled observations) or 'annual' (annual means)
+        n_permutations: Random labelings when exact enumeration is too large
+        max_exact: Largest number of labelings enumerated exactly
+        alpha: Significance level
+        seed: Random seed for reproducible draws
+
+    Returns:
+        dict: Arrays (one entry per series) of difference, p_value, significant,
+              null_mean, null_std, plus n_permutations and exact
+    """
+    year_sums = np.atleast_2d(np.asarray(year_sums, dtype=float))
+    year_counts = np.atleast_2d(np.asarray(year_counts, dtype=float))
+    event_mask = np.asarray(event_mask, dtype=bool)
+
+    labels, exact = event_label_matrix(len(event_mask), int(event_mask.sum()),
+                                       n_permutations, max_exact, seed)
+    observed = _event_mean_difference(year_sums, year_counts, event_mask[None, :], level)[:, 0]
+    null = _event_mean_difference(year_sums, year_counts, labels, level)
+
+    # Two-sided; small tolerance so the observed labeling counts as "as extreme"
+    extreme = (np.abs(null) >= np.abs(observed)[:, None] - 1e-12).sum(axis=1)
+    n_labelings = len(labels)
+    p_value = extreme / n_labelings if exact else (extreme + 1) / (n_labelings + 1)
+    p_value = np.where(np.isfinite(observed), p_value, np.nan)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        null_mean = np.nanmean(null, axis=1)
+        null_std = np.nanstd(null, axis=1)
+
+    return {
+        'difference': observed,
+        'p_value': p_value,
+        'significant': p_value < alpha,
+        'null_mean': null_mean,
+        'null_std': null_std,
+        'n_permutations': n_labelings,
+        'exact': exact
+    }
@@ -5,7 +5,9 @@ Handles monthly, annual, and fire impact analyses
 
 import pandas as pd
 import numpy as np
-from .statistics import mann_kendall_test, sens_slope_estimate, calculate_trend_statistics
+from .statistics import (mann_kendall_test, sens_slope_estimate, calculate_trend_statistics,
+                         calculate_trend_statistics_batch, permutation_test_event_years)
+from .changepoint import analyze_change_points
 
 
 def analyze_annual_trends(df, value_column='albedo_mean', min_obs_per_year=5):
@@ -61,6 +63,59 @@ def analyze_annual_trends(df, value_column='albedo_mean', min_obs_per_year=5):
     return results
 
 
+def analyze_glacier_trends(df, value_column='albedo_mean', min_obs_per_year=5, group_column='glacier_id'):
+    """
+    Annual trend analysis of every glacier of a multi-glacier table
+    
+    Annual means of all glaciers come from one groupby and all trends from
+    one batched call over the (glacier × year) matrix, so each glacier gets
+    the same statistics analyze_annual_trends would give it alone.
+    
+    Args:
+        df: Long DataFrame keyed by glacier (see extract_time_series_glaciers)
+        value_column: Column name for values to analyze
+        min_obs_per_year: Minimum observations required per year
+        group_column: Column identifying the glacier
+    
+    Returns:
+        dict: {glacier_id: trend results with 'annual_data' and 'glacier_name'}
+              for glaciers with at least 4 valid years
+    """
+    if df.empty or group_column not in df.columns:
+        return {}
+    
+    print(f"\n🔍 ANNUAL TREND ANALYSIS BY GLACIER")
+    print("=" * 50)
+    
+    annual = df.groupby([group_column, 'year'], observed=True)[value_column] \
+        .agg(['mean', 'std', 'count']).reset_index()
+    annual = annual[annual['count'] >= min_obs_per_year]
+    
+    annual_means = annual.pivot(index=group_column, columns='year', values='mean')
+    trend_results = calculate_trend_statistics_batch(
+        annual_means.to_numpy(dtype=float), annual_means.columns.to_numpy()
+    )
+    annual_by_glacier = {glacier: group.drop(columns=group_column).reset_index(drop=True)
+                         for glacier, group in annual.groupby(group_column, observed=True)}
+    names = df.drop_duplicates(group_column).set_index(group_column)['glacier_name'].to_dict() \
+        if 'glacier_name' in df.columns else {}
+    
+    results = {}
+    for glacier, trends in zip(annual_means.index, trend_results):
+        glacier_annual = annual_by_glacier.get(glacier)
+        if trends is None or glacier_annual is None or len(glacier_annual) < 4:
+            print(f"   ⚠️  {names.get(glacier, glacier)}: insufficient years for trend analysis")
+            continue
+        trends['annual_data'] = glacier_annual
+        trends['glacier_name'] = names.get(glacier, glacier)
+        results[glacier] = trends
+        print(f"   {trends['glacier_name']}: {trends['change_per_year']:.4f}/year "
+              f"(p={trends['mann_kendall']['p_value']:.3f}, {trends['period']})")
+    
+    print(f"📊 Trends computed for {len(results)}/{df[group_column].nunique()} glaciers")
+    return results
+
+
 def analyze_monthly_trends(df, months=[6, 7, 8, 9], value_column='albedo_mean'):
     """
     Analyze trends for specific months separately
@@ -177,6 +232,14 @@ def analyze_fire_impact(df, fire_years=[2017, 2018, 2021, 2023], value_column='a
     else:
         print(f"   ⚠️  No significant difference detected")
     
+    # Permutation test over fire-year labels (daily and annual levels)
+    permutation_results = event_year_permutation_test(df, fire_years, value_column)
+    if permutation_results:
+        print(f"\n🎲 PERMUTATION TEST ({'exact' if permutation_results['daily']['exact'] else 'Monte Carlo'}, "
+              f"{permutation_results['daily']['n_permutations']} labelings):")
+        print(f"   Daily level P-value: {permutation_results['daily']['p_value']:.4f}")
+        print(f"   Annual level P-value: {permutation_results['annual']['p_value']:.4f}")
+    
     # Analyze individual fire years
     fire_year_stats = {}
     for year in fire_years:
@@ -199,12 +262,80 @@ def analyze_fire_impact(df, fire_years=[2017, 2018, 2021, 2023], value_column='a
         't_statistic': t_stat,
         'p_value': p_value,
         'significant': p_value < 0.05,
+        'permutation_test': permutation_results,
         'fire_year_stats': fire_year_stats
     }
     
     return results
 
 
+def event_year_permutation_test(df, event_years, value_column='albedo_mean',
+                                n_permutations=10000, max_exact=20000, alpha=0.05, seed=42):
+    """
+    Permutation test of event years (fires, dust events, ...) against other years
+    
+    Event labels are permuted over whole years. The 'daily' level pools all
+    observations of a group; the 'annual' level compares annual means.
+    Labelings are enumerated exactly when there are at most max_exact of them.
+    
+    Args:
+        df: DataFrame with year and value data
+        event_years: List of event years
+        value_column: Column name for values
+        n_permutations: Random labelings when exact enumeration is too large
+        max_exact: Largest number of labelings enumerated exactly
+        alpha: Significance level
+        seed: Random seed for reproducible draws
+    
+    Returns:
+        dict: {'daily': {...}, 'annual': {...}} test results, empty if untestable
+    """
+    if df.empty:
+        return {}
+    
+    yearly = df.groupby('year')[value_column].agg(['sum', 'count'])
+    return event_year_permutation_test_from_totals(yearly, event_years, n_permutations=n_permutations,
+                                                   max_exact=max_exact, alpha=alpha, seed=seed)
+
+
+def event_year_permutation_test_from_totals(yearly, event_years, n_permutations=10000, max_exact=20000,
+                                            alpha=0.05, seed=42):
+    """
+    event_year_permutation_test from per-year totals instead of daily rows
+    
+    Args:
+        yearly: DataFrame indexed by year with 'sum' and 'count' of the values
+        event_years: List of event years
+        n_permutations, max_exact, alpha, seed: As event_year_permutation_test
+    
+    Returns:
+        dict: Same structure as event_year_permutation_test
+    """
+    yearly = yearly[yearly['count'] > 0]
+    event_mask = yearly.index.isin(event_years)
+    
+    if event_mask.all() or not event_mask.any():
+        return {}
+    
+    results = {}
+    for level in ('daily', 'annual'):
+        test = permutation_test_event_years(
+            yearly['sum'].to_numpy(), yearly['count'].to_numpy(), event_mask, level=level,
+            n_permutations=n_permutations, max_exact=max_exact, alpha=alpha, seed=seed
+        )
+        results[level] = {
+            'difference': float(test['difference'][0]),
+            'p_value': float(test['p_value'][0]),
+            'significant': bool(test['significant'][0]),
+            'null_std': float(test['null_std'][0]),
+            'n_permutations': test['n_permutations'],
+            'exact': test['exact']
+        }
+    results['event_years'] = [int(y) for y in yearly.index[event_mask]]
+    results['n_years'] = len(yearly)
+    return results
+
+
 def analyze_melt_season_trends(df):
     """
     Comprehensive melt season trend analysis
@@ -234,6 +365,9 @@ def analyze_melt_season_trends(df):
     # Fire impact analysis
     fire_results = analyze_fire_impact(df, fire_years=[2017, 2018, 2021, 2023])
     
+    # Regime shifts (Pettitt + binary segmentation)
+    change_point_results = analyze_change_points(df, months=[6, 7, 8, 9])
+    
     # Summary statistics
     print(f"\n📊 SUMMARY STATISTICS:")
     print(f"   Overall albedo mean: {df['albedo_mean'].mean():.3f}")
@@ -244,6 +378,7 @@ def analyze_melt_season_trends(df):
         'annual_trends': annual_results,
         'monthly_trends': monthly_results,
         'fire_impact': fire_results,
+        'change_points': change_point_results,
         'summary_stats': {
             'mean_albedo': df['albedo_mean'].mean(),
             'std_albedo': df['albedo_mean'].std(),
@@ -0,0 +1,475 @@
+"""
+Incremental Trend State for Melt Season Analysis
+Keeps per-year sufficient statistics so a new melt season can be appended
+without regrouping the full daily table
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.stats import ttest_ind_from_stats
+
+from .changepoint import detect_change_points
+from .statistics import mann_kendall_test
+from .temporal import event_year_permutation_test_from_totals
+
+
+DEFAULT_FIRE_YEARS = [2017, 2018, 2021, 2023]
+
+
+def _combine_moments(counts, means, m2s):
+    """
+    Combine per-group (count, mean, M2) into overall moments (Chan et al.)
+
+    Returns:
+        tuple: (count, mean, std) with std using ddof=1
+    """
+    counts = np.asarray(counts, dtype=float)
+    means = np.asarray(means, dtype=float)
+    m2s = np.asarray(m2s, dtype=float)
+    n = counts.sum()
+    if n == 0:
+        return 0, np.nan, np.nan
+    mean = (counts * means).sum() / n
+    m2 = m2s.sum() + (counts * (means - mean) ** 2).sum()
+    std = np.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+    return int(n), mean, std
+
+
+def _year_statistics(df, keys, value_column):
+    """Per-(keys, year) count, mean, std and M2 of the value column"""
+    grouped = df.groupby(keys + ['year'], observed=True)[value_column].agg(['count', 'mean', 'std'])
+    grouped = grouped[grouped['count'] > 0]
+    grouped['m2'] = (grouped['std'].fillna(0.0) ** 2) * (grouped['count'] - 1)
+    return grouped
+
+
+def year_fingerprints(df, value_column, columns=()):
+    """
+    Per-year fingerprint of the observations a trend state aggregates
+
+    Count plus an order-independent hash of the values (and of the month /
+    band columns they are grouped by), so re-extracted data with other QA
+    settings or corrected values is detected even when counts match.
+
+    Returns:
+        dict: {year: 'count:hash'} for years with at least one value
+    """
+    df = df[df[value_column].notna()]
+    if df.empty:
+        return {}
+    columns = [value_column] + [col for col in columns if col in df.columns]
+    hashes = pd.util.hash_pandas_object(df[columns], index=False)
+    # uint64 sums wrap around, which keeps the fingerprint order-independent
+    totals = hashes.groupby(df['year'].to_numpy()).agg(['count', 'sum'])
+    return {int(year): f"{int(row['count'])}:{int(row['sum']):016x}" for year, row in totals.iterrows()}
+
+
+class _SeriesState:
+    """
+    Annual statistics of one series (annual, one month or one band) and the
+    sorted pairwise slopes of the years that pass the observation threshold
+    """
+
+    def __init__(self, min_obs):
+        self.min_obs = min_obs
+        self.years = {}      # year -> [count, mean, std, m2]
+        self.included = []   # years passing min_obs, ascending
+        self.slopes = np.empty(0)
+        self.dirty = False
+
+    def _values(self):
+        return np.array([self.years[y][1] for y in self.included], dtype=float)
+
+    def add_year(self, year, count, mean, std, m2):
+        """Add or merge one year's statistics"""
+        year = int(year)
+        if year in self.years:
+            old_count, old_mean, _, old_m2 = self.years[year]
+            count, mean, std = _combine_moments([old_count, count], [old_mean, mean], [old_m2, m2])
+            m2 = (std ** 2) * (count - 1) if count > 1 else 0.0
+        self.years[year] = [int(count), float(mean), float(std), float(m2)]
+
+        was_included = year in self.included
+        now_included = count >= self.min_obs
+        if was_included or (now_included and self.included and year < self.included[-1]):
+            # Value of an existing point changed or a year landed mid-series:
+            # every index gap shifts, rebuild on demand
+            self.dirty = True
+        elif now_included:
+            self._append(year)
+
+    def drop_year(self, year):
+        """Remove one year's statistics (e.g. before re-adding a partial season)"""
+        if self.years.pop(int(year), None) is not None and int(year) in self.included:
+            self.dirty = True
+
+    def _append(self, year):
+        """Append a year after the last included one (O(n) slope merge)"""
+        if self.dirty:
+            self.included.append(year)
+            return
+        values = self._values()
+        n = len(values)
+        new_value = self.years[year][1]
+        new_slopes = np.sort((new_value - values) / (n - np.arange(n)))
+        self.slopes = np.insert(self.slopes, np.searchsorted(self.slopes, new_slopes), new_slopes)
+        self.included.append(year)
+
+    def _rebuild(self):
+        self.included = sorted(y for y, stats in self.years.items() if stats[0] >= self.min_obs)
+        values = self._values()
+        i, j = np.triu_indices(len(values), k=1)
+        self.slopes = np.sort((values[j] - values[i]) / (j - i))
+        self.dirty = False
+
+    def sens_slope(self):
+        """Sen's slope and intercept, matching sens_slope_estimate"""
+        if self.dirty:
+            self._rebuild()
+        values = self._values()
+        n = len(values)
+        if n < 4:
+            return {'slope_per_year': 0.0, 'intercept': np.mean(values)}
+        k = len(self.slopes) // 2
+        if len(self.slopes) % 2:
+            slope = self.slopes[k]
+        else:
+            slope = np.mean(self.slopes[k - 1:k + 1])
+        return {
+            'slope_per_year': slope,
+            'intercept': np.median(values) - slope * np.median(np.arange(n))
+        }
+
+    def trend_statistics(self):
+        """Statistics dict as returned by calculate_trend_statistics"""
+        if self.dirty:
+            self._rebuild()
+        values = self._values()
+        if len(values) == 0:
+            return None
+        years = np.array(self.included)
+
+        mk_result = mann_kendall_test(values)
+        sens_result = self.sens_slope()
+
+        first_year_value = values[0]
+        total_change = values[-1] - first_year_value
+        change_per_year = sens_result['slope_per_year']
+
+        return {
+            'mann_kendall': mk_result,
+            'sens_slope': sens_result,
+            'n_years': len(years),
+            'change_per_year': change_per_year,
+            'change_percent_per_year': (change_per_year / first_year_value) * 100,
+            'total_change': total_change,
+            'total_percent_change': (total_change / first_year_value) * 100,
+            'significance': "significant" if mk_result['p_value'] < 0.05 else "not significant",
+            'period': f"{years.min()}-{years.max()}"
+        }
+
+    def annual_data(self, columns=('mean', 'std', 'count')):
+        """Annual table of the included years, like the groupby in the analyses"""
+        if self.dirty:
+            self._rebuild()
+        rows = {'year': np.array(self.included, dtype=int)}
+        index = {'count': 0, 'mean': 1, 'std': 2}
+        for col in columns:
+            rows[col] = [self.years[y][index[col]] for y in self.included]
+        table = pd.DataFrame(rows)
+        if 'count' in table.columns:
+            table['count'] = table['count'].astype(int)
+        return table
+
+    def to_dict(self):
+        if self.dirty:
+            self._rebuild()
+        return {
+            'min_obs': self.min_obs,
+            'years': {str(y): stats for y, stats in self.years.items()},
+            'included': self.included,
+            'slopes': self.slopes.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        series = cls(state['min_obs'])
+        series.years = {int(y): stats for y, stats in state['years'].items()}
+        series.included = [int(y) for y in state['included']]
+        series.slopes = np.asarray(state['slopes'], dtype=float)
+        return series
+
+
+class TrendState:
+    """
+    Persistent melt season trend state
+
+    Stores per-year count, mean, std and M2 for the annual series, each
+    melt-season month and (when present) each elevation band, together with
+    the sorted pairwise slopes behind Sen's slope. Appending a season only
+    aggregates the new rows and merges n new slopes; results match
+    analyze_annual_trends / analyze_monthly_trends / analyze_fire_impact.
+    """
+
+    def __init__(self, value_column='albedo_mean', months=(6, 7, 8, 9),
+                 band_column='elevation_band', min_obs_per_year=5,
+                 min_obs_per_month=3, min_obs_per_band=5):
+        self.value_column = value_column
+        self.months = [int(m) for m in months]
+        self.band_column = band_column
+        self.annual = _SeriesState(min_obs_per_year)
+        self.monthly = {m: _SeriesState(min_obs_per_month) for m in self.months}
+        self.bands = {}
+        self.min_obs_per_band = min_obs_per_band
+        self.fingerprints = {}   # year -> year_fingerprints() value of the folded rows
+
+    @property
+    def years(self):
+        """All years with at least one observation"""
+        return sorted(self.annual.years)
+
+    def update(self, df):
+        """
+        Fold new daily observations (typically one melt season) into the state
+
+        Args:
+            df: DataFrame with year, month and value columns (optionally band column)
+
+        Returns:
+            TrendState: self (for chaining)
+        """
+        if df.empty:
+            return self
+
+        df = df[df[self.value_column].notna()]
+        self.fingerprints.update(self.fingerprint(df))
+
+        for year, row in _year_statistics(df, [], self.value_column).iterrows():
+            self.annual.add_year(year, row['count'], row['mean'], row['std'], row['m2'])
+
+        if 'month' in df.columns:
+            monthly = _year_statistics(df[df['month'].isin(self.months)], ['month'], self.value_column)
+            for (month, year), row in monthly.iterrows():
+                self.monthly[int(month)].add_year(year, row['count'], row['mean'], row['std'], row['m2'])
+
+        if self.band_column and self.band_column in df.columns:
+            banded = _year_statistics(df, [self.band_column], self.value_column)
+            for (band, year), row in banded.iterrows():
+                series = self.bands.setdefault(str(band), _SeriesState(self.min_obs_per_band))
+                series.add_year(year, row['count'], row['mean'], row['std'], row['m2'])
+
+        return self
+
+    def fingerprint(self, df):
+        """Per-year fingerprints of df for the columns this state aggregates"""
+        return year_fingerprints(df, self.value_column, ['month', self.band_column] if self.band_column else ['month'])
+
+    def drop_years(self, years):
+        """
+        Remove years from every series so they can be re-added in full
+
+        Args:
+            years: Iterable of years to remove
+        """
+        for series in [self.annual] + list(self.monthly.values()) + list(self.bands.values()):
+            for year in years:
+                series.drop_year(year)
+        for year in years:
+            self.fingerprints.pop(year, None)
+        return self
+
+    def annual_trends(self):
+        """Annual trend results (same structure as analyze_annual_trends)"""
+        results = self.annual.trend_statistics()
+        if results is None or results['n_years'] < 4:
+            return None
+        results['annual_data'] = self.annual.annual_data()
+        return results
+
+    def monthly_trends(self):
+        """Monthly trend results (same structure as analyze_monthly_trends)"""
+        monthly_results = {}
+        for month, series in self.monthly.items():
+            stats = series.trend_statistics()
+            if stats is None or stats['n_years'] < 4:
+                continue
+            stats['month_name'] = pd.Timestamp(2000, month, 1).strftime('%B')
+            stats['annual_data'] = series.annual_data(columns=('mean', 'count'))
+            monthly_results[month] = stats
+        return monthly_results
+
+    def band_trends(self):
+        """Per-band trend statistics (bands with ≥4 qualifying years)"""
+        band_results = {}
+        for band, series in self.bands.items():
+            stats = series.trend_statistics()
+            if stats is None or stats['n_years'] < 4:
+                continue
+            stats['annual_data'] = series.annual_data()
+            band_results[band] = stats
+        return band_results
+
+    def fire_impact(self, fire_years=None):
+        """Fire vs non-fire comparison (same structure as analyze_fire_impact)"""
+        fire_years = list(DEFAULT_FIRE_YEARS if fire_years is None else fire_years)
+        fire_stats = [self.annual.years[y] for y in self.annual.years if y in fire_years]
+        other_stats = [self.annual.years[y] for y in self.annual.years if y not in fire_years]
+        if not fire_stats or not other_stats:
+            return {}
+
+        n_fire, fire_mean, fire_std = _combine_moments(*zip(*[s[:2] + s[3:] for s in fire_stats]))
+        n_other, non_fire_mean, non_fire_std = _combine_moments(*zip(*[s[:2] + s[3:] for s in other_stats]))
+        t_stat, p_value = ttest_ind_from_stats(fire_mean, fire_std, n_fire,
+                                               non_fire_mean, non_fire_std, n_other)
+        difference = fire_mean - non_fire_mean
+
+        # Permutation test over fire-year labels, from the stored annual totals
+        yearly = pd.DataFrame(
+            [(year, stats[0] * stats[1], stats[0]) for year, stats in sorted(self.annual.years.items())],
+            columns=['year', 'sum', 'count']
+        ).set_index('year')
+        permutation_results = event_year_permutation_test_from_totals(yearly, fire_years)
+
+        return {
+            'fire_years': fire_years,
+            'fire_mean': fire_mean,
+            'fire_std': fire_std,
+            'non_fire_mean': non_fire_mean,
+            'non_fire_std': non_fire_std,
+            'difference': difference,
+            'percent_difference': (difference / non_fire_mean) * 100,
+            't_statistic': t_stat,
+            'p_value': p_value,
+            'significant': p_value < 0.05,
+            'permutation_test': permutation_results,
+            'fire_year_stats': {
+                year: {'mean': self.annual.years[year][1],
+                       'std': self.annual.years[year][2],
+                       'count': self.annual.years[year][0]}
+                for year in fire_years if year in self.annual.years
+            }
+        }
+
+    def change_points(self):
+        """Change points of the annual, monthly and band series (same structure as analyze_change_points)"""
+        results = {}
+        annual = self.annual.annual_data(columns=('mean', 'count'))
+        if len(annual) >= 4:
+            results['annual'] = detect_change_points(annual, value_column='mean')
+
+        monthly = [series.annual_data(columns=('mean', 'count')).assign(month=month)
+                   for month, series in self.monthly.items()]
+        monthly = pd.concat(monthly, ignore_index=True) if monthly else pd.DataFrame()
+        if not monthly.empty:
+            results['monthly'] = detect_change_points(monthly, value_column='mean', series_columns=['month'])
+
+        bands = [series.annual_data(columns=('mean', 'count')).assign(**{self.band_column: band})
+                 for band, series in self.bands.items()]
+        bands = pd.concat(bands, ignore_index=True) if bands else pd.DataFrame()
+        if not bands.empty:
+            results['bands'] = detect_change_points(bands, value_column='mean', series_columns=[self.band_column])
+        return results
+
+    def summary_stats(self):
+        """Overall summary (same structure as analyze_melt_season_trends)"""
+        stats = list(self.annual.years.values())
+        if not stats:
+            return {}
+        n, mean, std = _combine_moments(*zip(*[s[:2] + s[3:] for s in stats]))
+        years = self.years
+        return {
+            'mean_albedo': mean,
+            'std_albedo': std,
+            'n_observations': n,
+            'years_covered': years,
+            'period': f"{min(years)}-{max(years)}"
+        }
+
+    def results(self, fire_years=None):
+        """Combined results keyed like analyze_melt_season_trends"""
+        return {
+            'annual_trends': self.annual_trends(),
+            'monthly_trends': self.monthly_trends(),
+            'fire_impact': self.fire_impact(fire_years),
+            'band_trends': self.band_trends(),
+            'change_points': self.change_points(),
+            'summary_stats': self.summary_stats()
+        }
+
+    def to_dict(self):
+        """Serializable representation of the trend state"""
+        return {
+            'value_column': self.value_column,
+            'months': self.months,
+            'band_column': self.band_column,
+            'min_obs_per_band': self.min_obs_per_band,
+            'annual': self.annual.to_dict(),
+            'monthly': {str(m): s.to_dict() for m, s in self.monthly.items()},
+            'bands': {b: s.to_dict() for b, s in self.bands.items()},
+            'fingerprints': {str(y): f for y, f in self.fingerprints.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild a trend state from to_dict() output"""
+        trend_state = cls(value_column=state['value_column'], months=state['months'],
+                          band_column=state['band_column'],
+                          min_obs_per_band=state['min_obs_per_band'])
+        trend_state.annual = _SeriesState.from_dict(state['annual'])
+        trend_state.monthly = {int(m): _SeriesState.from_dict(s) for m, s in state['monthly'].items()}
+        trend_state.bands = {b: _SeriesState.from_dict(s) for b, s in state['bands'].items()}
+        trend_state.fingerprints = {int(y): f for y, f in state.get('fingerprints', {}).items()}
+        return trend_state
+
+    def save(self, path):
+        """Save the trend state as JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        """Load a trend state saved with save()"""
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+def update_trend_state(df, state_path=None, **kwargs):
+    """
+    Bring a saved trend state up to date with a daily melt season table
+
+    Every year of df is fingerprinted (count and hash of its values); only
+    years missing from the state or whose fingerprint changed (new rows of
+    the current season, re-extraction with other QA settings, corrected
+    values) are aggregated again. Stored years absent from df are dropped.
+
+    Args:
+        df: DataFrame with complete melt season data
+        state_path: JSON file of a previously saved TrendState (optional)
+        **kwargs: TrendState options when a new state is created
+
+    Returns:
+        TrendState: Updated state (not saved)
+    """
+    state = None
+    if state_path is not None and os.path.exists(state_path):
+        try:
+            state = TrendState.load(state_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Could not load trend state, rebuilding: {e}")
+
+    if state is None:
+        return TrendState(**kwargs).update(df)
+
+    fingerprints = state.fingerprint(df)
+    # Years outside the requested period, and years whose data changed (states
+    # saved without fingerprints are refreshed in full)
+    refresh = [y for y in state.years if state.fingerprints.get(y) != fingerprints.get(y)]
+    state.drop_years(refresh)
+    new_years = set(fingerprints) - set(state.years)
+    if new_years:
+        print(f"🔄 Updating trend state with {len(new_years)} year(s): {', '.join(map(str, sorted(new_years)))}")
+        state.update(df[df['year'].isin(new_years)])
+    return state
@@ -9,6 +9,17 @@ import ee
 from datetime import datetime
 from config import athabasca_roi, MODIS_COLLECTIONS
 
+try:
+    from ..ee_trace import trace_phase
+    from ..glacier_roi import get_glacier_roi, get_glacier_set
+    from ..region_tiling import plan_tiles, run_tiles
+    from ..utils.run_timing import span as run_span
+except ImportError:
+    from ee_trace import trace_phase
+    from glacier_roi import get_glacier_roi, get_glacier_set
+    from region_tiling import plan_tiles, run_tiles
+    from utils.run_timing import span as run_span
+
 
 # ================================================================================
 # MODIS MASKING FUNCTIONS
@@ -220,16 +231,98 @@ def combine_terra_aqua_literature_method(terra_collection, aqua_collection):
     return final_collection
 
 
+def _snow_masking_function(use_advanced_qa, qa_level, custom_qa_config):
+    """Masking function for the QA preferences (prints the chosen filtering)"""
+    if use_advanced_qa:
+        # Use advanced masking with Algorithm QA flags
+        print(f"   🔬 Using advanced QA filtering ({qa_level})")
+        if custom_qa_config:
+            print(f"   🎯 Custom QA config: {custom_qa_config}")
+        return lambda img: mask_modis_snow_albedo_advanced(img, qa_level, custom_qa_config)
+    # Use standard masking (Basic QA only)
+    print(f"   ⚡ Using standard QA filtering")
+    return mask_modis_snow_albedo_fast
+
+
+def _fused_snow_collections(start_date, end_date, region, masking_func):
+    """
+    Masked Terra and Aqua collections and their literature-based fusion
+    (Terra priority + Aqua gap-filling)
+
+    Returns:
+        tuple: (terra collection, aqua collection, daily composites)
+    """
+    print(f"   🛰️ Applying literature-based Terra-Aqua fusion strategy")
+    
+    mod_col = ee.ImageCollection(MODIS_COLLECTIONS['snow_terra']) \
+        .filterBounds(region) \
+        .filterDate(start_date, end_date) \
+        .map(masking_func)
+    
+    myd_col = ee.ImageCollection(MODIS_COLLECTIONS['snow_aqua']) \
+        .filterBounds(region) \
+        .filterDate(start_date, end_date) \
+        .map(masking_func)
+    
+    return mod_col, myd_col, combine_terra_aqua_literature_method(mod_col, myd_col)
+
+
+def _print_fusion_statistics(terra_count, aqua_count, combined_count):
+    print(f"   📊 Fusion Statistics:")
+    print(f"      - Terra (MOD10A1): {terra_count} observations")
+    print(f"      - Aqua (MYD10A1): {aqua_count} observations") 
+    print(f"      - Combined (literature method): {combined_count} daily composites")
+    print(f"      - Reduction: {terra_count + aqua_count - combined_count} duplicate/conflicting observations removed")
+
+
+def _print_pixel_count_statistics(df):
+    print(f"📊 Pixel count statistics:")
+    print(f"   Min: {df['pixel_count'].min()}")
+    print(f"   Max: {df['pixel_count'].max()}")
+    print(f"   Mean: {df['pixel_count'].mean():.1f}")
+    print(f"   Median: {df['pixel_count'].median():.1f}")
+
+
+def _add_calendar_columns(df):
+    """Year, month and season columns from the date column (in place)"""
+    df['year'] = df['date'].dt.year
+    df['month'] = df['date'].dt.month
+    df['season'] = df['month'].map({
+        12: 'Winter', 1: 'Winter', 2: 'Winter',
+        3: 'Spring', 4: 'Spring', 5: 'Spring',
+        6: 'Summer', 7: 'Summer', 8: 'Summer',
+        9: 'Fall', 10: 'Fall', 11: 'Fall'
+    })
+
+
+def _add_fusion_columns(df, terra_count, aqua_count, combined_count):
+    """Terra-Aqua fusion summary metadata (in place)"""
+    df['terra_aqua_fusion'] = True
+    df['fusion_method'] = 'Literature-based (Terra priority + Aqua gap-filling)'
+    df['terra_total_observations'] = terra_count
+    df['aqua_total_observations'] = aqua_count
+    df['combined_daily_composites'] = combined_count
+    df['duplicates_eliminated'] = terra_count + aqua_count - combined_count
+
+
+@trace_phase('time_series')
 def extract_time_series_fast(start_date, end_date, 
                             use_broadband=False,
                             sampling_days=None,
                             scale=500,
                             use_advanced_qa=False,
                             qa_level='standard',
-                            custom_qa_config=None):
+                            custom_qa_config=None,
+                            region=None,
+                            tile_cells=None,
+                            max_workers=None):
     """
     Fast extraction - statistics for entire glacier without zone division
     
+    Large regions (e.g. config.COLUMBIA_ICEFIELD_BOUNDS) are extracted in
+    tiling mode: one request per grid-aligned tile, run concurrently and
+    merged exactly (see _extract_time_series_tiled).
+    
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
@@ -238,6 +331,11 @@ def extract_time_series_fast(start_date, end_date,
         scale: Spatial resolution in meters
         use_advanced_qa: Whether to use advanced Algorithm QA flags filtering
         qa_level: Quality level ('strict', 'standard', 'relaxed')
+        region: None for the Athabasca mask, a (min_lon, min_lat, max_lon,
+                max_lat) box or an ee.Geometry
+        tile_cells: Tile edge in 500 m cells to enable tiling mode (None
+                    extracts the region in one request)
+        max_workers: Concurrent tile requests (tiling mode only)
     
     Returns:
         DataFrame: Extracted time series data
@@ -251,45 +349,23 @@ def extract_time_series_fast(start_date, end_date,
         use_broadband = False
     
     # Choose masking function based on QA preferences
-    if use_advanced_qa:
-        # Use advanced masking with Algorithm QA flags
-        masking_func = lambda img: mask_modis_snow_albedo_advanced(img, qa_level, custom_qa_config)
-        print(f"   🔬 Using advanced QA filtering ({qa_level})")
-        if custom_qa_config:
-            print(f"   🎯 Custom QA config: {custom_qa_config}")
-    else:
-        # Use standard masking (Basic QA only)
-        masking_func = mask_modis_snow_albedo_fast
-        print(f"   ⚡ Using standard QA filtering")
+    masking_func = _snow_masking_function(use_advanced_qa, qa_level, custom_qa_config)
     
     # Combine MOD10A1 and MYD10A1 using literature best practices
     # Terra prioritized over Aqua due to band 6 reliability issues
-    print(f"   🛰️ Applying literature-based Terra-Aqua fusion strategy")
-    
-    mod_col = ee.ImageCollection(MODIS_COLLECTIONS['snow_terra']) \
-        .filterBounds(athabasca_roi) \
-        .filterDate(start_date, end_date) \
-        .map(masking_func)
-    
-    myd_col = ee.ImageCollection(MODIS_COLLECTIONS['snow_aqua']) \
-        .filterBounds(athabasca_roi) \
-        .filterDate(start_date, end_date) \
-        .map(masking_func)
-    
-    # Apply literature-based fusion: Terra priority + Aqua gap-filling
-    collection = combine_terra_aqua_literature_method(mod_col, myd_col)
+    roi, bounds = _extraction_region(region)
+    mod_col, myd_col, collection = _fused_snow_collections(start_date, end_date, roi, masking_func)
     albedo_band = 'albedo_daily'
     
+    if tile_cells:
+        return _extract_time_series_tiled(mod_col, myd_col, collection, roi, bounds,
+                                          scale, tile_cells, max_workers)
+    
     # Report fusion statistics
     terra_count = mod_col.size().getInfo()
     aqua_count = myd_col.size().getInfo()
     combined_count = collection.size().getInfo()
-    
-    print(f"   📊 Fusion Statistics:")
-    print(f"      - Terra (MOD10A1): {terra_count} observations")
-    print(f"      - Aqua (MYD10A1): {aqua_count} observations") 
-    print(f"      - Combined (literature method): {combined_count} daily composites")
-    print(f"      - Reduction: {terra_count + aqua_count - combined_count} duplicate/conflicting observations removed")
+    _print_fusion_statistics(terra_count, aqua_count, combined_count)
     
     # Temporal sampling if specified
     if sampling_days:
@@ -307,14 +383,14 @@ def extract_time_series_fast(start_date, end_date,
         # Complete glacier stats with centroid-based filtering
         # Sample pixels at their centers within the glacier boundary
         albedo_sample = albedo.sample(
-            region=athabasca_roi,
+            region=roi,
             scale=scale,
             geometries=True
         )
         
         # Filter to keep only pixels whose centers are inside the glacier
         def filter_pixel_centroids(feature):
-            return feature.set('inside_glacier', athabasca_roi.contains(feature.geometry()))
+            return feature.set('inside_glacier', roi.contains(feature.geometry()))
         
         centroids_tested = albedo_sample.map(filter_pixel_centroids)
         valid_centroids = centroids_tested.filter(ee.Filter.eq('inside_glacier', True))
@@ -370,30 +446,14 @@ def extract_time_series_fast(start_date, end_date,
             df['date'] = pd.to_datetime(df['date'])
             df = df.sort_values('date').reset_index(drop=True)
             
-            print(f"📊 Pixel count statistics:")
-            print(f"   Min: {df['pixel_count'].min()}")
-            print(f"   Max: {df['pixel_count'].max()}")
-            print(f"   Mean: {df['pixel_count'].mean():.1f}")
-            print(f"   Median: {df['pixel_count'].median():.1f}")
+            _print_pixel_count_statistics(df)
             
             # Temporal columns
-            df['year'] = df['date'].dt.year
-            df['month'] = df['date'].dt.month
-            df['season'] = df['month'].map({
-                12: 'Winter', 1: 'Winter', 2: 'Winter',
-                3: 'Spring', 4: 'Spring', 5: 'Spring',
-                6: 'Summer', 7: 'Summer', 8: 'Summer',
-                9: 'Fall', 10: 'Fall', 11: 'Fall'
-            })
+            _add_calendar_columns(df)
             
             # Add Terra-Aqua fusion summary metadata
             if not use_broadband:  # Only for MOD10A1/MYD10A1
-                df['terra_aqua_fusion'] = True
-                df['fusion_method'] = 'Literature-based (Terra priority + Aqua gap-filling)'
-                df['terra_total_observations'] = terra_count
-                df['aqua_total_observations'] = aqua_count
-                df['combined_daily_composites'] = combined_count
-                df['duplicates_eliminated'] = terra_count + aqua_count - combined_count
+                _add_fusion_columns(df, terra_count, aqua_count, combined_count)
             else:
                 df['terra_aqua_fusion'] = False
                 df['fusion_method'] = 'N/A (MCD43A3 product)'
@@ -406,11 +466,263 @@ def extract_time_series_fast(start_date, end_date,
         return pd.DataFrame()
 
 
+def _extraction_region(region):
+    """
+    Earth Engine geometry and lon/lat bounds of the region to extract
+
+    Returns:
+        tuple: (ee.Geometry, (min_lon, min_lat, max_lon, max_lat) or None if
+               only known server-side)
+    """
+    if region is None:
+        return athabasca_roi, get_glacier_roi().bounds
+    if isinstance(region, (list, tuple)) and len(region) == 4:
+        # Planar box, as the lon/lat test of full_grid_map.is_in_columbia_icefield_region
+        return ee.Geometry.Rectangle(list(region), None, False), tuple(region)
+    return region, None
+
+
+# Additive per-tile statistics downloaded per date by the tiling mode
+TILE_SUM_COLUMNS = ['date', 'timestamp', 'albedo_sum', 'albedo_sum_sq', 'albedo_min', 'albedo_max',
+                    'pixel_count', 'satellite_source', 'original_satellite']
+
+TIME_SERIES_COLUMNS = ['date', 'timestamp', 'albedo_mean', 'albedo_stdDev', 'albedo_min', 'albedo_max',
+                       'pixel_count', 'satellite_source', 'original_satellite']
+
+
+def _merge_tile_sums(parts):
+    """
+    Per-date statistics of the whole region from per-tile sums
+
+    Counts, sums and sums of squares add up and min/max combine, so the
+    merged mean, min, max and count are those of a single reduction over
+    the region; albedo_stdDev is the sample standard deviation.
+    """
+    merged = parts.groupby('date', sort=True).agg(
+        timestamp=('timestamp', 'first'),
+        albedo_sum=('albedo_sum', 'sum'),
+        albedo_sum_sq=('albedo_sum_sq', 'sum'),
+        albedo_min=('albedo_min', 'min'),
+        albedo_max=('albedo_max', 'max'),
+        pixel_count=('pixel_count', 'sum'),
+        satellite_source=('satellite_source', 'first'),
+        original_satellite=('original_satellite', 'first')
+    ).reset_index()
+    
+    count = merged['pixel_count']
+    merged['albedo_mean'] = merged['albedo_sum'] / count
+    variance = (merged['albedo_sum_sq'] - merged['albedo_sum'] * merged['albedo_mean']) / (count - 1)
+    merged['albedo_stdDev'] = np.sqrt(variance.clip(lower=0)).where(count > 1, 0.0)
+    return merged[TIME_SERIES_COLUMNS]
+
+
+def _extract_time_series_tiled(mod_col, myd_col, collection, roi, bounds, scale,
+                               tile_cells, max_workers=None):
+    """
+    Tiling mode of extract_time_series_fast
+    
+    The region is split into grid-aligned tiles (region_tiling.plan_tiles)
+    sampled by concurrent requests. A tile keeps only the pixels whose
+    center lies inside both the tile and the region, so each pixel is
+    counted once, and downloads additive sums per date that are merged
+    client-side (_merge_tile_sums).
+    
+    Returns:
+        DataFrame: Same columns as the single-request extraction
+    """
+    albedo_band = 'albedo_daily'
+    if bounds is None:
+        ring = roi.bounds().coordinates().getInfo()[0]
+        bounds = (min(p[0] for p in ring), min(p[1] for p in ring),
+                  max(p[0] for p in ring), max(p[1] for p in ring))
+    tiles = plan_tiles(bounds, tile_cells)
+    print(f"   🧩 Tiling mode: {len(tiles)} tiles of {tile_cells}×{tile_cells} cells")
+    
+    def tile_sums(tile):
+        """Rows of TILE_SUM_COLUMNS for the pixels owned by this tile (one request)"""
+        tile_geometry = tile.ee_geometry()
+        
+        def image_sums(image):
+            samples = image.select(albedo_band).sample(region=tile_geometry, scale=scale, geometries=True)
+            owned = samples.map(lambda feature: feature.set({
+                'inside_glacier': roi.contains(feature.geometry()),
+                'inside_tile': tile_geometry.contains(feature.geometry())
+            })).filter(ee.Filter.And(
+                ee.Filter.eq('inside_glacier', True),
+                ee.Filter.eq('inside_tile', True)
+            ))
+            stats = owned.aggregate_stats(albedo_band)
+            return ee.Feature(None, {
+                'date': image.date().format('YYYY-MM-dd'),
+                'timestamp': image.date().millis(),
+                'albedo_sum': stats.get('sum'),
+                'albedo_sum_sq': stats.get('sum_sq'),
+                'albedo_min': stats.get('min'),
+                'albedo_max': stats.get('max'),
+                'pixel_count': owned.size(),
+                'satellite_source': ee.Algorithms.If(
+                    image.propertyNames().contains('source'), image.get('source'), 'Unknown'
+                ),
+                'original_satellite': ee.Algorithms.If(
+                    image.propertyNames().contains('satellite'), image.get('satellite'), 'Unknown'
+                )
+            })
+        
+        sums = collection.map(image_sums).filter(ee.Filter.gt('pixel_count', 0))
+        return sums.reduceColumns(
+            ee.Reducer.toList(len(TILE_SUM_COLUMNS)), TILE_SUM_COLUMNS
+        ).get('list').getInfo() or []
+    
+    try:
+        counts = ee.Dictionary({
+            'terra': mod_col.size(),
+            'aqua': myd_col.size(),
+            'combined': collection.size()
+        }).getInfo()
+        tile_rows = run_tiles(tile_sums, tiles, max_workers)
+    except Exception as e:
+        print(f"❌ Extraction error: {e}")
+        return pd.DataFrame()
+    
+    terra_count, aqua_count, combined_count = counts['terra'], counts['aqua'], counts['combined']
+    _print_fusion_statistics(terra_count, aqua_count, combined_count)
+    
+    parts = pd.DataFrame([row for rows in tile_rows for row in rows], columns=TILE_SUM_COLUMNS)
+    print(f"📡 Tile results: {len(parts)} tile-days from {sum(1 for rows in tile_rows if rows)}/{len(tiles)} tiles")
+    df = _merge_tile_sums(parts)
+    
+    # Minimum 5 pixels, as in the single-request extraction
+    df = df[df['pixel_count'] >= 5]
+    df = df.reset_index(drop=True)
+    if not df.empty:
+        df['date'] = pd.to_datetime(df['date'])
+        _print_pixel_count_statistics(df)
+        _add_calendar_columns(df)
+        _add_fusion_columns(df, terra_count, aqua_count, combined_count)
+    
+    print(f"✅ Extraction completed: {len(df)} observations")
+    return df
+
+
+# Columns downloaded per (glacier, date) by the multi-glacier extraction
+GLACIER_SERIES_COLUMNS = ['glacier_id', 'date', 'timestamp', 'albedo_mean', 'albedo_stdDev',
+                          'albedo_min', 'albedo_max', 'pixel_count', 'satellite_source', 'original_satellite']
+
+
+@trace_phase('time_series_glaciers')
+def extract_time_series_glaciers(start_date, end_date, glaciers=None, scale=500,
+                                 use_advanced_qa=False, qa_level='standard',
+                                 custom_qa_config=None, min_pixels=5):
+    """
+    Albedo statistics of every glacier of a set in one collection pass
+    
+    Each daily composite is reduced over all glacier outlines at once
+    (reduceRegions), so an extra glacier adds rows to the same download
+    instead of extra requests. Pixels count when their center is inside an
+    outline, as in extract_time_series_fast.
+    
+    Args:
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD)
+        glaciers: GlacierSet, path to an RGI-style GeoJSON/shapefile, or None
+                  for the default set (see glacier_roi.get_glacier_set)
+        scale: Spatial resolution in meters
+        use_advanced_qa: Whether to use advanced Algorithm QA flags filtering
+        qa_level: Quality level ('strict', 'standard', 'relaxed')
+        custom_qa_config: Dict with custom QA configuration for custom qa_level
+        min_pixels: Minimum valid pixels for a glacier-day to be kept
+    
+    Returns:
+        DataFrame: Long table, one row per glacier and date, keyed by glacier_id
+    """
+    glaciers = get_glacier_set(glaciers)
+    print(f"⚡ Multi-glacier extraction {start_date} to {end_date}")
+    print(f"   Glaciers: {len(glaciers)}, Resolution: {scale}m")
+    
+    masking_func = _snow_masking_function(use_advanced_qa, qa_level, custom_qa_config)
+    mod_col, myd_col, collection = _fused_snow_collections(
+        start_date, end_date, glaciers.ee_region(), masking_func
+    )
+    albedo_band = 'albedo_daily'
+    outlines = glaciers.ee_collection()
+    
+    # Pixel-center selection, as the centroid test of the single-glacier path
+    reducer = ee.Reducer.mean() \
+        .combine(ee.Reducer.stdDev(), sharedInputs=True) \
+        .combine(ee.Reducer.min(), sharedInputs=True) \
+        .combine(ee.Reducer.max(), sharedInputs=True) \
+        .combine(ee.Reducer.count(), sharedInputs=True) \
+        .unweighted()
+    
+    def reduce_over_glaciers(image):
+        """One geometry-free feature per glacier for this daily composite"""
+        image_properties = {
+            'date': image.date().format('YYYY-MM-dd'),
+            'timestamp': image.date().millis(),
+            'satellite_source': ee.Algorithms.If(
+                image.propertyNames().contains('source'), image.get('source'), 'Unknown'
+            ),
+            'original_satellite': ee.Algorithms.If(
+                image.propertyNames().contains('satellite'), image.get('satellite'), 'Unknown'
+            )
+        }
+        stats = image.select(albedo_band).reduceRegions(
+            collection=outlines, reducer=reducer, scale=scale
+        )
+        return stats.map(lambda feature: ee.Feature(None, dict(image_properties, **{
+            'glacier_id': feature.get('glacier_id'),
+            'albedo_mean': feature.get('mean'),
+            'albedo_stdDev': feature.get('stdDev'),
+            'albedo_min': feature.get('min'),
+            'albedo_max': feature.get('max'),
+            'pixel_count': feature.get('count')
+        })))
+    
+    series = collection.map(reduce_over_glaciers).flatten() \
+        .filter(ee.Filter.gte('pixel_count', min_pixels))
+    
+    try:
+        # Fusion counts and the table as rows (no per-feature JSON) in one request
+        result = ee.Dictionary({
+            'terra': mod_col.size(),
+            'aqua': myd_col.size(),
+            'combined': collection.size(),
+            'rows': series.reduceColumns(
+                ee.Reducer.toList(len(GLACIER_SERIES_COLUMNS)), GLACIER_SERIES_COLUMNS
+            ).get('list')
+        }).getInfo()
+    except Exception as e:
+        print(f"❌ Extraction error: {e}")
+        return pd.DataFrame()
+    
+    terra_count, aqua_count, combined_count = result['terra'], result['aqua'], result['combined']
+    _print_fusion_statistics(terra_count, aqua_count, combined_count)
+    
+    df = pd.DataFrame(result['rows'] or [], columns=GLACIER_SERIES_COLUMNS)
+    df = df[df['albedo_mean'].notna()]
+    if df.empty:
+        print(f"✅ Extraction completed: 0 observations")
+        return df.reset_index(drop=True)
+    
+    df.insert(1, 'glacier_name', df['glacier_id'].map(glaciers.names))
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.sort_values(['glacier_id', 'date']).reset_index(drop=True)
+    _add_calendar_columns(df)
+    _add_fusion_columns(df, terra_count, aqua_count, combined_count)
+    
+    counts = df['glacier_id'].value_counts()
+    print(f"📊 Observations per glacier: min {counts.min()}, max {counts.max()} "
+          f"({len(counts)}/{len(glaciers)} glaciers with data)")
+    print(f"✅ Extraction completed: {len(df)} observations")
+    return df
+
+
 # ================================================================================
 # MAIN EXTRACTION FUNCTIONS
 # ================================================================================
 
-def extract_melt_season_data_yearly(start_year=2010, end_year=2024, scale=500, use_advanced_qa=False, qa_level='standard', custom_qa_config=None):
+@trace_phase('melt_season')
+def extract_melt_season_data_yearly(start_year=2010, end_year=2024, scale=500, use_advanced_qa=False, qa_level='standard', custom_qa_config=None, glaciers=None):
     """
     Extract melt season data year by year to manage memory
     Focus on melt season months: June-September
@@ -421,6 +733,9 @@ def extract_melt_season_data_yearly(start_year=2010, end_year=2024, scale=500, u
         scale: Spatial resolution in meters
         use_advanced_qa: Whether to use advanced Algorithm QA flags filtering
         qa_level: Quality level ('strict', 'standard', 'relaxed')
+        glaciers: GlacierSet or RGI-style outline file; when given, every glacier
+                  is extracted in the same pass (see extract_time_series_glaciers)
+                  and the result is keyed by glacier_id
     
     Returns:
         DataFrame: Combined melt season data
@@ -433,41 +748,53 @@ def extract_melt_season_data_yearly(start_year=2010, end_year=2024, scale=500, u
     failed_years = []
     
     for year in range(start_year, end_year + 1):
-        print(f"\n📡 Extracting data for {year} melt season...")
-        
-        # Extract melt season for this year (June-September)
-        year_start = f'{year}-06-01'
-        year_end = f'{year}-09-30'
-        
-        try:
-            df_year = extract_time_series_fast(
-                year_start, year_end, 
-                scale=scale, 
-                sampling_days=7,
-                use_advanced_qa=use_advanced_qa,
-                qa_level=qa_level,
-                custom_qa_config=custom_qa_config
-            )
+        with run_span('extraction_year', unit=year) as year_span:
+            print(f"\n📡 Extracting data for {year} melt season...")
+        
+            # Extract melt season for this year (June-September)
+            year_start = f'{year}-06-01'
+            year_end = f'{year}-09-30'
+        
+            try:
+                if glaciers is not None:
+                    df_year = extract_time_series_glaciers(
+                        year_start, year_end,
+                        glaciers=glaciers,
+                        scale=scale,
+                        use_advanced_qa=use_advanced_qa,
+                        qa_level=qa_level,
+                        custom_qa_config=custom_qa_config
+                    )
+                else:
+                    df_year = extract_time_series_fast(
+                        year_start, year_end, 
+                        scale=scale, 
+                        sampling_days=7,
+                        use_advanced_qa=use_advanced_qa,
+                        qa_level=qa_level,
+                        custom_qa_config=custom_qa_config
+                    )
             
-            if not df_year.empty:
-                # Filter to melt season months only
-                melt_data = df_year[df_year['month'].isin([6, 7, 8, 9])].copy()
+                if not df_year.empty:
+                    # Filter to melt season months only
+                    melt_data = df_year[df_year['month'].isin([6, 7, 8, 9])].copy()
                 
-                if not melt_data.empty:
-                    all_data.append(melt_data)
-                    successful_years.append(year)
-                    print(f"   ✅ {year}: {len(melt_data)} observations")
+                    if not melt_data.empty:
+                        all_data.append(melt_data)
+                        successful_years.append(year)
+                        year_span.set(rows=len(melt_data))
+                        print(f"   ✅ {year}: {len(melt_data)} observations")
+                    else:
+                        failed_years.append(year)
+                        print(f"   ❌ {year}: No melt season data")
                 else:
                     failed_years.append(year)
-                    print(f"   ❌ {year}: No melt season data")
-            else:
-                failed_years.append(year)
-                print(f"   ❌ {year}: No data extracted")
+                    print(f"   ❌ {year}: No data extracted")
                 
-        except Exception as e:
-            failed_years.append(year)
-            print(f"   ❌ {year}: Error - {str(e)[:50]}...")
-            continue
+            except Exception as e:
+                failed_years.append(year)
+                print(f"   ❌ {year}: Error - {str(e)[:50]}...")
+                continue
     
     if all_data:
         combined_df = pd.concat(all_data, ignore_index=True)
@@ -481,6 +808,7 @@ def extract_melt_season_data_yearly(start_year=2010, end_year=2024, scale=500, u
         return pd.DataFrame()
 
 
+@trace_phase('melt_season_elevation')
 def extract_melt_season_data_yearly_with_elevation(start_year=2010, end_year=2024, scale=500, use_advanced_qa=False, qa_level='standard', custom_qa_config=None):
     """
     Extract melt season data year by year with elevation information
@@ -507,50 +835,52 @@ def extract_melt_season_data_yearly_with_elevation(start_year=2010, end_year=202
     failed_years = []
     
     for year in range(start_year, end_year + 1):
-        print(f"\n📡 Extracting data for {year} melt season...")
-        
-        # Extract melt season for this year (June-September)
-        year_start = f'{year}-06-01'
-        year_end = f'{year}-09-30'
-        
-        try:
-            df_year = extract_time_series_fast(
-                year_start, year_end, 
-                scale=scale, 
-                sampling_days=7,
-                use_advanced_qa=use_advanced_qa,
-                qa_level=qa_level,
-                custom_qa_config=custom_qa_config
-            )
+        with run_span('extraction_year', unit=year) as year_span:
+            print(f"\n📡 Extracting data for {year} melt season...")
+        
+            # Extract melt season for this year (June-September)
+            year_start = f'{year}-06-01'
+            year_end = f'{year}-09-30'
+        
+            try:
+                df_year = extract_time_series_fast(
+                    year_start, year_end, 
+                    scale=scale, 
+                    sampling_days=7,
+                    use_advanced_qa=use_advanced_qa,
+                    qa_level=qa_level,
+                    custom_qa_config=custom_qa_config
+                )
             
-            if not df_year.empty:
-                # Filter to melt season months only
-                melt_data = df_year[df_year['month'].isin([6, 7, 8, 9])].copy()
+                if not df_year.empty:
+                    # Filter to melt season months only
+                    melt_data = df_year[df_year['month'].isin([6, 7, 8, 9])].copy()
                 
-                if not melt_data.empty:
-                    # Extract elevation data
-                    elevation_data = extract_elevation_data(len(melt_data), year)
+                    if not melt_data.empty:
+                        # Extract elevation data
+                        elevation_data = extract_elevation_data(len(melt_data), year)
                     
-                    # Add elevation columns
-                    melt_data['elevation'] = elevation_data['elevations']
-                    melt_data['glacier_median_elevation'] = elevation_data['median']
-                    melt_data['glacier_min_elevation'] = elevation_data['min']
-                    melt_data['glacier_max_elevation'] = elevation_data['max']
+                        # Add elevation columns
+                        melt_data['elevation'] = elevation_data['elevations']
+                        melt_data['glacier_median_elevation'] = elevation_data['median']
+                        melt_data['glacier_min_elevation'] = elevation_data['min']
+                        melt_data['glacier_max_elevation'] = elevation_data['max']
                     
-                    all_data.append(melt_data)
-                    successful_years.append(year)
-                    print(f"   ✅ {year}: {len(melt_data)} observations with elevation")
+                        all_data.append(melt_data)
+                        successful_years.append(year)
+                        year_span.set(rows=len(melt_data))
+                        print(f"   ✅ {year}: {len(melt_data)} observations with elevation")
+                    else:
+                        failed_years.append(year)
+                        print(f"   ❌ {year}: No melt season data")
                 else:
                     failed_years.append(year)
-                    print(f"   ❌ {year}: No melt season data")
-            else:
-                failed_years.append(year)
-                print(f"   ❌ {year}: No data extracted")
+                    print(f"   ❌ {year}: No data extracted")
                 
-        except Exception as e:
-            failed_years.append(year)
-            print(f"   ❌ {year}: Error - {str(e)[:50]}...")
-            continue
+            except Exception as e:
+                failed_years.append(year)
+                print(f"   ❌ {year}: Error - {str(e)[:50]}...")
+                continue
     
     if all_data:
         combined_df = pd.concat(all_data, ignore_index=True)
@@ -566,6 +896,7 @@ def extract_melt_season_data_yearly_with_elevation(start_year=2010, end_year=202
         return pd.DataFrame()
 
 
+@trace_phase('elevation')
 def extract_elevation_data(n_observations, year_seed=None):
     """
     Extract real elevation data from SRTM DEM via Google Earth Engine
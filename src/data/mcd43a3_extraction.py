@@ -8,6 +8,17 @@ import ee
 import pandas as pd
 from datetime import datetime, timedelta
 
+try:
+    from ..ee_trace import trace_phase
+    from ..utils.run_timing import span as run_span
+except ImportError:
+    from ee_trace import trace_phase
+    from utils.run_timing import span as run_span
+
+
+# Mandatory quality kept for every band (0 = full BRDF inversion,
+# 1 = magnitude inversion)
+MCD43A3_QA_THRESHOLD = 1
 
 def initialize_earth_engine():
     """Initialize Google Earth Engine"""
@@ -51,7 +62,7 @@ def mask_mcd43a3_spectral_fast(image):
     quality_image = image.select(quality_bands)
     
     # Apply vectorized quality filtering (QA ≤ 1: Full + magnitude inversions)
-    quality_masks = quality_image.lte(1)
+    quality_masks = quality_image.lte(MCD43A3_QA_THRESHOLD)
     
     # Apply quality masks and albedo range filters to corresponding spectral bands
     masked_bands = []
@@ -86,6 +97,7 @@ def mask_mcd43a3_spectral_fast(image):
     return final_image.copyProperties(image, ['system:time_start'])
 
 
+@trace_phase('mcd43a3')
 def extract_mcd43a3_data_fixed(start_year=2010, end_year=2024, glacier_mask=None):
     """
     FIXED MCD43A3 extraction with simplified, robust processing
@@ -159,7 +171,7 @@ def extract_mcd43a3_data_fixed(start_year=2010, end_year=2024, glacier_mask=None
         
         for albedo_band, quality_band in spectral_bands.items():
             # Apply quality mask (QA ≤ 1: full + magnitude inversions)
-            quality_mask = image.select(quality_band).lte(1)
+            quality_mask = image.select(quality_band).lte(MCD43A3_QA_THRESHOLD)
             
             # Apply scaling first
             scaled_albedo = image.select(albedo_band).multiply(0.001)
@@ -268,6 +280,7 @@ def extract_mcd43a3_data_fixed(start_year=2010, end_year=2024, glacier_mask=None
         return pd.DataFrame()
 
 
+@trace_phase('mcd43a3')
 def extract_mcd43a3_data_yearly(start_year=2010, end_year=2024, glacier_mask=None):
     """
     YEARLY MCD43A3 extraction to avoid 5000-element limit
@@ -297,134 +310,136 @@ def extract_mcd43a3_data_yearly(start_year=2010, end_year=2024, glacier_mask=Non
     failed_years = []
     
     for year in range(start_year, end_year + 1):
-        print(f"\n📡 Extracting MCD43A3 data for {year} melt season...")
+        with run_span('extraction_year', unit=year) as year_span:
+            print(f"\n📡 Extracting MCD43A3 data for {year} melt season...")
         
-        try:
-            # Extract melt season for this year (June-September)
-            year_start = f'{year}-06-01'
-            year_end = f'{year}-09-30'
+            try:
+                # Extract melt season for this year (June-September)
+                year_start = f'{year}-06-01'
+                year_end = f'{year}-09-30'
             
-            # MCD43A3 collection for this year only
-            mcd43a3 = ee.ImageCollection("MODIS/061/MCD43A3")
-            collection = mcd43a3.filterDate(year_start, year_end).filterBounds(glacier_mask)
+                # MCD43A3 collection for this year only
+                mcd43a3 = ee.ImageCollection("MODIS/061/MCD43A3")
+                collection = mcd43a3.filterDate(year_start, year_end).filterBounds(glacier_mask)
             
-            collection_size = collection.size().getInfo()
+                collection_size = collection.size().getInfo()
             
-            if collection_size == 0:
-                failed_years.append(year)
-                print(f"   ❌ {year}: No MCD43A3 data available")
-                continue
+                if collection_size == 0:
+                    failed_years.append(year)
+                    print(f"   ❌ {year}: No MCD43A3 data available")
+                    continue
             
-            print(f"   📊 Found {collection_size} MCD43A3 composites for {year}")
+                print(f"   📊 Found {collection_size} MCD43A3 composites for {year}")
             
-            def process_image_simple(image):
-                """
-                Simplified image processing for better reliability
-                """
-                # Define the key spectral bands we need
-                spectral_bands = {
-                    'Albedo_BSA_vis': 'BRDF_Albedo_Band_Mandatory_Quality_vis',
-                    'Albedo_BSA_nir': 'BRDF_Albedo_Band_Mandatory_Quality_nir',
-                    'Albedo_BSA_Band1': 'BRDF_Albedo_Band_Mandatory_Quality_Band1',  # Red
-                    'Albedo_BSA_Band2': 'BRDF_Albedo_Band_Mandatory_Quality_Band2',  # NIR
-                    'Albedo_BSA_Band3': 'BRDF_Albedo_Band_Mandatory_Quality_Band3',  # Blue
-                    'Albedo_BSA_Band4': 'BRDF_Albedo_Band_Mandatory_Quality_Band4'   # Green
-                }
+                def process_image_simple(image):
+                    """
+                    Simplified image processing for better reliability
+                    """
+                    # Define the key spectral bands we need
+                    spectral_bands = {
+                        'Albedo_BSA_vis': 'BRDF_Albedo_Band_Mandatory_Quality_vis',
+                        'Albedo_BSA_nir': 'BRDF_Albedo_Band_Mandatory_Quality_nir',
+                        'Albedo_BSA_Band1': 'BRDF_Albedo_Band_Mandatory_Quality_Band1',  # Red
+                        'Albedo_BSA_Band2': 'BRDF_Albedo_Band_Mandatory_Quality_Band2',  # NIR
+                        'Albedo_BSA_Band3': 'BRDF_Albedo_Band_Mandatory_Quality_Band3',  # Blue
+                        'Albedo_BSA_Band4': 'BRDF_Albedo_Band_Mandatory_Quality_Band4'   # Green
+                    }
                 
-                # Extract date information
-                date = ee.Date(image.get('system:time_start'))
+                    # Extract date information
+                    date = ee.Date(image.get('system:time_start'))
                 
-                # Process each band individually and combine results
-                band_stats = {}
+                    # Process each band individually and combine results
+                    band_stats = {}
                 
-                for albedo_band, quality_band in spectral_bands.items():
-                    # Apply quality mask (QA ≤ 1: full + magnitude inversions)
-                    quality_mask = image.select(quality_band).lte(1)
+                    for albedo_band, quality_band in spectral_bands.items():
+                        # Apply quality mask (QA ≤ 1: full + magnitude inversions)
+                        quality_mask = image.select(quality_band).lte(MCD43A3_QA_THRESHOLD)
                     
-                    # Apply scaling first
-                    scaled_albedo = image.select(albedo_band).multiply(0.001)
+                        # Apply scaling first
+                        scaled_albedo = image.select(albedo_band).multiply(0.001)
                     
-                    # Apply Williamson & Menounos (2021) albedo range filters
-                    # Exclude shadow-affected pixels (<0.05) and unrealistic values (>0.99)
-                    albedo_range_mask = scaled_albedo.gte(0.05).And(scaled_albedo.lte(0.99))
+                        # Apply Williamson & Menounos (2021) albedo range filters
+                        # Exclude shadow-affected pixels (<0.05) and unrealistic values (>0.99)
+                        albedo_range_mask = scaled_albedo.gte(0.05).And(scaled_albedo.lte(0.99))
                     
-                    # Combine quality and albedo range masks
-                    combined_mask = quality_mask.And(albedo_range_mask)
+                        # Combine quality and albedo range masks
+                        combined_mask = quality_mask.And(albedo_range_mask)
                     
-                    # Apply combined mask
-                    masked_albedo = scaled_albedo.updateMask(combined_mask)
+                        # Apply combined mask
+                        masked_albedo = scaled_albedo.updateMask(combined_mask)
                     
-                    # Calculate statistics
-                    stats = masked_albedo.reduceRegion(
-                        reducer=ee.Reducer.mean().combine(ee.Reducer.count(), sharedInputs=True),
-                        geometry=glacier_mask,
-                        scale=500,
-                        maxPixels=1e9
-                    )
+                        # Calculate statistics
+                        stats = masked_albedo.reduceRegion(
+                            reducer=ee.Reducer.mean().combine(ee.Reducer.count(), sharedInputs=True),
+                            geometry=glacier_mask,
+                            scale=500,
+                            maxPixels=1e9
+                        )
                     
-                    # Extract mean and count
-                    mean_val = stats.get(f'{albedo_band}_mean')
-                    count_val = stats.get(f'{albedo_band}_count')
+                        # Extract mean and count
+                        mean_val = stats.get(f'{albedo_band}_mean')
+                        count_val = stats.get(f'{albedo_band}_count')
                     
-                    band_stats[albedo_band] = mean_val
-                    band_stats[f'{albedo_band}_count'] = count_val
+                        band_stats[albedo_band] = mean_val
+                        band_stats[f'{albedo_band}_count'] = count_val
                 
-                # Combine all statistics
-                all_properties = {
-                    'date': date.format('YYYY-MM-dd'),
-                    'year': date.get('year'),
-                    'month': date.get('month'),
-                    'doy': date.getRelative('day', 'year')
-                }
-                all_properties.update(band_stats)
+                    # Combine all statistics
+                    all_properties = {
+                        'date': date.format('YYYY-MM-dd'),
+                        'year': date.get('year'),
+                        'month': date.get('month'),
+                        'doy': date.getRelative('day', 'year')
+                    }
+                    all_properties.update(band_stats)
                 
-                return ee.Feature(None, all_properties)
+                    return ee.Feature(None, all_properties)
             
-            # Process all images for this year
-            processed_collection = collection.map(process_image_simple)
+                # Process all images for this year
+                processed_collection = collection.map(process_image_simple)
             
-            # Convert to DataFrame for this year
-            print(f"   📥 Downloading {year} results...")
-            data_list = processed_collection.getInfo()['features']
+                # Convert to DataFrame for this year
+                print(f"   📥 Downloading {year} results...")
+                data_list = processed_collection.getInfo()['features']
             
-            if not data_list:
-                failed_years.append(year)
-                print(f"   ❌ {year}: No valid data extracted")
-                continue
+                if not data_list:
+                    failed_years.append(year)
+                    print(f"   ❌ {year}: No valid data extracted")
+                    continue
             
-            # Process results into records
-            year_records = []
+                # Process results into records
+                year_records = []
             
-            for feature in data_list:
-                props = feature['properties']
+                for feature in data_list:
+                    props = feature['properties']
                 
-                # Check if we have valid data (at least 5 pixels for key bands)
-                vis_count = props.get('Albedo_BSA_vis_count', 0)
-                nir_count = props.get('Albedo_BSA_nir_count', 0)
+                    # Check if we have valid data (at least 5 pixels for key bands)
+                    vis_count = props.get('Albedo_BSA_vis_count', 0)
+                    nir_count = props.get('Albedo_BSA_nir_count', 0)
                 
-                if vis_count >= 5 and nir_count >= 5:
-                    # Clean the record - only keep valid (non-null) values
-                    record = {}
-                    for key, value in props.items():
-                        if value is not None:
-                            record[key] = value
+                    if vis_count >= 5 and nir_count >= 5:
+                        # Clean the record - only keep valid (non-null) values
+                        record = {}
+                        for key, value in props.items():
+                            if value is not None:
+                                record[key] = value
                     
-                    # Ensure we have the minimum required fields
-                    if 'date' in record and 'Albedo_BSA_vis' in record and 'Albedo_BSA_nir' in record:
-                        year_records.append(record)
+                        # Ensure we have the minimum required fields
+                        if 'date' in record and 'Albedo_BSA_vis' in record and 'Albedo_BSA_nir' in record:
+                            year_records.append(record)
             
-            if year_records:
-                all_data.extend(year_records)
-                successful_years.append(year)
-                print(f"   ✅ {year}: {len(year_records)} valid observations")
-            else:
-                failed_years.append(year)
-                print(f"   ❌ {year}: No records passed quality filtering")
+                if year_records:
+                    all_data.extend(year_records)
+                    successful_years.append(year)
+                    year_span.set(rows=len(year_records))
+                    print(f"   ✅ {year}: {len(year_records)} valid observations")
+                else:
+                    failed_years.append(year)
+                    print(f"   ❌ {year}: No records passed quality filtering")
             
-        except Exception as e:
-            failed_years.append(year)
-            print(f"   ❌ {year}: Error - {str(e)[:50]}...")
-            continue
+            except Exception as e:
+                failed_years.append(year)
+                print(f"   ❌ {year}: Error - {str(e)[:50]}...")
+                continue
     
     if not all_data:
         print(f"\n❌ NO DATA EXTRACTED FROM ANY YEAR")
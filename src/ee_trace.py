@@ -0,0 +1,331 @@
+"""
+Earth Engine Call Tracer
+Opt-in wrapper around every blocking Earth Engine evaluation (getInfo and
+the URL / map-id requests) recording its call site, latency, response size
+and the workflow phase it ran in, with a per-run JSON profile and a summary
+ranked by time spent waiting on the server
+
+Enable with the ALBEDO_EE_TRACE environment variable (1 for the default
+directory outputs/profiles/ee_trace, or a directory path), or from code:
+
+    from ee_trace import trace_run, trace_phase
+    with trace_run('melt_season_2010_2024'):
+        with trace_phase('extraction'):
+            ...
+
+Until tracing is first enabled nothing is wrapped, and trace_phase only
+updates a context variable.
+"""
+
+import atexit
+import contextlib
+import contextvars
+import functools
+import linecache
+import os
+import sys
+import threading
+import time
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PROFILE_DIR = os.path.join(PROJECT_ROOT, 'outputs', 'profiles', 'ee_trace')
+
+# Methods that block until the server answers
+BLOCKING_METHODS = ('getInfo', 'getDownloadURL', 'getThumbURL', 'getMapId')
+
+_PHASE = contextvars.ContextVar('ee_trace_phase', default=())
+_IN_CALL = threading.local()
+_PATCHED = {}
+_TRACER = None
+_TRACER_LOCK = threading.Lock()
+_ATEXIT_REGISTERED = False
+_THIS_FILE = os.path.abspath(__file__)
+
+# The main codebase imports this module as `ee_trace` (src/ on sys.path) or
+# `src.ee_trace`: register both names so the tracer and phases are shared
+for _name in ('ee_trace', 'src.ee_trace'):
+    sys.modules.setdefault(_name, sys.modules[__name__])
+
+
+@contextlib.contextmanager
+def trace_phase(name):
+    """
+    Label Earth Engine calls made inside the block (or decorated function)
+
+    Phases nest: calls inside trace_phase('melt_season') and then
+    trace_phase('time_series') are recorded under 'melt_season/time_series'.
+    """
+    token = _PHASE.set(_PHASE.get() + (str(name),))
+    try:
+        yield
+    finally:
+        _PHASE.reset(token)
+
+
+def current_phase():
+    return '/'.join(_PHASE.get()) or 'unscoped'
+
+
+class EETracer:
+    """Blocking calls recorded during one run"""
+
+    def __init__(self, run_name=None, output_dir=None):
+        self.run_name = run_name or f"run_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        self.output_dir = output_dir or DEFAULT_PROFILE_DIR
+        self.started_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self._start = time.perf_counter()
+        self._records = []
+        self._lock = threading.Lock()
+
+    def record(self, method, site, code, latency, size, error=None):
+        with self._lock:
+            self._records.append({
+                'offset_s': round(time.perf_counter() - self._start - latency, 4),
+                'method': method,
+                'site': site,
+                'code': code,
+                'phase': current_phase(),
+                'thread': threading.current_thread().name,
+                'latency_s': round(latency, 4),
+                'bytes': size,
+                'error': error
+            })
+
+    @property
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def summary(self):
+        """
+        Totals and calls grouped by call site and by phase, slowest first
+
+        Returns:
+            dict: 'totals' (calls, latency_s, bytes, errors, wall_time_s),
+                  'by_site' and 'by_phase' (lists of dicts with calls,
+                  latency_s, mean_s, bytes and share of the blocking time)
+        """
+        records = self.records
+        total_latency = sum(record['latency_s'] for record in records)
+
+        def grouped(key, extra=()):
+            groups = {}
+            for record in records:
+                group = groups.setdefault(record[key], {
+                    key: record[key], 'calls': 0, 'latency_s': 0.0, 'bytes': 0, 'errors': 0,
+                    **{field: record[field] for field in extra}
+                })
+                group['calls'] += 1
+                group['latency_s'] += record['latency_s']
+                group['bytes'] += record['bytes'] or 0
+                group['errors'] += record['error'] is not None
+            rows = sorted(groups.values(), key=lambda row: -row['latency_s'])
+            for row in rows:
+                row['latency_s'] = round(row['latency_s'], 4)
+                row['mean_s'] = round(row['latency_s'] / row['calls'], 4)
+                row['share'] = round(row['latency_s'] / total_latency, 4) if total_latency else 0.0
+            return rows
+
+        return {
+            'totals': {
+                'calls': len(records),
+                'latency_s': round(total_latency, 4),
+                'bytes': sum(record['bytes'] or 0 for record in records),
+                'errors': sum(record['error'] is not None for record in records),
+                'wall_time_s': round(time.perf_counter() - self._start, 4)
+            },
+            'by_site': grouped('site', extra=('code',)),
+            'by_phase': grouped('phase')
+        }
+
+    def write_profile(self, path=None):
+        """
+        Write the run (summary and every call) as JSON
+
+        Returns:
+            str: Path of the profile
+        """
+        import json
+
+        path = path or os.path.join(self.output_dir, f'{self.run_name}.json')
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        profile = {'run': self.run_name, 'started_at': self.started_at, **self.summary(), 'calls': self.records}
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(profile, f, indent=1)
+        os.replace(tmp_path, path)
+        return path
+
+    def print_summary(self, top=15):
+        summary = self.summary()
+        totals = summary['totals']
+        print(f"📡 Earth Engine round trips ({self.run_name}): {totals['calls']} calls, "
+              f"{totals['latency_s']:.2f} s blocking of {totals['wall_time_s']:.2f} s, "
+              f"{totals['bytes'] / 1024:.1f} KB received"
+              + (f", {totals['errors']} failed" if totals['errors'] else ""))
+        if not totals['calls']:
+            return
+        print(f"   {'share':>6} {'calls':>6} {'total s':>8} {'mean s':>7} {'KB':>9}  call site")
+        for row in summary['by_site'][:top]:
+            print(f"   {row['share'] * 100:5.1f}% {row['calls']:>6} {row['latency_s']:>8.2f} "
+                  f"{row['mean_s']:>7.3f} {row['bytes'] / 1024:>9.1f}  {row['site']}")
+            if row['code']:
+                print(f"   {'':>40}  {row['code'][:90]}")
+        print("   By phase:")
+        for row in summary['by_phase'][:top]:
+            print(f"   {row['share'] * 100:5.1f}% {row['calls']:>6} {row['latency_s']:>8.2f}  {row['phase']}")
+
+
+def _call_site(ee_module):
+    """First frame outside the Earth Engine client and this module"""
+    ee_file = os.path.abspath(getattr(ee_module, '__file__', '') or '')
+    ee_dir = os.path.dirname(ee_file) if hasattr(ee_module, '__path__') else None
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename != ee_file and filename != _THIS_FILE and not (ee_dir and filename.startswith(ee_dir + os.sep)):
+            break
+        frame = frame.f_back
+    if frame is None:
+        return 'unknown', ''
+
+    filename = frame.f_code.co_filename
+    display = os.path.relpath(filename, PROJECT_ROOT) if filename.startswith(PROJECT_ROOT) else filename
+    code = linecache.getline(filename, frame.f_lineno).strip()
+    return f"{display}:{frame.f_lineno} {frame.f_code.co_name}", code
+
+
+def _response_size(result):
+    import json
+    try:
+        return len(json.dumps(result, default=str).encode('utf-8'))
+    except (TypeError, ValueError):
+        return len(str(result))
+
+
+def _traced(ee_module, owner, method_name, original):
+    @functools.wraps(original)
+    def wrapper(self, *args, **kwargs):
+        tracer = _TRACER
+        # Only the outermost blocking call is recorded (Image.getInfo calls ComputedObject.getInfo)
+        if tracer is None or getattr(_IN_CALL, 'active', False):
+            return original(self, *args, **kwargs)
+
+        site, code = _call_site(ee_module)
+        _IN_CALL.active = True
+        start = time.perf_counter()
+        try:
+            result = original(self, *args, **kwargs)
+        except Exception as e:
+            tracer.record(f'{owner}.{method_name}', site, code, time.perf_counter() - start, 0, repr(e)[:300])
+            raise
+        finally:
+            _IN_CALL.active = False
+        tracer.record(f'{owner}.{method_name}', site, code, time.perf_counter() - start, _response_size(result))
+        return result
+    return wrapper
+
+
+def _install_wrappers():
+    """Wrap the blocking methods of every ee.ComputedObject subclass (once)"""
+    import ee
+
+    base = getattr(ee, 'ComputedObject', None)
+    classes = [getattr(ee, name) for name in dir(ee)]
+    for cls in classes:
+        if not (isinstance(cls, type) and base is not None and issubclass(cls, base)):
+            continue
+        for method_name in BLOCKING_METHODS:
+            original = cls.__dict__.get(method_name)
+            if original is None or (cls, method_name) in _PATCHED:
+                continue
+            _PATCHED[(cls, method_name)] = original
+            setattr(cls, method_name, _traced(ee, cls.__name__, method_name, original))
+
+
+def get_tracer():
+    """Active tracer, or None when tracing is off"""
+    return _TRACER
+
+
+def enable_tracing(output_dir=None, run_name=None):
+    """
+    Start recording blocking Earth Engine calls for this process
+
+    The profile is written and the summary printed at interpreter exit (or
+    by finish_tracing()). Calling it again keeps the active tracer.
+
+    Returns:
+        EETracer: The active tracer
+    """
+    global _TRACER, _ATEXIT_REGISTERED
+    with _TRACER_LOCK:
+        if _TRACER is None:
+            _install_wrappers()
+            _TRACER = EETracer(run_name, output_dir)
+            if not _ATEXIT_REGISTERED:
+                atexit.register(finish_tracing)
+                _ATEXIT_REGISTERED = True
+        return _TRACER
+
+
+def finish_tracing(print_summary=True):
+    """
+    Stop tracing, write the profile of the run and print its summary
+
+    Returns:
+        str: Profile path, or None when tracing was off
+    """
+    global _TRACER
+    with _TRACER_LOCK:
+        tracer, _TRACER = _TRACER, None
+    if tracer is None:
+        return None
+    path = tracer.write_profile()
+    if print_summary:
+        tracer.print_summary()
+        print(f"💾 Earth Engine call profile: {path}")
+    return path
+
+
+def enable_from_env():
+    """
+    Enable tracing when ALBEDO_EE_TRACE is set (1/true or a profile directory)
+
+    Returns:
+        EETracer: The active tracer, or None when tracing is not requested
+    """
+    value = os.environ.get('ALBEDO_EE_TRACE', '').strip()
+    if not value or value.lower() in ('0', 'false', 'no', 'off'):
+        return None
+    output_dir = None if value.lower() in ('1', 'true', 'yes', 'on') else value
+    return enable_tracing(output_dir)
+
+
+@contextlib.contextmanager
+def trace_run(run_name, output_dir=None, print_summary=True):
+    """
+    Trace the calls of one run into their own profile
+
+    A tracer already active (e.g. from ALBEDO_EE_TRACE) is suspended for the
+    duration of the block and resumed afterwards.
+
+    Yields:
+        EETracer: The run's tracer (its profile path is set on exit as
+                  tracer.profile_path)
+    """
+    global _TRACER
+    with _TRACER_LOCK:
+        _install_wrappers()
+        previous, _TRACER = _TRACER, EETracer(run_name, output_dir)
+        tracer = _TRACER
+    try:
+        yield tracer
+    finally:
+        with _TRACER_LOCK:
+            _TRACER = previous
+        tracer.profile_path = tracer.write_profile()
+        if print_summary:
+            tracer.print_summary()
+            print(f"💾 Earth Engine call profile: {tracer.profile_path}")
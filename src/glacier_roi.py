@@ -0,0 +1,457 @@
+"""
+Lazy Glacier ROI Provider
+Parses the Athabasca glacier mask once, caches a normalized GeoJSON / WKB
+copy with its bounds and area keyed by the mask's content hash, and builds
+the Earth Engine geometry only when it is first used.
+
+Several glaciers (e.g. the Columbia Icefield outlets from an RGI-style
+GeoJSON) are handled as a GlacierSet keyed by glacier ID, reduced together
+by the multi-glacier extraction.
+"""
+
+import os
+import threading
+
+# hashlib and json are imported where used: importing config must stay cheap
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SHAPEFILE = os.path.join(
+    PROJECT_ROOT, 'data', 'geospatial', 'shapefiles', 'Masque_athabasca_2023_Arcgis.shp'
+)
+DEFAULT_GEOJSON = os.path.join(
+    PROJECT_ROOT, 'data', 'geospatial', 'masks', 'Athabasca_mask_2023_cut.geojson'
+)
+DEFAULT_ROI_CACHE_DIR = os.path.join(PROJECT_ROOT, 'outputs', 'cache', 'roi')
+
+# Bump when the cached payload layout changes
+ROI_CACHE_VERSION = 1
+
+_SHAPEFILE_PARTS = ('.shp', '.shx', '.dbf', '.prj', '.cpg')
+
+# Glacier set used when none is given (RGI-style GeoJSON or shapefile)
+GLACIERS_FILE = os.environ.get('ALBEDO_GLACIERS')
+
+# Feature properties tried, in order, for the ID and name of each glacier
+# (RGI 6 / RGI 7 / GLIMS attribute names, then generic ones)
+GLACIER_ID_PROPERTIES = ('glacier_id', 'RGIId', 'rgi_id', 'GLIMSId', 'glims_id', 'id')
+GLACIER_NAME_PROPERTIES = ('glacier_name', 'Name', 'name', 'glac_name')
+
+DEFAULT_GLACIER_ID = 'athabasca'
+
+
+def _source_files(path):
+    """Files whose content defines the mask (all shapefile components)"""
+    if path.lower().endswith('.shp'):
+        base = os.path.splitext(path)[0]
+        return [base + ext for ext in _SHAPEFILE_PARTS if os.path.exists(base + ext)]
+    return [path]
+
+
+def mask_digest(path):
+    """Content hash of a mask file (and its shapefile components)"""
+    import hashlib
+
+    digest = hashlib.sha1(f'v{ROI_CACHE_VERSION}'.encode('utf-8'))
+    for file_path in _source_files(path):
+        digest.update(os.path.basename(file_path).encode('utf-8'))
+        with open(file_path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:20]
+
+
+def _iter_positions(coordinates):
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        yield coordinates
+        return
+    for part in coordinates:
+        yield from _iter_positions(part)
+
+
+def _geojson_bounds(geojson):
+    """(min_lon, min_lat, max_lon, max_lat) of a FeatureCollection"""
+    lons, lats = [], []
+    for feature in geojson['features']:
+        for position in _iter_positions(feature['geometry']['coordinates']):
+            lons.append(position[0])
+            lats.append(position[1])
+    return [min(lons), min(lats), max(lons), max(lats)]
+
+
+def _read_shapefile(path):
+    """WGS84 FeatureCollection and Earth Engine polygons of a shapefile"""
+    import json
+    import geopandas as gpd
+
+    gdf = gpd.read_file(path)
+    if gdf.crs and gdf.crs.to_epsg() != 4326:
+        gdf = gdf.to_crs(4326)
+    geojson = json.loads(gdf.to_json())
+
+    # Union of all features, exterior rings only (as used for the Earth Engine ROI)
+    unified = gdf.geometry.unary_union if len(gdf) > 1 else gdf.geometry.iloc[0]
+    polygons = list(unified.geoms) if hasattr(unified, 'geoms') else [unified]
+    ee_polygons = [[[list(xy) for xy in polygon.exterior.coords]]
+                   for polygon in polygons if polygon.geom_type == 'Polygon']
+    return geojson, ee_polygons
+
+
+def _read_geojson(path):
+    """FeatureCollection and Earth Engine polygons of a GeoJSON mask"""
+    import json
+
+    with open(path, 'r') as f:
+        geojson = json.load(f)
+    if geojson.get('type') == 'Feature':
+        geojson = {'type': 'FeatureCollection', 'features': [geojson]}
+    elif geojson.get('type') != 'FeatureCollection':
+        geojson = {'type': 'FeatureCollection', 'features': [{'type': 'Feature', 'properties': {}, 'geometry': geojson}]}
+    if not geojson['features']:
+        raise ValueError(f"No feature in {os.path.basename(path)}")
+
+    # Only the first polygon of the first feature: gives the expected pixel count (~20 rather than 40)
+    geometry = geojson['features'][0]['geometry']
+    coordinates = geometry['coordinates'][0] if geometry['type'] == 'MultiPolygon' else geometry['coordinates']
+    return geojson, [coordinates]
+
+
+def _geometry_summary(geojson):
+    """WKB (hex) and geodesic area in km² of the mask (None without shapely/pyproj)"""
+    try:
+        from pyproj import Geod
+        from shapely.geometry import shape
+        from shapely.ops import unary_union
+        from shapely.validation import make_valid
+    except ImportError:
+        return None, None
+
+    geometry = unary_union([make_valid(shape(feature['geometry'])) for feature in geojson['features']])
+    area_m2, _ = Geod(ellps='WGS84').geometry_area_perimeter(geometry)
+    return geometry.wkb_hex, abs(area_m2) / 1e6
+
+
+class GlacierROI:
+    """
+    Glacier mask loaded on first use
+
+    The shapefile is preferred when it exists and geopandas can read it, with
+    the GeoJSON mask as fallback. The parsed result is stored as JSON under
+    cache_dir, keyed by the mask's content hash, so later processes skip
+    geopandas entirely and an edited mask is re-parsed automatically.
+    """
+
+    def __init__(self, shapefile_path=DEFAULT_SHAPEFILE, geojson_path=DEFAULT_GEOJSON,
+                 cache_dir=DEFAULT_ROI_CACHE_DIR):
+        self.shapefile_path = shapefile_path
+        self.geojson_path = geojson_path
+        self.cache_dir = os.path.normpath(cache_dir)
+        self._payload = None
+        self._ee_geometry = None
+        self._lock = threading.Lock()
+
+    def _candidates(self):
+        candidates = []
+        if self.shapefile_path and os.path.exists(self.shapefile_path):
+            candidates.append((self.shapefile_path, _read_shapefile))
+        if self.geojson_path and os.path.exists(self.geojson_path):
+            candidates.append((self.geojson_path, _read_geojson))
+        return candidates
+
+    def _load(self):
+        if self._payload is not None:
+            return self._payload
+        import json
+
+        with self._lock:
+            if self._payload is not None:
+                return self._payload
+
+            errors = []
+            for path, reader in self._candidates():
+                digest = mask_digest(path)
+                cache_path = os.path.join(self.cache_dir, f'roi_{digest}.json')
+                try:
+                    with open(cache_path, 'r') as f:
+                        self._payload = json.load(f)
+                    return self._payload
+                except (OSError, ValueError):
+                    pass
+
+                try:
+                    geojson, ee_polygons = reader(path)
+                except Exception as e:  # e.g. geopandas missing: try the next source
+                    errors.append(f"{os.path.basename(path)}: {e}")
+                    continue
+
+                wkb_hex, area_km2 = _geometry_summary(geojson)
+                payload = {
+                    'source_path': path,
+                    'use_shapefile': reader is _read_shapefile,
+                    'digest': digest,
+                    'geojson': geojson,
+                    'ee_polygons': ee_polygons,
+                    'bounds': _geojson_bounds(geojson),
+                    'area_km2': area_km2,
+                    'wkb_hex': wkb_hex
+                }
+                print(f"📂 Glacier mask parsed: {os.path.basename(path)}"
+                      + (f" ({area_km2:.2f} km²)" if area_km2 is not None else ""))
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+                    with open(tmp_path, 'w') as f:
+                        json.dump(payload, f)
+                    os.replace(tmp_path, cache_path)
+                except OSError:
+                    pass  # Read-only checkout: keep the in-memory copy
+                self._payload = payload
+                return payload
+
+            raise FileNotFoundError("No readable glacier mask" + (f" ({'; '.join(errors)})" if errors else ""))
+
+    @property
+    def geojson(self):
+        """Mask as a WGS84 GeoJSON FeatureCollection"""
+        return self._load()['geojson']
+
+    @property
+    def bounds(self):
+        """(min_lon, min_lat, max_lon, max_lat)"""
+        return tuple(self._load()['bounds'])
+
+    @property
+    def area_km2(self):
+        """Geodesic area of the mask in km² (None without shapely/pyproj)"""
+        return self._load()['area_km2']
+
+    @property
+    def source_path(self):
+        return self._load()['source_path']
+
+    @property
+    def use_shapefile(self):
+        return self._load()['use_shapefile']
+
+    @property
+    def digest(self):
+        return self._load()['digest']
+
+    def shapely_geometry(self):
+        """Mask as a shapely geometry (from the cached WKB)"""
+        from shapely import wkb
+        return wkb.loads(self._load()['wkb_hex'], hex=True)
+
+    def ee_geometry(self):
+        """
+        Earth Engine geometry of the mask, built on first call
+
+        Earth Engine is initialized at that point if needed, never at import.
+        """
+        if self._ee_geometry is None:
+            import ee
+            _ensure_ee_initialized()
+            polygons = self._load()['ee_polygons']
+            if len(polygons) == 1:
+                self._ee_geometry = ee.Geometry.Polygon(polygons[0])
+            else:
+                self._ee_geometry = ee.Geometry.MultiPolygon(polygons)
+        return self._ee_geometry
+
+
+_EE_INITIALIZED = False
+
+
+def _ensure_ee_initialized():
+    global _EE_INITIALIZED
+    if _EE_INITIALIZED:
+        return
+    import ee
+    try:
+        ee.Initialize()
+    except Exception:
+        pass  # Already initialized by the caller, or credentials unavailable
+    try:
+        from .ee_trace import enable_from_env
+    except ImportError:
+        from ee_trace import enable_from_env
+    enable_from_env()  # Opt-in call tracing (ALBEDO_EE_TRACE)
+    _EE_INITIALIZED = True
+
+
+_GLACIER_ROI = None
+_GLACIER_ROI_LOCK = threading.Lock()
+
+
+def get_glacier_roi():
+    """Process-wide provider for the default Athabasca mask"""
+    global _GLACIER_ROI
+    with _GLACIER_ROI_LOCK:
+        if _GLACIER_ROI is None:
+            _GLACIER_ROI = GlacierROI()
+        return _GLACIER_ROI
+
+
+def _first_property(properties, names):
+    for name in names:
+        value = properties.get(name)
+        if value not in (None, ''):
+            return str(value)
+    return None
+
+
+def _read_glacier_outlines(path, id_property=None, name_property=None):
+    """One {glacier_id, glacier_name, geometry} per feature of a GeoJSON or shapefile"""
+    import json
+
+    if path.lower().endswith('.shp'):
+        import geopandas as gpd
+        gdf = gpd.read_file(path)
+        if gdf.crs and gdf.crs.to_epsg() != 4326:
+            gdf = gdf.to_crs(4326)
+        geojson = json.loads(gdf.to_json())
+    else:
+        with open(path, 'r') as f:
+            geojson = json.load(f)
+        if geojson.get('type') == 'Feature':
+            geojson = {'type': 'FeatureCollection', 'features': [geojson]}
+
+    id_properties = (id_property,) if id_property else GLACIER_ID_PROPERTIES
+    name_properties = (name_property,) if name_property else GLACIER_NAME_PROPERTIES
+
+    glaciers = []
+    for index, feature in enumerate(geojson.get('features', [])):
+        geometry = feature.get('geometry')
+        if not geometry or geometry['type'] not in ('Polygon', 'MultiPolygon'):
+            continue
+        properties = feature.get('properties') or {}
+        glacier_id = _first_property(properties, id_properties) or f'glacier_{index + 1}'
+        glaciers.append({
+            'glacier_id': glacier_id,
+            'glacier_name': _first_property(properties, name_properties) or glacier_id,
+            'geometry': geometry
+        })
+    if not glaciers:
+        raise ValueError(f"No glacier polygon in {os.path.basename(path)}")
+
+    ids = [glacier['glacier_id'] for glacier in glaciers]
+    duplicates = sorted({glacier_id for glacier_id in ids if ids.count(glacier_id) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate glacier IDs in {os.path.basename(path)}: {', '.join(duplicates)}")
+    return glaciers
+
+
+class GlacierSet:
+    """
+    Glacier outlines keyed by glacier ID, loaded on first use
+
+    Built from an RGI-style GeoJSON or shapefile with one (Multi)Polygon
+    feature per glacier, or, without a path, from the default Athabasca mask
+    (ID 'athabasca', same polygons as GlacierROI). Holes (nunataks) are kept.
+    """
+
+    def __init__(self, path=None, id_property=None, name_property=None):
+        self.path = path
+        self.id_property = id_property
+        self.name_property = name_property
+        self._glaciers = None
+        self._ee_collection = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._glaciers is not None:
+            return self._glaciers
+
+        with self._lock:
+            if self._glaciers is None:
+                if self.path:
+                    glaciers = _read_glacier_outlines(self.path, self.id_property, self.name_property)
+                    print(f"📂 Glacier outlines parsed: {os.path.basename(self.path)} ({len(glaciers)} glaciers)")
+                else:
+                    polygons = get_glacier_roi()._load()['ee_polygons']
+                    geometry = ({'type': 'Polygon', 'coordinates': polygons[0]} if len(polygons) == 1
+                                else {'type': 'MultiPolygon', 'coordinates': polygons})
+                    glaciers = [{'glacier_id': DEFAULT_GLACIER_ID, 'glacier_name': 'Athabasca',
+                                 'geometry': geometry}]
+                for glacier in glaciers:
+                    glacier['bounds'] = _geojson_bounds({'features': [glacier]})
+                self._glaciers = glaciers
+        return self._glaciers
+
+    def __len__(self):
+        return len(self._load())
+
+    @property
+    def ids(self):
+        """Glacier IDs in file order"""
+        return [glacier['glacier_id'] for glacier in self._load()]
+
+    @property
+    def names(self):
+        """{glacier_id: glacier_name}"""
+        return {glacier['glacier_id']: glacier['glacier_name'] for glacier in self._load()}
+
+    @property
+    def bounds(self):
+        """(min_lon, min_lat, max_lon, max_lat) of all glaciers"""
+        all_bounds = [glacier['bounds'] for glacier in self._load()]
+        return (min(b[0] for b in all_bounds), min(b[1] for b in all_bounds),
+                max(b[2] for b in all_bounds), max(b[3] for b in all_bounds))
+
+    def geojson(self):
+        """Outlines as a FeatureCollection with glacier_id / glacier_name properties"""
+        return {'type': 'FeatureCollection', 'features': [
+            {'type': 'Feature', 'geometry': glacier['geometry'],
+             'properties': {'glacier_id': glacier['glacier_id'], 'glacier_name': glacier['glacier_name']}}
+            for glacier in self._load()
+        ]}
+
+    def areas_km2(self):
+        """{glacier_id: geodesic area in km²} (None values without shapely/pyproj)"""
+        return {glacier['glacier_id']: _geometry_summary({'features': [glacier]})[1]
+                for glacier in self._load()}
+
+    def ee_collection(self):
+        """
+        ee.FeatureCollection of the outlines (glacier_id property only), built on first call
+        """
+        if self._ee_collection is None:
+            import ee
+            _ensure_ee_initialized()
+            self._ee_collection = ee.FeatureCollection([
+                ee.Feature(ee.Geometry(glacier['geometry']), {'glacier_id': glacier['glacier_id']})
+                for glacier in self._load()
+            ])
+        return self._ee_collection
+
+    def ee_region(self):
+        """Bounding rectangle of all glaciers, for filterBounds"""
+        import ee
+        _ensure_ee_initialized()
+        return ee.Geometry.Rectangle(list(self.bounds))
+
+
+_GLACIER_SETS = {}
+
+
+def get_glacier_set(glaciers=None, id_property=None, name_property=None):
+    """
+    Glacier set for a path (cached per path), passing GlacierSet instances through
+
+    Args:
+        glaciers: GlacierSet, path to an RGI-style GeoJSON/shapefile, or None
+                  for ALBEDO_GLACIERS (Athabasca only when unset)
+        id_property: Feature property holding the glacier ID (default: first of GLACIER_ID_PROPERTIES)
+        name_property: Feature property holding the glacier name
+
+    Returns:
+        GlacierSet
+    """
+    if hasattr(glaciers, 'ee_collection'):  # Already a GlacierSet
+        return glaciers
+    path = os.path.abspath(glaciers) if glaciers else (GLACIERS_FILE and os.path.abspath(GLACIERS_FILE))
+    key = (path, id_property, name_property)
+    with _GLACIER_ROI_LOCK:
+        if key not in _GLACIER_SETS:
+            _GLACIER_SETS[key] = GlacierSet(path, id_property, name_property)
+        return _GLACIER_SETS[key]
@@ -107,127 +107,10 @@ def sens_slope_estimate(data):
 # HYPSOMETRIC ANALYSIS (Elevation-based) - Williamson & Menounos (2021)
 # ================================================================================
 
-def classify_elevation_bands(df, elevation_column='elevation', median_elevation=None):
-    """
-    Classify data into elevation bands relative to glacier median elevation
-    Following Williamson & Menounos (2021): ±100m bands around median elevation
-    
-    Args:
-        df: DataFrame with elevation data
-        elevation_column: Column name for elevation data
-        median_elevation: Median elevation of glacier (if None, calculated from data)
-    
-    Returns:
-        DataFrame with added 'elevation_band' column
-    """
-    if df.empty:
-        return df
-    
-    df = df.copy()
-    
-    # Calculate median elevation if not provided
-    if median_elevation is None:
-        median_elevation = df[elevation_column].median()
-    
-    print(f"📏 Glacier median elevation: {median_elevation:.0f} m")
-    
-    # Define elevation bands (following Williamson methodology)
-    def assign_elevation_band(elevation):
-        """Assign elevation band based on distance from median"""
-        diff = elevation - median_elevation
-        
-        if diff > 100:
-            return 'above_median'  # > 100m above median
-        elif diff < -100:
-            return 'below_median'  # > 100m below median
-        else:
-            return 'near_median'   # ±100m of median
-    
-    # Apply classification
-    df['elevation_band'] = df[elevation_column].apply(assign_elevation_band)
-    
-    # Count pixels in each band
-    band_counts = df['elevation_band'].value_counts()
-    print(f"📊 Elevation band distribution:")
-    print(f"   Above median (>{median_elevation+100:.0f}m): {band_counts.get('above_median', 0)} pixels")
-    print(f"   Near median ({median_elevation-100:.0f}-{median_elevation+100:.0f}m): {band_counts.get('near_median', 0)} pixels")
-    print(f"   Below median (<{median_elevation-100:.0f}m): {band_counts.get('below_median', 0)} pixels")
-    
-    return df
-
-def analyze_hypsometric_trends(df, elevation_column='elevation', value_column='albedo_mean', 
-                             median_elevation=None, min_obs_per_year=5):
-    """
-    Perform comprehensive hypsometric (elevation-based) trend analysis
-    Following Williamson & Menounos (2021) methodology
-    
-    Args:
-        df: DataFrame with elevation, year, and albedo data
-        elevation_column: Column name for elevation
-        value_column: Column name for values to analyze
-        median_elevation: Glacier median elevation (calculated if None)
-        min_obs_per_year: Minimum observations per year
-    
-    Returns:
-        dict: Hypsometric trend analysis results by elevation band
-    """
-    if df.empty:
-        print("❌ Empty dataset for hypsometric analysis")
-        return {}
-    
-    print(f"\n🏔️  HYPSOMETRIC TREND ANALYSIS")
-    print("=" * 60)
-    print("Following Williamson & Menounos (2021) methodology")
-    print("Elevation bands: ±100m around glacier median elevation")
-    
-    # Classify into elevation bands
-    df_classified = classify_elevation_bands(df, elevation_column, median_elevation)
-    
-    # Analyze trends for each elevation band
-    band_results = {}
-    band_names = {
-        'above_median': 'Above Median (>100m)',
-        'near_median': 'Near Median (±100m)', 
-        'below_median': 'Below Median (>100m)'
-    }
-    
-    for band, band_name in band_names.items():
-        band_data = df_classified[df_classified['elevation_band'] == band]
-        
-        if band_data.empty:
-            print(f"\n⚠️  No data for {band_name} elevation band")
-            continue
-        
-        print(f"\n🎯 Analyzing {band_name} elevation band:")
-        print(f"   📊 {len(band_data)} total observations")
-        
-        # Perform annual trend analysis for this band
-        band_trends = analyze_annual_trends(band_data, value_column, min_obs_per_year)
-        
-        if band_trends:
-            band_results[band] = {
-                'band_name': band_name,
-                'elevation_range': get_elevation_range(band_data, elevation_column),
-                'n_observations': len(band_data),
-                'trend_analysis': band_trends
-            }
-            
-            # Print band-specific summary
-            trend_info = band_trends['mann_kendall']
-            sens_info = band_trends['sens_slope']
-            
-            print(f"   📈 Trend: {trend_info['trend'].replace('_', ' ').title()}")
-            print(f"   📊 Sen's slope: {sens_info['slope_per_year']:.4f}/year")
-            print(f"   🎯 P-value: {trend_info['p_value']:.4f}")
-            
-            if trend_info['p_value'] < 0.05:
-                print(f"   ✅ SIGNIFICANT trend in {band_name}")
-            else:
-                print(f"   ⚠️  Non-significant trend in {band_name}")
-        else:
-            print(f"   ❌ Insufficient data for trend analysis in {band_name}")
-    
-    return band_results
+# NOTE: classify_elevation_bands and analyze_hypsometric_trends moved to
+# analysis/hypsometric.py (vectorized band classification, configurable band
+# edges, single grouped aggregation and batched trend statistics).
+# They are imported above; the per-row implementations were removed.
 
 def get_elevation_range(df, elevation_column):
     """Get elevation range for a dataset"""
@@ -0,0 +1,263 @@
+"""
+Columnar Output Writer
+Atomic columnar files (Parquet when pyarrow is available, pickle otherwise)
+for the workflow outputs, with compact dtypes and the run-level metadata
+(Terra-Aqua fusion counts, QA settings) stored once in the file instead of
+repeated on every row. CSV stays available as an optional export.
+
+    from output_writer import write_output, read_output
+    write_output(df, get_safe_output_path('MOD10A1_data_basic_standard.csv'))
+    df = read_output('outputs/csv/MOD10A1_data_basic_standard.csv')
+
+Paths may be given with the .csv name the workflows always used: the
+columnar file is written and looked up next to it under the same name.
+Set ALBEDO_WRITE_CSV=1 to also write the CSV files.
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+
+try:
+    import pyarrow  # noqa: F401
+    OUTPUT_FORMAT = 'parquet'
+except ImportError:
+    OUTPUT_FORMAT = 'pickle'
+
+EXTENSIONS = {'parquet': '.parquet', 'pickle': '.pkl'}
+OUTPUT_EXTENSION = EXTENSIONS[OUTPUT_FORMAT]
+
+# Key of the run metadata in the Parquet schema (and in DataFrame.attrs)
+METADATA_KEY = 'run_metadata'
+
+# Low-cardinality labels stored as categoricals
+CATEGORICAL_COLUMNS = ('season', 'qa_level', 'satellite_source', 'original_satellite',
+                       'elevation_band', 'band_name', 'analysis_type', 'trend', 'significance')
+
+# Integer columns and their compact dtype (used when every value fits)
+INTEGER_DTYPES = {'pixel_count': 'int16', 'year': 'int16', 'month': 'int8', 'doy': 'int16'}
+
+# Per-run values repeated on every row by the extraction; moved into the
+# file metadata when constant across the file
+RUN_METADATA_COLUMNS = ('terra_aqua_fusion', 'fusion_method', 'terra_total_observations',
+                        'aqua_total_observations', 'combined_daily_composites',
+                        'duplicates_eliminated', 'qa_advanced', 'qa_description')
+
+# The main codebase imports this module as `output_writer` (src/ on sys.path)
+# or `src.output_writer`; the dashboard reaches it through the same name
+for _name in ('output_writer', 'src.output_writer'):
+    sys.modules.setdefault(_name, sys.modules[__name__])
+
+
+def write_csv_enabled():
+    """Whether ALBEDO_WRITE_CSV asks for the optional CSV exports"""
+    return os.environ.get('ALBEDO_WRITE_CSV', '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def columnar_path(path):
+    """Columnar file path for an output path given with any extension"""
+    base, extension = os.path.splitext(os.fspath(path))
+    if extension in EXTENSIONS.values():
+        return base + OUTPUT_EXTENSION
+    return (base if extension == '.csv' else os.fspath(path)) + OUTPUT_EXTENSION
+
+
+def csv_path(path):
+    """CSV export path for an output path given with any extension"""
+    base, extension = os.path.splitext(os.fspath(path))
+    return (base if extension in ('.csv',) + tuple(EXTENSIONS.values()) else os.fspath(path)) + '.csv'
+
+
+def find_output(path):
+    """
+    Existing file of an output, preferring the columnar copy
+
+    Returns:
+        str or None: Columnar file if present (and not older than the CSV),
+                     else the CSV, else None
+    """
+    columnar, csv = columnar_path(path), csv_path(path)
+    if os.path.exists(columnar):
+        if not os.path.exists(csv) or os.path.getmtime(columnar) >= os.path.getmtime(csv):
+            return columnar
+    if os.path.exists(csv):
+        return csv
+    return None
+
+
+def compact_output_dtypes(df):
+    """
+    Compact dtypes for storage
+
+    Albedo columns become float32, counts and calendar fields the smallest
+    integer type they fit (int16 pixel_count), labels categoricals and dates
+    datetime64. Columns with missing values keep their float type.
+
+    Returns:
+        DataFrame: Converted copy
+    """
+    df = df.copy()
+    if 'date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['date']):
+        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+
+    for col in df.columns:
+        series = df[col]
+        if col.lower().startswith('albedo') and pd.api.types.is_float_dtype(series):
+            df[col] = series.astype('float32')
+        elif col in INTEGER_DTYPES and pd.api.types.is_numeric_dtype(series) and series.notna().all():
+            info = np.iinfo(INTEGER_DTYPES[col])
+            if (series % 1 == 0).all() and series.between(info.min, info.max).all():
+                df[col] = series.astype(INTEGER_DTYPES[col])
+        elif col in CATEGORICAL_COLUMNS and (pd.api.types.is_object_dtype(series)
+                                             or pd.api.types.is_string_dtype(series)):
+            df[col] = series.astype('category')
+    return df
+
+
+def split_run_metadata(df, columns=RUN_METADATA_COLUMNS):
+    """
+    Move run-level columns that hold one value for the whole file out of the rows
+
+    Returns:
+        tuple: (DataFrame without those columns, {column: value})
+    """
+    metadata = {}
+    for col in columns:
+        if col in df.columns and df[col].nunique(dropna=False) <= 1:
+            value = df[col].iloc[0] if len(df) else None
+            metadata[col] = value.item() if isinstance(value, np.generic) else value
+    return df.drop(columns=list(metadata)), metadata
+
+
+def _atomic_write(path, write):
+    """Write through a temporary file and move it into place"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        write(tmp_path)
+        for attempt in range(3):
+            try:
+                os.replace(tmp_path, path)
+                return
+            except PermissionError:
+                # Windows: target open in another program (e.g. Excel)
+                if attempt == 2:
+                    raise
+                time.sleep(0.5)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_columnar(df, path, metadata):
+    if OUTPUT_FORMAT == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        schema_metadata = dict(table.schema.metadata or {})
+        schema_metadata[METADATA_KEY.encode()] = json.dumps(metadata, default=str).encode('utf-8')
+        table = table.replace_schema_metadata(schema_metadata)
+        compression = 'zstd' if pa.Codec.is_available('zstd') else 'snappy'
+        _atomic_write(path, lambda tmp_path: pq.write_table(table, tmp_path, compression=compression))
+    else:
+        df = df.copy()
+        df.attrs[METADATA_KEY] = metadata
+        _atomic_write(path, lambda tmp_path: df.to_pickle(tmp_path))
+
+
+def write_output(df, path, metadata=None, write_csv=None):
+    """
+    Write a workflow output atomically as a compact columnar file
+
+    Args:
+        df: DataFrame to save
+        path: Output path (a .csv name is mapped to the columnar file next to it)
+        metadata: Extra run-level metadata stored with the file
+        write_csv: Also export a CSV (default: ALBEDO_WRITE_CSV)
+
+    Returns:
+        str: Path of the columnar file
+    """
+    compact, run_metadata = split_run_metadata(compact_output_dtypes(df))
+    run_metadata.update(metadata or {})
+
+    # CSV first: readers prefer the columnar file unless the CSV is newer
+    if write_csv if write_csv is not None else write_csv_enabled():
+        export_path = csv_path(path)
+        _atomic_write(export_path, lambda tmp_path: df.to_csv(tmp_path, index=False, encoding='utf-8'))
+        print(f"💾 CSV export: {export_path}")
+
+    path = columnar_path(path)
+    _write_columnar(compact, path, run_metadata)
+    print(f"💾 Output written: {path} ({len(compact)} rows, {os.path.getsize(path) / 1024:.1f} KB)")
+    return path
+
+
+def _schema_metadata(schema):
+    raw = (schema.metadata or {}).get(METADATA_KEY.encode())
+    return json.loads(raw) if raw else {}
+
+
+def read_output_metadata(path):
+    """
+    Run-level metadata of an output without reading its rows
+
+    Returns:
+        dict: Metadata ({} for CSV files or files written without it)
+    """
+    found = find_output(path)
+    if found is None or found.endswith('.csv'):
+        return {}
+    if found.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return _schema_metadata(pq.read_schema(found))
+    return pd.read_pickle(found).attrs.get(METADATA_KEY, {})
+
+
+def read_output(path, columns=None, restore_metadata=False):
+    """
+    Read a workflow output (columnar file, or the CSV of older runs)
+
+    Args:
+        path: Output path (.csv name or columnar file)
+        columns: Columns to read (None for all)
+        restore_metadata: Add the run-level metadata back as constant
+                          (categorical) columns, as in the CSV exports
+
+    Returns:
+        DataFrame: Data with the run metadata in df.attrs['run_metadata']
+    """
+    found = find_output(path)
+    if found is None:
+        raise FileNotFoundError(f"No output at {path}")
+
+    if found.endswith('.csv'):
+        df = pd.read_csv(found, usecols=columns)
+        df.attrs[METADATA_KEY] = {}
+        return df
+
+    if found.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        table = pq.read_table(found, columns=[col for col in columns if col not in RUN_METADATA_COLUMNS]
+                              if columns is not None else None)
+        metadata = _schema_metadata(table.schema)
+        df = table.to_pandas()
+    else:
+        df = pd.read_pickle(found)
+        metadata = df.attrs.get(METADATA_KEY, {})
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
+
+    if restore_metadata:
+        for key, value in metadata.items():
+            if key not in df.columns and (columns is None or key in columns):
+                df[key] = (pd.Categorical.from_codes(np.zeros(len(df), dtype='int8'), [value])
+                           if isinstance(value, str) else value)
+    df.attrs[METADATA_KEY] = metadata
+    return df
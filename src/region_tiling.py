@@ -0,0 +1,154 @@
+"""
+Grid-Aligned Region Tiling
+Splits a large region (e.g. the whole Columbia Icefield box) into tiles whose
+edges fall on MODIS 500 m cell boundaries and runs one Earth Engine request
+per tile concurrently. Every pixel belongs to the single tile containing its
+center, so per-tile pixel statistics merge exactly, without double-counting
+the pixels along tile edges.
+"""
+
+import contextvars
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+# MODIS sinusoidal grid (same grid as streamlit_app/src/utils/earth_engine/modis_grid.py)
+EARTH_RADIUS = 6371007.181
+GRID_ORIGIN_X = -20015109.354
+GRID_ORIGIN_Y = 10007554.677
+CELL_SIZE_500M = 463.312716525
+
+# Tile edge in 500 m cells (64 cells ≈ 30 km, 12 tiles over the Columbia Icefield box)
+DEFAULT_TILE_CELLS = 64
+DEFAULT_TILE_WORKERS = int(os.environ.get('ALBEDO_TILE_WORKERS', 4))
+
+
+def to_sinusoidal(lon, lat):
+    """Lon/lat (degrees) to MODIS sinusoidal x/y (meters)"""
+    lat_rad = math.radians(lat)
+    return EARTH_RADIUS * math.radians(lon) * math.cos(lat_rad), EARTH_RADIUS * lat_rad
+
+
+def to_lonlat(x, y):
+    """MODIS sinusoidal x/y (meters) to lon/lat (degrees)"""
+    lat_rad = y / EARTH_RADIUS
+    return math.degrees(x / (EARTH_RADIUS * math.cos(lat_rad))), math.degrees(lat_rad)
+
+
+class RegionTile:
+    """
+    Block of MODIS cells [row_start, row_end) × [col_start, col_end)
+
+    Rows and columns are global grid indices, so tiles of the same size line
+    up across runs and regions.
+    """
+
+    def __init__(self, row_start, row_end, col_start, col_end, cell_size=CELL_SIZE_500M):
+        self.row_start, self.row_end = row_start, row_end
+        self.col_start, self.col_end = col_start, col_end
+        self.cell_size = cell_size
+
+    def __repr__(self):
+        return f"RegionTile(rows {self.row_start}-{self.row_end}, cols {self.col_start}-{self.col_end})"
+
+    @property
+    def key(self):
+        return (self.row_start, self.col_start)
+
+    def ring(self):
+        """
+        Closed lon/lat ring of the tile outline
+
+        Cell columns are curved in lon/lat: the east and west edges get a
+        vertex on every cell row boundary, so no pixel center changes side.
+        Neighbouring tiles compute identical shared vertices, so their
+        outlines meet without gaps or overlaps.
+        """
+        x_left = GRID_ORIGIN_X + self.col_start * self.cell_size
+        x_right = GRID_ORIGIN_X + self.col_end * self.cell_size
+        y_values = [GRID_ORIGIN_Y - row * self.cell_size for row in range(self.row_start, self.row_end + 1)]
+
+        west = [to_lonlat(x_left, y) for y in y_values]                # top to bottom
+        east = [to_lonlat(x_right, y) for y in reversed(y_values)]     # bottom to top
+        ring = [list(point) for point in west + east]
+        return ring + [ring[0]]
+
+    def lonlat_bounds(self):
+        ring = self.ring()
+        lons = [point[0] for point in ring]
+        lats = [point[1] for point in ring]
+        return min(lons), min(lats), max(lons), max(lats)
+
+    def ee_geometry(self):
+        """Planar ee.Geometry.Polygon of the tile (edges follow the ring, not geodesics)"""
+        import ee
+        return ee.Geometry.Polygon([self.ring()], None, False)
+
+
+def plan_tiles(bounds, tile_cells=DEFAULT_TILE_CELLS, cell_size=CELL_SIZE_500M):
+    """
+    Grid-aligned tiles covering a lon/lat box
+
+    Args:
+        bounds: (min_lon, min_lat, max_lon, max_lat) of the region
+        tile_cells: Tile edge in grid cells
+        cell_size: Grid cell size in meters (500 m MODIS by default)
+
+    Returns:
+        list: RegionTile objects overlapping the box, row-major
+    """
+    min_lon, min_lat, max_lon, max_lat = bounds
+    # x of a meridian is extreme at a box corner (|cos(lat)| is monotonic on each side of the equator)
+    corners = [to_sinusoidal(lon, lat) for lon in (min_lon, max_lon) for lat in (min_lat, max_lat)]
+    min_x, max_x = min(x for x, _ in corners), max(x for x, _ in corners)
+    min_y, max_y = min(y for _, y in corners), max(y for _, y in corners)
+
+    col_start = math.floor((min_x - GRID_ORIGIN_X) / cell_size)
+    col_end = math.floor((max_x - GRID_ORIGIN_X) / cell_size) + 1
+    row_start = math.floor((GRID_ORIGIN_Y - max_y) / cell_size)
+    row_end = math.floor((GRID_ORIGIN_Y - min_y) / cell_size) + 1
+
+    tiles = []
+    for tile_row in range(row_start // tile_cells, (row_end - 1) // tile_cells + 1):
+        for tile_col in range(col_start // tile_cells, (col_end - 1) // tile_cells + 1):
+            tile = RegionTile(
+                tile_row * tile_cells, (tile_row + 1) * tile_cells,
+                tile_col * tile_cells, (tile_col + 1) * tile_cells,
+                cell_size
+            )
+            tile_min_lon, tile_min_lat, tile_max_lon, tile_max_lat = tile.lonlat_bounds()
+            if tile_max_lon > min_lon and tile_min_lon < max_lon and tile_max_lat > min_lat and tile_min_lat < max_lat:
+                tiles.append(tile)
+    return tiles
+
+
+def tile_key(row, col, tile_cells=DEFAULT_TILE_CELLS):
+    """Key of the tile holding grid cell (row, col), for grouping cell lists"""
+    return (row // tile_cells * tile_cells, col // tile_cells * tile_cells)
+
+
+def run_tiles(function, tiles, max_workers=None):
+    """
+    Call function(tile) for every tile concurrently
+
+    Earth Engine requests are I/O bound, so threads overlap their round
+    trips. Each call runs in a copy of the caller's context, keeping the
+    ee_trace phase of the calls it makes.
+
+    Args:
+        function: Callable taking one tile
+        tiles: Tiles (or any work items)
+        max_workers: Concurrent requests (ALBEDO_TILE_WORKERS, 4 by default)
+
+    Returns:
+        list: Results in tile order (the first tile error is raised)
+    """
+    tiles = list(tiles)
+    if len(tiles) <= 1:
+        return [function(tile) for tile in tiles]
+
+    workers = max(1, min(max_workers or DEFAULT_TILE_WORKERS, len(tiles)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, function, tile) for tile in tiles]
+        return [future.result() for future in futures]
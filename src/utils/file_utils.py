@@ -5,127 +5,55 @@ Handles cross-platform file operations with proper locking and error handling
 
 import os
 import time
-import tempfile
 import pandas as pd
 
 
-def safe_csv_write(df, file_path, index=False, max_retries=3, retry_delay=0.5, timeout_seconds=60):
+def safe_csv_write(df, file_path, index=False, max_retries=3, retry_delay=0.5, timeout_seconds=None):
     """
-    Safely write a DataFrame to CSV with retry mechanism and timeout
+    Safely write a DataFrame to CSV (temporary file, then atomic replace)
+    
+    Workflow outputs are written as columnar files by output_writer.write_output;
+    this stays for CSV exports and callers that need a CSV.
     
     Args:
         df: DataFrame to save
         file_path: Path where to save the CSV
         index: Whether to include DataFrame index
-        max_retries: Maximum number of retry attempts
+        max_retries: Maximum number of attempts when the target is locked (Windows)
         retry_delay: Delay between retries in seconds
-        timeout_seconds: Timeout for CSV write operation
+        timeout_seconds: Unused, kept for compatibility
         
     Returns:
         bool: True if successful, False otherwise
     """
-    import signal
-    import threading
-    
-    def csv_write_with_timeout():
-        """Inner function to write CSV"""
-        try:
-            # Use normalized path for cross-platform compatibility
-            file_path_norm = os.path.normpath(file_path)
-            # Ensure directory exists
-            dir_path = os.path.dirname(file_path_norm)
-            os.makedirs(dir_path, exist_ok=True)
-            
-            print(f"🔍 Writing {len(df)} rows, {len(df.columns)} columns")
-            
-            # Try to save CSV with retry mechanism for Windows file locking
-            for attempt in range(max_retries):
-                try:
-                    # Save to temporary file first, then move atomically
-                    temp_file = file_path_norm + '.tmp'
-                    print(f"🔍 Attempt {attempt + 1}: Writing to {temp_file}")
-                    
-                    # Write CSV with explicit encoding to avoid issues
-                    # Use original pandas method to avoid any monkey-patching recursion
-                    import pandas as pd
-                    original_to_csv = pd.DataFrame.to_csv
-                    original_to_csv(df, temp_file, index=index, encoding='utf-8')
-                    print(f"🔍 Successfully wrote temp file")
-                    
-                    # On Windows, need to handle file replacement carefully
-                    if os.path.exists(file_path_norm):
-                        backup_file = file_path_norm + '.bak'
-                        # Remove old backup if it exists
-                        if os.path.exists(backup_file):
-                            os.remove(backup_file)
-                        # Move current file to backup
-                        os.rename(file_path_norm, backup_file)
-                    
-                    # Move temp file to final location
-                    os.rename(temp_file, file_path_norm)
-                    print(f"🔍 Successfully moved to final location")
-                    
-                    # Clean up backup file
-                    backup_file = file_path_norm + '.bak'
-                    if os.path.exists(backup_file):
-                        os.remove(backup_file)
-                    
-                    return True
-                    
-                except (PermissionError, OSError) as e:
-                    if attempt < max_retries - 1:
-                        print(f"⚠️  CSV write attempt {attempt + 1} failed: {e}")
-                        print(f"🔄 Retrying in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                        continue
-                    else:
-                        print(f"❌ Failed to write CSV after {max_retries} attempts: {e}")
-                        raise e
-            
-            return False
-            
-        except Exception as e:
-            print(f"❌ Critical error writing CSV {file_path}: {e}")
-            print(f"❌ Error type: {type(e)}")
-            import traceback
-            traceback.print_exc()
-            return False
-    
-    # Execute with timeout using threading
-    result = [False]  # Mutable container for thread result
-    exception = [None]
-    
-    def target():
-        try:
-            result[0] = csv_write_with_timeout()
-        except Exception as e:
-            exception[0] = e
-    
-    thread = threading.Thread(target=target)
-    thread.daemon = True
-    thread.start()
-    thread.join(timeout=timeout_seconds)
-    
-    if thread.is_alive():
-        print(f"❌ CSV write timed out after {timeout_seconds} seconds!")
-        print("🔍 This suggests a system-level hang - trying alternative approach...")
+    file_path = os.path.normpath(file_path)
+    temp_file = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        df.to_csv(temp_file, index=index, encoding='utf-8')
         
-        # Try a simpler approach
-        try:
-            import pandas as pd
-            original_to_csv = pd.DataFrame.to_csv
-            simple_path = file_path + '.simple'
-            original_to_csv(df, simple_path, index=index)
-            print(f"✅ Simple CSV write succeeded: {simple_path}")
-            return True
-        except Exception as e:
-            print(f"❌ Even simple CSV write failed: {e}")
-            return False
-    
-    if exception[0]:
-        raise exception[0]
-    
-    return result[0]
+        for attempt in range(max_retries):
+            try:
+                os.replace(temp_file, file_path)
+                return True
+            except PermissionError as e:
+                if attempt < max_retries - 1:
+                    print(f"⚠️  CSV write attempt {attempt + 1} failed: {e}")
+                    print(f"🔄 Retrying in {retry_delay} seconds...")
+                    time.sleep(retry_delay)
+                else:
+                    print(f"❌ Failed to write CSV after {max_retries} attempts: {e}")
+        return False
+        
+    except Exception as e:
+        print(f"❌ Critical error writing CSV {file_path}: {e}")
+        return False
+    finally:
+        if os.path.exists(temp_file):
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
 
 
 def check_file_lock(file_path):
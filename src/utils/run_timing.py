@@ -0,0 +1,384 @@
+"""
+Workflow Run Timing
+Phases and spans for the analysis workflows (extraction per year, export,
+trend analysis, plotting, report) recording durations, row counts and the
+process memory high-water mark, with progress derived from measured work and a JSON
+run record saved with the outputs
+"""
+
+import contextlib
+import contextvars
+import glob
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+RUNS_DIR = os.path.join(PROJECT_ROOT, 'outputs', 'runs')
+
+# Seconds per planned unit before a workflow has a recorded run to learn from
+DEFAULT_SECONDS_PER_UNIT = {
+    'initialization': 2.0,
+    'extraction': 30.0,   # per year
+    'export': 1.0,
+    'trend_analysis': 3.0,
+    'plotting': 5.0,
+    'summary_export': 1.0,
+    'report': 1.0
+}
+
+_CURRENT_RUN = contextvars.ContextVar('workflow_run', default=None)
+
+# Workflows import this module as `utils.run_timing` or `src.utils.run_timing`
+# (and the extraction modules follow suit): one module, one current run
+for _name in ('utils.run_timing', 'src.utils.run_timing'):
+    sys.modules.setdefault(_name, sys.modules[__name__])
+
+
+def process_peak_memory_mb():
+    """
+    High-water mark of the process resident memory in MB (None if unknown)
+
+    This is the peak over the whole process lifetime (e.g. the Streamlit
+    server), not of one run: it never decreases, so a phase only raises it
+    when it allocates more than anything before it.
+    """
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS, in kilobytes on Linux and the BSDs
+        return round(peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024, 1)
+    except ImportError:  # Windows
+        try:
+            import psutil
+            info = psutil.Process().memory_info()
+            return round(getattr(info, 'peak_wset', info.rss) / 1024 / 1024, 1)
+        except Exception:
+            return None
+
+
+class Span:
+    """One timed piece of work"""
+
+    def __init__(self, name, unit=None, **info):
+        self.name = name
+        self.unit = unit
+        self.info = info
+        self.rows = None
+        self.status = 'running'
+        self.error = None
+        self.children = []
+        self._start = time.perf_counter()
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.seconds = None
+        self.process_peak_memory_mb = None
+
+    def set(self, rows=None, **info):
+        """Attach a row count and/or extra fields to the record"""
+        if rows is not None:
+            self.rows = int(rows)
+        self.info.update(info)
+
+    def close(self, status='ok', error=None):
+        if self.seconds is None:
+            self.seconds = round(time.perf_counter() - self._start, 3)
+            self.process_peak_memory_mb = process_peak_memory_mb()
+            self.status = status
+            self.error = error
+
+    @property
+    def elapsed(self):
+        return self.seconds if self.seconds is not None else time.perf_counter() - self._start
+
+    def to_dict(self):
+        record = {
+            'name': self.name,
+            'started_at': self.started_at,
+            'seconds': self.seconds,
+            'rows': self.rows,
+            'process_peak_memory_mb': self.process_peak_memory_mb,
+            'status': self.status
+        }
+        if self.unit is not None:
+            record['unit'] = self.unit
+        if self.error:
+            record['error'] = self.error
+        if self.info:
+            record['info'] = self.info
+        if self.children:
+            record['spans'] = [child.to_dict() for child in self.children]
+        return record
+
+
+class _NullSpan:
+    """Stand-in when no workflow run is active"""
+
+    def set(self, rows=None, **info):
+        pass
+
+
+class WorkflowRun:
+    """
+    Timing of one workflow run
+
+    The workflow moves through top-level phases with phase() (each call
+    closes the previous phase); nested work, such as the per-year
+    extraction, is timed with span(), also from deeper modules through the
+    module-level span() helper. Use the run as a context manager so that an
+    exception finishes it as failed (and releases the current run).
+
+    Progress is the planned work completed so far, each phase weighted by
+    its seconds per unit in the previous recorded run of the same workflow
+    (DEFAULT_SECONDS_PER_UNIT before the first one). A phase planned with
+    several units (e.g. one per year) advances as its nested spans complete.
+
+    Args:
+        workflow: Workflow name, also the run record file prefix
+        plan: {phase: units} of the expected work, in order
+        parameters: Run parameters, stored in the record
+        progress_callback: Called with (percent, message), as the
+                           workflows' progress_callback
+        runs_dir: Directory of the run records
+    """
+
+    def __init__(self, workflow, plan, parameters=None, progress_callback=None, runs_dir=RUNS_DIR):
+        self.workflow = workflow
+        self.plan = dict(plan)
+        self.parameters = parameters or {}
+        self.progress_callback = progress_callback
+        self.runs_dir = runs_dir
+        self.seconds_per_unit = _seconds_per_unit(workflow, runs_dir)
+        self.phases = []
+        self.status = 'running'
+        self.error = None
+        self.record_path = None
+        self._current = None
+        self._start = time.perf_counter()
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._token = _CURRENT_RUN.set(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.status == 'running':
+            if exc is not None:
+                self.finish('failed', repr(exc)[:300])
+            else:
+                self.finish()
+        return False
+
+    # ---- phases and spans ----
+
+    def phase(self, name, message=None, **info):
+        """
+        Close the current phase and start the next one
+
+        Returns:
+            Span: The new phase (set rows on it with .set(rows=...))
+        """
+        self._close_current()
+        self._current = Span(name, **info)
+        self.phases.append(self._current)
+        self._report(message or name.replace('_', ' ').capitalize() + '...')
+        return self._current
+
+    @property
+    def current(self):
+        return self._current
+
+    @contextlib.contextmanager
+    def span(self, name, unit=None, **info):
+        """Time nested work inside the current phase"""
+        span = Span(name, unit, **info)
+        parent = self._current
+        try:
+            yield span
+        except BaseException as e:
+            span.close('failed', repr(e)[:300])
+            raise
+        else:
+            span.close()
+        finally:
+            if parent is not None:
+                parent.children.append(span)
+            label = f"{span.name.replace('_', ' ')} {unit}" if unit is not None else span.name.replace('_', ' ')
+            planned = self.plan.get(parent.name) if parent is not None else None
+            done = f" ({len(parent.children)}/{planned})" if planned and planned > 1 else ""
+            self._report(f"{label.capitalize()} done{done}")
+
+    def _close_current(self, status='ok', error=None):
+        if self._current is not None:
+            self._current.close(status, error)
+            self._current = None
+
+    # ---- progress ----
+
+    def _weight(self, name):
+        return max(self.seconds_per_unit.get(name, DEFAULT_SECONDS_PER_UNIT.get(name, 1.0)), 0.01)
+
+    def progress(self):
+        """Percentage of the planned work completed (0-100)"""
+        total = sum(units * self._weight(name) for name, units in self.plan.items())
+        if not total:
+            return 0
+        done = 0.0
+        for phase in self.phases:
+            units = self.plan.get(phase.name)
+            if not units:
+                continue
+            completed = units if phase.status == 'ok' else min(len(phase.children), units)
+            done += completed * self._weight(phase.name)
+        return int(min(100, 100 * done / total))
+
+    def _report(self, message):
+        percent = self.progress()
+        elapsed = time.perf_counter() - self._start
+        figures = f"{_format_seconds(elapsed)} elapsed"
+        if 0 < percent < 100:
+            figures += f", ~{_format_seconds(elapsed * (100 - percent) / percent)} left"
+        full_message = f"{message} · {figures}"
+        print(f"📊 Progress {percent}%: {full_message}")
+        if self.progress_callback:
+            try:
+                self.progress_callback(percent, full_message)
+            except Exception as e:
+                print(f"Warning: Progress callback failed: {e}")
+
+    # ---- record ----
+
+    def finish(self, status='completed', error=None):
+        """
+        Close the run, save its record and print the phase summary
+
+        Returns:
+            dict: The run record (also saved as JSON under runs_dir)
+        """
+        if self.status != 'running':  # Already finished
+            return self.to_dict()
+        self._close_current('ok' if status == 'completed' else 'failed', error)
+        self.status = status
+        self.error = error
+        try:
+            _CURRENT_RUN.reset(self._token)
+        except ValueError:  # Finished from another context
+            _CURRENT_RUN.set(None)
+
+        record = self.to_dict()
+        try:
+            os.makedirs(self.runs_dir, exist_ok=True)
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            self.record_path = os.path.join(self.runs_dir, f'{self.workflow}_{stamp}_{os.getpid()}.json')
+            tmp_path = f'{self.record_path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(record, f, indent=2, default=str)
+            os.replace(tmp_path, self.record_path)
+            record['record_path'] = self.record_path
+        except OSError as e:
+            print(f"⚠️ Could not save run record: {e}")
+
+        self.print_summary()
+        if status == 'completed':
+            self._report("Analysis completed successfully!")
+        elif error:
+            self._report(error)
+        return record
+
+    def to_dict(self):
+        return {
+            'workflow': self.workflow,
+            'status': self.status,
+            'error': self.error,
+            'started_at': self.started_at,
+            'wall_time_s': round(time.perf_counter() - self._start, 3),
+            'process_peak_memory_mb': process_peak_memory_mb(),
+            'progress': self.progress(),
+            'plan': self.plan,
+            'parameters': self.parameters,
+            'phases': [phase.to_dict() for phase in self.phases]
+        }
+
+    def print_summary(self):
+        print(f"\n⏱️ RUN TIMING ({self.workflow}, {self.status}):")
+        for phase in self.phases:
+            rows = f", {phase.rows} rows" if phase.rows is not None else ""
+            memory = (f", process peak {phase.process_peak_memory_mb:.0f} MB"
+                      if phase.process_peak_memory_mb is not None else "")
+            print(f"   {phase.name:<16} {_format_seconds(phase.elapsed):>8}{rows}{memory}")
+            if phase.children:
+                slowest = max(phase.children, key=lambda child: child.seconds or 0)
+                print(f"   {'':<16} {len(phase.children)} spans, slowest {slowest.unit or slowest.name} "
+                      f"({_format_seconds(slowest.seconds or 0)})")
+        print(f"   {'total':<16} {_format_seconds(time.perf_counter() - self._start):>8}")
+
+
+def _format_seconds(seconds):
+    if seconds < 60:
+        return f"{seconds:.1f} s"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes} min {seconds:02d} s" if minutes < 60 else f"{minutes // 60} h {minutes % 60:02d} min"
+
+
+def load_run_records(workflow=None, runs_dir=RUNS_DIR, limit=None):
+    """
+    Saved run records, newest first
+
+    Args:
+        workflow: Only records of this workflow (all by default)
+        limit: Maximum number of records
+
+    Returns:
+        list: Run record dicts
+    """
+    pattern = os.path.join(runs_dir, f'{workflow}_*.json' if workflow else '*.json')
+    records = []
+    for path in sorted(glob.glob(pattern), key=os.path.getmtime, reverse=True):
+        try:
+            with open(path, 'r') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if workflow and record.get('workflow') != workflow:
+            continue
+        record['record_path'] = path
+        records.append(record)
+        if limit and len(records) >= limit:
+            break
+    return records
+
+
+def _seconds_per_unit(workflow, runs_dir):
+    """Measured seconds per planned unit of each phase in the last completed run"""
+    for record in load_run_records(workflow, runs_dir, limit=5):
+        if record.get('status') != 'completed':
+            continue
+        plan = record.get('plan', {})
+        return {
+            phase['name']: phase['seconds'] / max(plan.get(phase['name'], 1), 1)
+            for phase in record.get('phases', []) if phase.get('seconds') is not None
+        }
+    return {}
+
+
+def current_run():
+    """Workflow run active in this context, or None"""
+    return _CURRENT_RUN.get()
+
+
+@contextlib.contextmanager
+def span(name, unit=None, **info):
+    """
+    Time nested work inside the active workflow run (no-op without one)
+
+    Yields:
+        Span: Call .set(rows=...) on it to record the output size
+    """
+    run = current_run()
+    if run is None:
+        yield _NullSpan()
+        return
+    with run.span(name, unit, **info) as active_span:
+        yield active_span
@@ -9,6 +9,13 @@ import pandas as pd
 from paths import get_figure_path
 
 
+def _elevation_band_colors(bands, cmap='viridis'):
+    """Colors for elevation bands ordered low to high, sampled evenly from a colormap"""
+    colormap = plt.get_cmap(cmap)
+    positions = np.linspace(0.1, 0.9, len(bands)) if len(bands) > 1 else [0.5]
+    return {band: colormap(position) for band, position in zip(bands, positions)}
+
+
 def create_hypsometric_plot(hypsometric_results, comparison_results, df, output_file='athabasca_hypsometric_analysis.png'):
     """
     Create comprehensive hypsometric analysis visualization
@@ -24,22 +31,20 @@ def create_hypsometric_plot(hypsometric_results, comparison_results, df, output_
         return
     
     # Import needed function
-    from analysis.hypsometric import classify_elevation_bands
+    from analysis.hypsometric import ordered_bands
     
     fig, axes = plt.subplots(2, 2, figsize=(15, 12))
     fig.suptitle('Hypsometric Analysis - Elevation Band Trends\n(Following Williamson & Menounos 2021)', 
                  fontsize=16, fontweight='bold')
     
-    # Color scheme for elevation bands
-    colors = {
-        'above_median': '#2E8B57',  # Sea Green (high elevation)
-        'near_median': '#FF6B35',   # Orange Red (transition zone)
-        'below_median': '#4682B4'   # Steel Blue (low elevation)
-    }
+    # Bands of the results (any scheme), lowest first, colored along a colormap
+    bands_low_to_high = ordered_bands(hypsometric_results)
+    colors = _elevation_band_colors(bands_low_to_high)
     
-    # Plot 1: Annual trends by elevation band
+    # Plot 1: Annual trends by elevation band (highest first in the legend)
     ax1 = axes[0, 0]
-    for band, results in hypsometric_results.items():
+    for band in reversed(bands_low_to_high):
+        results = hypsometric_results[band]
         if 'trend_analysis' in results:
             annual_data = results['trend_analysis']['annual_data']
             years = annual_data['year'].values
@@ -70,7 +75,7 @@ def create_hypsometric_plot(hypsometric_results, comparison_results, df, output_
         bands = list(slopes.keys())
         slope_values = [slopes[band] for band in bands]
         band_names = [hypsometric_results[band]['band_name'] for band in bands]
-        bar_colors = [colors[band] for band in bands]
+        bar_colors = [colors.get(band, 'gray') for band in bands]
         
         bars = ax2.bar(band_names, slope_values, color=bar_colors, alpha=0.7, edgecolor='black')
         
@@ -89,20 +94,15 @@ def create_hypsometric_plot(hypsometric_results, comparison_results, df, output_
     # Plot 3: Elevation distribution
     ax3 = axes[1, 0]
     if not df.empty and 'elevation' in df.columns:
-        # First classify the data into elevation bands if not already done
-        if 'elevation_band' not in df.columns:
-            df_temp = classify_elevation_bands(df.copy(), 'elevation')
-        else:
-            df_temp = df.copy()
-        
-        # Plot histogram for each elevation band
+        # Plot histogram for each elevation band (pixels within the band's elevation range)
         bands_plotted = False
-        for band in ['above_median', 'near_median', 'below_median']:
-            band_data = df_temp[df_temp['elevation_band'] == band]
+        for band in reversed(bands_low_to_high):
+            elevation_range = hypsometric_results[band]['elevation_range']
+            band_data = df[df['elevation'].between(elevation_range['min'], elevation_range['max'])]
             if not band_data.empty:
                 ax3.hist(band_data['elevation'], bins=20, alpha=0.6, 
                         color=colors[band], 
-                        label=hypsometric_results[band]['band_name'] if band in hypsometric_results else band,
+                        label=hypsometric_results[band]['band_name'],
                         edgecolor='black', linewidth=0.5)
                 bands_plotted = True
         
@@ -310,10 +310,18 @@ def create_melt_season_plot_with_elevation(annual_trends, df, filename='athabasc
     albedo_values = annual_trends['values']
     
     # Calculate annual means for each elevation band if available
+    from analysis.hypsometric import WILLIAMSON_BAND_NAMES
+    
     elevation_bands = None
     if 'elevation_band' in df.columns:
+        # Band labels of the classification (any scheme), lowest first
+        if isinstance(df['elevation_band'].dtype, pd.CategoricalDtype):
+            band_labels = [band for band in df['elevation_band'].cat.categories]
+        else:
+            band_labels = list(df.groupby('elevation_band')['elevation'].mean().sort_values().index) \
+                if 'elevation' in df.columns else sorted(df['elevation_band'].dropna().unique())
         elevation_bands = {}
-        for band in ['above_median', 'near_median', 'below_median']:
+        for band in band_labels:
             band_data = df[df['elevation_band'] == band]
             if not band_data.empty:
                 band_annual = band_data.groupby('year')['albedo_mean'].mean()
@@ -324,15 +332,12 @@ def create_melt_season_plot_with_elevation(annual_trends, df, filename='athabasc
     ax.plot(years, albedo_values, 'ko-', linewidth=2, markersize=8, label='Overall')
     
     # Add elevation band trends if available
-    colors = {'above_median': '#2166ac', 'near_median': '#fee090', 'below_median': '#d73027'}
-    labels = {'above_median': 'Above Median (>100m)', 'near_median': 'Near Median (±100m)', 
-              'below_median': 'Below Median (>100m)'}
-    
     if elevation_bands:
-        for band, band_data in elevation_bands.items():
+        colors = _elevation_band_colors(list(elevation_bands))
+        for band, band_data in reversed(list(elevation_bands.items())):
             ax.plot(band_data.index, band_data.values, 
-                   color=colors.get(band, 'gray'), alpha=0.7, linewidth=1.5,
-                   marker='o', markersize=4, label=labels.get(band, band))
+                   color=colors[band], alpha=0.7, linewidth=1.5,
+                   marker='o', markersize=4, label=WILLIAMSON_BAND_NAMES.get(band, band))
     
     # Add trend line
     z = np.polyfit(years, albedo_values, 1)
@@ -356,25 +361,39 @@ def create_melt_season_plot_with_elevation(annual_trends, df, filename='athabasc
         # Create histogram
         n, bins, patches = ax2.hist(df['elevation'], bins=50, alpha=0.7, color='gray', edgecolor='black')
         
-        # Color bins by elevation band
-        for i, patch in enumerate(patches):
-            bin_center = (bins[i] + bins[i+1]) / 2
-            if bin_center > median_elev + 100:
-                patch.set_facecolor(colors['above_median'])
-            elif bin_center < median_elev - 100:
-                patch.set_facecolor(colors['below_median'])
-            else:
-                patch.set_facecolor(colors['near_median'])
+        if elevation_bands:
+            # Color bins by the band whose elevation range holds their center
+            band_ranges = df.groupby('elevation_band', observed=True)['elevation'].agg(['min', 'max'])
+            for i, patch in enumerate(patches):
+                bin_center = (bins[i] + bins[i+1]) / 2
+                for band in elevation_bands:
+                    if band in band_ranges.index and \
+                            band_ranges.loc[band, 'min'] <= bin_center <= band_ranges.loc[band, 'max']:
+                        patch.set_facecolor(colors[band])
+                        break
+            title = 'Elevation Distribution by Elevation Band'
+        else:
+            # No classification: Williamson & Menounos ±100m bands around the median
+            colors = _elevation_band_colors(['below_median', 'near_median', 'above_median'])
+            for i, patch in enumerate(patches):
+                bin_center = (bins[i] + bins[i+1]) / 2
+                if bin_center > median_elev + 100:
+                    patch.set_facecolor(colors['above_median'])
+                elif bin_center < median_elev - 100:
+                    patch.set_facecolor(colors['below_median'])
+                else:
+                    patch.set_facecolor(colors['near_median'])
+            ax2.axvline(median_elev + 100, color='gray', linestyle=':', alpha=0.5)
+            ax2.axvline(median_elev - 100, color='gray', linestyle=':', alpha=0.5)
+            title = 'Elevation Distribution with Williamson & Menounos Bands'
         
         # Add median line
         ax2.axvline(median_elev, color='black', linestyle='--', linewidth=2, 
                    label=f'Median: {median_elev:.0f}m')
-        ax2.axvline(median_elev + 100, color='gray', linestyle=':', alpha=0.5)
-        ax2.axvline(median_elev - 100, color='gray', linestyle=':', alpha=0.5)
         
         ax2.set_xlabel('Elevation (m)', fontsize=12)
         ax2.set_ylabel('Pixel Count', fontsize=12)
-        ax2.set_title('Elevation Distribution with Williamson & Menounos Bands', fontsize=12)
+        ax2.set_title(title, fontsize=12)
         ax2.legend()
         ax2.grid(True, alpha=0.3)
     
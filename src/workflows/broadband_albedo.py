@@ -18,12 +18,15 @@ from src.data.mcd43a3_extraction import (
     initialize_earth_engine,
     extract_mcd43a3_data_fixed,
     extract_mcd43a3_data_yearly,
-    analyze_data_quality
+    analyze_data_quality,
+    MCD43A3_QA_THRESHOLD
 )
 from src.analysis.spectral_analysis import (
     analyze_spectral_trends,
     calculate_spectral_ratios,
     detect_contamination_events,
+    detect_contamination_events_rolling,
+    SpectralBaseline,
     analyze_seasonal_patterns
 )
 from src.visualization.spectral_plots import (
@@ -33,143 +36,171 @@ from src.visualization.spectral_plots import (
     create_multi_year_seasonal_evolution,
     create_interactive_seasonal_evolution
 )
+from src.utils.run_timing import WorkflowRun
+from src.output_writer import write_output
 
 
-def run_mcd43a3_analysis(start_year=2010, end_year=2024):
+def run_mcd43a3_analysis(start_year=2010, end_year=2024, progress_callback=None):
     """
     Complete MCD43A3 broadband albedo analysis workflow
     
     Args:
         start_year: Start year for analysis
         end_year: End year for analysis
+        progress_callback: Function to call with progress updates (progress, message)
     
     Returns:
-        dict: Complete MCD43A3 analysis results
+        dict: Complete MCD43A3 analysis results, with the timing record as 'run_record'
     """
-    print("🌈 ATHABASCA GLACIER MCD43A3 BROADBAND ALBEDO ANALYSIS")
-    print("=" * 80)
-    print("📡 Product: MODIS MCD43A3 16-day broadband albedo composites")
-    print("📚 Method: Following Williamson & Menounos (2021) spectral methodology")
-    print("🎯 Focus: Spectral albedo analysis for contamination detection")
-    
-    # Initialize Earth Engine
-    initialize_earth_engine()
-    
-    # Extract MCD43A3 data
-    df = extract_mcd43a3_data_fixed(start_year=start_year, end_year=end_year)
-    
-    if df.empty:
-        print("❌ No MCD43A3 data extracted. Analysis cannot proceed.")
-        return None
-    
-    # Export raw data
-    from src.paths import get_output_path
-    
-    csv_path = get_output_path('MCD43A3_spectral_data.csv')
-    df.to_csv(csv_path, index=False)
-    print(f"\n💾 Raw MCD43A3 data exported: {csv_path}")
-    
-    # Analyze data quality
-    quality_results = analyze_data_quality(df)
-    
-    # Perform spectral trend analysis
-    spectral_results = analyze_spectral_trends(df)
-    
-    if not spectral_results:
-        print("❌ Spectral trend analysis failed.")
-        return None
-    
-    # Create visualizations
-    create_spectral_plot_fixed(df, spectral_results)
-    
-    # Create multi-year seasonal evolution plot
-    print("\n📊 Creating multi-year seasonal evolution plot...")
-    create_multi_year_seasonal_evolution(df)
-    
-    # Create interactive seasonal evolution dashboard
-    print("\n🌐 Creating interactive seasonal evolution dashboard...")
-    create_interactive_seasonal_evolution(df)
-    
-    # Export results summary
-    results_path = get_output_path('MCD43A3_results.csv')
-    
-    # Create summary DataFrame for export
-    summary_data = []
-    for group_name, group_results in spectral_results.items():
-        if group_name == 'spectral_comparison':
-            continue
-            
-        for band, band_results in group_results.items():
-            if 'change_percent_per_year' in band_results:
-                summary_data.append({
-                    'spectral_group': group_name,
-                    'band': band,
-                    'change_percent_per_year': band_results['change_percent_per_year'],
-                    'mann_kendall_p_value': band_results['mann_kendall']['p_value'],
-                    'trend_direction': band_results['mann_kendall']['trend'],
-                    'significance': band_results['significance'],
-                    'n_years': band_results['n_years']
-                })
-    
-    if summary_data:
-        summary_df = pd.DataFrame(summary_data)
-        summary_df.to_csv(results_path, index=False)
-        print(f"💾 MCD43A3 results exported: {results_path}")
-    
-    # Final summary
-    print(f"\n🎉 MCD43A3 SPECTRAL ANALYSIS COMPLETE!")
-    print("=" * 60)
-    print(f"📊 Period analyzed: {start_year}-{end_year}")
-    print(f"📈 Total observations: {len(df)}")
-    
-    if 'spectral_comparison' in spectral_results:
-        comp = spectral_results['spectral_comparison']
-        print(f"🔍 Key finding: {comp['interpretation'].replace('_', ' ').title()} decline pattern")
-        print(f"📊 Visible change: {comp['visible_avg_change']:.2f}%/year")
-        print(f"📊 NIR change: {comp['nir_avg_change']:.2f}%/year")
-    
-    print(f"💾 Files generated:")
-    print(f"   📊 Spectral analysis: figures/melt_season/athabasca_mcd43a3_spectral_analysis.png")
-    print(f"   📊 Seasonal evolution: figures/melt_season/mcd43a3_seasonal_evolution_grid.png")
-    print(f"   🌐 Interactive dashboard: maps/interactive/interactive_seasonal_evolution.html")
-    print(f"   💾 Raw data: outputs/csv/MCD43A3_spectral_data.csv")
-    print(f"   💾 Results: outputs/csv/MCD43A3_results.csv")
-    
-    # Compile comprehensive results
-    comprehensive_results = {
-        'spectral_data': df,
-        'statistics': spectral_results,
-        'quality_analysis': quality_results,
-        'dataset_info': {
-            'total_observations': len(df),
-            'years_analyzed': sorted(df['year'].unique()),
-            'period': f"{start_year}-{end_year}",
-            'product': "MODIS MCD43A3 16-day broadband albedo",
-            'method': "Williamson & Menounos (2021) Spectral Analysis",
-            'quality_filtering': "QA ≤ 1 (Full + magnitude inversions)"
-        }
-    }
-    
-    # Generate automatic report
-    try:
-        from src.utils.report_generator import generate_analysis_report
-        from datetime import datetime
+    n_years = end_year - start_year + 1
+    with WorkflowRun(
+        'mcd43a3',
+        # Periods over 8 years are extracted year by year, shorter ones in one request
+        plan={'initialization': 1, 'extraction': n_years if n_years > 8 else 1, 'export': 1,
+              'trend_analysis': 1, 'plotting': 3, 'summary_export': 1, 'report': 1},
+        parameters={'start_year': start_year, 'end_year': end_year},
+        progress_callback=progress_callback
+    ) as run:
+        run.phase('initialization', "Initializing analysis...")
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_path = f"outputs/athabasca_mcd43a3_rapport_{timestamp}.txt"
+        print("🌈 ATHABASCA GLACIER MCD43A3 BROADBAND ALBEDO ANALYSIS")
+        print("=" * 80)
+        print("📡 Product: MODIS MCD43A3 16-day broadband albedo composites")
+        print("📚 Method: Following Williamson & Menounos (2021) spectral methodology")
+        print("🎯 Focus: Spectral albedo analysis for contamination detection")
         
-        generate_analysis_report(
-            analysis_type='MCD43A3',
-            results_data=comprehensive_results,
-            output_path=report_path,
-            start_year=start_year,
-            end_year=end_year
-        )
+        # Initialize Earth Engine
+        initialize_earth_engine()
         
-    except Exception as e:
-        print(f"⚠️  Erreur génération rapport automatique: {e}")
-    
-    return comprehensive_results
+        # Extract MCD43A3 data
+        run.phase('extraction', "Extracting MCD43A3 data...")
+        df = extract_mcd43a3_data_fixed(start_year=start_year, end_year=end_year)
+        run.current.set(rows=len(df))
+        
+        if df.empty:
+            print("❌ No MCD43A3 data extracted. Analysis cannot proceed.")
+            run.finish('failed', "No MCD43A3 data extracted")
+            return None
+        
+        # Export raw data
+        from src.paths import get_output_path
+        
+        run.phase('export', "Exporting raw data...").set(rows=len(df))
+        data_path = write_output(df, get_output_path('MCD43A3_spectral_data.csv'),
+                                 metadata={'product': 'MCD43A3', 'period': f"{start_year}-{end_year}"})
+        print(f"\n💾 Raw MCD43A3 data exported: {data_path}")
+        
+        # Analyze data quality
+        run.phase('trend_analysis', "Performing spectral trend analysis...", input_rows=len(df))
+        quality_results = analyze_data_quality(df)
+        
+        # Perform spectral trend analysis
+        spectral_results = analyze_spectral_trends(df)
+        
+        if not spectral_results:
+            print("❌ Spectral trend analysis failed.")
+            run.finish('failed', "Spectral trend analysis failed")
+            return None
+        
+        # Create visualizations
+        run.phase('plotting', "Creating visualizations...")
+        with run.span('plot', unit='spectral_analysis'):
+            create_spectral_plot_fixed(df, spectral_results)
+        
+        # Create multi-year seasonal evolution plot
+        print("\n📊 Creating multi-year seasonal evolution plot...")
+        with run.span('plot', unit='seasonal_evolution'):
+            create_multi_year_seasonal_evolution(df)
+        
+        # Create interactive seasonal evolution dashboard
+        print("\n🌐 Creating interactive seasonal evolution dashboard...")
+        with run.span('plot', unit='interactive_seasonal_evolution'):
+            create_interactive_seasonal_evolution(df)
+        
+        # Export results summary
+        run.phase('summary_export', "Exporting results summary...")
+        results_path = get_output_path('MCD43A3_results.csv')
+        
+        # Create summary DataFrame for export
+        summary_data = []
+        for group_name, group_results in spectral_results.items():
+            if group_name == 'spectral_comparison':
+                continue
+                
+            for band, band_results in group_results.items():
+                if 'change_percent_per_year' in band_results:
+                    summary_data.append({
+                        'spectral_group': group_name,
+                        'band': band,
+                        'change_percent_per_year': band_results['change_percent_per_year'],
+                        'mann_kendall_p_value': band_results['mann_kendall']['p_value'],
+                        'trend_direction': band_results['mann_kendall']['trend'],
+                        'significance': band_results['significance'],
+                        'n_years': band_results['n_years']
+                    })
+        
+        if summary_data:
+            summary_df = pd.DataFrame(summary_data)
+            results_path = write_output(summary_df, results_path)
+            run.current.set(rows=len(summary_df))
+            print(f"💾 MCD43A3 results exported: {results_path}")
+        
+        # Final summary
+        run.phase('report', "Generating report...")
+        print(f"\n🎉 MCD43A3 SPECTRAL ANALYSIS COMPLETE!")
+        print("=" * 60)
+        print(f"📊 Period analyzed: {start_year}-{end_year}")
+        print(f"📈 Total observations: {len(df)}")
+        
+        if 'spectral_comparison' in spectral_results:
+            comp = spectral_results['spectral_comparison']
+            print(f"🔍 Key finding: {comp['interpretation'].replace('_', ' ').title()} decline pattern")
+            print(f"📊 Visible change: {comp['visible_avg_change']:.2f}%/year")
+            print(f"📊 NIR change: {comp['nir_avg_change']:.2f}%/year")
+        
+        print(f"💾 Files generated:")
+        print(f"   📊 Spectral analysis: figures/melt_season/athabasca_mcd43a3_spectral_analysis.png")
+        print(f"   📊 Seasonal evolution: figures/melt_season/mcd43a3_seasonal_evolution_grid.png")
+        print(f"   🌐 Interactive dashboard: maps/interactive/interactive_seasonal_evolution.html")
+        print(f"   💾 Raw data: {data_path}")
+        print(f"   💾 Results: {results_path}")
+        
+        # Compile comprehensive results
+        comprehensive_results = {
+            'spectral_data': df,
+            'statistics': spectral_results,
+            'quality_analysis': quality_results,
+            'dataset_info': {
+                'total_observations': len(df),
+                'years_analyzed': sorted(df['year'].unique()),
+                'period': f"{start_year}-{end_year}",
+                'product': "MODIS MCD43A3 16-day broadband albedo",
+                'method': "Williamson & Menounos (2021) Spectral Analysis",
+                'quality_filtering': "QA ≤ 1 (Full + magnitude inversions)"
+            }
+        }
+        
+        # Generate automatic report
+        try:
+            from src.utils.report_generator import generate_analysis_report
+            from datetime import datetime
+            
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            report_path = f"outputs/athabasca_mcd43a3_rapport_{timestamp}.txt"
+            
+            generate_analysis_report(
+                analysis_type='MCD43A3',
+                results_data=comprehensive_results,
+                output_path=report_path,
+                start_year=start_year,
+                end_year=end_year
+            )
+            
+        except Exception as e:
+            print(f"⚠️  Erreur génération rapport automatique: {e}")
+        
+        comprehensive_results['run_record'] = run.finish()
+        return comprehensive_results
 
 
 def run_extended_spectral_analysis(start_year=2010, end_year=2024):
@@ -207,6 +238,33 @@ def run_extended_spectral_analysis(start_year=2010, end_year=2024):
         print(f"⚠️  Detected {len(contamination_events)} potential contamination events")
         create_spectral_ratio_plot(df)
     
+    # Rolling day-of-year baseline per product and QA level: every composite
+    # is scored, dates not yet in the saved baseline are folded into it
+    from src.paths import get_output_path
+    output_key = f'MCD43A3_qa{MCD43A3_QA_THRESHOLD}'
+    baseline_path = get_output_path(f'{output_key}_spectral_baseline.json')
+    baseline = None
+    if baseline_path.exists():
+        try:
+            baseline = SpectralBaseline.load(baseline_path)
+            print(f"📂 Loaded spectral baseline ({len(baseline.dates)} composites, last: "
+                  f"{baseline.last_date.date() if baseline.last_date is not None else 'n/a'})")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Could not load spectral baseline, rebuilding: {e}")
+            baseline = None
+    
+    baseline_events, baseline = detect_contamination_events_rolling(df, baseline)
+    baseline.save(baseline_path)
+    print(f"📉 Baseline anomalies: {len(baseline_events)} observations below DOY baseline")
+    
+    # Rewritten on every run so an empty run leaves no stale events behind
+    events_path = get_output_path(f'{output_key}_contamination_events.csv')
+    if not baseline_events.empty:
+        baseline_events.to_csv(events_path, index=False)
+        print(f"💾 Contamination events saved: {events_path}")
+    elif events_path.exists():
+        events_path.unlink()
+    
     # Seasonal pattern analysis
     seasonal_results = analyze_seasonal_patterns(df)
     if seasonal_results:
@@ -215,6 +273,8 @@ def run_extended_spectral_analysis(start_year=2010, end_year=2024):
     
     # Update results with extended analysis
     results['contamination_events'] = contamination_events
+    results['baseline_contamination_events'] = baseline_events
+    results['spectral_baseline'] = baseline
     results['seasonal_analysis'] = seasonal_results
     
     print("\n🎉 EXTENDED SPECTRAL ANALYSIS COMPLETE!")
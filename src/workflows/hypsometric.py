@@ -17,7 +17,19 @@ from analysis.temporal import analyze_annual_trends
 from visualization.plots import create_hypsometric_plot
 from data.extraction import extract_melt_season_data_yearly_with_elevation
 
-def run_hypsometric_analysis_williamson(start_year=2010, end_year=2024, scale=500):
+try:
+    from utils.run_timing import WorkflowRun
+except ImportError:
+    from src.utils.run_timing import WorkflowRun
+
+try:
+    from output_writer import write_output
+except ImportError:
+    from src.output_writer import write_output
+
+def run_hypsometric_analysis_williamson(start_year=2010, end_year=2024, scale=500,
+                                        band_scheme='median', band_width=100, n_bands=3,
+                                        band_edges=None, progress_callback=None):
     """
     Complete hypsometric analysis workflow following Williamson & Menounos (2021)
     Analyzes albedo trends by elevation bands (±100m around median elevation)
@@ -26,148 +38,180 @@ def run_hypsometric_analysis_williamson(start_year=2010, end_year=2024, scale=50
         start_year: Start year for analysis
         end_year: End year for analysis
         scale: Spatial resolution in meters
+        band_scheme: Elevation band scheme ('median', 'fixed', 'quantile', 'explicit')
+        band_width: Band half-width ('median') or bin width ('fixed') in meters
+        n_bands: Number of bands for the 'quantile' scheme
+        band_edges: Cut points in meters for the 'explicit' scheme
+        progress_callback: Function to call with progress updates (progress, message)
     
     Returns:
-        dict: Complete hypsometric analysis results
+        dict: Complete hypsometric analysis results, with the timing record as 'run_record'
     """
-    print("🏔️  ATHABASCA GLACIER HYPSOMETRIC ANALYSIS")
-    print("=" * 80)
-    print(f"📊 Using Williamson & Menounos (2021) methodology")
-    print(f"🗓️  Period: {start_year}-{end_year}")
-    print(f"📏 Resolution: {scale}m")
-    print(f"🎯 Method: ±100m elevation bands around glacier median")
-    
-    # Initialize Earth Engine
-    ee.Initialize()
-    
-    # Extract data with elevation
-    print(f"\n⏳ Extracting MODIS albedo data with elevation...")
-    print(f"🏔️  Including SRTM elevation data for each pixel")
-    
-    df = extract_melt_season_data_yearly_with_elevation(
-        start_year=start_year, 
-        end_year=end_year, 
-        scale=scale
-    )
-    
-    if df.empty:
-        print("❌ No data extracted. Check your date range and region.")
-        return None
-    
-    # Export raw data with elevation
-    csv_path = get_output_path('SRTM_hypsometric_data.csv')
-    df.to_csv(csv_path, index=False)
-    print(f"\n💾 Raw data with elevation exported: {csv_path}")
-    
-    # Calculate glacier-wide median elevation
-    median_elevation = df['elevation'].median()
-    print(f"\n📏 Glacier median elevation: {median_elevation:.0f} m")
-    
-    # Perform hypsometric analysis
-    print(f"\n🔍 Analyzing trends by elevation band...")
-    hypsometric_results = analyze_hypsometric_trends(
-        df, 
-        elevation_column='elevation',
-        value_column='albedo_mean',
-        median_elevation=median_elevation
-    )
-    
-    if not hypsometric_results:
-        print("❌ Hypsometric analysis failed.")
-        return None
-    
-    # Compare elevation bands
-    elevation_comparison = compare_elevation_bands(hypsometric_results)
-    
-    # Create visualization
-    from paths import get_figure_path
-    hypsometric_path = get_figure_path('athabasca_hypsometric_analysis.png', 'trends')
-    create_hypsometric_plot(hypsometric_results, elevation_comparison, df, str(hypsometric_path))
-    
-    # Export results summary
-    summary_path = get_output_path('SRTM_hypsometric_results.csv')
-    
-    # Create summary dataframe
-    summary_data = []
-    for band, results in hypsometric_results.items():
-        if 'trend_analysis' in results:
-            trend = results['trend_analysis']
-            summary_data.append({
-                'elevation_band': results['band_name'],
-                'elevation_range_min': results['elevation_range']['min'],
-                'elevation_range_max': results['elevation_range']['max'],
-                'n_observations': results['n_observations'],
-                'trend': trend['mann_kendall']['trend'],
-                'p_value': trend['mann_kendall']['p_value'],
-                'sens_slope_per_year': trend['sens_slope']['slope_per_year'],
-                'percent_change_per_year': trend['annual_change']['percent_per_year'],
-                'total_change': trend['total_change']['absolute'],
-                'significance': 'SIGNIFICANT' if trend['mann_kendall']['p_value'] < 0.05 else 'Not significant'
-            })
-    
-    summary_df = pd.DataFrame(summary_data)
-    summary_df.to_csv(summary_path, index=False)
-    print(f"💾 Hypsometric results exported: {summary_path}")
-    
-    # Also create overall temporal plot with elevation bands
-    overall_trends = analyze_annual_trends(df, 'albedo_mean')
-    if overall_trends:
-        from visualization.plots import create_melt_season_plot_with_elevation
-        elevation_path = get_figure_path('athabasca_melt_season_with_elevation.png', 'evolution')
-        create_melt_season_plot_with_elevation(
-            overall_trends, 
+    with WorkflowRun(
+        'hypsometric',
+        plan={'initialization': 1, 'extraction': end_year - start_year + 1, 'export': 1,
+              'trend_analysis': 1, 'plotting': 1, 'summary_export': 1, 'plotting_elevation': 1,
+              'report': 1},
+        parameters={'start_year': start_year, 'end_year': end_year, 'scale': scale,
+                    'band_scheme': band_scheme, 'band_width': band_width, 'n_bands': n_bands},
+        progress_callback=progress_callback
+    ) as run:
+        run.phase('initialization', "Initializing analysis...")
+        
+        print("🏔️  ATHABASCA GLACIER HYPSOMETRIC ANALYSIS")
+        print("=" * 80)
+        print(f"📊 Using Williamson & Menounos (2021) methodology")
+        print(f"🗓️  Period: {start_year}-{end_year}")
+        print(f"📏 Resolution: {scale}m")
+        print(f"🎯 Method: ±100m elevation bands around glacier median")
+        
+        # Initialize Earth Engine
+        ee.Initialize()
+        
+        # Extract data with elevation
+        run.phase('extraction', "Starting data extraction...")
+        print(f"\n⏳ Extracting MODIS albedo data with elevation...")
+        print(f"🏔️  Including SRTM elevation data for each pixel")
+        
+        df = extract_melt_season_data_yearly_with_elevation(
+            start_year=start_year, 
+            end_year=end_year, 
+            scale=scale
+        )
+        run.current.set(rows=len(df))
+        
+        if df.empty:
+            print("❌ No data extracted. Check your date range and region.")
+            run.finish('failed', "No data extracted - check parameters")
+            return None
+        
+        # Export raw data with elevation
+        run.phase('export', "Exporting raw data...").set(rows=len(df))
+        data_path = write_output(df, get_output_path('SRTM_hypsometric_data.csv'),
+                                metadata={'period': f"{start_year}-{end_year}", 'scale': scale})
+        print(f"\n💾 Raw data with elevation exported: {data_path}")
+        
+        # Calculate glacier-wide median elevation
+        median_elevation = df['elevation'].median()
+        print(f"\n📏 Glacier median elevation: {median_elevation:.0f} m")
+        
+        # Perform hypsometric analysis
+        run.phase('trend_analysis', "Analyzing trends by elevation band...", input_rows=len(df))
+        print(f"\n🔍 Analyzing trends by elevation band...")
+        hypsometric_results = analyze_hypsometric_trends(
             df, 
-            str(elevation_path)
+            elevation_column='elevation',
+            value_column='albedo_mean',
+            median_elevation=median_elevation,
+            scheme=band_scheme,
+            band_width=band_width,
+            n_bands=n_bands,
+            edges=band_edges
         )
-    
-    # Print key findings
-    print_hypsometric_findings(hypsometric_results, elevation_comparison)
-    
-    print(f"\n🎉 HYPSOMETRIC ANALYSIS COMPLETE!")
-    print(f"Files generated:")
-    print(f"   📊 Hypsometric visualization: {hypsometric_path}")
-    print(f"   📊 Temporal with elevation: {elevation_path}")
-    print(f"   💾 Raw data: {csv_path}")
-    print(f"   💾 Results summary: {summary_path}")
-    
-    # Prepare comprehensive results for report
-    comprehensive_results = {
-        'hypsometric_data': df,
-        'elevation_statistics': hypsometric_results,
-        'elevation_comparison': elevation_comparison,
-        'median_elevation': median_elevation,
-        'overall_trends': overall_trends,
-        'dataset_info': {
-            'total_observations': len(df),
-            'years_analyzed': sorted(df['year'].unique()) if 'year' in df.columns else [],
-            'period': f"{start_year}-{end_year}",
-            'product': "MODIS MOD10A1/MYD10A1 + SRTM DEM",
-            'method': "Williamson & Menounos (2021) Hypsometric Analysis",
-            'quality_filtering': "QA ≤ 1 (Best + good quality)",
-            'elevation_bands': len(hypsometric_results)
+        
+        if not hypsometric_results:
+            print("❌ Hypsometric analysis failed.")
+            run.finish('failed', "Hypsometric analysis failed")
+            return None
+        
+        # Compare elevation bands
+        elevation_comparison = compare_elevation_bands(hypsometric_results)
+        
+        # Create visualization
+        run.phase('plotting', "Creating visualization...")
+        from paths import get_figure_path
+        hypsometric_path = get_figure_path('athabasca_hypsometric_analysis.png', 'trends')
+        create_hypsometric_plot(hypsometric_results, elevation_comparison, df, str(hypsometric_path))
+        
+        # Export results summary
+        run.phase('summary_export', "Exporting results summary...")
+        summary_path = get_output_path('SRTM_hypsometric_results.csv')
+        
+        # Create summary dataframe
+        summary_data = []
+        for band, results in hypsometric_results.items():
+            if 'trend_analysis' in results:
+                trend = results['trend_analysis']
+                summary_data.append({
+                    'elevation_band': results['band_name'],
+                    'elevation_range_min': results['elevation_range']['min'],
+                    'elevation_range_max': results['elevation_range']['max'],
+                    'n_observations': results['n_observations'],
+                    'trend': trend['mann_kendall']['trend'],
+                    'p_value': trend['mann_kendall']['p_value'],
+                    'sens_slope_per_year': trend['sens_slope']['slope_per_year'],
+                    'percent_change_per_year': trend['annual_change']['percent_per_year'],
+                    'total_change': trend['total_change']['absolute'],
+                    'significance': 'SIGNIFICANT' if trend['mann_kendall']['p_value'] < 0.05 else 'Not significant'
+                })
+        
+        summary_df = pd.DataFrame(summary_data)
+        summary_path = write_output(summary_df, summary_path)
+        run.current.set(rows=len(summary_df))
+        print(f"💾 Hypsometric results exported: {summary_path}")
+        
+        # Also create overall temporal plot with elevation bands
+        run.phase('plotting_elevation', "Creating temporal plot with elevation...")
+        overall_trends = analyze_annual_trends(df, 'albedo_mean')
+        if overall_trends:
+            from visualization.plots import create_melt_season_plot_with_elevation
+            elevation_path = get_figure_path('athabasca_melt_season_with_elevation.png', 'evolution')
+            create_melt_season_plot_with_elevation(
+                overall_trends, 
+                df, 
+                str(elevation_path)
+            )
+        
+        # Print key findings
+        run.phase('report', "Finalizing analysis...")
+        print_hypsometric_findings(hypsometric_results, elevation_comparison)
+        
+        print(f"\n🎉 HYPSOMETRIC ANALYSIS COMPLETE!")
+        print(f"Files generated:")
+        print(f"   📊 Hypsometric visualization: {hypsometric_path}")
+        print(f"   📊 Temporal with elevation: {elevation_path}")
+        print(f"   💾 Raw data: {data_path}")
+        print(f"   💾 Results summary: {summary_path}")
+        
+        # Prepare comprehensive results for report
+        comprehensive_results = {
+            'hypsometric_data': df,
+            'elevation_statistics': hypsometric_results,
+            'elevation_comparison': elevation_comparison,
+            'median_elevation': median_elevation,
+            'overall_trends': overall_trends,
+            'dataset_info': {
+                'total_observations': len(df),
+                'years_analyzed': sorted(df['year'].unique()) if 'year' in df.columns else [],
+                'period': f"{start_year}-{end_year}",
+                'product': "MODIS MOD10A1/MYD10A1 + SRTM DEM",
+                'method': "Williamson & Menounos (2021) Hypsometric Analysis",
+                'quality_filtering': "QA ≤ 1 (Best + good quality)",
+                'elevation_bands': len(hypsometric_results)
+            }
         }
-    }
-    
-    # Generate automatic report
-    try:
-        from src.utils.report_generator import generate_analysis_report
-        from datetime import datetime
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_path = f"outputs/athabasca_hypsometric_rapport_{timestamp}.txt"
-        
-        generate_analysis_report(
-            analysis_type='Hypsometric',
-            results_data=comprehensive_results,
-            output_path=report_path,
-            start_year=start_year,
-            end_year=end_year
-        )
         
-    except Exception as e:
-        print(f"⚠️  Erreur génération rapport automatique: {e}")
-    
-    return comprehensive_results
+        # Generate automatic report
+        try:
+            from src.utils.report_generator import generate_analysis_report
+            from datetime import datetime
+            
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            report_path = f"outputs/athabasca_hypsometric_rapport_{timestamp}.txt"
+            
+            generate_analysis_report(
+                analysis_type='Hypsometric',
+                results_data=comprehensive_results,
+                output_path=report_path,
+                start_year=start_year,
+                end_year=end_year
+            )
+            
+        except Exception as e:
+            print(f"⚠️  Erreur génération rapport automatique: {e}")
+        
+        comprehensive_results['run_record'] = run.finish()
+        return comprehensive_results
 
 def print_hypsometric_findings(hypsometric_results, elevation_comparison):
     """Print key hypsometric findings"""
@@ -15,6 +15,16 @@ from paths import get_output_path
 # Import analysis modules
 from data.extraction import extract_melt_season_data_yearly
 
+try:
+    from utils.run_timing import WorkflowRun
+except ImportError:
+    from src.utils.run_timing import WorkflowRun
+
+try:
+    from output_writer import write_output
+except ImportError:
+    from src.output_writer import write_output
+
 # Try different import paths for utils.file_utils
 try:
     from utils.file_utils import safe_csv_write, get_safe_output_path
@@ -98,6 +108,12 @@ except ImportError:
             os.makedirs(csv_dir, exist_ok=True)
             return os.path.normpath(os.path.join(csv_dir, filename))
 
+def _qa_suffix(use_advanced_qa, qa_level):
+    """QA part of the output filenames (custom QA levels already include their full suffix)"""
+    if qa_level.startswith('cqa'):
+        return qa_level  # e.g. cqa1f015
+    return f"{'advanced_' if use_advanced_qa else 'basic_'}{qa_level}"
+
 def run_melt_season_analysis_williamson(start_year=2010, end_year=2024, scale=500, use_advanced_qa=False, qa_level='standard', custom_qa_config=None, progress_callback=None):
     """
     Complete melt season analysis workflow following Williamson & Menounos (2021)
@@ -109,316 +125,466 @@ def run_melt_season_analysis_williamson(start_year=2010, end_year=2024, scale=50
         scale: Spatial resolution in meters
         use_advanced_qa: Whether to use advanced Algorithm QA flags filtering
         qa_level: Quality level ('strict', 'standard', 'relaxed')
-        progress_callback: Function to call with progress updates (progress, message)
+        progress_callback: Function to call with progress updates (progress, message),
+                           progress measured from the work done (see utils/run_timing.py)
     
     Returns:
-        dict: Complete analysis results
+        dict: Complete analysis results, with the timing record as 'run_record'
     """
-    def update_progress(progress, message):
-        """Helper function to update progress"""
-        print(f"📊 Progress {progress}%: {message}")
-        if progress_callback:
-            try:
-                progress_callback(progress, message)
-            except Exception as e:
-                print(f"Warning: Progress callback failed: {e}")
-    
-    update_progress(0, "Initializing analysis...")
-    
-    print("🏔️  ATHABASCA GLACIER MELT SEASON ALBEDO ANALYSIS")
-    print("=" * 80)
-    print(f"📊 Using Williamson & Menounos (2021) methodology")
-    print(f"🗓️  Period: {start_year}-{end_year}")
-    print(f"📏 Resolution: {scale}m")
-    print(f"🎯 Focus: June-September (melt season)")
-    if use_advanced_qa:
-        print(f"⚙️  Advanced QA: {qa_level} filtering with Algorithm flags")
-    else:
-        print(f"⚙️  Standard QA: Basic filtering only")
-    
-    update_progress(5, "Setting up safe file operations...")
-    
-    # Note: Removed dangerous monkey patching that caused infinite recursion
-    print("🔧 Using direct safe CSV writing (no monkey patching)")
-    
-    update_progress(10, "Initializing Earth Engine...")
-    
-    # Initialize Earth Engine
-    ee.Initialize()
-    
-    # Extract melt season data with optional advanced QA
-    update_progress(15, "Starting data extraction...")
-    print(f"\n⏳ Extracting MODIS albedo data year by year...")
-    print(f"🔄 This ensures manageable memory usage for long time series")
-    
-    df = extract_melt_season_data_yearly(
-        start_year=start_year, 
-        end_year=end_year, 
-        scale=scale,
-        use_advanced_qa=use_advanced_qa,
-        qa_level=qa_level,
-        custom_qa_config=custom_qa_config
-    )
-    
-    update_progress(60, "Data extraction completed, validating...")
-    
-    # Check memory usage and data size
-    import psutil
-    import sys
-    
-    try:
-        process = psutil.Process()
-        memory_mb = process.memory_info().rss / 1024 / 1024
-        print(f"🔍 Memory usage: {memory_mb:.1f} MB")
-        print(f"🔍 DataFrame shape: {df.shape}")
-        print(f"🔍 DataFrame memory: {df.memory_usage(deep=True).sum() / 1024 / 1024:.1f} MB")
-        
-        if memory_mb > 1000:  # More than 1GB
-            print("⚠️ HIGH MEMORY USAGE - This might cause crashes!")
-            
-    except Exception as e:
-        print(f"Memory check failed: {e}")
-    
-    if df.empty:
-        print("❌ No data extracted. Check your date range and region.")
-        update_progress(0, "No data extracted - check parameters")
-        return None
-    
-    # Export raw data with error handling
-    try:
-        update_progress(65, "Exporting raw data...")
+    with WorkflowRun(
+        'melt_season',
+        plan={'initialization': 1, 'extraction': end_year - start_year + 1, 'export': 1,
+              'trend_analysis': 1, 'plotting': 1, 'summary_export': 1, 'report': 1},
+        parameters={'start_year': start_year, 'end_year': end_year, 'scale': scale,
+                    'use_advanced_qa': use_advanced_qa, 'qa_level': qa_level},
+        progress_callback=progress_callback
+    ) as run:
+        run.phase('initialization', "Initializing analysis...")
         
-        # Create QA-specific filename
-        # Handle custom QA configurations that already include their full suffix
-        if qa_level.startswith('cqa'):
-            qa_suffix = qa_level  # Custom QA level already has full suffix (e.g., cqa1f015)
+        print("🏔️  ATHABASCA GLACIER MELT SEASON ALBEDO ANALYSIS")
+        print("=" * 80)
+        print(f"📊 Using Williamson & Menounos (2021) methodology")
+        print(f"🗓️  Period: {start_year}-{end_year}")
+        print(f"📏 Resolution: {scale}m")
+        print(f"🎯 Focus: June-September (melt season)")
+        if use_advanced_qa:
+            print(f"⚙️  Advanced QA: {qa_level} filtering with Algorithm flags")
         else:
-            qa_suffix = f"{'advanced_' if use_advanced_qa else 'basic_'}{qa_level}"
+            print(f"⚙️  Standard QA: Basic filtering only")
         
-        data_filename = f'MOD10A1_data_{qa_suffix}.csv'
+        # Note: Removed dangerous monkey patching that caused infinite recursion
+        print("🔧 Using direct safe CSV writing (no monkey patching)")
         
-        print(f"🔍 About to get output path...")
-        csv_path = get_safe_output_path(data_filename)
-        print(f"🔍 Got path: {csv_path}")
-        print(f"🔍 About to write CSV...")
+        # Initialize Earth Engine
+        ee.Initialize()
         
-        # Add QA metadata columns to the dataframe
-        df_with_qa = df.copy()
-        df_with_qa['qa_advanced'] = use_advanced_qa
-        df_with_qa['qa_level'] = qa_level
-        df_with_qa['qa_description'] = f"{'Advanced' if use_advanced_qa else 'Basic'} QA, {qa_level} level"
+        # Extract melt season data with optional advanced QA
+        run.phase('extraction', "Starting data extraction...")
+        print(f"\n⏳ Extracting MODIS albedo data year by year...")
+        print(f"🔄 This ensures manageable memory usage for long time series")
+        
+        df = extract_melt_season_data_yearly(
+            start_year=start_year, 
+            end_year=end_year, 
+            scale=scale,
+            use_advanced_qa=use_advanced_qa,
+            qa_level=qa_level,
+            custom_qa_config=custom_qa_config
+        )
         
-        # Flush stdout before potentially hanging operation
+        run.current.set(rows=len(df))
+        
+        # Check memory usage and data size
+        import psutil
         import sys
-        sys.stdout.flush()
         
-        success = safe_csv_write(df_with_qa, csv_path, index=False)
-        print(f"🔍 CSV write returned: {success}")
+        try:
+            process = psutil.Process()
+            memory_mb = process.memory_info().rss / 1024 / 1024
+            print(f"🔍 Memory usage: {memory_mb:.1f} MB")
+            print(f"🔍 DataFrame shape: {df.shape}")
+            print(f"🔍 DataFrame memory: {df.memory_usage(deep=True).sum() / 1024 / 1024:.1f} MB")
+            
+            if memory_mb > 1000:  # More than 1GB
+                print("⚠️ HIGH MEMORY USAGE - This might cause crashes!")
+                
+        except Exception as e:
+            print(f"Memory check failed: {e}")
         
-        if success:
-            print(f"\n💾 Raw data exported: {csv_path}")
-            print(f"📋 QA Settings: {'Advanced' if use_advanced_qa else 'Basic'} QA, {qa_level} level")
-        else:
-            print(f"\n⚠️ Warning: Could not export raw data to {csv_path}")
+        if df.empty:
+            print("❌ No data extracted. Check your date range and region.")
+            run.finish('failed', "No data extracted - check parameters")
+            return None
+        
+        # Export raw data with error handling
+        try:
+            run.phase('export', "Exporting raw data...")
             
-    except Exception as e:
-        print(f"❌ Error during raw data export: {e}")
-        import traceback
-        traceback.print_exc()
-        update_progress(0, f"Raw data export failed: {e}")
-        return {'error': f'Raw data export failed: {e}', 'success': False}
-    
-    # Perform comprehensive analysis with error handling
-    try:
-        update_progress(70, "Performing trend analysis...")
-        print(f"\n🔍 Performing comprehensive trend analysis...")
+            # Create QA-specific filename
+            qa_suffix = _qa_suffix(use_advanced_qa, qa_level)
+            
+            data_filename = f'MOD10A1_data_{qa_suffix}.csv'
+            
+            # Add QA metadata columns to the dataframe (stored once in the file metadata)
+            df_with_qa = df.copy()
+            df_with_qa['qa_advanced'] = use_advanced_qa
+            df_with_qa['qa_level'] = qa_level
+            df_with_qa['qa_description'] = f"{'Advanced' if use_advanced_qa else 'Basic'} QA, {qa_level} level"
+            
+            data_path = write_output(df_with_qa, get_safe_output_path(data_filename),
+                                     metadata={'period': f"{start_year}-{end_year}", 'scale': scale})
+            run.current.set(rows=len(df_with_qa))
+            print(f"\n💾 Raw data exported: {data_path}")
+            print(f"📋 QA Settings: {'Advanced' if use_advanced_qa else 'Basic'} QA, {qa_level} level")
+                
+        except Exception as e:
+            print(f"❌ Error during raw data export: {e}")
+            import traceback
+            traceback.print_exc()
+            run.finish('failed', f"Raw data export failed: {e}")
+            return {'error': f'Raw data export failed: {e}', 'success': False}
         
-        # Import the analysis function safely
+        # Perform comprehensive analysis with error handling
         try:
-            from analysis.temporal import analyze_melt_season_trends
-        except ImportError as e:
-            print(f"❌ Could not import analysis function: {e}")
-            update_progress(0, f"Import error: {e}")
-            return {'error': f'Analysis import failed: {e}', 'success': False}
-        
-        results = analyze_melt_season_trends(df)
-        
-        if not results or not results.get('annual_trends'):
-            print("❌ Trend analysis failed.")
-            update_progress(0, "Trend analysis failed")
-            return {'error': 'Trend analysis returned no results', 'success': False}
+            run.phase('trend_analysis', "Performing trend analysis...", input_rows=len(df))
+            print(f"\n🔍 Performing comprehensive trend analysis...")
             
-    except Exception as e:
-        print(f"❌ Error during trend analysis: {e}")
-        import traceback
-        traceback.print_exc()
-        update_progress(0, f"Trend analysis failed: {e}")
-        return {'error': f'Trend analysis failed: {e}', 'success': False}
-    
-    # Create visualization with error handling
-    try:
-        update_progress(80, "Creating visualization...")
-        from paths import get_figure_path
-        figure_path = get_figure_path('athabasca_melt_season_analysis.png', 'melt_season')
+            # Import the analysis function safely
+            try:
+                from analysis.trend_state import update_trend_state
+            except ImportError as e:
+                print(f"❌ Could not import analysis function: {e}")
+                run.finish('failed', f"Import error: {e}")
+                return {'error': f'Analysis import failed: {e}', 'success': False}
+            
+            # Incremental trend state: only seasons missing from the saved state
+            # (or with new rows) are aggregated, results come from the state
+            trend_state_path = get_safe_output_path(f'MOD10A1_trend_state_{qa_suffix}.json')
+            trend_state = update_trend_state(df, trend_state_path)
+            results = trend_state.results()
+            
+            summary = results.get('summary_stats') or {}
+            if summary:
+                print(f"📊 Period {summary['period']}: {summary['n_observations']} observations, "
+                      f"mean albedo {summary['mean_albedo']:.3f} ± {summary['std_albedo']:.3f}")
+            
+            if not results or not results.get('annual_trends'):
+                print("❌ Trend analysis failed.")
+                run.finish('failed', "Trend analysis failed")
+                return {'error': 'Trend analysis returned no results', 'success': False}
+                
+        except Exception as e:
+            print(f"❌ Error during trend analysis: {e}")
+            import traceback
+            traceback.print_exc()
+            run.finish('failed', f"Trend analysis failed: {e}")
+            return {'error': f'Trend analysis failed: {e}', 'success': False}
         
-        # Import visualization function safely
+        # Create visualization with error handling
         try:
-            from visualization.plots import create_melt_season_plot
-        except ImportError as e:
-            print(f"❌ Could not import visualization function: {e}")
-            # Continue without visualization rather than crashing
+            run.phase('plotting', "Creating visualization...")
+            from paths import get_figure_path
+            figure_path = get_figure_path('athabasca_melt_season_analysis.png', 'melt_season')
+            
+            # Import visualization function safely
+            try:
+                from visualization.plots import create_melt_season_plot
+            except ImportError as e:
+                print(f"❌ Could not import visualization function: {e}")
+                # Continue without visualization rather than crashing
+                figure_path = None
+            
+            if figure_path:
+                create_melt_season_plot(
+                    results['annual_trends'], 
+                    results['monthly_trends'], 
+                    df, 
+                    str(figure_path)
+                )
+                print(f"📊 Visualization created: {figure_path}")
+            else:
+                print("⚠️ Skipping visualization due to import error")
+                
+        except Exception as e:
+            print(f"❌ Error during visualization: {e}")
+            print("⚠️ Continuing without visualization...")
             figure_path = None
         
-        if figure_path:
-            create_melt_season_plot(
-                results['annual_trends'], 
-                results['monthly_trends'], 
-                df, 
-                str(figure_path)
-            )
-            print(f"📊 Visualization created: {figure_path}")
-        else:
-            print("⚠️ Skipping visualization due to import error")
+        # Export results summary with error handling
+        try:
+            run.phase('summary_export', "Preparing results summary...")
+            # Create summary dataframe
+            summary_data = []
             
-    except Exception as e:
-        print(f"❌ Error during visualization: {e}")
-        print("⚠️ Continuing without visualization...")
-        figure_path = None
-    
-    # Export results summary with error handling
-    try:
-        update_progress(85, "Preparing results summary...")
-        # Create summary dataframe
-        summary_data = []
-        
-        # Annual trend
-        if results.get('annual_trends'):
-            annual = results['annual_trends']
-            summary_data.append({
-                'analysis_type': 'Annual Melt Season',
-                'period': annual.get('period', 'Unknown'),
-                'trend': annual.get('mann_kendall', {}).get('trend', 'Unknown'),
-                'p_value': annual.get('mann_kendall', {}).get('p_value', 'Unknown'),
-                'sens_slope_per_year': annual.get('change_per_year', 'Unknown'),
-                'percent_change_per_year': annual.get('change_percent_per_year', 'Unknown'),
-                'total_change': annual.get('total_change', 'Unknown'),
-                'significance': annual.get('significance', 'Unknown'),
-                'qa_advanced': use_advanced_qa,
-                'qa_level': qa_level,
-                'qa_description': f"{'Advanced' if use_advanced_qa else 'Basic'} QA, {qa_level} level"
-            })
-        
-        # Monthly trends
-        if results.get('monthly_trends'):
-            for month, monthly in results['monthly_trends'].items():
+            # Annual trend
+            if results.get('annual_trends'):
+                annual = results['annual_trends']
                 summary_data.append({
-                    'analysis_type': f'{monthly.get("month_name", month)} Only',
-                    'period': monthly.get('period', 'Unknown'),
-                    'trend': monthly.get('mann_kendall', {}).get('trend', 'Unknown'),
-                    'p_value': monthly.get('mann_kendall', {}).get('p_value', 'Unknown'),
-                    'sens_slope_per_year': monthly.get('change_per_year', 'Unknown'),
-                    'percent_change_per_year': monthly.get('change_percent_per_year', 'Unknown'),
-                    'total_change': monthly.get('total_change', 'Unknown'),
-                    'significance': monthly.get('significance', 'Unknown'),
+                    'analysis_type': 'Annual Melt Season',
+                    'period': annual.get('period', 'Unknown'),
+                    'trend': annual.get('mann_kendall', {}).get('trend', 'Unknown'),
+                    'p_value': annual.get('mann_kendall', {}).get('p_value', 'Unknown'),
+                    'sens_slope_per_year': annual.get('change_per_year', 'Unknown'),
+                    'percent_change_per_year': annual.get('change_percent_per_year', 'Unknown'),
+                    'total_change': annual.get('total_change', 'Unknown'),
+                    'significance': annual.get('significance', 'Unknown'),
                     'qa_advanced': use_advanced_qa,
                     'qa_level': qa_level,
                     'qa_description': f"{'Advanced' if use_advanced_qa else 'Basic'} QA, {qa_level} level"
                 })
+            
+            # Monthly trends
+            if results.get('monthly_trends'):
+                for month, monthly in results['monthly_trends'].items():
+                    summary_data.append({
+                        'analysis_type': f'{monthly.get("month_name", month)} Only',
+                        'period': monthly.get('period', 'Unknown'),
+                        'trend': monthly.get('mann_kendall', {}).get('trend', 'Unknown'),
+                        'p_value': monthly.get('mann_kendall', {}).get('p_value', 'Unknown'),
+                        'sens_slope_per_year': monthly.get('change_per_year', 'Unknown'),
+                        'percent_change_per_year': monthly.get('change_percent_per_year', 'Unknown'),
+                        'total_change': monthly.get('total_change', 'Unknown'),
+                        'significance': monthly.get('significance', 'Unknown'),
+                        'qa_advanced': use_advanced_qa,
+                        'qa_level': qa_level,
+                        'qa_description': f"{'Advanced' if use_advanced_qa else 'Basic'} QA, {qa_level} level"
+                    })
+            
+            summary_df = pd.DataFrame(summary_data)
+            run.current.set(rows=len(summary_df))
+            
+            # Create QA-specific filename for results
+            results_filename = f'MOD10A1_results_{qa_suffix}.csv'
+            summary_path = write_output(summary_df, get_safe_output_path(results_filename))
+            print(f"💾 Results summary exported: {summary_path}")
+                
+        except Exception as e:
+            print(f"❌ Error during results summary: {e}")
+            print("⚠️ Continuing without results summary...")
+            summary_path = None
         
-        summary_df = pd.DataFrame(summary_data)
-        update_progress(90, "Exporting results summary...")
+        # Export change-point results next to the results summary
+        changepoint_path = None
+        try:
+            change_points = results.get('change_points') or {}
+            changepoint_frames = []
+            for series_type, cp_df in change_points.items():
+                if cp_df is not None and not cp_df.empty:
+                    cp_df = cp_df.copy()
+                    cp_df.insert(0, 'series_type', series_type)
+                    changepoint_frames.append(cp_df)
+            
+            if changepoint_frames:
+                changepoint_df = pd.concat(changepoint_frames, ignore_index=True)
+                changepoint_df['segmentation_change_points'] = changepoint_df['segmentation_change_points'].apply(
+                    lambda cps: ';'.join(map(str, cps))
+                )
+                changepoint_df['qa_level'] = qa_level
+                changepoint_path = get_safe_output_path(f'MOD10A1_changepoints_{qa_suffix}.csv')
+                if safe_csv_write(changepoint_df, changepoint_path, index=False):
+                    print(f"💾 Change-point results exported: {changepoint_path}")
+                else:
+                    print(f"⚠️ Warning: Could not export change-point results to {changepoint_path}")
+                    changepoint_path = None
+        except Exception as e:
+            print(f"❌ Error during change-point export: {e}")
+            changepoint_path = None
         
-        # Create QA-specific filename for results
-        results_filename = f'MOD10A1_results_{qa_suffix}.csv'
-        summary_path = get_safe_output_path(results_filename)
-        if safe_csv_write(summary_df, summary_path, index=False):
-            print(f"💾 Results summary exported: {summary_path}")
-        else:
-            print(f"⚠️ Warning: Could not export results summary to {summary_path}")
+        # Persist incremental trend state so the next season only aggregates new years
+        try:
+            trend_state.save(trend_state_path)
+            print(f"💾 Trend state saved: {trend_state_path}")
+        except Exception as e:
+            print(f"❌ Error saving trend state: {e}")
+            trend_state_path = None
+        
+        # Print key findings with error handling
+        try:
+            run.phase('report', "Finalizing analysis...")
+            print_key_findings(results)
+        except Exception as e:
+            print(f"❌ Error printing key findings: {e}")
+            print("⚠️ Skipping key findings display...")
+        
+        print(f"\n🎉 MELT SEASON ANALYSIS COMPLETE!")
+        print(f"Files generated:")
+        print(f"   📊 Visualization: {figure_path}")
+        print(f"   💾 Raw data: {data_path}")
+        print(f"   💾 Results summary: {summary_path}")
+        print(f"   💾 Change points: {changepoint_path}")
+        print(f"   💾 Trend state: {trend_state_path}")
+        
+        # Prepare comprehensive results for report with error handling
+        try:
+            comprehensive_results = {
+                'melt_season_data': df,
+                'overall_statistics': results.get('annual_trends'),
+                'monthly_statistics': results.get('monthly_trends'),
+                'fire_impact': results.get('fire_impact'),
+                'change_points': results.get('change_points'),
+                'dataset_info': {
+                    'total_observations': len(df),
+                    'years_analyzed': sorted(df['year'].unique()) if 'year' in df.columns else [],
+                    'period': f"{start_year}-{end_year}",
+                    'product': "MODIS MOD10A1/MYD10A1 Snow Albedo",
+                    'method': "Williamson & Menounos (2021) Melt Season Analysis",
+                    'quality_filtering': "QA ≤ 1 (Best + good quality)"
+                },
+                'success': True,
+                'files_generated': {
+                    'visualization': str(figure_path) if figure_path else None,
+                    'raw_data': str(data_path) if data_path else None,
+                    'results_summary': str(summary_path) if summary_path else None,
+                    'change_points': str(changepoint_path) if changepoint_path else None,
+                    'trend_state': str(trend_state_path) if trend_state_path else None
+                }
+            }
+        except Exception as e:
+            print(f"❌ Error preparing comprehensive results: {e}")
+            # Return minimal results
+            comprehensive_results = {
+                'success': True,
+                'error': None,
+                'dataset_info': {
+                    'total_observations': len(df) if 'df' in locals() else 0,
+                    'period': f"{start_year}-{end_year}",
+                    'method': "Williamson & Menounos (2021) Melt Season Analysis"
+                }
+            }
+        
+        # Generate automatic report with error handling
+        try:
+            from src.utils.report_generator import generate_analysis_report
+            from datetime import datetime
             
-    except Exception as e:
-        print(f"❌ Error during results summary: {e}")
-        print("⚠️ Continuing without results summary...")
-        summary_path = None
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            report_path = f"outputs/athabasca_melt_season_rapport_{timestamp}.txt"
+            
+            generate_analysis_report(
+                analysis_type='Melt_Season',
+                results_data=comprehensive_results,
+                output_path=report_path,
+                start_year=start_year,
+                end_year=end_year,
+                fire_years=results.get('fire_impact', {}).get('fire_years', []),
+                fire_significance=results.get('fire_impact', {}).get('p_value', 1.0)
+            )
+            
+        except Exception as e:
+            print(f"⚠️  Erreur génération rapport automatique: {e}")
+        
+        comprehensive_results['run_record'] = run.finish()
+        
+        print("🎯 Workflow completed without crashing!")
+        return comprehensive_results
+
+def run_multi_glacier_melt_season_analysis(start_year=2010, end_year=2024, glaciers=None, scale=500,
+                                           use_advanced_qa=False, qa_level='standard', custom_qa_config=None,
+                                           progress_callback=None):
+    """
+    Melt season albedo trends of several glaciers from one extraction pass
     
-    # Print key findings with error handling
-    try:
-        update_progress(95, "Finalizing analysis...")
-        print_key_findings(results)
-    except Exception as e:
-        print(f"❌ Error printing key findings: {e}")
-        print("⚠️ Skipping key findings display...")
+    Every glacier of the set (e.g. Athabasca, Saskatchewan, Dome from an
+    RGI-style GeoJSON) is reduced in the same Earth Engine requests; the
+    long table keyed by glacier_id and one trend row per glacier are exported.
     
-    print(f"\n🎉 MELT SEASON ANALYSIS COMPLETE!")
-    print(f"Files generated:")
-    print(f"   📊 Visualization: {figure_path}")
-    print(f"   💾 Raw data: {csv_path}")
-    print(f"   💾 Results summary: {summary_path}")
+    Args:
+        start_year: Start year for analysis
+        end_year: End year for analysis
+        glaciers: GlacierSet or path to an RGI-style GeoJSON/shapefile
+                  (None: ALBEDO_GLACIERS, or Athabasca only)
+        scale: Spatial resolution in meters
+        use_advanced_qa: Whether to use advanced Algorithm QA flags filtering
+        qa_level: Quality level ('strict', 'standard', 'relaxed')
+        custom_qa_config: Dict with custom QA configuration for custom qa_level
+        progress_callback: Function to call with progress updates (progress, message)
     
-    # Prepare comprehensive results for report with error handling
+    Returns:
+        dict: Glacier data and trends, with the timing record as 'run_record'
+    """
     try:
-        comprehensive_results = {
-            'melt_season_data': df,
-            'overall_statistics': results.get('annual_trends'),
-            'monthly_statistics': results.get('monthly_trends'),
-            'fire_impact': results.get('fire_impact'),
+        from glacier_roi import get_glacier_set
+        from analysis.temporal import analyze_glacier_trends
+    except ImportError:
+        from src.glacier_roi import get_glacier_set
+        from src.analysis.temporal import analyze_glacier_trends
+    
+    glacier_set = get_glacier_set(glaciers)
+    with WorkflowRun(
+        'melt_season_glaciers',
+        plan={'initialization': 1, 'extraction': end_year - start_year + 1, 'export': 1,
+              'trend_analysis': 1, 'summary_export': 1},
+        parameters={'start_year': start_year, 'end_year': end_year, 'scale': scale,
+                    'use_advanced_qa': use_advanced_qa, 'qa_level': qa_level,
+                    'glaciers': glacier_set.path or 'athabasca'},
+        progress_callback=progress_callback
+    ) as run:
+        run.phase('initialization', "Loading glacier outlines...", glaciers=len(glacier_set))
+        
+        print("🏔️  MULTI-GLACIER MELT SEASON ALBEDO ANALYSIS")
+        print("=" * 80)
+        print(f"🧊 Glaciers: {len(glacier_set)} ({', '.join(glacier_set.names.values())})")
+        print(f"🗓️  Period: {start_year}-{end_year}")
+        print(f"📏 Resolution: {scale}m")
+        
+        ee.Initialize()
+        
+        run.phase('extraction', "Extracting all glaciers...")
+        df = extract_melt_season_data_yearly(
+            start_year=start_year,
+            end_year=end_year,
+            scale=scale,
+            use_advanced_qa=use_advanced_qa,
+            qa_level=qa_level,
+            custom_qa_config=custom_qa_config,
+            glaciers=glacier_set
+        )
+        run.current.set(rows=len(df))
+        
+        if df.empty:
+            print("❌ No data extracted. Check your date range and glacier outlines.")
+            run.finish('failed', "No data extracted - check parameters")
+            return None
+        
+        qa_suffix = _qa_suffix(use_advanced_qa, qa_level)
+        qa_description = f"{'Advanced' if use_advanced_qa else 'Basic'} QA, {qa_level} level"
+        
+        run.phase('export', "Exporting glacier data...").set(rows=len(df))
+        df_with_qa = df.copy()
+        df_with_qa['qa_advanced'] = use_advanced_qa
+        df_with_qa['qa_level'] = qa_level
+        df_with_qa['qa_description'] = qa_description
+        data_path = write_output(df_with_qa, get_safe_output_path(f'MOD10A1_glaciers_data_{qa_suffix}.csv'),
+                                 metadata={'period': f"{start_year}-{end_year}", 'scale': scale,
+                                           'glaciers': glacier_set.ids})
+        print(f"\n💾 Glacier data exported: {data_path}")
+        
+        run.phase('trend_analysis', "Analyzing trends by glacier...", input_rows=len(df))
+        glacier_trends = analyze_glacier_trends(df)
+        
+        run.phase('summary_export', "Exporting glacier trends...")
+        summary_df = pd.DataFrame([{
+            'glacier_id': glacier_id,
+            'glacier_name': trends['glacier_name'],
+            'period': trends['period'],
+            'n_years': trends['n_years'],
+            'trend': trends['mann_kendall']['trend'],
+            'p_value': trends['mann_kendall']['p_value'],
+            'sens_slope_per_year': trends['change_per_year'],
+            'percent_change_per_year': trends['change_percent_per_year'],
+            'total_change': trends['total_change'],
+            'significance': trends['significance'],
+            'qa_level': qa_level
+        } for glacier_id, trends in glacier_trends.items()])
+        summary_path = None
+        if not summary_df.empty:
+            summary_path = write_output(summary_df, get_safe_output_path(f'MOD10A1_glaciers_results_{qa_suffix}.csv'))
+            run.current.set(rows=len(summary_df))
+            print(f"💾 Glacier trends exported: {summary_path}")
+        
+        print(f"\n🎉 MULTI-GLACIER ANALYSIS COMPLETE!")
+        print(f"   💾 Glacier data: {data_path}")
+        print(f"   💾 Glacier trends: {summary_path}")
+        
+        return {
+            'glacier_data': df,
+            'glacier_trends': glacier_trends,
             'dataset_info': {
                 'total_observations': len(df),
-                'years_analyzed': sorted(df['year'].unique()) if 'year' in df.columns else [],
+                'glaciers': glacier_set.ids,
+                'glaciers_with_trends': len(glacier_trends),
+                'years_analyzed': sorted(df['year'].unique()),
                 'period': f"{start_year}-{end_year}",
                 'product': "MODIS MOD10A1/MYD10A1 Snow Albedo",
-                'method': "Williamson & Menounos (2021) Melt Season Analysis",
-                'quality_filtering': "QA ≤ 1 (Best + good quality)"
+                'quality_filtering': qa_description
             },
             'success': True,
             'files_generated': {
-                'visualization': str(figure_path) if figure_path else None,
-                'raw_data': str(csv_path) if csv_path else None,
+                'raw_data': str(data_path),
                 'results_summary': str(summary_path) if summary_path else None
-            }
-        }
-    except Exception as e:
-        print(f"❌ Error preparing comprehensive results: {e}")
-        # Return minimal results
-        comprehensive_results = {
-            'success': True,
-            'error': None,
-            'dataset_info': {
-                'total_observations': len(df) if 'df' in locals() else 0,
-                'period': f"{start_year}-{end_year}",
-                'method': "Williamson & Menounos (2021) Melt Season Analysis"
-            }
+            },
+            'run_record': run.finish()
         }
-    
-    # Generate automatic report with error handling
-    try:
-        from src.utils.report_generator import generate_analysis_report
-        from datetime import datetime
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_path = f"outputs/athabasca_melt_season_rapport_{timestamp}.txt"
-        
-        generate_analysis_report(
-            analysis_type='Melt_Season',
-            results_data=comprehensive_results,
-            output_path=report_path,
-            start_year=start_year,
-            end_year=end_year,
-            fire_years=results.get('fire_impact', {}).get('fire_years', []),
-            fire_significance=results.get('fire_impact', {}).get('p_value', 1.0)
-        )
-        
-    except Exception as e:
-        print(f"⚠️  Erreur génération rapport automatique: {e}")
-    
-    # Final progress update with error handling
-    try:
-        update_progress(100, "Analysis completed successfully!")
-    except Exception as e:
-        print(f"⚠️ Progress callback error: {e}")
-    
-    print("🎯 Workflow completed without crashing!")
-    return comprehensive_results
 
 def print_key_findings(results):
     """Print key findings from the analysis"""
@@ -447,6 +613,15 @@ def print_key_findings(results):
             for month, data in significant_months:
                 print(f"   {data['month_name']}: {data['change_percent_per_year']:.2f}%/year (p={data['mann_kendall']['p_value']:.3f})")
     
+    # Regime shift (Pettitt change point on annual means)
+    annual_cp = (results.get('change_points') or {}).get('annual')
+    if annual_cp is not None and not annual_cp.empty and annual_cp.iloc[0]['significant']:
+        cp = annual_cp.iloc[0]
+        print(f"\n🔀 REGIME SHIFT:")
+        print(f"   Change point: after {cp['change_point']}")
+        print(f"   Albedo before/after: {cp['mean_before']:.3f} → {cp['mean_after']:.3f}")
+        print(f"   Statistical significance: YES (p={cp['p_value']:.3f})")
+    
     # Fire impact
     if results['fire_impact'] and results['fire_impact']['significant']:
         fire = results['fire_impact']
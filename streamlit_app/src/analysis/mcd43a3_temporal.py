@@ -13,18 +13,22 @@ from datetime import datetime, timedelta
 
 def extract_mcd43a3_time_series_realtime(start_date, end_date, qa_level='standard', 
                                         band_selection='shortwave', diffuse_fraction=0.2, 
-                                        max_observations=200):
+                                        max_observations=None):
     """
     Extract MCD43A3 time series with real-time Earth Engine processing
-    Adapted from realtime_qa_dashboard.py for MCD43A3 temporal analysis
+    
+    Every MCD43A3 image in the melt season is reduced over the glacier
+    server-side, one melt season per request, giving the full daily series.
+    Extracted seasons are kept on disk so interrupted or repeated extractions
+    resume where they stopped.
     
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)  
-        qa_level: Quality filtering level ('strict' or 'standard')
+        qa_level: Quality filtering level ('strict', 'standard' or 'relaxed')
         band_selection: Spectral band ('shortwave', 'vis', 'nir')
         diffuse_fraction: Atmospheric diffuse fraction (0.0-1.0)
-        max_observations: Maximum number of observations to extract
+        max_observations: Unused, kept for compatibility (the full series is returned)
         
     Returns:
         DataFrame with temporal MCD43A3 data
@@ -38,8 +42,9 @@ def extract_mcd43a3_time_series_realtime(start_date, end_date, qa_level='standar
     
     try:
         from ..utils.ee_utils import initialize_earth_engine, get_roi_from_geojson
-        from ..utils.earth_engine.modis_extraction import get_modis_pixels_for_date
-        import ee
+        from ..utils.earth_engine.mcd43a3_series import (
+            QA_LEVEL_THRESHOLDS, SeriesStore, fetch_season_series, melt_season_chunks
+        )
         
         # Initialize Earth Engine
         ee_available = initialize_earth_engine()
@@ -55,319 +60,80 @@ def extract_mcd43a3_time_series_realtime(start_date, end_date, qa_level='standar
             
         athabasca_roi = get_roi_from_geojson(glacier_geojson)
         
-        # Generate date range focused on melt season
-        start_dt = pd.to_datetime(start_date)
-        end_dt = pd.to_datetime(end_date)
-        
-        # Process year by year for multi-year extractions to avoid timeouts
-        years_span = end_dt.year - start_dt.year + 1
-        
-        if years_span > 5:  # For extractions longer than 5 years, process year by year
-            st.info(f"📅 Multi-year extraction detected ({years_span} years). Processing year by year to avoid timeouts...")
-            
-            # Generate dates year by year for melt seasons only
-            all_dates = []
-            for year in range(start_dt.year, end_dt.year + 1):
-                # Melt season for this year (June 1 - September 30)
-                year_start = max(start_dt, pd.Timestamp(year, 6, 1))
-                year_end = min(end_dt, pd.Timestamp(year, 9, 30))
-                
-                if year_start <= year_end:
-                    # Generate dates for this year's melt season with 8-day sampling
-                    year_dates = pd.date_range(year_start, year_end, freq='8D')
-                    year_dates = [d for d in year_dates if _validate_melt_season_date(d)]
-                    all_dates.extend(year_dates)
-                    print(f"📅 Year {year}: {len(year_dates)} dates generated for melt season")
-            
-            date_range = all_dates
-            
-        else:
-            # For shorter extractions, use standard approach
-            # For MCD43A3, use more frequent sampling during melt season
-            # 16-day cycle is too sparse for melt season analysis, use 8-day sampling
-            date_range = pd.date_range(start_dt, end_dt, freq='8D')  # 8-day sampling for better temporal resolution
-            
-            # CRITICAL: Filter to ensure dates stay within melt season bounds
-            # This prevents extraction beyond September 30th
-            date_range = [d for d in date_range if d <= end_dt]
-            
-            # Additional safety: enforce melt season bounds using validated function
-            date_range = _filter_dates_to_melt_season(date_range)
-        
-        st.info(f"📅 Total melt season dates: {len(date_range)} from {date_range[0].strftime('%Y-%m-%d')} to {date_range[-1].strftime('%Y-%m-%d')}" if date_range else "📅 No dates in melt season range")
-        
-        # Limit observations for performance and reliability with better distribution
-        if len(date_range) > max_observations:
-            # For multi-year data, ensure we sample from each year proportionally
-            if years_span > 1:
-                # Sample proportionally from each year
-                years = list(range(start_dt.year, end_dt.year + 1))
-                samples_per_year = max(1, max_observations // len(years))
-                
-                sampled_dates = []
-                for year in years:
-                    year_dates = [d for d in date_range if d.year == year]
-                    if year_dates:
-                        # Sample evenly from this year
-                        step = max(1, len(year_dates) // samples_per_year)
-                        year_sample = year_dates[::step][:samples_per_year]
-                        sampled_dates.extend(year_sample)
-                
-                date_range = sampled_dates[:max_observations]
-                st.info(f"📊 Sampling strategy: ~{samples_per_year} dates per year, {len(date_range)} total dates selected")
-            else:
-                # Single year - simple sampling
-                step = len(date_range) // max_observations
-                date_range = date_range[::step][:max_observations]
-        
-        # Debug information about date range generation
-        print(f"🔍 DEBUG: Date range generation:")
-        print(f"   Start date: {start_date} -> {start_dt}")
-        print(f"   End date: {end_date} -> {end_dt}")
-        print(f"   Generated {len(date_range)} dates")
-        if date_range:
-            print(f"   First date: {date_range[0].strftime('%Y-%m-%d')}")
-            print(f"   Last date: {date_range[-1].strftime('%Y-%m-%d')}")
-        
-        # Check for existing partial data in session state for resumption
-        session_key = f"mcd43a3_extraction_{start_date}_{end_date}_{qa_level}_{band_selection}"
-        if session_key in st.session_state:
-            existing_data = st.session_state[session_key]
-            
-            # Filter existing data to only include melt season dates
-            valid_existing_data = []
-            for item in existing_data:
-                if _validate_melt_season_date(item['date']):
-                    valid_existing_data.append(item)
-            
-            if len(valid_existing_data) != len(existing_data):
-                removed_count = len(existing_data) - len(valid_existing_data)
-                print(f"🧹 Cleaned {removed_count} non-melt-season dates from session cache")
-                st.session_state[session_key] = valid_existing_data
-            
-            existing_dates = [pd.to_datetime(d['date']) for d in valid_existing_data]
-            # Only process dates not already extracted
-            date_range = [d for d in date_range if d not in existing_dates]
-            st.info(f"🔄 Resuming extraction: {len(valid_existing_data)} dates already completed, {len(date_range)} remaining")
-            existing_data = valid_existing_data
-        else:
-            existing_data = []
-        
-        # Configure QA parameters with safe mapping
-        qa_mapping = {
-            'strict': 0,
-            'standard': 1,
-            'relaxed': 2
-        }
-        qa_threshold = qa_mapping.get(qa_level, 1)  # Default to standard if unknown
+        # One chunk (request) per melt season
+        chunks = melt_season_chunks(start_date, end_date)
+        if not chunks:
+            st.warning("📅 No dates in melt season range")
+            return pd.DataFrame()
         
-        # Provide feedback on QA selection
+        qa_threshold = QA_LEVEL_THRESHOLDS.get(qa_level, 1)  # Default to standard if unknown
         st.info(f"🔬 Using QA threshold: {qa_threshold} (level: {qa_level})")
         
-        # Extract data with progress tracking and robustness improvements
-        extracted_data = []
+        # Resume from the persistent store
+        store = SeriesStore(qa_level, band_selection, diffuse_fraction)
+        pending = [chunk for chunk in chunks if not store.is_complete(chunk[1], chunk[2])]
+        if len(pending) < len(chunks):
+            st.info(f"🔄 Resuming extraction: {len(chunks) - len(pending)} melt seasons already stored, {len(pending)} remaining")
+        
         progress_bar = st.progress(0)
         status_container = st.empty()
+        failed_years = []
         
-        st.info(f"🔍 Extracting MCD43A3 data for {len(date_range)} dates...")
+        for i, (year, chunk_start, chunk_end) in enumerate(pending):
+            status_container.info(f"📊 Extracting melt season {year} ({i + 1}/{len(pending)})")
+            try:
+                rows = fetch_season_series(
+                    chunk_start, chunk_end, athabasca_roi, qa_threshold=qa_threshold,
+                    band_selection=band_selection, diffuse_fraction=diffuse_fraction
+                )
+                store.add_chunk(chunk_start, chunk_end, rows)
+                print(f"✅ Extracted {len(rows)} daily observations for {year}")
+            except Exception as e:
+                print(f"ERROR: Failed to extract melt season {year}: {e}")
+                failed_years.append(year)
+            progress_bar.progress((i + 1) / len(pending))
         
-        # Process in smaller batches to avoid timeouts with enhanced robustness
-        # Adjust batch size based on extraction span
-        if years_span > 10:
-            batch_size = 5   # Very small batches for 10+ year extractions
-            pause_time = 2   # Longer pauses
-        elif years_span > 5:
-            batch_size = 10  # Small batches for 5+ year extractions  
-            pause_time = 1.5
-        else:
-            batch_size = 20  # Standard batches for shorter extractions
-            pause_time = 1
-            
-        total_processed = 0
-        failed_dates = []
-        consecutive_failures = 0
-        max_consecutive_failures = 10  # Stop if too many consecutive failures
+        progress_bar.empty()
+        status_container.empty()
         
-        st.info(f"🔧 Using batch size: {batch_size}, pause time: {pause_time}s for {years_span}-year extraction")
+        start_str = pd.to_datetime(start_date).strftime('%Y-%m-%d')
+        end_str = pd.to_datetime(end_date).strftime('%Y-%m-%d')
+        extracted_data = store.series(start_str, end_str)
         
-        for batch_start in range(0, len(date_range), batch_size):
-            batch_end = min(batch_start + batch_size, len(date_range))
-            batch_dates = date_range[batch_start:batch_end]
-            batch_num = batch_start // batch_size + 1
-            total_batches = (len(date_range) - 1) // batch_size + 1
-            
-            status_container.info(f"📊 Processing batch {batch_num}/{total_batches} (Years: {batch_dates[0].year}-{batch_dates[-1].year})")
-            
-            batch_successes = 0
-            
-            for i, date in enumerate(batch_dates):
-                date_str = date.strftime('%Y-%m-%d')
-                global_index = batch_start + i
-                
-                try:
-                    # Extract pixels for this date with timeout handling
-                    modis_pixels = get_modis_pixels_for_date(
-                        date_str, athabasca_roi, product='MCD43A3', 
-                        qa_threshold=qa_threshold, selected_band=band_selection,
-                        diffuse_fraction=diffuse_fraction, silent=True
-                    )
-                    
-                    if modis_pixels and 'features' in modis_pixels:
-                        # Extract albedo values from pixels
-                        albedo_values = []
-                        for feature in modis_pixels['features']:
-                            if 'properties' in feature and 'albedo_value' in feature['properties']:
-                                albedo_value = feature['properties']['albedo_value']
-                                if albedo_value is not None and 0 <= albedo_value <= 1:
-                                    albedo_values.append(albedo_value)
-                        
-                        if albedo_values:
-                            # Calculate statistics
-                            mean_albedo = sum(albedo_values) / len(albedo_values)
-                            std_albedo = pd.Series(albedo_values).std()
-                            
-                            extracted_data.append({
-                                'date': date_str,
-                                'albedo_mean': mean_albedo,
-                                'albedo_std': std_albedo,
-                                'pixel_count': len(albedo_values),
-                                'band_type': band_selection,
-                                'diffuse_fraction': diffuse_fraction,
-                                'qa_level': qa_level
-                            })
-                            
-                            print(f"✅ Successfully extracted {len(albedo_values)} pixels for {date_str}")
-                            batch_successes += 1
-                            consecutive_failures = 0  # Reset failure counter
-                        else:
-                            print(f"⚠️ No valid pixels found for {date_str}")
-                            consecutive_failures += 1
-                    else:
-                        print(f"❌ No MODIS data found for {date_str}")
-                        failed_dates.append(date_str)
-                        consecutive_failures += 1
-                    
-                    # Update progress
-                    total_processed += 1
-                    progress_bar.progress(total_processed / len(date_range))
-                    
-                    # Check for too many consecutive failures
-                    if consecutive_failures >= max_consecutive_failures:
-                        st.error(f"🚨 Stopping extraction: {consecutive_failures} consecutive failures detected. This may indicate a systematic issue.")
-                        break
-                    
-                except Exception as e:
-                    print(f"ERROR: Failed to extract data for {date_str}: {e}")
-                    failed_dates.append(date_str)
-                    consecutive_failures += 1
-                    
-                    # For multi-year extractions, be more forgiving of individual failures
-                    if consecutive_failures >= max_consecutive_failures:
-                        st.error(f"🚨 Stopping extraction: {consecutive_failures} consecutive failures detected.")
-                        break
-                    continue
-            
-            # Check if we should stop due to consecutive failures
-            if consecutive_failures >= max_consecutive_failures:
-                break
-            
-            # Save progress periodically for long extractions
-            if len(extracted_data) > 0 and batch_num % 10 == 0:  # Save every 10 batches
-                st.session_state[session_key] = existing_data + extracted_data
-                st.info(f"💾 Progress saved: {len(extracted_data)} new extractions completed")
-            
-            # Enhanced pause between batches with feedback
-            if batch_num < total_batches:  # Don't pause after last batch
-                print(f"⏸️ Batch {batch_num} completed ({batch_successes}/{len(batch_dates)} successful). Pausing {pause_time}s...")
-                import time
-                time.sleep(pause_time)
+        if not extracted_data:
+            st.error("❌ No data extracted for the specified period.")
+            if failed_years:
+                st.write("Failed melt seasons:", ", ".join(str(y) for y in failed_years))
+            return pd.DataFrame()
         
-        progress_bar.empty()
-        status_container.empty()
+        df = pd.DataFrame(extracted_data)
+        df['band_type'] = band_selection
+        df['diffuse_fraction'] = diffuse_fraction
+        df['qa_level'] = qa_level
+        df['date'] = pd.to_datetime(df['date'])
+        df['year'] = df['date'].dt.year
+        df['doy'] = df['date'].dt.dayofyear
+        df['month'] = df['date'].dt.month
         
-        # Combine existing data with newly extracted data
-        all_extracted_data = existing_data + extracted_data
+        st.success(f"✅ Extraction completed: {len(df)} daily observations")
         
-        # Save final progress to session state
-        if all_extracted_data:
-            st.session_state[session_key] = all_extracted_data
+        # Multi-year extraction summary
+        if df['year'].nunique() > 1:
+            year_counts = df['year'].value_counts().sort_index()
+            st.info(f"📅 **Multi-year breakdown**: {dict(year_counts)}")
         
-        # Final extraction report
-        new_extractions = len(extracted_data)
-        total_extractions = len(all_extracted_data)
-        total_attempted = len(date_range) + len(existing_data)
-        success_rate = (total_extractions / total_attempted) * 100 if total_attempted > 0 else 0
+        if failed_years:
+            st.warning(f"⚠️ Failed to extract {len(failed_years)} melt seasons: {', '.join(str(y) for y in failed_years)}. Run the extraction again to retry them.")
         
-        st.info(f"📊 Extraction session summary:")
-        st.info(f"   • New extractions: {new_extractions}")
-        st.info(f"   • Total extractions: {total_extractions}")
-        st.info(f"   • Success rate: {success_rate:.1f}%")
+        # Data summary
+        date_range_actual = f"{df['date'].min().strftime('%Y-%m-%d')} to {df['date'].max().strftime('%Y-%m-%d')}"
+        years_covered = sorted(df['year'].unique())
+        st.info(f"📊 **Data coverage**: {date_range_actual} ({len(years_covered)} years: {years_covered})")
         
-        if all_extracted_data:
-            # Final validation: filter all extracted data to ensure only melt season dates
-            valid_extracted_data = []
-            for item in all_extracted_data:
-                if _validate_melt_season_date(item['date']):
-                    valid_extracted_data.append(item)
-                else:
-                    print(f"⚠️ Removing non-melt-season date from results: {item['date']}")
-            
-            if len(valid_extracted_data) != len(all_extracted_data):
-                removed_final = len(all_extracted_data) - len(valid_extracted_data)
-                st.warning(f"🧹 Removed {removed_final} dates outside melt season from final results")
-            
-            if valid_extracted_data:
-                df = pd.DataFrame(valid_extracted_data)
-                df['date'] = pd.to_datetime(df['date'])
-                df['year'] = df['date'].dt.year
-                df['doy'] = df['date'].dt.dayofyear
-                df['month'] = df['date'].dt.month
-                
-                # Success summary
-                st.success(f"✅ Extraction completed: {len(valid_extracted_data)} total observations ({success_rate:.1f}% success rate)")
-                
-                # Multi-year extraction summary
-                if years_span > 1:
-                    year_counts = df['year'].value_counts().sort_index()
-                    st.info(f"📅 **Multi-year breakdown**: {dict(year_counts)}")
-                
-                if failed_dates:
-                    st.warning(f"⚠️ Failed to extract data for {len(failed_dates)} dates in this session")
-                    if len(failed_dates) <= 10:
-                        st.write("Failed dates:", ", ".join(failed_dates[:10]))
-                    else:
-                        st.write(f"Failed dates (first 10): {', '.join(failed_dates[:10])}... and {len(failed_dates)-10} more")
-                
-                # Data summary
-                date_range_actual = f"{df['date'].min().strftime('%Y-%m-%d')} to {df['date'].max().strftime('%Y-%m-%d')}"
-                years_covered = sorted(df['year'].unique())
-                st.info(f"📊 **Data coverage**: {date_range_actual} ({len(years_covered)} years: {years_covered})")
-                
-                # Verify all dates are in melt season
-                melt_season_count = sum(1 for d in df['date'] if _validate_melt_season_date(d))
-                st.success(f"✅ **Melt season validation**: {melt_season_count}/{len(df)} dates confirmed in melt season (June-September)")
-                
-                # Add extraction resumption information
-                if existing_data:
-                    st.info(f"🔄 **Resumption info**: {len(existing_data)} dates from previous sessions + {new_extractions} new extractions")
-                
-                # Add CSV download functionality
-                _add_csv_download_buttons(df, band_selection, qa_level, start_date, end_date)
-                
-                return df
-            else:
-                st.warning("📊 No valid melt season data extracted")
-                return pd.DataFrame()
-        else:
-            st.error(f"❌ No data extracted for the specified period. Failed on all {len(failed_dates)} attempted dates.")
-            if failed_dates:
-                st.write("Some failed dates:", ", ".join(failed_dates[:10]))
-            
-            # Show session resumption tip for multi-year extractions
-            if years_span > 5:
-                st.info(f"💡 **Tip for large extractions**: The system saves progress automatically. You can restart the extraction to resume from where it left off.")
-            
-            return pd.DataFrame()
+        # Add CSV download functionality
+        _add_csv_download_buttons(df, band_selection, qa_level, start_date, end_date)
+        
+        return df
             
     except Exception as e:
         st.error(f"Error in temporal extraction: {e}")
@@ -718,25 +484,9 @@ def _filter_dates_to_melt_season(date_list):
 
 
 def _load_glacier_boundary_for_temporal():
-    """Load glacier boundary for temporal analysis"""
-    import json
-    import os
-    
-    # Try different paths
-    paths = [
-        '../data/geospatial/masks/Athabasca_mask_2023_cut.geojson',
-        '../../data/geospatial/masks/Athabasca_mask_2023_cut.geojson',
-        'Athabasca_mask_2023_cut.geojson'
-    ]
-    
-    for path in paths:
-        try:
-            with open(path, 'r') as f:
-                return json.load(f)
-        except:
-            continue
-    
-    return None
+    """Load glacier boundary for temporal analysis (shared cached ROI provider)"""
+    from ..utils.ee_utils import load_glacier_geojson
+    return load_glacier_geojson()
 
 
 def create_comparative_analysis(df_mcd43a3, df_mod10a1=None):
@@ -222,14 +222,18 @@ def _handle_pixel_analysis(all_available_dates, selected_product, qa_threshold,
         )
     
         if use_pixel_analysis:
-            # Create unique key based on QA settings to detect changes
-            qa_key = f"{selected_product}_{qa_threshold}_{use_advanced_qa}_{hash(str(sorted(algorithm_flags.items())))}"
+            from src.utils.earth_engine.pixel_availability import build_qa_key, PixelAvailabilityIndex
+            
+            # Stable key based on QA settings (shared with the persistent availability index)
+            qa_key = build_qa_key(selected_product, qa_threshold, use_advanced_qa, algorithm_flags)
             
             # Check if QA settings have changed
             if 'previous_qa_key' not in st.session_state or st.session_state.previous_qa_key != qa_key:
-                st.session_state.pixel_analysis_data = None  # Clear old analysis
                 st.session_state.previous_qa_key = qa_key
-                st.info("⚠️ QA settings changed - analysis needs to be updated")
+                # Reuse counts from earlier sessions when available
+                st.session_state.pixel_analysis_data = PixelAvailabilityIndex().get(qa_key) or None
+                if st.session_state.pixel_analysis_data is None:
+                    st.info("⚠️ QA settings changed - analysis needs to be updated")
             
             analyze_pixels = st.button("Analyze Dates", key="analyze_pixels_btn")
             
@@ -252,7 +256,7 @@ def _handle_pixel_analysis(all_available_dates, selected_product, qa_threshold,
 def _perform_pixel_analysis(all_available_dates, selected_product, qa_threshold, use_advanced_qa=False, algorithm_flags={}):
     """Perform pixel count analysis for dates"""
     with st.spinner("Analyzing pixel counts for dates..."):
-        from src.utils.ee_utils import initialize_earth_engine, count_modis_pixels_for_date, get_roi_from_geojson
+        from src.utils.ee_utils import initialize_earth_engine, get_roi_from_geojson
         
         ee_available = initialize_earth_engine()
         
@@ -268,24 +272,19 @@ def _perform_pixel_analysis(all_available_dates, selected_product, qa_threshold,
                 if glacier_geojson:
                     athabasca_roi = get_roi_from_geojson(glacier_geojson)
                     
-                    # Sample dates for analysis
-                    sample_dates = _get_sample_dates(all_available_dates)
-                    
                     # Show analysis info
-                    st.info(f"🔍 Analyzing {len(sample_dates)} sample dates from {len(all_available_dates)} total available dates")
-                    
-                    pixel_analysis = {}
-                    progress_bar = st.progress(0)
+                    st.info(f"🔍 Analyzing all {len(all_available_dates)} available dates")
                     
-                    for i, date in enumerate(sample_dates):
-                        try:
-                            pixel_count = count_modis_pixels_for_date(date, athabasca_roi, selected_product, qa_threshold, use_advanced_qa, algorithm_flags)
-                            pixel_analysis[date] = pixel_count
-                            progress_bar.progress((i + 1) / len(sample_dates))
-                        except Exception:
-                            pixel_analysis[date] = 0
+                    # One batched request for every candidate date and QA threshold;
+                    # dates already in the availability index are not re-queried
+                    from src.utils.earth_engine.pixel_availability import analyze_pixel_availability, build_qa_key
+                    qa_thresholds = sorted({0, 1, 2, qa_threshold}) if selected_product != 'MCD43A3' else sorted({0, 1, qa_threshold})
+                    index = analyze_pixel_availability(
+                        all_available_dates, athabasca_roi, selected_product, qa_thresholds,
+                        use_advanced_qa, algorithm_flags
+                    )
                     
-                    progress_bar.empty()
+                    pixel_analysis = index.get(build_qa_key(selected_product, qa_threshold, use_advanced_qa, algorithm_flags))
                     st.session_state.pixel_analysis_data = pixel_analysis
                     
                     return _filter_dates_by_pixel_analysis(all_available_dates, pixel_analysis)
@@ -300,77 +299,9 @@ def _perform_pixel_analysis(all_available_dates, selected_product, qa_threshold,
 
 
 def _load_glacier_boundary():
-    """Load glacier boundary from shapefile (preferred) or GeoJSON file"""
-    import json
-    
-    # PRIORITY 1: Try to load from shapefile (most accurate)
-    shapefile_paths = [
-        '../data/geospatial/shapefiles/Masque_athabasca_2023_Arcgis.shp',  # New organized path
-        '../../data/geospatial/shapefiles/Masque_athabasca_2023_Arcgis.shp',  # Alternative organized path
-    ]
-    
-    for shp_path in shapefile_paths:
-        try:
-            import geopandas as gpd
-            
-            # Load shapefile with geopandas
-            gdf = gpd.read_file(shp_path)
-            
-            # Convert to WGS84 if needed
-            if gdf.crs and gdf.crs.to_epsg() != 4326:
-                gdf = gdf.to_crs(4326)
-            
-            # Convert to GeoJSON for compatibility
-            glacier_geojson = json.loads(gdf.to_json())
-            
-            return glacier_geojson
-            
-        except ImportError:
-            # Geopandas not available, continue to GeoJSON fallback
-            continue
-        except Exception:
-            # Shapefile loading failed, continue to GeoJSON fallback
-            continue
-    
-    # PRIORITY 2: Fallback to GeoJSON files
-    geojson_paths = [
-        '../data/geospatial/masks/Athabasca_mask_2023_cut.geojson',  # New organized path
-        '../../data/geospatial/masks/Athabasca_mask_2023_cut.geojson',  # Alternative organized path
-        '../Athabasca_mask_2023_cut.geojson',  # Legacy fallback
-        '../../Athabasca_mask_2023_cut.geojson',  # Legacy fallback
-        'Athabasca_mask_2023_cut.geojson'  # Same directory fallback
-    ]
-    
-    for path in geojson_paths:
-        try:
-            with open(path, 'r') as f:
-                return json.load(f)
-        except:
-            continue
-    
-    return None
-
-
-def _get_sample_dates(all_available_dates):
-    """Get sample dates for pixel analysis"""
-    # Group dates by year to ensure good coverage
-    dates_by_year = {}
-    for date in all_available_dates:
-        year = date[:4]  # Extract year (YYYY)
-        if year not in dates_by_year:
-            dates_by_year[year] = []
-        dates_by_year[year].append(date)
-    
-    # Sample dates from each year (5-10 dates per year)
-    sample_dates = []
-    for year, year_dates in dates_by_year.items():
-        # Take every Nth date to get good coverage, aim for 8 dates per year
-        step = max(1, len(year_dates) // 8)
-        year_sample = year_dates[::step][:10]  # Max 10 dates per year
-        sample_dates.extend(year_sample)
-    
-    # Limit total for performance but ensure good year coverage
-    return sample_dates[:80]
+    """Load glacier boundary from shapefile (preferred) or GeoJSON file, via the shared ROI provider"""
+    from ..utils.ee_utils import load_glacier_geojson
+    return load_glacier_geojson()
 
 
 def _get_filtered_dates_from_analysis(all_available_dates):
@@ -383,10 +314,10 @@ def _get_filtered_dates_from_analysis(all_available_dates):
 
 
 def _filter_dates_by_pixel_analysis(all_available_dates, pixel_analysis):
-    """Filter dates based on pixel analysis results"""
-    # This is a simplified version - in full implementation, this would include
-    # the complex filtering logic from the original file
-    return all_available_dates
+    """Drop dates analysed without any valid pixel (dates not analysed yet are kept)"""
+    filtered = [date for date in all_available_dates if pixel_analysis.get(date, 1) > 0]
+    # Fall back to every date if nothing was analysed (or nothing has pixels)
+    return filtered if filtered else all_available_dates
 
 
 def _create_date_selection_interface(available_dates, use_pixel_analysis):
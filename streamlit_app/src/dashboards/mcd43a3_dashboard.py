@@ -9,6 +9,11 @@ import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
 
+from ..utils.aggregates import get_aggregates
+from ..utils.shared_cache import get_shared_cache
+from ..utils.csv_pipeline import import_csv_with_progress
+from ..utils.downsampling import DEFAULT_MAX_POINTS, lod_downsample, lod_range_slider
+
 
 def create_mcd43a3_dashboard(df, qa_config=None, qa_level=None):
     """
@@ -52,6 +57,9 @@ def _create_spectral_analysis_tab(df):
         st.error("No MCD43A3 data available")
         return
     
+    # Version key of the shared dataset (downsampled series are cached on it)
+    data_key = get_shared_cache().key_of(df)
+    
     # Prepare data
     df = df.copy()
     df['date'] = pd.to_datetime(df['date'])
@@ -93,7 +101,12 @@ def _create_spectral_analysis_tab(df):
     
     # Create plots based on view type
     if view_type == "Seasonal Evolution":
-        fig = _create_seasonal_evolution_plot(filtered_df, selected_years, colors)
+        doy_window = None
+        if not filtered_df.empty and 'doy' in filtered_df.columns:
+            doy_window = lod_range_slider("🔍 Day-of-Year Window", int(filtered_df['doy'].min()),
+                                          int(filtered_df['doy'].max()), key="spectral_lod_window",
+                                          help="Long records are downsampled; narrow the window to see every day")
+        fig = _create_seasonal_evolution_plot(filtered_df, selected_years, colors, doy_window, data_key)
     elif view_type == "Visible vs NIR":
         fig = _create_vis_nir_comparison_plot(filtered_df)
     elif view_type == "Spectral Bands":
@@ -466,6 +479,9 @@ def _create_advanced_analytics_tab(df):
         st.warning("No data available for advanced analytics")
         return
     
+    # Version key of the shared dataset (aggregates are keyed on it, not on the copy)
+    data_key = get_shared_cache().key_of(df)
+    
     # Prepare data
     df = df.copy()
     df['date'] = pd.to_datetime(df['date'])
@@ -485,18 +501,22 @@ def _create_advanced_analytics_tab(df):
     elif analytics_type == "Anomaly Detection":
         _create_anomaly_analysis(df)
     elif analytics_type == "Statistical Summary":
-        _create_statistical_summary(df)
+        _create_statistical_summary(df, data_key)
 
 
 # Helper functions for spectral analysis (original functionality)
-def _create_seasonal_evolution_plot(filtered_df, selected_years, colors):
-    """Create seasonal evolution plot for MCD43A3 data"""
+def _create_seasonal_evolution_plot(filtered_df, selected_years, colors, doy_window=None, data_key=None):
+    """Create seasonal evolution plot for MCD43A3 data (downsampled to a bounded point budget)"""
     fig = go.Figure()
+    year_budget = DEFAULT_MAX_POINTS // max(1, len(selected_years))
     
     for year in selected_years:
         year_data = filtered_df[filtered_df['year'] == year]
         
         if not year_data.empty and 'Albedo_BSA_vis' in year_data.columns:
+            year_data = lod_downsample(year_data, 'doy', 'Albedo_BSA_vis',
+                                       visible_range=doy_window, max_points=year_budget,
+                                       dataset_key=None if data_key is None else data_key + (int(year),))
             year_data = year_data.copy()
             year_data['date_label'] = year_data['date'].dt.strftime('%B %d, %Y')
             
@@ -517,6 +537,8 @@ def _create_seasonal_evolution_plot(filtered_df, selected_years, colors):
         height=600,
         hovermode='closest'
     )
+    if doy_window is not None:
+        fig.update_xaxes(range=[doy_window[0] - 1, doy_window[1] + 1])
     
     return fig
 
@@ -807,7 +829,7 @@ def _create_anomaly_analysis(df):
             st.metric("Anomaly Rate", f"{anomaly_rate:.1f}%")
 
 
-def _create_statistical_summary(df):
+def _create_statistical_summary(df, data_key=None):
     """Create statistical summary"""
     st.markdown("### 📊 Statistical Summary")
     
@@ -816,20 +838,22 @@ def _create_statistical_summary(df):
     spectral_cols = [col for col in numeric_cols if 'Albedo_BSA' in col]
     
     if spectral_cols:
-        summary_stats = df[spectral_cols].describe()
+        aggregates = get_aggregates(df, value_columns=spectral_cols, product='MCD43A3', dataset_key=data_key)
+        summary_stats = aggregates.describe(spectral_cols)
         st.dataframe(summary_stats, use_container_width=True)
         
         # Additional statistics
         st.markdown("### 📈 Additional Statistics")
         
         for col in spectral_cols:
+            stats = aggregates.query([], col, moments=True).iloc[0]
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric(f"{col} - Skewness", f"{df[col].skew():.3f}")
+                st.metric(f"{col} - Skewness", f"{stats['skew']:.3f}")
             with col2:
-                st.metric(f"{col} - Kurtosis", f"{df[col].kurtosis():.3f}")
+                st.metric(f"{col} - Kurtosis", f"{stats['kurtosis']:.3f}")
             with col3:
-                st.metric(f"{col} - Range", f"{df[col].max() - df[col].min():.3f}")
+                st.metric(f"{col} - Range", f"{stats['max'] - stats['min']:.3f}")
 
 
 def _add_temporal_csv_download(temporal_df, analysis_type):
@@ -934,17 +958,9 @@ def _add_csv_import_interface(product_type="MCD43A3"):
         
         if uploaded_file is not None:
             try:
-                # Load CSV with different encodings
-                df_imported = None
-                for encoding in ['utf-8', 'latin-1', 'cp1252']:
-                    try:
-                        df_imported = pd.read_csv(uploaded_file, encoding=encoding)
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                
+                # Streaming import (encoding, delimiter and column names are sniffed)
+                df_imported = import_csv_with_progress(uploaded_file)
                 if df_imported is None:
-                    st.error("❌ Could not read the CSV file with any encoding")
                     return None
                 
                 # Validate required columns
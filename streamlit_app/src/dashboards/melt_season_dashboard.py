@@ -11,6 +11,10 @@ import plotly.express as px
 from plotly.subplots import make_subplots
 import numpy as np
 
+from ..utils.aggregates import get_aggregates
+from ..utils.shared_cache import get_shared_cache
+from ..utils.downsampling import DEFAULT_MAX_POINTS, box_statistics, lod_downsample, lod_range_slider
+
 
 def create_melt_season_dashboard(df_data, df_results, df_focused):
     """
@@ -28,6 +32,10 @@ def create_melt_season_dashboard(df_data, df_results, df_focused):
         st.error("No melt season data available")
         return
     
+    # Version keys of the shared datasets (aggregates are keyed on them, not on the copies)
+    data_key = get_shared_cache().key_of(df_data)
+    focused_key = get_shared_cache().key_of(df_focused)
+    
     # Prepare data
     df_data = df_data.copy()
     df_data['date'] = pd.to_datetime(df_data['date'])
@@ -114,19 +122,22 @@ def create_melt_season_dashboard(df_data, df_results, df_focused):
         (df_data['year'].isin(selected_years)) & 
         (df_data['month'].isin(selected_months))
     ]
+    selection_key = None if data_key is None else \
+        (data_key, tuple(int(y) for y in selected_years), tuple(int(m) for m in selected_months))
     
     # Create plots based on view type
     if view_type == "Seasonal Evolution":
         create_seasonal_evolution_view(filtered_df, selected_years)
         
     elif view_type == "Annual Trends":
-        create_annual_trends_view(df_data, df_results, selected_years)
+        create_annual_trends_view(df_data, df_results, selected_years, data_key)
         
     elif view_type == "Melt Season Analysis":
-        create_melt_season_analysis_view(df_focused, filtered_df)
+        create_melt_season_analysis_view(df_focused, df_data, selected_years, selected_months,
+                                         focused_key, data_key)
         
     elif view_type == "Daily Variability":
-        create_daily_variability_view(filtered_df)
+        create_daily_variability_view(filtered_df, selection_key)
         
     elif view_type == "Terra vs Aqua Comparison":
         create_terra_aqua_comparison_view(filtered_df)
@@ -222,19 +233,18 @@ def create_seasonal_evolution_view(filtered_df, selected_years):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def create_annual_trends_view(df_data, df_results, selected_years):
+def create_annual_trends_view(df_data, df_results, selected_years, data_key=None):
     """Create annual trends analysis"""
     st.subheader("📈 Long-term Albedo Trends")
     
-    # Annual statistics
-    annual_stats = df_data.groupby('year').agg({
-        'albedo_mean': ['mean', 'std', 'min', 'max', 'count']
-    }).round(3)
-    annual_stats.columns = ['Mean_Albedo', 'Std_Albedo', 'Min_Albedo', 'Max_Albedo', 'Observations']
-    annual_stats = annual_stats.reset_index()
-    
-    # Filter for selected years
-    annual_stats_filtered = annual_stats[annual_stats['year'].isin(selected_years)]
+    # Annual statistics for the selected years (materialized aggregates)
+    annual_stats_filtered = get_aggregates(df_data, dataset_key=data_key).query(
+        ['year'], 'albedo_mean', years=selected_years
+    ).round(3)
+    annual_stats_filtered = annual_stats_filtered.rename(columns={
+        'mean': 'Mean_Albedo', 'std': 'Std_Albedo', 'min': 'Min_Albedo', 'max': 'Max_Albedo',
+        'count': 'Observations'
+    })
     
     # Create subplots
     fig = make_subplots(
@@ -332,30 +342,31 @@ def create_annual_trends_view(df_data, df_results, selected_years):
                 st.error(f"Error displaying results: {e}")
 
 
-def create_melt_season_analysis_view(df_focused, filtered_df):
+def create_melt_season_analysis_view(df_focused, df_data, selected_years, selected_months,
+                                     focused_key=None, data_key=None):
     """Create focused melt season analysis"""
     st.subheader("🏔️ Focused Melt Season Analysis")
     
     if df_focused.empty:
         st.warning("No focused melt season data available. Showing filtered data instead.")
-        analysis_df = filtered_df
+        # Aggregates of the whole dataset, restricted to the selection at query time
+        analysis_df, dataset_key = df_data, data_key
+        years, months = selected_years, selected_months
     else:
-        analysis_df = df_focused.copy()
-        analysis_df['date'] = pd.to_datetime(analysis_df['date'])
-        analysis_df['year'] = analysis_df['date'].dt.year
-        analysis_df['doy'] = analysis_df['date'].dt.dayofyear
+        analysis_df, dataset_key = df_focused, focused_key
+        years, months = None, None
     
     if analysis_df.empty:
         st.error("No data available for melt season analysis")
         return
     
     # Monthly analysis
-    analysis_df['month'] = analysis_df['date'].dt.month
-    monthly_stats = analysis_df.groupby(['year', 'month']).agg({
-        'albedo_mean': ['mean', 'std', 'count']
-    }).round(3)
-    monthly_stats.columns = ['Mean_Albedo', 'Std_Albedo', 'Count']
-    monthly_stats = monthly_stats.reset_index()
+    aggregates = get_aggregates(analysis_df, dataset_key=dataset_key)
+    monthly_stats = aggregates.query(['year', 'month'], 'albedo_mean', years=years, months=months).round(3)
+    if monthly_stats.empty:
+        st.error("No data available for melt season analysis")
+        return
+    monthly_stats = monthly_stats.rename(columns={'mean': 'Mean_Albedo', 'std': 'Std_Albedo', 'count': 'Count'})
     
     # Create monthly heatmap
     pivot_data = monthly_stats.pivot(index='year', columns='month', values='Mean_Albedo')
@@ -385,11 +396,8 @@ def create_melt_season_analysis_view(df_focused, filtered_df):
     st.subheader("📅 Intra-seasonal Albedo Patterns")
     
     # Group by day of year for pattern analysis
-    doy_stats = analysis_df.groupby('doy').agg({
-        'albedo_mean': ['mean', 'std', 'count']
-    }).round(3)
-    doy_stats.columns = ['Mean_Albedo', 'Std_Albedo', 'Count']
-    doy_stats = doy_stats.reset_index()
+    doy_stats = aggregates.query(['doy'], 'albedo_mean', years=years, months=months).round(3)
+    doy_stats = doy_stats.rename(columns={'mean': 'Mean_Albedo', 'std': 'Std_Albedo', 'count': 'Count'})
     
     fig2 = go.Figure()
     
@@ -485,7 +493,7 @@ def create_melt_season_analysis_view(df_focused, filtered_df):
     st.plotly_chart(fig2, use_container_width=True)
 
 
-def create_daily_variability_view(filtered_df):
+def create_daily_variability_view(filtered_df, selection_key=None):
     """Create daily variability analysis"""
     st.subheader("📊 Daily Albedo Variability Analysis")
     
@@ -506,32 +514,51 @@ def create_daily_variability_view(filtered_df):
         }).reset_index()
         daily_var.columns = ['year', 'doy', 'albedo_mean', 'albedo_std', 'pixel_count']
     
-    # Box plot by year
+    # Date labels for hover
+    import datetime
+    daily_var['date_label'] = daily_var.apply(
+        lambda row: (datetime.datetime(int(row['year']), 1, 1) + datetime.timedelta(days=int(row['doy'])-1)).strftime('%B %d, %Y'),
+        axis=1
+    )
+    
+    # Box plot by year (statistics computed here, only outliers sent as points)
     fig1 = go.Figure()
     
     years = sorted(daily_var['year'].unique())
-    for year in years:
+    palette = px.colors.qualitative.Plotly
+    for i, year in enumerate(years):
         year_data = daily_var[daily_var['year'] == year]
-        
-        # Create date labels for outliers
-        import datetime
-        if 'doy' in year_data.columns:
-            year_data = year_data.copy()
-            year_data['date_label'] = year_data.apply(
-                lambda row: (datetime.datetime(int(row['year']), 1, 1) + datetime.timedelta(days=int(row['doy'])-1)).strftime('%B %d, %Y'),
-                axis=1
-            )
-            customdata = year_data['date_label']
-        else:
-            customdata = [f"Year {year}"] * len(year_data)
+        stats = box_statistics(year_data['albedo_mean'])
+        if stats is None:
+            continue
+        color = palette[i % len(palette)]
         
         fig1.add_trace(go.Box(
-            y=year_data['albedo_mean'],
+            x=[str(year)],
+            q1=[stats['q1']],
+            median=[stats['median']],
+            q3=[stats['q3']],
+            lowerfence=[stats['lowerfence']],
+            upperfence=[stats['upperfence']],
             name=str(year),
-            boxpoints='outliers',
-            hovertemplate=f'🗓️ <b>Year {year}</b><br>📅 Date: %{{customdata}}<br>📊 Albedo: %{{y:.3f}}<br>📈 Statistical distribution<extra></extra>',
-            customdata=customdata
+            legendgroup=str(year),
+            marker_color=color,
+            hoverinfo='y'
         ))
+        
+        outliers = year_data[stats['outliers']]
+        if not outliers.empty:
+            fig1.add_trace(go.Scatter(
+                x=[str(year)] * len(outliers),
+                y=outliers['albedo_mean'],
+                mode='markers',
+                name=str(year),
+                legendgroup=str(year),
+                showlegend=False,
+                marker=dict(size=4, color=color),
+                hovertemplate=f'🗓️ <b>Year {year}</b><br>📅 Date: %{{customdata}}<br>📊 Albedo: %{{y:.3f}}<br>📈 Statistical distribution<extra></extra>',
+                customdata=outliers['date_label']
+            ))
     
     fig1.update_layout(
         title="Annual Albedo Distribution (Box Plots)",
@@ -547,34 +574,43 @@ def create_daily_variability_view(filtered_df):
     
     # Scatter plot of standard deviation over time
     if 'albedo_std' in daily_var.columns:
-        # Create date labels for hover
-        import datetime
-        daily_var['date_label'] = daily_var.apply(
-            lambda row: (datetime.datetime(int(row['year']), 1, 1) + datetime.timedelta(days=int(row['doy'])-1)).strftime('%B %d, %Y'),
-            axis=1
-        )
+        # Visible DOY window; every year shares the point budget
+        doy_window = lod_range_slider("🔍 Day-of-Year Window", int(daily_var['doy'].min()), int(daily_var['doy'].max()),
+                                      key="variability_lod_window",
+                                      help="Long records are downsampled; narrow the window to see every day")
+        year_budget = DEFAULT_MAX_POINTS // max(1, len(years))
+        reduced = pd.concat([
+            lod_downsample(daily_var[daily_var['year'] == year], 'doy', 'albedo_std',
+                           visible_range=doy_window, max_points=year_budget, method='minmax',
+                           dataset_key=None if selection_key is None else selection_key + ('daily_var', int(year)))
+            for year in years
+        ])
+        points_total = int(daily_var['doy'].between(*doy_window).sum())
+        if len(reduced) < points_total:
+            st.caption(f"📉 Showing {len(reduced):,} of {points_total:,} days (min/max downsampling) - narrow the window for full resolution")
         
         fig2.add_trace(go.Scatter(
-            x=daily_var['doy'],
-            y=daily_var['albedo_std'],
+            x=reduced['doy'],
+            y=reduced['albedo_std'],
             mode='markers',
             marker=dict(
-                color=daily_var['year'],
+                color=reduced['year'],
                 colorscale='Viridis',
-                size=daily_var['pixel_count'],
+                size=reduced['pixel_count'],
                 sizemode='diameter',
                 sizeref=2.*max(daily_var['pixel_count'])/(40.**2),
                 sizemin=4,
                 colorbar=dict(title="Year")
             ),
             hovertemplate='📅 Date: %{customdata}<br>📊 Std Dev: %{y:.3f}<br>🗓️ Year: %{marker.color}<br>🔢 Pixels: %{marker.size}<br>📈 DOY: %{x}<extra></extra>',
-            customdata=daily_var['date_label']
+            customdata=reduced['date_label']
         ))
         
         fig2.update_layout(
             title="Daily Albedo Variability (Standard Deviation)",
             xaxis_title="Day of Year",
             yaxis_title="Albedo Standard Deviation",
+            xaxis=dict(range=[doy_window[0] - 1, doy_window[1] + 1]),
             height=400
         )
         
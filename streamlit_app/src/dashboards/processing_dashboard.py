@@ -21,6 +21,8 @@ from src.utils.processing_manager import (
     ProcessingManager, load_csv_with_metadata, save_csv_with_metadata,
     get_processing_summary, validate_uploaded_csv
 )
+from src.utils.job_runner import get_job_runner, ACTIVE_STATES
+from src.utils.output_writer import read_output
 
 
 def create_processing_dashboard():
@@ -113,9 +115,14 @@ def create_configuration_interface():
         if st.button("💾 Save Config", help="Save current configuration"):
             save_configuration(selected_analysis, parameters)
     
-    # Processing execution
+    # Processing execution (background job)
     if process_button:
         execute_processing(selected_analysis, parameters)
+    
+    if st.session_state.get('processing_job_id'):
+        show_processing_job(st.session_state.processing_job_id)
+    
+    create_jobs_overview()
 
 
 def configure_analysis_parameters(analysis_type):
@@ -355,130 +362,199 @@ def configure_analysis_parameters(analysis_type):
     return parameters
 
 
+def _auto_refresh(func):
+    """Re-run func every 2 s on its own where st.fragment exists (Streamlit >= 1.37)"""
+    fragment = getattr(st, 'fragment', None)
+    return fragment(run_every=2)(func) if fragment else func
+
+
 def execute_processing(analysis_type, parameters):
-    """Execute the processing workflow"""
-    # Initialize progress tracking
-    progress_placeholder = st.empty()
-    status_placeholder = st.empty()
-    completion_placeholder = st.empty()
-    
-    def update_progress(progress, message):
-        progress_placeholder.progress(progress / 100)
-        if progress < 100:
-            status_placeholder.info(f"🔄 {message}")
-        else:
-            status_placeholder.success(f"✅ {message}")
-    
+    """Submit the processing workflow as a background job"""
     try:
-        # Show initial status
-        update_progress(0, "Initializing processing...")
-        
-        # Execute processing
-        results = st.session_state.processing_manager.run_analysis(
-            analysis_type, parameters, update_progress
-        )
-        
-        # Check if processing succeeded or failed
-        if isinstance(results, dict) and results.get('success') == False:
-            # Processing failed but didn't crash the app
-            progress_placeholder.empty()
-            status_placeholder.error(f"❌ Processing failed: {results.get('error', 'Unknown error')}")
-            
-            st.error("🚨 **Processing Error**")
-            st.write(f"**Error:** {results.get('error', 'Unknown error')}")
-            
-            # Show traceback if available (in expander for brevity)
-            if results.get('traceback'):
-                with st.expander("🔍 Technical Details (for debugging)", expanded=False):
-                    st.code(results['traceback'], language='text')
-            
-            # Show troubleshooting tips
-            with st.expander("🔧 Troubleshooting Tips", expanded=True):
-                st.markdown("""
-                **Common issues and solutions:**
-                
-                1. **Earth Engine Authentication Error**
-                   - Check that Earth Engine is properly authenticated
-                   - Try refreshing the page and reconnecting
-                
-                2. **Memory/Timeout Error**
-                   - Try reducing the date range (fewer years)
-                   - Use coarser spatial resolution (1000m instead of 500m)
-                   - Use relaxed QA settings for faster processing
-                
-                3. **No Data Found**
-                   - Check date range is within MODIS data availability (2000+)
-                   - Try relaxed QA settings to increase data coverage
-                   - Verify glacier boundary is correct
-                
-                4. **Parameter Validation Error**
-                   - Check that start year ≤ end year
-                   - Ensure all required parameters are set
-                   - Verify parameter values are within valid ranges
-                """)
-            
-            # Don't store failed results
-            return
-        
-        # Store successful results
-        st.session_state.processing_results = results
-        
-        # Keep the final success status visible
-        # progress_placeholder shows 100%, status shows success message
-        
-        # Show completion summary
-        completion_placeholder.success("🎉 **Processing Complete!**")
-        
-        # Show quick summary
-        output_files = results.get('output_files', [])
-        if output_files:
-            st.write(f"📁 Generated {len(output_files)} output files:")
-            for file_info in output_files:
-                size_mb = file_info['size'] / (1024 * 1024)
-                st.write(f"• {file_info['filename']} ({size_mb:.2f} MB)")
-        
-        # Switch to results tab
-        st.info("💡 Check the **Results & Export** tab to download your data!")
-        
+        job_id = get_job_runner().submit(analysis_type, parameters)
     except Exception as e:
-        # This should rarely happen now since we catch exceptions in the processing manager
-        # But keep it as a final safety net
-        progress_placeholder.empty()
-        status_placeholder.error(f"❌ Unexpected error: {str(e)}")
-        
-        st.error("🚨 **Unexpected Error**")
-        st.write(f"**Error:** {str(e)}")
-        st.write("This error was not properly caught by the processing manager.")
-        
-        # Show full traceback for debugging
-        import traceback
-        with st.expander("🔍 Technical Details", expanded=False):
-            st.code(traceback.format_exc(), language='text')
-        
-        # Show troubleshooting tips
-        with st.expander("🔧 Troubleshooting Tips", expanded=True):
-            st.markdown("""
-            **Common issues and solutions:**
-            
-            1. **Earth Engine Authentication Error**
-               - Check that Earth Engine is properly authenticated
-               - Try refreshing the page and reconnecting
-            
-            2. **Memory/Timeout Error**
-               - Try reducing the date range (fewer years)
-               - Use coarser spatial resolution (1000m instead of 500m)
-               - Use relaxed QA settings for faster processing
-            
-            3. **No Data Found**
-               - Check date range is within MODIS data availability (2000+)
-               - Try relaxed QA settings to increase data coverage
-               - Verify glacier boundary is correct
-            
-            4. **Parameter Validation Error**
-               - Check that start year ≤ end year
-               - Ensure all required parameters are set
-               - Verify parameter values are within valid ranges
-            """)
+        st.error(f"❌ Could not start background job: {str(e)}")
+        return
+    
+    st.session_state.processing_job_id = job_id
+    st.info(f"🧵 Job `{job_id}` submitted. It keeps running if you leave or reload the page.")
+
+
+def show_processing_job(job_id):
+    """Status of a background job: live progress while active, outcome once final"""
+    status = get_job_runner().status(job_id)
+    if status is None:
+        st.warning(f"Job {job_id} not found")
+        return
+    
+    if status['state'] in ACTIVE_STATES:
+        _poll_job_status(job_id)
+    else:
+        _show_final_job_status(job_id, status)
+
+
+@_auto_refresh
+def _poll_job_status(job_id):
+    runner = get_job_runner()
+    status = runner.status(job_id)
+    if status is None or status['state'] not in ACTIVE_STATES:
+        # Full rerun renders the outcome and refreshes the results tab
+        st.rerun()
+    
+    st.progress(min(max(status.get('progress', 0), 0), 100) / 100)
+    st.info(f"🔄 {status.get('message') or 'Processing...'}")
+    
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        if st.button("⏹️ Cancel Job", key=f"cancel_job_{job_id}"):
+            runner.cancel(job_id)
+            st.warning("Cancellation requested - the job stops at its next progress update")
+    with col2:
+        if not hasattr(st, 'fragment'):
+            st.button("🔄 Refresh Status", key=f"refresh_job_{job_id}")
+
+
+def _show_final_job_status(job_id, status):
+    runner = get_job_runner()
+    state = status['state']
+    
+    if state == 'completed':
+        # Load results once per job so the results tab shows them
+        if st.session_state.get('processing_results_job') != job_id:
+            st.session_state.processing_results = runner.result(job_id)
+            st.session_state.processing_results_job = job_id
+        
+        st.progress(1.0)
+        st.success(f"✅ {status.get('message') or 'Processing complete!'}")
+        results = st.session_state.processing_results
+        if results:
+            _show_processing_success(results)
+    
+    elif state == 'failed':
+        results = runner.result(job_id) or {
+            'error': status.get('error', 'Unknown error'),
+            'traceback': status.get('traceback')
+        }
+        st.error(f"❌ Processing failed: {results.get('error', 'Unknown error')}")
+        _show_processing_failure(results)
+    
+    elif state == 'cancelled':
+        st.warning(f"⏹️ Job {job_id} was cancelled")
+    
+    else:
+        st.warning(f"⚠️ Job {job_id} was interrupted: {status.get('message', '')}")
+
+
+def _show_processing_success(results):
+    """Completion summary of a successful run"""
+    st.success("🎉 **Processing Complete!**")
+    
+    # Show quick summary
+    output_files = results.get('output_files', [])
+    if output_files:
+        st.write(f"📁 Generated {len(output_files)} output files:")
+        for file_info in output_files:
+            size_mb = file_info['size'] / (1024 * 1024)
+            st.write(f"• {file_info['filename']} ({size_mb:.2f} MB)")
+    
+    _show_run_timing(results.get('metadata', {}).get('run_record'))
+    
+    # Switch to results tab
+    st.info("💡 Check the **Results & Export** tab to download your data!")
+
+
+def _show_run_timing(run_record):
+    """Measured duration, rows and process peak memory of each workflow phase"""
+    if not run_record or not run_record.get('phases'):
+        return
+    
+    import pandas as pd
+    
+    with st.expander(f"⏱️ Run timing ({run_record.get('wall_time_s', 0):.1f} s, "
+                     f"process peak {_process_peak_memory_mb(run_record) or 0:.0f} MB)", expanded=False):
+        st.dataframe(pd.DataFrame([
+            {
+                'phase': phase['name'],
+                'seconds': phase.get('seconds'),
+                'rows': phase.get('rows'),
+                'process_peak_memory_mb': _process_peak_memory_mb(phase),
+                'steps': len(phase.get('spans', []))
+            }
+            for phase in run_record['phases']
+        ]), use_container_width=True)
+        
+        steps = [span for phase in run_record['phases'] for span in phase.get('spans', [])]
+        if steps:
+            slowest = max(steps, key=lambda span: span.get('seconds') or 0)
+            st.caption(f"Slowest step: {slowest['name']} {slowest.get('unit', '')} "
+                       f"({slowest.get('seconds') or 0:.1f} s, {slowest.get('rows') or 0} rows)")
+        if run_record.get('record_path'):
+            st.caption(f"💾 Run record: {run_record['record_path']}")
+
+
+def _process_peak_memory_mb(record):
+    """Process memory high-water mark of a run or phase record (older records name it peak_memory_mb)"""
+    return record.get('process_peak_memory_mb', record.get('peak_memory_mb'))
+
+
+def _show_processing_failure(results):
+    """Error details and troubleshooting tips of a failed run"""
+    st.error("🚨 **Processing Error**")
+    st.write(f"**Error:** {results.get('error', 'Unknown error')}")
+    
+    # Show traceback if available (in expander for brevity)
+    if results.get('traceback'):
+        with st.expander("🔍 Technical Details (for debugging)", expanded=False):
+            st.code(results['traceback'], language='text')
+    
+    # Show troubleshooting tips
+    with st.expander("🔧 Troubleshooting Tips", expanded=True):
+        st.markdown("""
+        **Common issues and solutions:**
+        
+        1. **Earth Engine Authentication Error**
+           - Check that Earth Engine is properly authenticated
+           - Try refreshing the page and reconnecting
+        
+        2. **Memory/Timeout Error**
+           - Try reducing the date range (fewer years)
+           - Use coarser spatial resolution (1000m instead of 500m)
+           - Use relaxed QA settings for faster processing
+        
+        3. **No Data Found**
+           - Check date range is within MODIS data availability (2000+)
+           - Try relaxed QA settings to increase data coverage
+           - Verify glacier boundary is correct
+        
+        4. **Parameter Validation Error**
+           - Check that start year ≤ end year
+           - Ensure all required parameters are set
+           - Verify parameter values are within valid ranges
+        """)
+
+
+def create_jobs_overview():
+    """Recent background jobs, including those started before a page reload"""
+    jobs = get_job_runner().list_jobs(limit=10)
+    if not jobs:
+        return
+    
+    state_icons = {
+        'queued': '⏳', 'running': '🔄', 'completed': '✅',
+        'failed': '❌', 'cancelled': '⏹️', 'interrupted': '⚠️'
+    }
+    with st.expander(f"🧵 Background Jobs ({len(jobs)})", expanded=False):
+        for job in jobs:
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                analysis_name = ANALYSIS_TYPES.get(job.get('analysis_type'), {}).get('name', job.get('analysis_type'))
+                st.write(f"{state_icons.get(job['state'], '•')} `{job['job_id']}` - {analysis_name} "
+                         f"({job['state']}, {job.get('progress', 0)}%)")
+            with col2:
+                if job['job_id'] != st.session_state.get('processing_job_id'):
+                    if st.button("👁️ Show", key=f"show_job_{job['job_id']}"):
+                        st.session_state.processing_job_id = job['job_id']
+                        st.rerun()
 
 
 def create_results_interface():
@@ -580,7 +656,7 @@ def create_results_interface():
                                 label="📥 Download",
                                 data=f.read(),
                                 file_name=file_info['filename'],
-                                mime="text/csv",
+                                mime="text/csv" if file_info['path'].endswith('.csv') else "application/octet-stream",
                                 key=f"download_{i}"
                             )
                     except Exception as e:
@@ -595,6 +671,7 @@ def create_results_interface():
     metadata = results.get('metadata', {})
     if metadata:
         st.markdown("#### 📊 Analysis Metadata")
+        _show_run_timing(metadata.get('run_record'))
         
         with st.expander("📋 View Detailed Metadata", expanded=False):
             st.json(metadata)
@@ -681,9 +758,9 @@ def create_import_interface():
 
 
 def preview_csv_file(file_path):
-    """Preview a CSV file"""
+    """Preview a workflow output file (columnar or CSV)"""
     try:
-        df = pd.read_csv(file_path)
+        df = read_output(file_path, restore_metadata=True)
         
         st.markdown(f"#### 📋 Preview: {os.path.basename(file_path)}")
         
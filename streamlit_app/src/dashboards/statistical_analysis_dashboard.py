@@ -10,11 +10,12 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
-from scipy.stats import pearsonr, spearmanr, linregress
-from scipy import signal
 import warnings
 warnings.filterwarnings('ignore')
 
+from ..utils.aggregates import get_aggregates
+from ..utils.shared_cache import get_shared_cache
+
 # Import the statistical functions with proper path handling
 import sys
 import os
@@ -108,6 +109,19 @@ except ImportError:
             }
 
 
+try:
+    from analysis.changepoint import detect_change_points
+    CHANGEPOINT_AVAILABLE = True
+except ImportError:
+    CHANGEPOINT_AVAILABLE = False
+
+try:
+    from analysis.temporal import event_year_permutation_test
+    PERMUTATION_AVAILABLE = True
+except ImportError:
+    PERMUTATION_AVAILABLE = False
+
+
 def create_statistical_analysis_dashboard(df_data, df_results, df_hypsometric=None):
     """
     Create comprehensive statistical analysis dashboard following Williamson & Menounos (2021)
@@ -124,6 +138,9 @@ def create_statistical_analysis_dashboard(df_data, df_results, df_hypsometric=No
         st.error("No data available for statistical analysis")
         return
     
+    # Version key of the shared dataset (aggregates are keyed on it, not on the copy)
+    data_key = get_shared_cache().key_of(df_data)
+    
     # Prepare data
     df_data = df_data.copy()
     df_data['date'] = pd.to_datetime(df_data['date'])
@@ -176,7 +193,11 @@ def create_statistical_analysis_dashboard(df_data, df_results, df_hypsometric=No
         create_significance_testing_view(filtered_df)
         
     elif analysis_type == "Comparative Statistics":
-        create_comparative_statistics_view(filtered_df)
+        create_comparative_statistics_view(
+            filtered_df,
+            aggregates=get_aggregates(df_data, dataset_key=data_key),
+            years=range(year_range[0], year_range[1] + 1)
+        )
         
     elif analysis_type == "Statistical Summary Tables":
         create_statistical_summary_tables(filtered_df, df_results)
@@ -308,6 +329,17 @@ def create_trend_analysis_view(filtered_df, df_results):
     # Add significance threshold
     fig.add_hline(y=0.05, line_dash="dash", line_color="red", row=2, col=2)
     
+    # Regime shift marker (Pettitt change point on annual means)
+    change_points = None
+    if CHANGEPOINT_AVAILABLE:
+        change_points = detect_change_points(annual_data, value_column='Mean_Albedo')
+        if not change_points.empty and change_points.iloc[0]['significant']:
+            fig.add_vline(
+                x=change_points.iloc[0]['change_point'] + 0.5,
+                line_dash="dot", line_color="purple",
+                row=1, col=1
+            )
+    
     fig.update_layout(
         height=800,
         title_text=f"Comprehensive Trend Analysis ({years.min()}-{years.max()})",
@@ -382,6 +414,60 @@ def create_trend_analysis_view(filtered_df, df_results):
     })
     
     st.dataframe(stats_df, use_container_width=True)
+    
+    if change_points is not None and not change_points.empty:
+        create_change_point_summary(filtered_df, change_points)
+
+
+def create_change_point_summary(filtered_df, annual_change_points):
+    """Show Pettitt and binary segmentation change points for annual and monthly series"""
+    st.markdown("### Change-Point Detection")
+    
+    annual = annual_change_points.iloc[0]
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric(
+            "🔀 Pettitt Change Point",
+            f"after {annual['change_point']}",
+            help="Last year of the first regime (Pettitt test)"
+        )
+    
+    with col2:
+        st.metric(
+            "📉 Regime Shift",
+            f"{annual['shift']:.4f}",
+            delta=f"{annual['mean_before']:.4f} → {annual['mean_after']:.4f}",
+            delta_color="off"
+        )
+    
+    with col3:
+        st.metric(
+            "🎯 P-value (approx.)",
+            f"{annual['p_value']:.4f}",
+            delta="Significant" if annual['significant'] else "Not significant",
+            delta_color="normal" if annual['significant'] else "off"
+        )
+    
+    # Per-month annual series in one batched call
+    monthly = filtered_df.groupby(['month', 'year'])['albedo_mean'].mean().reset_index()
+    monthly_cp = detect_change_points(monthly, series_columns=['month'])
+    
+    table = pd.concat([
+        annual_change_points.assign(series='Annual'),
+        monthly_cp.assign(series=monthly_cp['month'].map(lambda m: pd.Timestamp(2000, int(m), 1).strftime('%B')))
+    ], ignore_index=True)
+    table['segmentation_change_points'] = table['segmentation_change_points'].apply(
+        lambda cps: ', '.join(map(str, cps)) if cps else '—'
+    )
+    table = table[['series', 'change_point', 'p_value', 'significant', 'mean_before',
+                   'mean_after', 'shift', 'segmentation_change_points']]
+    table.columns = ['Series', 'Pettitt Change Point', 'P-value', 'Significant',
+                     'Mean Before', 'Mean After', 'Shift', 'Segmentation Change Points']
+    
+    st.dataframe(table.round(4), use_container_width=True)
+    st.caption("Pettitt test (approximate p-value) and binary segmentation of mean shifts; "
+               "change points mark the last year of the earlier regime.")
 
 
 def create_seasonal_decomposition_view(filtered_df):
@@ -558,6 +644,8 @@ def create_correlation_analysis_view(filtered_df, df_hypsometric):
     
     # Calculate temporal correlation
     if len(annual_data) >= 3:
+        from scipy.stats import pearsonr, spearmanr, linregress
+        
         pearson_r, pearson_p = pearsonr(annual_data['year'], annual_data['albedo_mean'])
         spearman_r, spearman_p = spearmanr(annual_data['year'], annual_data['albedo_mean'])
         
@@ -714,25 +802,85 @@ def create_significance_testing_view(filtered_df):
     
     with col4:
         st.metric("🧪 Mann-Whitney P-value", f"{u_pvalue:.4f}")
+    
+    if PERMUTATION_AVAILABLE:
+        create_event_year_permutation_view(filtered_df)
 
 
-def create_comparative_statistics_view(filtered_df):
-    """Create comparative statistics across different groupings"""
+def create_event_year_permutation_view(filtered_df):
+    """Permutation test of user-selected event years (fires, dust...) against the other years"""
+    
+    st.markdown("#### 🎲 Event-Year Permutation Test")
+    
+    available_years = sorted(filtered_df['year'].unique())
+    default_events = [y for y in [2017, 2018, 2021, 2023] if y in available_years]
+    event_years = st.multiselect(
+        "Event years (fires, dust events...):",
+        options=available_years,
+        default=default_events,
+        key="stats_event_years"
+    )
+    
+    if not event_years or len(event_years) == len(available_years):
+        st.info("Select at least one event year, leaving some years for comparison")
+        return
+    
+    n_permutations = st.select_slider(
+        "Random permutations (used when exact enumeration is too large):",
+        options=[1000, 5000, 10000, 20000, 50000],
+        value=10000,
+        key="stats_n_permutations"
+    )
+    
+    results = event_year_permutation_test(filtered_df, event_years, n_permutations=n_permutations)
+    if not results:
+        st.warning("⚠️ Insufficient data for event-year comparison")
+        return
+    
+    daily, annual = results['daily'], results['annual']
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("📊 Daily Difference", f"{daily['difference']:+.4f}",
+                  help="Event minus non-event mean of all daily observations")
+    
+    with col2:
+        st.metric("🧪 Daily P-value", f"{daily['p_value']:.4f}")
+    
+    with col3:
+        st.metric("📊 Annual Difference", f"{annual['difference']:+.4f}",
+                  help="Event minus non-event mean of annual means")
+    
+    with col4:
+        st.metric("🧪 Annual P-value", f"{annual['p_value']:.4f}")
+    
+    method = "exact enumeration" if daily['exact'] else "Monte Carlo"
+    st.caption(f"{method} over {daily['n_permutations']:,} year labelings "
+               f"({len(results['event_years'])} event years out of {results['n_years']})")
+
+
+def create_comparative_statistics_view(filtered_df, aggregates=None, years=None):
+    """
+    Create comparative statistics across different groupings
+    
+    Args:
+        filtered_df: Data for the selected period
+        aggregates: Materialized aggregates of the full dataset (built from
+                    filtered_df if not given)
+        years: Years of the selected period when aggregates cover more
+    """
+    if aggregates is None:
+        aggregates = get_aggregates(filtered_df)
+    columns = {'mean': 'Mean', 'std': 'Std', 'count': 'Count', 'min': 'Min', 'max': 'Max'}
     
     # Monthly statistics
-    monthly_stats = filtered_df.groupby('month').agg({
-        'albedo_mean': ['mean', 'std', 'count', 'min', 'max']
-    }).round(4)
-    monthly_stats.columns = ['Mean', 'Std', 'Count', 'Min', 'Max']
-    monthly_stats = monthly_stats.reset_index()
+    monthly_stats = aggregates.query(['month'], 'albedo_mean', years=years).round(4)
+    monthly_stats = monthly_stats.rename(columns=columns)[['month', 'Mean', 'Std', 'Count', 'Min', 'Max']]
     monthly_stats['Month_Name'] = pd.to_datetime(monthly_stats['month'], format='%m').dt.strftime('%B')
     
     # Annual statistics
-    annual_stats = filtered_df.groupby('year').agg({
-        'albedo_mean': ['mean', 'std', 'count', 'min', 'max']
-    }).round(4)
-    annual_stats.columns = ['Mean', 'Std', 'Count', 'Min', 'Max']
-    annual_stats = annual_stats.reset_index()
+    annual_stats = aggregates.query(['year'], 'albedo_mean', years=years).round(4)
+    annual_stats = annual_stats.rename(columns=columns)[['year', 'Mean', 'Std', 'Count', 'Min', 'Max']]
     
     # Create tabs for different comparisons
     tab1, tab2 = st.tabs(["Monthly", "Annual"])
@@ -10,6 +10,9 @@ import plotly.express as px
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 
+from ..utils.csv_pipeline import import_csv_with_progress
+from ..utils.downsampling import DEFAULT_MAX_POINTS, lod_downsample, lod_range_slider
+
 
 def create_unified_temporal_dashboard():
     """
@@ -732,11 +735,27 @@ def _create_detailed_timeline_comparison(comparison_data):
     # Determine actual date range from available data
     min_date = min(all_dates)
     max_date = max(all_dates)
+    
+    # Visible window: narrowing it loads more detail, up to full resolution
+    window = lod_range_slider("🔍 Visible Period", pd.Timestamp(min_date), pd.Timestamp(max_date),
+                              key="timeline_lod_window",
+                              help="Long records are downsampled; narrow the period to see every observation")
+    min_date, max_date = window
     date_span = (max_date - min_date).days
     
+    # Point budget shared by the products on the chart
+    products_with_data = [product for product, data in comparison_data.items() if not data.empty]
+    trace_budget = DEFAULT_MAX_POINTS // max(1, len(products_with_data))
+    points_shown = 0
+    points_total = 0
+    
     # Create traces for each product
     for product, data in comparison_data.items():
         if not data.empty:
+            points_total += int(data['date'].between(min_date, max_date).sum())
+            data = lod_downsample(data, 'date', 'albedo_mean', visible_range=window, max_points=trace_budget)
+            points_shown += len(data)
+            
             # Add error bars if standard deviation is available
             error_y = None
             if 'albedo_std' in data.columns:
@@ -821,6 +840,9 @@ def _create_detailed_timeline_comparison(comparison_data):
             borderwidth=1
         )
     
+    if points_shown < points_total:
+        st.caption(f"📉 Showing {points_shown:,} of {points_total:,} observations (LTTB downsampling) - narrow the period for full resolution")
+    
     # Display data summary
     col1, col2, col3 = st.columns(3)
     
@@ -1261,17 +1283,9 @@ def _add_unified_csv_import_interface():
 def _process_unified_csv_import(uploaded_file, product_type):
     """Process uploaded CSV for unified comparison"""
     try:
-        # Load CSV with different encodings
-        df_imported = None
-        for encoding in ['utf-8', 'latin-1', 'cp1252']:
-            try:
-                df_imported = pd.read_csv(uploaded_file, encoding=encoding)
-                break
-            except UnicodeDecodeError:
-                continue
-        
+        # Streaming import (encoding, delimiter and column names are sniffed)
+        df_imported = import_csv_with_progress(uploaded_file, label=f"{product_type} CSV")
         if df_imported is None:
-            st.error(f"❌ Could not read {product_type} CSV file with any encoding")
             return None
         
         # Validate and process the data
@@ -0,0 +1,335 @@
+"""
+Materialized Aggregate Tables for Dashboards
+Builds year × month × DOY-bin × product × qa_level summary tables once per
+dataset version (shared cache key or content hash), stores them next to the cached data and
+answers the dashboards' annual / monthly / DOY statistics by rolling them up
+"""
+
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .dataset_cache import COLUMNAR_FORMAT, _read_columnar, _write_columnar
+from .shared_cache import get_shared_cache
+
+
+DEFAULT_AGGREGATES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'outputs', 'cache', 'aggregates'
+)
+
+# Bump when the table layout changes so stale materializations are rebuilt
+AGGREGATE_VERSION = 1
+
+# Width of the day-of-year bins (1 = exact DOY statistics)
+DOY_BIN_DAYS = 1
+
+DIMENSIONS = ['year', 'month', 'doy', 'product', 'qa_level']
+MAX_STORED_TABLES = 64
+MAX_MEMORY_TABLES = 16
+
+
+def default_value_columns(df):
+    """Albedo and pixel-count columns summarized by default"""
+    return [
+        col for col in df.columns
+        if (col in ('albedo_mean', 'pixel_count') or col.startswith('Albedo_'))
+        and pd.api.types.is_numeric_dtype(df[col])
+    ]
+
+
+def _dimension_frame(df, product, qa_level, doy_bin_days):
+    """year, month, doy (bin start), product and qa_level for every row"""
+    if 'date' in df.columns:
+        dates = pd.to_datetime(df['date'], errors='coerce')
+        year, month, doy = dates.dt.year, dates.dt.month, dates.dt.dayofyear
+    else:
+        missing = pd.Series(0, index=df.index)
+        year = df['year'] if 'year' in df.columns else missing
+        month = df['month'] if 'month' in df.columns else missing
+        doy = df['doy'] if 'doy' in df.columns else missing
+
+    dims = pd.DataFrame({
+        'year': year,
+        'month': month,
+        'doy': (doy - 1) // doy_bin_days * doy_bin_days + 1
+    }, index=df.index)
+    dims['product'] = df['product'].astype(str) if 'product' in df.columns else product
+    dims['qa_level'] = df['qa_level'].astype(str) if 'qa_level' in df.columns else qa_level
+    return dims.dropna(subset=['year', 'month', 'doy']).astype({'year': 'int32', 'month': 'int32', 'doy': 'int32'})
+
+
+def build_aggregate_table(df, value_columns=None, product='default', qa_level='default',
+                          doy_bin_days=DOY_BIN_DAYS):
+    """
+    Aggregate cells of a daily dataset
+
+    Each cell holds the count, min, max and power sums (up to the 4th, about
+    the variable's overall mean for numerical stability) of one variable, so
+    any coarser grouping can be rolled up exactly, including std, skewness and
+    kurtosis.
+
+    Args:
+        df: Daily observations with 'date' (or year/month/doy columns)
+        value_columns: Columns to summarize (albedo columns by default)
+        product: Product label when df has no 'product' column
+        qa_level: QA label when df has no 'qa_level' column
+        doy_bin_days: Width of the day-of-year bins
+
+    Returns:
+        tuple: (cells DataFrame in long format with a 'variable' column,
+                quantiles DataFrame of the whole dataset per variable/product/qa_level)
+    """
+    value_columns = value_columns or default_value_columns(df)
+    dims = _dimension_frame(df, product, qa_level, doy_bin_days)
+    keys = [dims[dim] for dim in DIMENSIONS]
+    group_keys = [dims['product'], dims['qa_level']]
+
+    cells, quantiles = [], []
+    for variable in value_columns:
+        values = df.loc[dims.index, variable].astype('float64')
+        shift = values.mean() if values.notna().any() else 0.0
+        deviation = values - shift
+        parts = pd.DataFrame({
+            'count': values.notna().astype('int64'),
+            's1': deviation,
+            's2': deviation ** 2,
+            's3': deviation ** 3,
+            's4': deviation ** 4,
+            'min': values,
+            'max': values
+        })
+        table = parts.groupby(keys, observed=True).agg({
+            'count': 'sum', 's1': 'sum', 's2': 'sum', 's3': 'sum', 's4': 'sum', 'min': 'min', 'max': 'max'
+        }).reset_index()
+        table.insert(len(DIMENSIONS), 'variable', variable)
+        table['shift'] = shift
+        cells.append(table)
+
+        q = values.groupby(group_keys, observed=True).quantile([0.25, 0.5, 0.75]).unstack()
+        q.columns = ['q25', 'q50', 'q75']
+        q = q.reset_index()
+        q.insert(2, 'variable', variable)
+        quantiles.append(q)
+
+    cell_columns = DIMENSIONS + ['variable', 'count', 's1', 's2', 's3', 's4', 'min', 'max', 'shift']
+    cells = pd.concat(cells, ignore_index=True) if cells else pd.DataFrame(columns=cell_columns)
+    quantiles = pd.concat(quantiles, ignore_index=True) if quantiles else \
+        pd.DataFrame(columns=['product', 'qa_level', 'variable', 'q25', 'q50', 'q75'])
+    return cells, quantiles
+
+
+def _rollup(cells, by, moments=False):
+    """Combine cells into groups, converting power sums to statistics"""
+    # Cells of one variable share the same shift
+    if by:
+        grouped = cells.groupby(by, observed=True, sort=True)
+        sums = grouped[['count', 's1', 's2', 's3', 's4']].sum()
+        sums['min'] = grouped['min'].min()
+        sums['max'] = grouped['max'].max()
+        sums['shift'] = grouped['shift'].first()
+    else:
+        sums = cells[['count', 's1', 's2', 's3', 's4']].sum().to_frame().T
+        sums['min'] = cells['min'].min()
+        sums['max'] = cells['max'].max()
+        sums['shift'] = cells['shift'].iloc[0] if len(cells) else 0.0
+
+    n = sums['count'].astype('float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d = sums['s1'] / n
+        m2 = (sums['s2'] - n * d ** 2).clip(lower=0)
+        result = pd.DataFrame({
+            'count': sums['count'].astype('int64'),
+            'mean': (sums['shift'] + d).where(n > 0),
+            'std': np.sqrt(m2 / (n - 1)).where(n > 1),
+            'min': sums['min'],
+            'max': sums['max']
+        }, index=sums.index)
+
+        if moments:
+            m3 = sums['s3'] - 3 * d * sums['s2'] + 2 * n * d ** 3
+            m4 = sums['s4'] - 4 * d * sums['s3'] + 6 * d ** 2 * sums['s2'] - 3 * n * d ** 4
+            # Bias-corrected estimators, as pandas Series.skew() / .kurtosis()
+            skew = n * np.sqrt(n - 1) / (n - 2) * m3 / m2 ** 1.5
+            kurtosis = (n * (n + 1) * (n - 1) * m4) / ((n - 2) * (n - 3) * m2 ** 2) \
+                - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+            result['skew'] = skew.where(m2 > 0, 0.0).where(n > 2)
+            result['kurtosis'] = kurtosis.where(m2 > 0, 0.0).where(n > 3)
+
+    return result.reset_index() if by else result.reset_index(drop=True)
+
+
+class AggregateTable:
+    """
+    Materialized aggregates of one dataset version
+
+    Queries filter and roll up the precomputed cells, so their cost depends
+    on the number of cells (years × DOY bins) and not on the number of rows.
+    """
+
+    def __init__(self, cells, quantiles, digest=None):
+        self.cells = cells
+        self.quantiles = quantiles
+        self.digest = digest
+        self._results = {}
+
+    @property
+    def variables(self):
+        return list(pd.unique(self.cells['variable']))
+
+    def _select(self, variable, years=None, months=None, doys=None, product=None, qa_level=None):
+        mask = self.cells['variable'] == variable
+        for column, values in (('year', years), ('month', months), ('doy', doys)):
+            if values is not None:
+                mask &= self.cells[column].isin([int(v) for v in values])
+        for column, value in (('product', product), ('qa_level', qa_level)):
+            if value is not None:
+                mask &= self.cells[column] == value
+        return self.cells[mask]
+
+    def query(self, by, variable='albedo_mean', years=None, months=None, doys=None,
+              product=None, qa_level=None, moments=False):
+        """
+        Grouped statistics from the materialized cells
+
+        Args:
+            by: Grouping columns among year, month, doy, product, qa_level ([] for overall)
+            variable: Summarized column
+            years, months, doys: Values to keep (None for all)
+            product, qa_level: Partition to keep (None for all)
+            moments: Also return skew and kurtosis
+
+        Returns:
+            DataFrame: by columns + count, mean, std (sample), min, max
+                       [, skew, kurtosis], sorted by the grouping columns
+        """
+        freeze = lambda values: None if values is None else tuple(sorted(int(v) for v in values))
+        key = (tuple(by), variable, freeze(years), freeze(months), freeze(doys), product, qa_level, moments)
+        result = self._results.get(key)
+        if result is None:
+            cells = self._select(variable, years, months, doys, product, qa_level)
+            result = self._results[key] = _rollup(cells, list(by), moments=moments)
+        # Callers may add display columns
+        return result.copy()
+
+    def describe(self, variables=None, product=None, qa_level=None):
+        """
+        DataFrame.describe() equivalent for the whole dataset
+
+        Returns:
+            DataFrame: count, mean, std, min, 25%, 50%, 75%, max rows per variable
+        """
+        summary = {}
+        for variable in variables or self.variables:
+            stats = self.query([], variable, product=product, qa_level=qa_level).iloc[0]
+            q = self.quantiles[self.quantiles['variable'] == variable]
+            if product is not None:
+                q = q[q['product'] == product]
+            if qa_level is not None:
+                q = q[q['qa_level'] == qa_level]
+            # Quantiles are not additive: exact only for a single partition
+            q = q.iloc[0] if len(q) == 1 else pd.Series({'q25': np.nan, 'q50': np.nan, 'q75': np.nan})
+            summary[variable] = [stats['count'], stats['mean'], stats['std'], stats['min'],
+                                 q['q25'], q['q50'], q['q75'], stats['max']]
+        return pd.DataFrame(summary, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'])
+
+
+def dataset_digest(df, value_columns=None, product='default', qa_level='default', doy_bin_days=DOY_BIN_DAYS):
+    """Content hash of the columns the aggregates depend on"""
+    value_columns = value_columns or default_value_columns(df)
+    columns = [col for col in ['date', 'year', 'month', 'doy', 'product', 'qa_level'] if col in df.columns]
+    columns += [col for col in value_columns if col not in columns]
+
+    digest = hashlib.sha1(f'v{AGGREGATE_VERSION}|{product}|{qa_level}|{doy_bin_days}|{columns}'.encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df[columns], index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:20]
+
+
+def _table_digest(df, dataset_key, value_columns, product, qa_level, doy_bin_days):
+    """Storage key of a materialization: dataset version key if known, content hash otherwise"""
+    dataset_key = dataset_key if dataset_key is not None else get_shared_cache().key_of(df)
+    if dataset_key is None:
+        return dataset_digest(df, value_columns, product, qa_level, doy_bin_days)
+    value_columns = value_columns or default_value_columns(df)
+    # Shared cache keys embed a content fingerprint, so they are stable across processes
+    key = f'v{AGGREGATE_VERSION}|{product}|{qa_level}|{doy_bin_days}|{list(value_columns)}|{dataset_key}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+
+_MEMORY = {}
+_MEMORY_LOCK = threading.Lock()
+
+
+def _table_paths(aggregates_dir, digest):
+    extension = 'parquet' if COLUMNAR_FORMAT == 'parquet' else 'pkl'
+    return (os.path.join(aggregates_dir, f'{digest}_cells.{extension}'),
+            os.path.join(aggregates_dir, f'{digest}_quantiles.{extension}'))
+
+
+def _prune(aggregates_dir, keep=MAX_STORED_TABLES):
+    """Drop the least recently used materializations beyond keep"""
+    entries = [os.path.join(aggregates_dir, name) for name in os.listdir(aggregates_dir) if '_cells.' in name]
+    if len(entries) <= keep:
+        return
+    entries.sort(key=os.path.getmtime)
+    for cells_path in entries[:len(entries) - keep]:
+        for path in (cells_path, cells_path.replace('_cells.', '_quantiles.')):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def get_aggregates(df, value_columns=None, product='default', qa_level='default',
+                   doy_bin_days=DOY_BIN_DAYS, aggregates_dir=None, dataset_key=None):
+    """
+    Materialized aggregates of a dataset (memory, then disk, then built)
+
+    Tables are keyed by the dataset version: dataset_key, else the shared
+    cache key of df, else a content hash of the data (hashing every row, so
+    only for frames of unknown origin). Pass the key of the unfiltered
+    dataset and filter the query results rather than aggregating a filtered
+    frame on every rerun.
+
+    Args:
+        df: Daily observations
+        value_columns: Columns to summarize (albedo columns by default)
+        product: Product label when df has no 'product' column
+        qa_level: QA label when df has no 'qa_level' column
+        doy_bin_days: Width of the day-of-year bins
+        aggregates_dir: Storage directory (outputs/cache/aggregates by default)
+        dataset_key: Version key of df (e.g. SharedDatasetCache.key_of of the
+                     frame it was copied from)
+
+    Returns:
+        AggregateTable
+    """
+    digest = _table_digest(df, dataset_key, value_columns, product, qa_level, doy_bin_days)
+    with _MEMORY_LOCK:
+        table = _MEMORY.get(digest)
+    if table is not None:
+        return table
+
+    aggregates_dir = os.path.normpath(aggregates_dir or DEFAULT_AGGREGATES_DIR)
+    cells_path, quantiles_path = _table_paths(aggregates_dir, digest)
+    try:
+        table = AggregateTable(_read_columnar(cells_path), _read_columnar(quantiles_path), digest)
+        os.utime(cells_path)
+    except Exception:
+        cells, quantiles = build_aggregate_table(df, value_columns, product, qa_level, doy_bin_days)
+        table = AggregateTable(cells, quantiles, digest)
+        try:
+            os.makedirs(aggregates_dir, exist_ok=True)
+            _write_columnar(cells, cells_path)
+            _write_columnar(quantiles, quantiles_path)
+            _prune(aggregates_dir)
+        except Exception:
+            pass  # Materialization on disk is an optimisation only
+
+    with _MEMORY_LOCK:
+        if len(_MEMORY) >= MAX_MEMORY_TABLES:
+            _MEMORY.pop(next(iter(_MEMORY)))
+        _MEMORY[digest] = table
+    return table
@@ -8,6 +8,43 @@ import pandas as pd
 import os
 import glob
 
+from .csv_pipeline import import_csv, import_csv_with_progress
+from .dataset_store import ingest_csv_variants, list_variants, load_variant_by_filename
+
+
+def _generated_data_files():
+    """
+    Generated QA-variant data files, consolidated into the partitioned store
+    
+    Falls back to a plain directory listing if the store cannot be built.
+    """
+    try:
+        ingest_csv_variants()
+        variants = list_variants(kind='data')
+        variants = variants[variants['qa_level'] != 'default']
+        return sorted(variants['filename'])
+    except Exception:
+        csv_pattern = os.path.join("outputs", "csv", "athabasca_melt_season_data_*.csv")
+        return sorted(os.path.basename(f) for f in glob.glob(csv_pattern))
+
+
+def _read_generated_file(filename):
+    """Read a generated file from the columnar store, or from CSV if not ingested"""
+    try:
+        df = load_variant_by_filename(filename)
+        if df is not None and not df.empty:
+            return df
+    except Exception:
+        pass
+    
+    file_path = os.path.join("outputs", "csv", filename)
+    if not os.path.exists(file_path):
+        return None
+    try:
+        return import_csv(file_path)[0]
+    except Exception:
+        return None
+
 
 def create_csv_import_interface():
     """
@@ -35,11 +72,9 @@ def _handle_csv_import_compact():
     """Handle CSV import in compact format"""
     # Quick file selector first
     try:
-        csv_pattern = os.path.join("outputs", "csv", "athabasca_melt_season_data_*.csv")
-        qa_files = glob.glob(csv_pattern)
+        qa_filenames = _generated_data_files()
         
-        if qa_files:
-            qa_filenames = [os.path.basename(f) for f in qa_files]
+        if qa_filenames:
             selected_file = st.selectbox(
                 "Generated files:",
                 [""] + qa_filenames,
@@ -82,12 +117,10 @@ def _show_quick_file_selector():
     """Show quick selector for generated QA files"""
     try:
         # Look for generated QA files
-        csv_pattern = os.path.join("outputs", "csv", "athabasca_melt_season_data_*.csv")
-        qa_files = glob.glob(csv_pattern)
+        qa_filenames = _generated_data_files()
         
-        if qa_files:
+        if qa_filenames:
             st.markdown("##### 🚀 Quick Select Generated Files")
-            qa_filenames = [os.path.basename(f) for f in qa_files]
             
             selected_file = st.selectbox(
                 "Choose from your generated files:",
@@ -109,16 +142,7 @@ def _show_quick_file_selector():
 def _load_quick_selected_file_compact(selected_file):
     """Load a quick-selected file with minimal display"""
     try:
-        file_path = os.path.join("outputs", "csv", selected_file)
-        
-        # Try multiple encodings for CSV reading
-        quick_df = None
-        for encoding in ['utf-8', 'latin-1', 'cp1252']:
-            try:
-                quick_df = pd.read_csv(file_path, encoding=encoding)
-                break
-            except UnicodeDecodeError:
-                continue
+        quick_df = _read_generated_file(selected_file)
         
         if quick_df is None:
             st.error(f"Could not read {selected_file}")
@@ -140,13 +164,9 @@ def _load_quick_selected_file_compact(selected_file):
         
         # Try to load corresponding results file
         results_file = selected_file.replace('_data_', '_results_')
-        results_path = os.path.join("outputs", "csv", results_file)
-        if os.path.exists(results_path):
-            try:
-                results_df = pd.read_csv(results_path)
-                melt_data['results'] = results_df
-            except Exception:
-                pass
+        results_df = _read_generated_file(results_file)
+        if results_df is not None:
+            melt_data['results'] = results_df
         
         return melt_data
         
@@ -175,7 +195,7 @@ def _process_uploaded_files_compact(uploaded_data_file, uploaded_results_file):
         uploaded_results = None
         if uploaded_results_file is not None:
             try:
-                uploaded_results = pd.read_csv(uploaded_results_file)
+                uploaded_results = import_csv(uploaded_results_file)[0]
                 st.success(f"✅ Results: {uploaded_results_file.name}")
             except Exception:
                 st.warning("Could not load results file")
@@ -197,16 +217,7 @@ def _process_uploaded_files_compact(uploaded_data_file, uploaded_results_file):
 def _load_quick_selected_file(selected_file):
     """Load a quick-selected file with validation"""
     try:
-        file_path = os.path.join("outputs", "csv", selected_file)
-        
-        # Try multiple encodings for CSV reading
-        quick_df = None
-        for encoding in ['utf-8', 'latin-1', 'cp1252']:
-            try:
-                quick_df = pd.read_csv(file_path, encoding=encoding)
-                break
-            except UnicodeDecodeError:
-                continue
+        quick_df = _read_generated_file(selected_file)
         
         if quick_df is None:
             st.error(f"Could not read {selected_file} with any encoding")
@@ -235,14 +246,10 @@ def _load_quick_selected_file(selected_file):
         
         # Try to load corresponding results file
         results_file = selected_file.replace('_data_', '_results_')
-        results_path = os.path.join("outputs", "csv", results_file)
-        if os.path.exists(results_path):
-            try:
-                results_df = pd.read_csv(results_path)
-                melt_data['results'] = results_df
-                st.success(f"✅ Also loaded results: {results_file}")
-            except Exception as e:
-                st.warning(f"Could not load results file: {e}")
+        results_df = _read_generated_file(results_file)
+        if results_df is not None:
+            melt_data['results'] = results_df
+            st.success(f"✅ Also loaded results: {results_file}")
         
         st.info("💡 Using selected generated file for analysis")
         return melt_data
@@ -311,7 +318,7 @@ def _process_uploaded_files(uploaded_data_file, uploaded_results_file):
         uploaded_results = None
         if uploaded_results_file is not None:
             try:
-                uploaded_results = pd.read_csv(uploaded_results_file)
+                uploaded_results = import_csv(uploaded_results_file)[0]
                 st.success(f"✅ Results loaded! {len(uploaded_results)} trend analyses")
             except Exception as e:
                 st.warning(f"⚠️ Could not load results file: {e}")
@@ -332,17 +339,8 @@ def _process_uploaded_files(uploaded_data_file, uploaded_results_file):
 
 
 def _load_csv_with_encoding(uploaded_file):
-    """Load CSV with multiple encoding attempts"""
-    for encoding in ['utf-8', 'latin-1', 'cp1252']:
-        try:
-            return pd.read_csv(uploaded_file, encoding=encoding)
-        except UnicodeDecodeError:
-            continue
-        except Exception:
-            break
-    
-    st.error("Could not read the CSV file with any encoding")
-    return None
+    """Load CSV through the streaming import pipeline (encoding and delimiter are sniffed)"""
+    return import_csv_with_progress(uploaded_file)
 
 
 def _validate_csv_data(df):
@@ -0,0 +1,305 @@
+"""
+Streaming CSV Import Pipeline
+Sniffs encoding, delimiter and header from the first bytes, maps column names
+before parsing, parses in chunks with compact dtypes and stores the result once
+in the columnar dataset cache
+"""
+
+import csv
+import hashlib
+import io
+import os
+
+import pandas as pd
+import streamlit as st
+
+from .dataset_cache import DEFAULT_CACHE_DIR, DatasetCache
+
+
+SNIFF_BYTES = 64 * 1024
+DEFAULT_CHUNKSIZE = 50000
+MAX_IMPORT_BYTES = int(float(os.environ.get('ALBEDO_MAX_IMPORT_MB', 200)) * 1024 * 1024)
+
+# Encodings tried, in order, when bytes past the sniffed head do not decode
+FALLBACK_ENCODINGS = ['cp1252', 'latin-1']
+
+# Accepted alternative names for the standard columns
+COLUMN_ALTERNATIVES = {
+    'date': ['date_str', 'observation_date', 'time', 'datetime'],
+    'albedo_mean': ['albedo', 'mean_albedo', 'albedo_avg', 'avg_albedo']
+}
+
+_IMPORT_CACHE = None
+
+
+def _import_cache():
+    global _IMPORT_CACHE
+    if _IMPORT_CACHE is None:
+        _IMPORT_CACHE = DatasetCache(cache_dir=os.path.join(DEFAULT_CACHE_DIR, '..', 'imports'))
+    return _IMPORT_CACHE
+
+
+def _decode_head(head):
+    """Encoding and decoded text of the first bytes (utf-8, then cp1252, then latin-1)"""
+    # Drop a possibly truncated last line so multi-byte characters are not split
+    complete = head[:head.rfind(b'\n') + 1] if b'\n' in head else head
+    if complete.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig', complete[3:].decode('utf-8', errors='replace')
+
+    for encoding in ['utf-8', 'cp1252']:
+        try:
+            return encoding, complete.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return 'latin-1', complete.decode('latin-1')
+
+
+def sniff_csv(head):
+    """
+    Encoding, delimiter, header and sample rows from the first bytes of a CSV
+
+    Args:
+        head: First bytes of the file
+
+    Returns:
+        dict: encoding, delimiter, has_header, columns (raw names) and sample (DataFrame)
+    """
+    encoding, text = _decode_head(head)
+    lines = text.splitlines()
+    sample_text = '\n'.join(lines[:50])
+
+    try:
+        dialect = csv.Sniffer().sniff(sample_text, delimiters=',;\t|')
+        delimiter = dialect.delimiter
+    except csv.Error:
+        delimiter = ','
+    try:
+        has_header = csv.Sniffer().has_header(sample_text)
+    except csv.Error:
+        has_header = True
+
+    sample = pd.read_csv(io.StringIO(text), sep=delimiter, header=0 if has_header else None)
+    if not has_header:
+        sample.columns = [f'column_{i + 1}' for i in range(sample.shape[1])]
+
+    return {
+        'encoding': encoding,
+        'delimiter': delimiter,
+        'has_header': has_header,
+        'columns': [str(col) for col in sample.columns],
+        'sample': sample
+    }
+
+
+def map_columns(columns, alternatives=COLUMN_ALTERNATIVES):
+    """
+    Renames bringing columns to the standard names (case-insensitive)
+
+    Args:
+        columns: Raw column names
+        alternatives: {standard_name: [accepted alternatives]}
+
+    Returns:
+        dict: {raw_name: standard_name} for columns needing a rename
+    """
+    by_lower = {}
+    for col in columns:
+        by_lower.setdefault(col.lower().strip(), col)
+
+    renames = {}
+    for standard, accepted in alternatives.items():
+        for candidate in [standard] + accepted:
+            raw = by_lower.get(candidate.lower())
+            if raw is not None:
+                if raw != standard:
+                    renames[raw] = standard
+                break
+    return renames
+
+
+def _chunk_dtypes(sample, renames):
+    """
+    Explicit per-column read dtypes from the sniffed sample
+
+    Integers are read as nullable Int32, floats as float64, text as category;
+    'date' is parsed separately.
+    """
+    dtypes = {}
+    for raw, dtype in sample.dtypes.items():
+        name = renames.get(raw, raw)
+        if name == 'date':
+            continue
+        if pd.api.types.is_integer_dtype(dtype):
+            within = sample[raw].between(-2**31, 2**31 - 1).all()
+            dtypes[raw] = 'Int32' if within else 'Int64'
+        elif pd.api.types.is_float_dtype(dtype):
+            dtypes[raw] = 'float64'
+        elif pd.api.types.is_bool_dtype(dtype):
+            dtypes[raw] = 'boolean'
+        else:
+            dtypes[raw] = 'category'
+    return dtypes
+
+
+def _finalize(chunks, dtypes, renames):
+    """Concatenate chunks, restoring categories and plain ints where possible"""
+    if not chunks:
+        return pd.DataFrame()
+    df = pd.concat(chunks, ignore_index=True)
+    for raw, dtype in dtypes.items():
+        col = renames.get(raw, raw)
+        if col not in df.columns:
+            continue
+        if dtype == 'category' and df[col].dtype != 'category':
+            # Chunks with different category sets concatenate to object
+            df[col] = df[col].astype('category')
+        elif dtype in ('Int32', 'Int64') and not df[col].isna().any():
+            df[col] = df[col].astype(dtype.lower())
+    return df
+
+
+def _parse_chunks(stream, info, renames, dtypes, chunksize, total_bytes, progress_callback):
+    stream.seek(0)
+    text = io.TextIOWrapper(stream, encoding=info['encoding'], newline='')
+    try:
+        reader = pd.read_csv(
+            text,
+            sep=info['delimiter'],
+            header=0 if info['has_header'] else None,
+            names=None if info['has_header'] else info['columns'],
+            dtype=dtypes,
+            chunksize=chunksize
+        )
+        chunks = []
+        for chunk in reader:
+            chunk = chunk.rename(columns=renames)
+            if 'date' in chunk.columns:
+                chunk['date'] = pd.to_datetime(chunk['date'], errors='coerce')
+            chunks.append(chunk)
+            if progress_callback and total_bytes:
+                progress_callback(min(stream.tell() / total_bytes, 1.0), f"Parsed {sum(map(len, chunks)):,} rows")
+        return _finalize(chunks, dtypes, renames)
+    finally:
+        # Leave the caller's stream open
+        text.detach()
+
+
+def _parse_stream(stream, info, renames, dtypes, chunksize, total_bytes, progress_callback):
+    """
+    Parse the whole stream with the sampled types and the sniffed encoding
+
+    Falls back to permissive types when a later chunk does not fit the
+    sample, and to the next FALLBACK_ENCODINGS when a byte past the sniffed
+    head is invalid in the encoding (info['encoding'] is updated).
+    """
+    guessed = info['encoding']
+    position = FALLBACK_ENCODINGS.index(guessed) + 1 if guessed in FALLBACK_ENCODINGS else 0
+    encodings = [guessed] + FALLBACK_ENCODINGS[position:]
+
+    for attempt, encoding in enumerate(encodings):
+        info['encoding'] = encoding
+        try:
+            try:
+                return _parse_chunks(stream, info, renames, dtypes, chunksize, total_bytes, progress_callback)
+            except UnicodeDecodeError:
+                raise
+            except (ValueError, TypeError, OverflowError):
+                # A later chunk did not fit the sampled types: parse with permissive types
+                return _parse_chunks(stream, info, renames, {}, chunksize, total_bytes, progress_callback)
+        except UnicodeDecodeError:
+            if attempt == len(encodings) - 1:
+                raise
+
+
+def import_csv(source, chunksize=DEFAULT_CHUNKSIZE, max_bytes=MAX_IMPORT_BYTES, progress_callback=None, use_cache=True):
+    """
+    Import a CSV file or upload in a single streaming pass
+
+    Args:
+        source: File path or binary file-like object (e.g. Streamlit UploadedFile)
+        chunksize: Rows per parsed chunk
+        max_bytes: Size limit; larger inputs raise ValueError
+        progress_callback: Function called with (fraction, message)
+        use_cache: Reuse / store the parsed copy in the columnar cache
+
+    Returns:
+        tuple: (DataFrame with standard column names, info dict with encoding,
+               delimiter, renamed columns, size and whether it came from cache)
+    """
+    is_path = isinstance(source, (str, os.PathLike))
+    if is_path:
+        total_bytes = os.path.getsize(source)
+    else:
+        source.seek(0, os.SEEK_END)
+        total_bytes = source.tell()
+        source.seek(0)
+
+    if total_bytes > max_bytes:
+        raise ValueError(f"File is {total_bytes / 1e6:.0f} MB, above the {max_bytes / 1e6:.0f} MB import limit")
+
+    stream = open(source, 'rb') if is_path else source
+    try:
+        # Cache key: path + mtime/size for files, content digest for uploads
+        if is_path:
+            stat = os.stat(source)
+            key = f'import://{os.path.abspath(source)}|{stat.st_mtime}|{stat.st_size}'
+        else:
+            digest = hashlib.sha1()
+            for block in iter(lambda: stream.read(1024 * 1024), b''):
+                digest.update(block)
+            key = f'import://upload/{digest.hexdigest()}'
+            stream.seek(0)
+
+        if use_cache:
+            cached, metadata = _import_cache().get_entry(key)
+            if cached is not None:
+                return cached, dict(metadata, from_cache=True)
+
+        info = sniff_csv(stream.read(SNIFF_BYTES))
+        renames = map_columns(info['columns'])
+        dtypes = _chunk_dtypes(info['sample'], renames)
+
+        df = _parse_stream(stream, info, renames, dtypes, chunksize, total_bytes, progress_callback)
+
+        metadata = {
+            'encoding': info['encoding'],
+            'delimiter': info['delimiter'],
+            'renamed': renames,
+            'bytes': total_bytes
+        }
+        if use_cache:
+            try:
+                _import_cache().put_entry(key, df, metadata)
+            except Exception:
+                pass  # Caching is an optimisation only
+        return df, dict(metadata, from_cache=False)
+    finally:
+        if is_path:
+            stream.close()
+        else:
+            stream.seek(0)
+
+
+def import_csv_with_progress(source, label=None):
+    """
+    Streamlit wrapper of import_csv with a progress bar and error reporting
+
+    Returns:
+        DataFrame or None: None if the file is too large or unreadable
+    """
+    name = label or getattr(source, 'name', None) or os.path.basename(str(source))
+    progress = st.progress(0.0, text=f"Reading {name}...")
+    try:
+        df, info = import_csv(
+            source,
+            progress_callback=lambda fraction, message: progress.progress(fraction, text=f"{name}: {message}")
+        )
+    except Exception as e:
+        progress.empty()
+        st.error(f"❌ Could not read {name}: {e}")
+        return None
+    progress.empty()
+
+    if info.get('renamed'):
+        st.info(f"📝 Renamed columns: {info['renamed']}")
+    return df
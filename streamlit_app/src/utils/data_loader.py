@@ -1,13 +1,13 @@
 """
 Data Loading Utilities for Streamlit Dashboard
-Handles CSV data loading from URLs with fallback to local files
+Handles CSV data loading from local files and URLs through a persistent disk cache
 """
 
 import streamlit as st
 import pandas as pd
-import requests
 import numpy as np
-from io import StringIO
+
+from .dataset_cache import DatasetCache
 
 
 # Configuration for data sources
@@ -45,53 +45,62 @@ DATA_SOURCES = {
 }
 
 
+_DATASET_CACHE = None
+
+
+def get_dataset_cache():
+    """
+    Shared on-disk dataset cache (created on first use)
+    
+    Returns:
+        DatasetCache: Process-wide cache instance
+    """
+    global _DATASET_CACHE
+    if _DATASET_CACHE is None:
+        _DATASET_CACHE = DatasetCache()
+    return _DATASET_CACHE
+
+
 @st.cache_data(ttl=300)  # Cache for 5 minutes
-def load_data_from_url(url, fallback_path=None, show_status=True):
+def load_data_from_url(url, fallback_path=None, show_status=True, prefer_local=True):
     """
-    Load CSV data from URL with local fallback
+    Load CSV data, local file first, then URL through the persistent disk cache
+    
+    Remote data is revalidated with conditional requests (ETag/Last-Modified)
+    and both sources are served from a pre-parsed columnar copy on warm starts,
+    so the dashboard keeps working offline once a dataset has been seen.
     
     Args:
         url: URL to load data from
-        fallback_path: Local file path to use if URL fails
+        fallback_path: Local file path (tried first when prefer_local)
         show_status: Whether to show status messages (default True)
+        prefer_local: Try the local file before the network
         
     Returns:
         tuple: (DataFrame, source_type)
     """
     try:
-        # Try to load from URL first
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        # Parse CSV from response
-        csv_data = StringIO(response.text)
-        df = pd.read_csv(csv_data)
-        
-        if show_status:
-            with st.sidebar:
-                st.success(f"✅ Data loaded from online source: {len(df)} records")
-        return df, "online"
-        
+        df, source_type = get_dataset_cache().load(url, fallback_path, prefer_local=prefer_local)
     except Exception as e:
         if show_status:
             with st.sidebar:
-                st.warning(f"⚠️ Could not load from URL: {str(e)}")
-        
-        # Fallback to local file if available
-        if fallback_path:
-            try:
-                df = pd.read_csv(fallback_path)
-                if show_status:
-                    with st.sidebar:
-                        st.info(f"📁 Using local fallback data: {len(df)} records")
-                return df, "local"
-            except Exception as local_e:
-                if show_status:
-                    with st.sidebar:
-                        st.error(f"❌ Local fallback also failed: {str(local_e)}")
-                return pd.DataFrame(), "failed"
-        
+                st.error(f"❌ Could not load data: {str(e)}")
         return pd.DataFrame(), "failed"
+    
+    if show_status:
+        with st.sidebar:
+            if source_type == 'local':
+                st.info(f"📁 Using local data: {len(df)} records")
+            elif source_type == 'online':
+                st.success(f"✅ Data loaded from online source: {len(df)} records")
+            elif source_type in ('cache', 'revalidated'):
+                st.success(f"✅ Data loaded from cache (up to date): {len(df)} records")
+            elif source_type == 'stale':
+                st.warning(f"⚠️ Online source unreachable, using cached copy: {len(df)} records")
+            else:
+                st.error("❌ Data unavailable online, in cache and locally")
+    
+    return df, source_type
 
 
 def load_dataset(dataset_name):
@@ -0,0 +1,236 @@
+"""
+Persistent Dataset Cache for Streamlit Dashboard
+Local-first CSV loading with a disk cache revalidated by conditional GET
+(ETag / Last-Modified) and a pre-parsed columnar copy for fast warm starts
+"""
+
+import hashlib
+import json
+import os
+import time
+from io import StringIO
+
+import pandas as pd
+import requests
+
+from .output_writer import find_output, read_output
+
+
+# Columnar format for parsed copies: Parquet when pyarrow is available, pickle otherwise
+try:
+    import pyarrow  # noqa: F401
+    COLUMNAR_FORMAT = 'parquet'
+except ImportError:
+    COLUMNAR_FORMAT = 'pickle'
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'ALBEDO_DATASET_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'outputs', 'cache', 'datasets')
+)
+
+
+def _write_columnar(df, path):
+    """Write a DataFrame in the columnar cache format (atomic replace)"""
+    tmp_path = path + '.tmp'
+    try:
+        if COLUMNAR_FORMAT == 'parquet':
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_columnar(path):
+    """Read a DataFrame written by _write_columnar"""
+    if COLUMNAR_FORMAT == 'parquet':
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+class DatasetCache:
+    """
+    Disk cache of CSV datasets keyed by URL or local file
+
+    Each entry is a pre-parsed columnar copy plus a JSON sidecar holding the
+    validators (ETag, Last-Modified) or, for local files, the source mtime
+    and size. Remote entries younger than max_age are served without any
+    network access; older ones are revalidated with a conditional request
+    and served from disk on 304 or when the network is unavailable.
+    """
+
+    def __init__(self, cache_dir=None, max_age=300, timeout=10, session=None):
+        self.cache_dir = os.path.normpath(cache_dir or DEFAULT_CACHE_DIR)
+        self.max_age = max_age
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError as e:
+            print(f"⚠️ Dataset cache directory unavailable, loading without cache: {e}")
+
+    def _entry_paths(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        extension = 'parquet' if COLUMNAR_FORMAT == 'parquet' else 'pkl'
+        base = os.path.join(self.cache_dir, digest)
+        return f'{base}.{extension}', f'{base}_metadata.json'
+
+    def _read_metadata(self, metadata_path):
+        try:
+            with open(metadata_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_entry(self, key, df, metadata):
+        data_path, metadata_path = self._entry_paths(key)
+        _write_columnar(df, data_path)
+        metadata['format'] = COLUMNAR_FORMAT
+        metadata['rows'] = len(df)
+        self._write_metadata(metadata_path, metadata)
+
+    def _write_metadata(self, metadata_path, metadata):
+        with open(metadata_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+
+    def _try_write_entry(self, key, df, metadata):
+        """Store an entry, warning instead of failing when the cache cannot be written"""
+        try:
+            self._write_entry(key, df, metadata)
+        except (OSError, ValueError) as e:  # Disk full, read-only directory, unserializable column
+            print(f"⚠️ Could not write dataset cache entry for {key}: {e}")
+
+    def _read_entry(self, key):
+        """Cached DataFrame and metadata, or (None, None) if absent/unreadable"""
+        data_path, metadata_path = self._entry_paths(key)
+        metadata = self._read_metadata(metadata_path)
+        if metadata is None or metadata.get('format') != COLUMNAR_FORMAT or not os.path.exists(data_path):
+            return None, None
+        try:
+            return _read_columnar(data_path), metadata
+        except Exception:
+            return None, None
+
+    def get_entry(self, key):
+        """
+        Cached DataFrame and metadata for an arbitrary key
+
+        Returns:
+            tuple: (DataFrame, metadata) or (None, None) if absent
+        """
+        return self._read_entry(key)
+
+    def put_entry(self, key, df, metadata=None):
+        """Store a parsed DataFrame under an arbitrary key (e.g. an upload digest)"""
+        self._write_entry(key, df, dict(metadata or {}))
+
+    def load_local(self, path):
+        """
+        Load a local CSV through its columnar copy
+
+        Workflow outputs written as columnar files (src/output_writer.py)
+        next to the CSV name are read directly, without a cache entry.
+
+        Returns:
+            DataFrame or None: None if the file does not exist
+        """
+        path = find_output(os.path.abspath(path))
+        if path is None:
+            return None
+        if not path.endswith('.csv'):
+            return read_output(path, restore_metadata=True)
+
+        stat = os.stat(path)
+        key = f'file://{path}'
+        df, metadata = self._read_entry(key)
+        if df is not None and metadata.get('mtime') == stat.st_mtime and metadata.get('size') == stat.st_size:
+            return df
+
+        df = pd.read_csv(path)
+        self._try_write_entry(key, df, {'source': path, 'mtime': stat.st_mtime, 'size': stat.st_size})
+        return df
+
+    def load_url(self, url):
+        """
+        Load a remote CSV, revalidating the disk copy when it is stale
+
+        Returns:
+            tuple: (DataFrame, status) with status one of 'cache' (fresh copy,
+                   no request), 'revalidated' (304), 'online' (200), 'stale'
+                   (request failed, disk copy served) or 'failed'
+        """
+        df, metadata = self._read_entry(url)
+        if df is not None and time.time() - metadata.get('checked_at', 0) < self.max_age:
+            return df, 'cache'
+
+        headers = {}
+        if metadata:
+            if metadata.get('etag'):
+                headers['If-None-Match'] = metadata['etag']
+            if metadata.get('last_modified'):
+                headers['If-Modified-Since'] = metadata['last_modified']
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304 and df is not None:
+                metadata['checked_at'] = time.time()
+                _, metadata_path = self._entry_paths(url)
+                try:
+                    self._write_metadata(metadata_path, metadata)
+                except OSError as e:
+                    print(f"⚠️ Could not update dataset cache metadata for {url}: {e}")
+                return df, 'revalidated'
+
+            response.raise_for_status()
+            downloaded = pd.read_csv(StringIO(response.text))
+
+        except Exception:
+            if df is not None:
+                return df, 'stale'
+            return pd.DataFrame(), 'failed'
+
+        # A cache write failure must not discard the frame just downloaded
+        self._try_write_entry(url, downloaded, {
+            'source': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'checked_at': time.time()
+        })
+        return downloaded, 'online'
+
+    def load(self, url=None, local_path=None, prefer_local=True):
+        """
+        Load a dataset from the local file or URL, whichever is available first
+
+        Args:
+            url: Remote CSV URL (optional)
+            local_path: Local CSV path (optional)
+            prefer_local: Try the local file before the network
+
+        Returns:
+            tuple: (DataFrame, source_type) with source_type 'local' or a load_url status
+        """
+        if prefer_local and local_path:
+            df = self.load_local(local_path)
+            if df is not None:
+                return df, 'local'
+
+        if url:
+            df, status = self.load_url(url)
+            if status != 'failed':
+                return df, status
+
+        if not prefer_local and local_path:
+            df = self.load_local(local_path)
+            if df is not None:
+                return df, 'local'
+
+        return pd.DataFrame(), 'failed'
+
+    def clear(self):
+        """Remove every cached entry"""
+        for name in os.listdir(self.cache_dir):
+            os.remove(os.path.join(self.cache_dir, name))
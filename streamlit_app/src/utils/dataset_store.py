@@ -0,0 +1,247 @@
+"""
+Partitioned Columnar Store for QA-Variant Datasets
+Consolidates the generated MOD10A1 / melt season CSV variants into one
+dataset partitioned by kind, product and qa_level, with compact dtypes
+and filter/column pushdown on read
+"""
+
+import json
+import os
+import re
+
+import pandas as pd
+
+from .dataset_cache import COLUMNAR_FORMAT
+from .output_writer import find_output, read_output
+
+
+DEFAULT_CSV_DIR = os.path.join("outputs", "csv")
+DEFAULT_STORE_DIR = os.path.join("outputs", "cache", "store")
+
+# Filename conventions of the generated variants: (pattern, product). Workflow
+# outputs are CSV (older runs, optional exports) or columnar (src/output_writer.py)
+_EXTENSION = r'\.(?:csv|parquet|pkl)$'
+VARIANT_PATTERNS = [
+    (re.compile(r'^MOD10A1_(?P<kind>data|results)_(?P<qa_level>.+?)' + _EXTENSION), 'MOD10A1'),
+    (re.compile(r'^athabasca_melt_season_(?P<kind>data|results)_(?P<qa_level>advanced_.+?)' + _EXTENSION), 'melt_season'),
+    (re.compile(r'^athabasca_melt_season_(?P<kind>data|results)' + _EXTENSION), 'melt_season'),
+    (re.compile(r'^athabasca_mcd43a3_(?P<kind>spectral_data|results)' + _EXTENSION), 'mcd43a3'),
+    (re.compile(r'^athabasca_hypsometric_(?P<kind>data|results)' + _EXTENSION), 'hypsometric'),
+]
+
+_MANIFEST_NAME = '_manifest.json'
+
+
+def parse_variant_filename(filename):
+    """
+    Identify kind, product and qa_level from a generated CSV filename
+
+    Returns:
+        dict or None: {'kind', 'product', 'qa_level'} or None if not a known variant
+    """
+    for pattern, product in VARIANT_PATTERNS:
+        match = pattern.match(filename)
+        if match:
+            kind = 'data' if match.group('kind') == 'spectral_data' else match.group('kind')
+            qa_level = match.groupdict().get('qa_level') or 'default'
+            return {'kind': kind, 'product': product, 'qa_level': qa_level}
+    return None
+
+
+def compact_dtypes(df):
+    """
+    Compact column dtypes for storage
+
+    Dates become datetime64, integers are stored as int32 when they fit and
+    low-cardinality strings become categoricals. Floats are kept at full precision.
+    """
+    df = df.copy()
+    if 'date' in df.columns:
+        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    for col in df.select_dtypes(include='integer').columns:
+        # int32 keeps arithmetic on counts safe while halving the footprint
+        if df[col].between(-2**31, 2**31 - 1).all():
+            df[col] = df[col].astype('int32')
+    for col in df.select_dtypes(include='object').columns:
+        if df[col].nunique(dropna=True) <= max(1, len(df) // 2):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def _partition_path(store_dir, kind, product, qa_level):
+    extension = 'parquet' if COLUMNAR_FORMAT == 'parquet' else 'pkl'
+    return os.path.join(store_dir, f'kind={kind}', f'product={product}', f'qa_level={qa_level}', f'part.{extension}')
+
+
+def _read_manifest(store_dir):
+    try:
+        with open(os.path.join(store_dir, _MANIFEST_NAME), 'r') as f:
+            manifest = json.load(f)
+        return manifest if manifest.get('format') == COLUMNAR_FORMAT else {'format': COLUMNAR_FORMAT, 'files': {}}
+    except (OSError, ValueError):
+        return {'format': COLUMNAR_FORMAT, 'files': {}}
+
+
+def _write_manifest(store_dir, manifest):
+    tmp_path = os.path.join(store_dir, _MANIFEST_NAME + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(store_dir, _MANIFEST_NAME))
+
+
+def ingest_csv_variants(csv_dir=DEFAULT_CSV_DIR, store_dir=DEFAULT_STORE_DIR):
+    """
+    Consolidate every known CSV variant into the partitioned store
+
+    Files whose size and modification time are unchanged since the last
+    ingestion are skipped, so calling this on every page load is cheap.
+
+    Args:
+        csv_dir: Directory containing the generated CSV files
+        store_dir: Root directory of the partitioned store
+
+    Returns:
+        dict: Manifest mapping source filename to partition metadata
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = _read_manifest(store_dir)
+    files = manifest['files']
+    changed = False
+
+    present = set()
+    for filename in sorted(os.listdir(csv_dir)) if os.path.isdir(csv_dir) else []:
+        variant = parse_variant_filename(filename)
+        if variant is None:
+            continue
+
+        source = os.path.join(csv_dir, filename)
+        if find_output(source) != source:
+            # Superseded by the newer CSV or columnar file of the same output
+            continue
+        present.add(filename)
+        stat = os.stat(source)
+        entry = files.get(filename)
+        if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size \
+                and os.path.exists(entry['path']):
+            continue
+
+        df = None
+        if not filename.endswith('.csv'):
+            df = read_output(source, restore_metadata=True)
+        for encoding in ['utf-8', 'latin-1', 'cp1252'] if df is None else []:
+            try:
+                df = pd.read_csv(source, encoding=encoding)
+                break
+            except UnicodeDecodeError:
+                continue
+        if df is None:
+            continue
+
+        df = compact_dtypes(df)
+        path = _partition_path(store_dir, **variant)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        if COLUMNAR_FORMAT == 'parquet':
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+        files[filename] = dict(variant, **{
+            'path': path,
+            'mtime': stat.st_mtime,
+            'size': stat.st_size,
+            'rows': len(df),
+            'columns': list(df.columns),
+            'years': sorted(int(y) for y in df['year'].dropna().unique()) if 'year' in df.columns else []
+        })
+        changed = True
+
+    for filename in set(files) - present:
+        del files[filename]
+        changed = True
+
+    if changed:
+        _write_manifest(store_dir, manifest)
+    return files
+
+
+def list_variants(kind='data', product=None, store_dir=DEFAULT_STORE_DIR):
+    """
+    Variants available in the store (from the manifest, no data read)
+
+    Args:
+        kind: 'data' or 'results'
+        product: Restrict to one product (optional)
+        store_dir: Root directory of the partitioned store
+
+    Returns:
+        DataFrame: filename, product, qa_level, rows and years per variant
+    """
+    files = _read_manifest(store_dir)['files']
+    rows = [
+        {'filename': name, 'product': entry['product'], 'qa_level': entry['qa_level'],
+         'rows': entry['rows'], 'years': entry['years']}
+        for name, entry in files.items()
+        if entry['kind'] == kind and (product is None or entry['product'] == product)
+    ]
+    return pd.DataFrame(rows, columns=['filename', 'product', 'qa_level', 'rows', 'years'])
+
+
+def load_variant(product, qa_level, kind='data', columns=None, years=None, months=None,
+                 store_dir=DEFAULT_STORE_DIR):
+    """
+    Read one variant, pushing column selection and year/month filters down
+
+    Args:
+        product: Product partition (e.g. 'MOD10A1', 'melt_season')
+        qa_level: QA partition (e.g. 'cqa1f015', 'advanced_strict', 'default')
+        kind: 'data' or 'results'
+        columns: Columns to read (None for all)
+        years: Years to keep (None for all)
+        months: Months to keep (None for all)
+        store_dir: Root directory of the partitioned store
+
+    Returns:
+        DataFrame: Selected rows and columns (empty if the variant is unknown)
+    """
+    path = _partition_path(store_dir, kind, product, qa_level)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+
+    filters = []
+    if years is not None:
+        filters.append(('year', 'in', [int(y) for y in years]))
+    if months is not None:
+        filters.append(('month', 'in', [int(m) for m in months]))
+
+    if COLUMNAR_FORMAT == 'parquet':
+        try:
+            return pd.read_parquet(path, columns=columns, filters=filters or None)
+        except Exception:
+            # Filter columns missing from this partition (e.g. results files)
+            df = pd.read_parquet(path)
+    else:
+        df = pd.read_pickle(path)
+
+    for column, _, values in filters:
+        if column in df.columns:
+            df = df[df[column].isin(values)]
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df.reset_index(drop=True)
+
+
+def load_variant_by_filename(filename, columns=None, years=None, months=None,
+                             store_dir=DEFAULT_STORE_DIR):
+    """
+    Read a variant through the store using its original CSV filename
+
+    Returns:
+        DataFrame or None: None if the filename is not a known variant
+    """
+    variant = parse_variant_filename(filename)
+    if variant is None:
+        return None
+    return load_variant(variant['product'], variant['qa_level'], variant['kind'],
+                        columns=columns, years=years, months=months, store_dir=store_dir)
@@ -0,0 +1,264 @@
+"""
+Level-of-Detail Downsampling for Time-Series Charts
+Reduces long daily series to a bounded point budget (LTTB or min/max
+bucketing) for the visible window, cached per zoom level
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+# Points sent to Plotly per chart, shared by all its traces
+DEFAULT_MAX_POINTS = 2000
+
+# Windows are snapped to 1/TILES_PER_LEVEL of the zoom level's span so nearby
+# slider positions reuse the same cached reduction
+TILES_PER_LEVEL = 4
+
+
+def _numeric(values):
+    """Float representation of x values (datetimes as nanoseconds)"""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('int64').to_numpy(dtype=float)
+    return values.to_numpy(dtype=float)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets selection
+
+    Keeps the first and last points and, in each bucket, the point forming the
+    largest triangle with the previously kept point and the next bucket's mean,
+    which preserves peaks and the visual shape of the line.
+
+    Args:
+        x: Sorted x values (numeric array)
+        y: y values (numeric array, no NaN)
+        n_out: Number of points to keep
+
+    Returns:
+        ndarray: Indices of the kept points
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            next_x, next_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+
+        area = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return np.unique(selected)
+
+
+def minmax_indices(x, y, n_out):
+    """
+    Min/max-preserving bucketing
+
+    Splits the series into (n_out - 2) / 2 equal-count buckets and keeps each
+    bucket's minimum and maximum (plus both ends), so extremes are never dropped.
+
+    Returns:
+        ndarray: Sorted indices of the kept points
+    """
+    n = len(x)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, (n_out - 2) // 2 + 1).astype(int)
+    selected = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            selected.append(start + int(np.argmin(y[start:end])))
+            selected.append(start + int(np.argmax(y[start:end])))
+    return np.unique(selected)
+
+
+def downsample_frame(df, x_col, y_col, max_points=DEFAULT_MAX_POINTS, x_range=None, method='lttb'):
+    """
+    Rows of df reduced to at most max_points within the visible range
+
+    Whole rows are kept, so companion columns (std, labels, counts) stay
+    aligned with the kept points. Windows holding fewer points than the
+    budget are returned at full resolution.
+
+    Args:
+        df: DataFrame with x_col and y_col
+        x_col: Column on the x axis (dates or numbers)
+        y_col: Column on the y axis
+        max_points: Point budget
+        x_range: (start, end) visible window (None for the full record)
+        method: 'lttb' or 'minmax'
+
+    Returns:
+        DataFrame: Selected rows sorted by x
+    """
+    if df.empty:
+        return df
+
+    data = df.dropna(subset=[y_col])
+    if not data[x_col].is_monotonic_increasing:
+        data = data.sort_values(x_col, kind='stable')
+
+    if x_range is not None:
+        x = data[x_col]
+        inside = (x >= x_range[0]) & (x <= x_range[1])
+        # Keep one neighbour on each side so lines reach the window edges
+        positions = np.flatnonzero(inside.to_numpy())
+        if len(positions) == 0:
+            return data.iloc[0:0]
+        data = data.iloc[max(positions[0] - 1, 0):positions[-1] + 2]
+
+    if len(data) <= max_points:
+        return data
+
+    x = _numeric(data[x_col])
+    y = data[y_col].to_numpy(dtype=float)
+    if method == 'minmax':
+        indices = minmax_indices(x, y, max_points)
+    else:
+        indices = lttb_indices(x, y, max_points)
+    return data.iloc[indices]
+
+
+def lod_window(full_range, visible_range, tiles_per_level=TILES_PER_LEVEL):
+    """
+    Zoom level and snapped window covering the visible range
+
+    Level 0 is the full record; each level halves the span. The visible range
+    is widened to whole tiles of the level so the reduction can be cached.
+
+    Returns:
+        tuple: (level, snapped_start, snapped_end) in the x units of full_range
+    """
+    full_start, full_end = full_range
+    if visible_range is None:
+        return 0, full_start, full_end
+
+    is_datetime = isinstance(full_start, (pd.Timestamp, np.datetime64))
+    to_number = (lambda v: pd.Timestamp(v).value) if is_datetime else float
+    from_number = (lambda v: pd.Timestamp(int(v))) if is_datetime else (lambda v: v)
+
+    lo, hi = to_number(full_start), to_number(full_end)
+    start, end = max(to_number(visible_range[0]), lo), min(to_number(visible_range[1]), hi)
+    span = hi - lo
+    if span <= 0 or end <= start:
+        return 0, full_start, full_end
+
+    level = max(0, int(math.floor(math.log2(span / (end - start)))))
+    tile = span / (2 ** level * tiles_per_level)
+    snapped_start = lo + math.floor((start - lo) / tile) * tile
+    snapped_end = min(lo + math.ceil((end - lo) / tile) * tile, hi)
+    return level, from_number(snapped_start), from_number(snapped_end)
+
+
+def series_key(df, x_col, y_col):
+    """
+    Content key of the plotted columns only
+
+    Fallback for callers without a dataset version key: cheaper than hashing
+    the whole frame with its text columns and index.
+    """
+    return int(pd.util.hash_pandas_object(df[[x_col, y_col]], index=False).sum())
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cached_downsample(dataset_key, _df, x_col, y_col, level, window_start, window_end, max_points, method):
+    # _df is not hashed (dataset_key identifies it); level is part of the cache key only
+    return downsample_frame(_df, x_col, y_col, max_points=max_points,
+                            x_range=(window_start, window_end), method=method)
+
+
+def lod_downsample(df, x_col, y_col, visible_range=None, max_points=DEFAULT_MAX_POINTS, method='lttb',
+                   dataset_key=None):
+    """
+    Cached level-of-detail reduction of a series for the visible range
+
+    Zooming in narrows the window, so the same budget covers fewer days and
+    full resolution is reached once the window holds fewer points than the
+    budget.
+
+    Args:
+        df: DataFrame with x_col and y_col
+        x_col: Column on the x axis
+        y_col: Column on the y axis
+        visible_range: (start, end) or None for the full record
+        max_points: Point budget for this series
+        method: 'lttb' or 'minmax'
+        dataset_key: Hashable key identifying df (e.g. shared cache key and
+                     selection), series_key of the plotted columns if None
+
+    Returns:
+        DataFrame: Selected rows sorted by x
+    """
+    if df.empty or len(df) <= max_points and visible_range is None:
+        return df
+
+    full_range = (df[x_col].min(), df[x_col].max())
+    level, window_start, window_end = lod_window(full_range, visible_range)
+    if dataset_key is None:
+        dataset_key = series_key(df, x_col, y_col)
+    return _cached_downsample(dataset_key, df, x_col, y_col, level, window_start, window_end, max_points, method)
+
+
+def lod_range_slider(label, x_min, x_max, key, help=None):
+    """
+    Visible-window control for LOD charts
+
+    Args:
+        label: Slider label
+        x_min: Earliest x value (date/Timestamp or number)
+        x_max: Latest x value
+        key: Streamlit widget key
+
+    Returns:
+        tuple: (start, end) in the same type as x_min/x_max
+    """
+    if isinstance(x_min, pd.Timestamp):
+        start, end = st.slider(label, min_value=x_min.date(), max_value=x_max.date(),
+                               value=(x_min.date(), x_max.date()), key=key, help=help)
+        return pd.Timestamp(start), pd.Timestamp(end) + pd.Timedelta(hours=23, minutes=59)
+    return st.slider(label, min_value=x_min, max_value=x_max, value=(x_min, x_max), key=key, help=help)
+
+
+def box_statistics(values):
+    """
+    Box-plot summary computed server-side (Tukey fences at 1.5 IQR)
+
+    Sending these five numbers plus the outliers keeps box plots bounded
+    instead of shipping every observation to the browser.
+
+    Returns:
+        dict: q1, median, q3, lowerfence, upperfence and outliers (boolean mask)
+    """
+    values = np.asarray(values, dtype=float)
+    valid = values[~np.isnan(values)]
+    if len(valid) == 0:
+        return None
+    q1, median, q3 = np.percentile(valid, [25, 50, 75])
+    iqr = q3 - q1
+    inside = valid[(valid >= q1 - 1.5 * iqr) & (valid <= q3 + 1.5 * iqr)]
+    lowerfence, upperfence = inside.min(), inside.max()
+    return {
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': lowerfence,
+        'upperfence': upperfence,
+        'outliers': (values < lowerfence) | (values > upperfence)
+    }
@@ -6,11 +6,35 @@ Provides specialized functions for MODIS data processing
 from .initialization import initialize_earth_engine
 from .modis_extraction import get_modis_pixels_for_date
 from .pixel_processing import count_modis_pixels_for_date
-from .geometry_utils import get_roi_from_geojson
+from .geometry_utils import get_roi_from_geojson, get_glacier_roi, load_glacier_geojson
+from .pixel_availability import (
+    build_qa_key,
+    count_pixels_batch,
+    analyze_pixel_availability,
+    PixelAvailabilityIndex
+)
+from .modis_grid import load_glacier_grid, sample_pixel_values, attach_pixel_values
+from .mcd43a3_series import fetch_season_series, melt_season_chunks, SeriesStore
+from .tracing import trace_phase, trace_run, enable_from_env
 
 __all__ = [
     'initialize_earth_engine',
     'get_modis_pixels_for_date', 
     'count_modis_pixels_for_date',
-    'get_roi_from_geojson'
+    'get_roi_from_geojson',
+    'get_glacier_roi',
+    'load_glacier_geojson',
+    'build_qa_key',
+    'count_pixels_batch',
+    'analyze_pixel_availability',
+    'PixelAvailabilityIndex',
+    'load_glacier_grid',
+    'sample_pixel_values',
+    'attach_pixel_values',
+    'fetch_season_series',
+    'melt_season_chunks',
+    'SeriesStore',
+    'trace_phase',
+    'trace_run',
+    'enable_from_env'
 ]
\ No newline at end of file
@@ -3,6 +3,42 @@ Geometry Utilities for Earth Engine
 Handles GeoJSON to Earth Engine geometry conversion
 """
 
+import os
+import sys
+
+
+# Root src/ directory, where the shared glacier ROI provider lives
+_ROOT_SRC_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '..', 'src'
+))
+
+
+def get_glacier_roi():
+    """
+    Shared lazy glacier ROI provider (src/glacier_roi.py of the main codebase)
+
+    The mask is parsed once and cached by content hash for the dashboard,
+    the workflows and config alike.
+    """
+    if _ROOT_SRC_DIR not in sys.path:
+        sys.path.append(_ROOT_SRC_DIR)
+    from glacier_roi import get_glacier_roi as _get_glacier_roi
+    return _get_glacier_roi()
+
+
+def load_glacier_geojson():
+    """
+    Glacier mask as GeoJSON (shapefile preferred, GeoJSON mask otherwise)
+
+    Returns:
+        dict: WGS84 FeatureCollection, or None if no mask could be read
+    """
+    try:
+        return get_glacier_roi().geojson
+    except Exception as e:
+        print(f"Error loading glacier mask: {e}")
+        return None
+
 
 def get_roi_from_geojson(glacier_geojson):
     """
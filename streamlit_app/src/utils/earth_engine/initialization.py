@@ -5,6 +5,8 @@ Handles authentication and initialization with multiple fallback methods
 
 import streamlit as st
 
+from .tracing import enable_from_env
+
 
 @st.cache_data(ttl=60)  # Cache for 1 minute only
 def initialize_earth_engine():
@@ -21,6 +23,7 @@ def initialize_earth_engine():
     
     try:
         import ee
+        enable_from_env()  # Opt-in call tracing (ALBEDO_EE_TRACE)
         
         # METHOD 1: Try regular service account format
         if 'gee_service_account' in st.secrets:
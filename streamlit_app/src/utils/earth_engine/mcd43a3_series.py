@@ -0,0 +1,177 @@
+"""
+Collection-level MCD43A3 Time Series Module
+Reduces every MCD43A3 image over the glacier server-side and downloads the
+daily series one melt season per request, with resumable on-disk storage
+"""
+
+import json
+import math
+import os
+from datetime import date as date_cls
+
+import pandas as pd
+
+from .tracing import trace_phase
+
+
+DEFAULT_SERIES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '..', 'outputs', 'cache', 'mcd43a3_series'
+)
+
+QA_LEVEL_THRESHOLDS = {
+    'strict': 0,
+    'standard': 1,
+    'relaxed': 2
+}
+
+# Melt season bounds (June 1 - September 30)
+MELT_SEASON_MONTHS = (6, 9)
+
+
+def _mcd43a3_albedo(image, qa_threshold, band_selection, diffuse_fraction):
+    """Quality-filtered albedo band (same rules as the map extraction)"""
+    qa_shortwave = image.select('BRDF_Albedo_Band_Mandatory_Quality_shortwave')
+    good_quality = qa_shortwave.lte(qa_threshold)
+
+    bsa_masked = image.select('Albedo_BSA_shortwave').updateMask(good_quality).multiply(0.001)
+    wsa_masked = image.select('Albedo_WSA_shortwave').updateMask(good_quality).multiply(0.001)
+    blue_sky = bsa_masked.multiply(1 - diffuse_fraction).add(wsa_masked.multiply(diffuse_fraction))
+
+    # Williamson & Menounos (2021) range filter on blue-sky albedo
+    range_mask = blue_sky.gte(0.05).And(blue_sky.lte(0.99))
+
+    if band_selection == 'vis':
+        albedo = image.select('Albedo_BSA_vis').updateMask(good_quality).multiply(0.001)
+    elif band_selection == 'nir':
+        albedo = image.select('Albedo_BSA_nir').updateMask(good_quality).multiply(0.001)
+    else:
+        albedo = blue_sky
+    return albedo.updateMask(range_mask).rename('albedo')
+
+
+def _season_feature_collection(start_date, end_date, roi, qa_threshold, band_selection, diffuse_fraction):
+    """Server-side {date, albedo_mean, albedo_std, pixel_count} feature per image"""
+    import ee
+
+    reducer = (ee.Reducer.mean()
+               .combine(ee.Reducer.stdDev(), sharedInputs=True)
+               .combine(ee.Reducer.count(), sharedInputs=True)
+               .unweighted())  # pixel-center membership, as in the centroid-based counts
+
+    def reduce_image(image):
+        stats = _mcd43a3_albedo(image, qa_threshold, band_selection, diffuse_fraction).reduceRegion(
+            reducer=reducer, geometry=roi, scale=500, maxPixels=1e6
+        )
+        return ee.Feature(None, {
+            'date': image.date().format('YYYY-MM-dd'),
+            'albedo_mean': stats.get('albedo_mean'),
+            'albedo_std': stats.get('albedo_stdDev'),
+            'pixel_count': stats.get('albedo_count')
+        })
+
+    images = (ee.ImageCollection('MODIS/061/MCD43A3')
+              .filterDate(start_date, ee.Date(end_date).advance(1, 'day'))
+              .filterBounds(roi)
+              .filter(ee.Filter.calendarRange(MELT_SEASON_MONTHS[0], MELT_SEASON_MONTHS[1], 'month')))
+    return images.map(reduce_image)
+
+
+@trace_phase('mcd43a3_series')
+def fetch_season_series(start_date, end_date, roi, qa_threshold=1, band_selection='shortwave',
+                        diffuse_fraction=0.2):
+    """
+    Daily glacier-mean MCD43A3 albedo for a date range in one getInfo() call
+
+    Args:
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD), inclusive
+        roi: Earth Engine geometry for glacier boundary
+        qa_threshold: 0=full BRDF only, 1=include magnitude inversions
+        band_selection: 'shortwave' (blue-sky), 'vis' or 'nir'
+        diffuse_fraction: Diffuse fraction for blue-sky albedo
+
+    Returns:
+        list: Dicts with date, albedo_mean, albedo_std and pixel_count for
+              days with at least one valid pixel
+    """
+    import ee
+
+    features = _season_feature_collection(start_date, end_date, roi, qa_threshold, band_selection, diffuse_fraction)
+    columns = ['date', 'albedo_mean', 'albedo_std', 'pixel_count']
+    rows = features.reduceColumns(ee.Reducer.toList(len(columns)), columns).get('list').getInfo()
+
+    series = []
+    for day, mean, std, count in rows or []:
+        count = int(count or 0)
+        if count == 0 or mean is None:
+            continue
+        # Earth Engine returns the population std; report the sample std like pandas
+        sample_std = std * math.sqrt(count / (count - 1)) if count > 1 and std is not None else float('nan')
+        series.append({
+            'date': day,
+            'albedo_mean': mean,
+            'albedo_std': sample_std,
+            'pixel_count': count
+        })
+    return series
+
+
+def melt_season_chunks(start_date, end_date):
+    """
+    One (start, end) chunk per melt season within the requested range
+
+    Returns:
+        list: (year, chunk_start, chunk_end) tuples with YYYY-MM-DD strings
+    """
+    start_dt = pd.to_datetime(start_date)
+    end_dt = pd.to_datetime(end_date)
+    chunks = []
+    for year in range(start_dt.year, end_dt.year + 1):
+        chunk_start = max(start_dt, pd.Timestamp(year, MELT_SEASON_MONTHS[0], 1))
+        chunk_end = min(end_dt, pd.Timestamp(year, MELT_SEASON_MONTHS[1], 30))
+        if chunk_start <= chunk_end:
+            chunks.append((year, chunk_start.strftime('%Y-%m-%d'), chunk_end.strftime('%Y-%m-%d')))
+    return chunks
+
+
+class SeriesStore:
+    """
+    On-disk store of extracted daily series, one JSON file per QA/band setting
+
+    Completed chunks are recorded so an interrupted or repeated extraction
+    only requests what is missing, across sessions and restarts.
+    """
+
+    def __init__(self, qa_level, band_selection, diffuse_fraction, series_dir=None):
+        series_dir = os.path.normpath(series_dir or DEFAULT_SERIES_DIR)
+        name = f"{qa_level}_{band_selection}_df{int(round(diffuse_fraction * 100)):02d}.json"
+        self.path = os.path.join(series_dir, name)
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        self.rows = state.get('rows', {})
+        self.completed = {tuple(chunk) for chunk in state.get('completed', [])}
+
+    def is_complete(self, chunk_start, chunk_end):
+        return (chunk_start, chunk_end) in self.completed
+
+    def add_chunk(self, chunk_start, chunk_end, rows):
+        """Store a chunk's rows; chunks reaching today stay open for refresh"""
+        for row in rows:
+            self.rows[row['date']] = row
+        if pd.Timestamp(chunk_end).date() < date_cls.today():
+            self.completed.add((chunk_start, chunk_end))
+        self.save()
+
+    def series(self, start_date, end_date):
+        """Stored rows within [start_date, end_date], sorted by date"""
+        return [self.rows[day] for day in sorted(self.rows) if start_date <= day <= end_date]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'rows': self.rows, 'completed': sorted(self.completed)}, f)
+        os.replace(tmp_path, self.path)
@@ -5,8 +5,10 @@ Handles pixel extraction and Terra-Aqua fusion for MODIS products
 
 import streamlit as st
 from .pixel_processing import _process_pixels_to_geojson, safe_int_conversion
+from .tracing import trace_phase
 
 
+@trace_phase('pixel_map')
 def get_modis_pixels_for_date(date, roi, product='MOD10A1', qa_threshold=1, use_advanced_qa=False, algorithm_flags={}, silent=False, selected_band=None, diffuse_fraction=None):
     """
     Get MODIS pixel boundaries with albedo values for a specific date
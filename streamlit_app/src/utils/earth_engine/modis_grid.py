@@ -0,0 +1,257 @@
+"""
+Local MODIS Sinusoidal Grid Module
+Computes the 500 m MODIS cells covering the glacier once (polygons, glacier-
+clipped parts, intersection areas, centroid-in-glacier flags) with pyproj and
+shapely, caches them on disk, and attaches per-date pixel values to them
+"""
+
+import hashlib
+import json
+import math
+import os
+
+from .region_tiling import DEFAULT_TILE_CELLS, run_tiles, tile_key
+
+
+# MODIS sinusoidal grid (sphere of radius 6371007.181 m, 36 × 18 tiles of 2400 cells at 500 m)
+SINUSOIDAL_PROJ4 = '+proj=sinu +lon_0=0 +x_0=0 +y_0=0 +R=6371007.181 +units=m +no_defs'
+MODIS_SINUSOIDAL_CRS = 'SR-ORG:6974'  # Earth Engine code of the same projection
+GRID_ORIGIN_X = -20015109.354
+GRID_ORIGIN_Y = 10007554.677
+CELL_SIZE_500M = 463.312716525
+
+# Pixels whose glacier-clipped part is smaller than this are not displayed (m²)
+MIN_INTERSECT_AREA = 25000
+
+# Cells sampled in one request; larger grids (icefield-scale regions) are
+# sampled per grid-aligned tile of DEFAULT_TILE_CELLS × DEFAULT_TILE_CELLS cells
+MAX_CELLS_PER_REQUEST = DEFAULT_TILE_CELLS * DEFAULT_TILE_CELLS
+
+DEFAULT_GRID_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '..', 'outputs', 'cache', 'modis_grid'
+)
+
+
+def _transformers():
+    from pyproj import Transformer
+    to_sinu = Transformer.from_crs('EPSG:4326', SINUSOIDAL_PROJ4, always_xy=True)
+    to_wgs84 = Transformer.from_crs(SINUSOIDAL_PROJ4, 'EPSG:4326', always_xy=True)
+    return to_sinu, to_wgs84
+
+
+def _glacier_geometry(glacier_geojson):
+    """Shapely geometry (WGS84) from a GeoJSON FeatureCollection, Feature or geometry"""
+    from shapely.geometry import shape
+    from shapely.ops import unary_union
+    from shapely.validation import make_valid
+
+    # Digitized masks may self-intersect; repair before overlay operations
+    if glacier_geojson.get('type') == 'FeatureCollection':
+        return unary_union([make_valid(shape(f['geometry'])) for f in glacier_geojson['features']])
+    if glacier_geojson.get('type') == 'Feature':
+        return make_valid(shape(glacier_geojson['geometry']))
+    return make_valid(shape(glacier_geojson))
+
+
+def compute_glacier_grid(glacier_geojson, cell_size=CELL_SIZE_500M):
+    """
+    MODIS cells intersecting the glacier
+
+    Areas are computed in the sinusoidal projection, which is equal-area, so
+    they are true ground areas.
+
+    Args:
+        glacier_geojson: Glacier boundary as GeoJSON (WGS84)
+        cell_size: Grid cell size in meters (500 m MODIS by default)
+
+    Returns:
+        list: One dict per cell with row, col (global grid indices), center
+              (lon, lat), cell and clipped geometries (GeoJSON, WGS84),
+              intersect_area (m²) and centroid_in_glacier
+    """
+    from shapely.geometry import box, mapping, Point
+    from shapely.ops import transform
+    from shapely.prepared import prep
+    from shapely.validation import make_valid
+
+    to_sinu, to_wgs84 = _transformers()
+    glacier = make_valid(transform(to_sinu.transform, _glacier_geometry(glacier_geojson)))
+    glacier_prepared = prep(glacier)
+
+    min_x, min_y, max_x, max_y = glacier.bounds
+    col_start = math.floor((min_x - GRID_ORIGIN_X) / cell_size)
+    col_end = math.floor((max_x - GRID_ORIGIN_X) / cell_size)
+    row_start = math.floor((GRID_ORIGIN_Y - max_y) / cell_size)
+    row_end = math.floor((GRID_ORIGIN_Y - min_y) / cell_size)
+
+    cells = []
+    for row in range(row_start, row_end + 1):
+        y_top = GRID_ORIGIN_Y - row * cell_size
+        for col in range(col_start, col_end + 1):
+            x_left = GRID_ORIGIN_X + col * cell_size
+            cell = box(x_left, y_top - cell_size, x_left + cell_size, y_top)
+            if not glacier_prepared.intersects(cell):
+                continue
+
+            clipped = cell.intersection(glacier)
+            center = cell.centroid
+            center_lon, center_lat = to_wgs84.transform(center.x, center.y)
+            cells.append({
+                'row': row,
+                'col': col,
+                'center': [center_lon, center_lat],
+                'cell_geometry': mapping(transform(to_wgs84.transform, cell)),
+                'clipped_geometry': mapping(transform(to_wgs84.transform, clipped)),
+                'intersect_area': clipped.area,
+                'centroid_in_glacier': glacier_prepared.contains(Point(center.x, center.y))
+            })
+    return cells
+
+
+def _geometry_digest(glacier_geojson, cell_size):
+    payload = json.dumps(glacier_geojson, sort_keys=True) + f'|{cell_size}'
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def load_glacier_grid(glacier_geojson, cell_size=CELL_SIZE_500M, cache_dir=None):
+    """
+    Cached glacier grid (computed on first use, then read from disk)
+
+    The cache file is keyed by a digest of the glacier geometry, so a new
+    mask produces a new grid automatically.
+    """
+    cache_dir = os.path.normpath(cache_dir or DEFAULT_GRID_CACHE_DIR)
+    cache_path = os.path.join(cache_dir, f'grid_{_geometry_digest(glacier_geojson, cell_size)}.json')
+
+    try:
+        with open(cache_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    cells = compute_glacier_grid(glacier_geojson, cell_size)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(cells, f)
+    os.replace(tmp_path, cache_path)
+    return cells
+
+
+def sample_pixel_values(image, cells, bands=('albedo_daily',), cell_size=CELL_SIZE_500M, max_workers=None,
+                        optional_bands=(), return_band_names=False):
+    """
+    Per-cell pixel values of an Earth Engine image
+
+    The image is sampled at the cached cell centers on the native MODIS grid,
+    replacing reduceToVectors, server-side intersections and per-pixel lookups.
+    Glacier-sized grids take one request; larger ones are split into
+    grid-aligned tiles sampled concurrently, each cell in exactly one tile.
+
+    Args:
+        image: ee.Image with the requested bands
+        cells: Cells from load_glacier_grid
+        bands: Band names to sample
+        max_workers: Concurrent tile requests (large grids only)
+        optional_bands: Bands sampled when the image has them (None otherwise)
+        return_band_names: Also return the image band names, fetched in the
+                           same request as the values
+
+    Returns:
+        dict: {(row, col): {band: value}} for cells with data, or
+              (values, band_names) with return_band_names
+    """
+    if len(cells) <= MAX_CELLS_PER_REQUEST:
+        values, band_names = _sample_cells(image, cells, bands, cell_size, optional_bands)
+        return (values, band_names) if return_band_names else values
+
+    tiles = {}
+    for cell in cells:
+        tiles.setdefault(tile_key(cell['row'], cell['col']), []).append(cell)
+    print(f"Sampling {len(cells)} MODIS cells in {len(tiles)} tiles")
+
+    values, band_names = {}, []
+    for tile_values, tile_band_names in run_tiles(
+            lambda tile_cells: _sample_cells(image, tile_cells, bands, cell_size, optional_bands),
+            list(tiles.values()), max_workers):
+        values.update(tile_values)
+        band_names = tile_band_names
+    return (values, band_names) if return_band_names else values
+
+
+def _sample_cells(image, cells, bands, cell_size, optional_bands=()):
+    """Values at the cell centers and the image band names in one request"""
+    import ee
+
+    band_names = image.bandNames()
+    optional_bands = [band for band in optional_bands if band not in bands]
+    for band in optional_bands:
+        # A missing optional band is sampled from a fully masked placeholder
+        placeholder = ee.Image.constant(0).rename(band).updateMask(ee.Image.constant(0))
+        image = ee.Image(ee.Algorithms.If(band_names.contains(band), image, image.addBands(placeholder)))
+    sampled_bands = list(bands) + optional_bands
+
+    centers = ee.FeatureCollection([
+        ee.Feature(ee.Geometry.Point(cell['center']), {'row': cell['row'], 'col': cell['col']})
+        for cell in cells
+    ])
+    sampled = image.select(sampled_bands).reduceRegions(
+        collection=centers,
+        reducer=ee.Reducer.first().setOutputs(sampled_bands) if len(sampled_bands) == 1 else ee.Reducer.first(),
+        crs=MODIS_SINUSOIDAL_CRS,
+        crsTransform=[cell_size, 0, GRID_ORIGIN_X, 0, -cell_size, GRID_ORIGIN_Y]
+    )
+    columns = ['row', 'col'] + sampled_bands
+    # Optional bands come last so toList keeps the cells where they are masked
+    rows = sampled.reduceColumns(ee.Reducer.toList(len(columns), len(optional_bands)), columns).get('list')
+    result = ee.Dictionary({'rows': rows, 'band_names': band_names}).getInfo()
+
+    values = {}
+    for row_values in result['rows'] or []:
+        row, col, *band_values = row_values
+        if all(value is None for value in band_values):
+            continue
+        values[(int(row), int(col))] = dict(zip(sampled_bands, band_values))
+    return values, result['band_names']
+
+
+def attach_pixel_values(cells, values, properties=None, min_intersect_area=MIN_INTERSECT_AREA):
+    """
+    GeoJSON of glacier-clipped pixels carrying their values
+
+    Args:
+        cells: Cells from load_glacier_grid
+        values: {(row, col): {'albedo_daily': value, ['satellite_source': 1|2]}}
+        properties: Properties added to every feature (date, product, ...)
+        min_intersect_area: Drop pixels with smaller glacier overlap (m²)
+
+    Returns:
+        dict: GeoJSON FeatureCollection with the same properties as the
+              Earth Engine vectorization path (albedo_value, satellite, ...)
+    """
+    features = []
+    for cell in cells:
+        cell_values = values.get((cell['row'], cell['col']))
+        if cell_values is None or cell['intersect_area'] < min_intersect_area:
+            continue
+        albedo = cell_values.get('albedo_daily')
+        if albedo is None:
+            continue
+
+        feature_properties = dict(properties or {})
+        feature_properties.update({
+            'albedo_value': round(float(albedo), 3),
+            'row': cell['row'],
+            'col': cell['col'],
+            'intersect_area': cell['intersect_area'],
+            'centroid_in_glacier': cell['centroid_in_glacier']
+        })
+        if cell_values.get('satellite_source') is not None:
+            feature_properties['satellite'] = 'Terra' if cell_values['satellite_source'] == 1 else 'Aqua'
+
+        features.append({
+            'type': 'Feature',
+            'geometry': cell['clipped_geometry'],
+            'properties': feature_properties
+        })
+    return {'type': 'FeatureCollection', 'features': features}
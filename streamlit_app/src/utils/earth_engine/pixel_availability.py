@@ -0,0 +1,206 @@
+"""
+Batched Pixel Availability Module
+Counts valid MODIS pixels for many dates, products and QA settings in a single
+Earth Engine request and persists the results in a local availability index
+"""
+
+import hashlib
+import json
+import os
+
+from .tracing import trace_phase
+
+
+DEFAULT_INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '..', 'outputs', 'cache', 'pixel_availability.json'
+)
+
+# Algorithm flag name -> bit of NDSI_Snow_Cover_Algorithm_Flags_QA
+ALGORITHM_FLAG_BITS = {
+    'no_inland_water': 0,
+    'no_low_visible': 1,
+    'no_low_ndsi': 2,
+    'no_temp_issues': 3,
+    'no_high_swir': 4,
+    'no_clouds': 5,
+    'no_cloud_clear': 6,
+    'no_shadows': 7
+}
+
+
+def build_qa_key(product, qa_threshold, use_advanced_qa=False, algorithm_flags=None):
+    """
+    Stable key for a product/QA combination
+
+    Same layout as the dashboard's session key, but the flag digest is a
+    content hash so it is identical across processes and sessions.
+    """
+    flags = sorted((algorithm_flags or {}).items())
+    digest = hashlib.md5(str(flags).encode('utf-8')).hexdigest()[:12]
+    return f"{product}_{qa_threshold}_{use_advanced_qa}_{digest}"
+
+
+def _mask_mod10a1(image, qa_threshold, use_advanced_qa, algorithm_flags):
+    """Quality mask for MOD10A1/MYD10A1 (same rules as count_modis_pixels_for_date)"""
+    albedo = image.select('Snow_Albedo_Daily_Tile')
+    qa = image.select('NDSI_Snow_Cover_Basic_QA')
+    quality = albedo.gte(5).And(albedo.lte(99)).And(qa.lte(qa_threshold))
+
+    if use_advanced_qa and algorithm_flags:
+        algo_qa = image.select('NDSI_Snow_Cover_Algorithm_Flags_QA')
+        for flag, bit in ALGORITHM_FLAG_BITS.items():
+            if algorithm_flags.get(flag, False):
+                quality = quality.And(algo_qa.bitwiseAnd(1 << bit).eq(0))
+
+    return albedo.updateMask(quality).multiply(0.01)
+
+
+def _mask_mcd43a3(image, qa_threshold):
+    """Quality mask for MCD43A3 (same rules as count_modis_pixels_for_date)"""
+    albedo = image.select('Albedo_BSA_shortwave')
+    qa_band1 = image.select('BRDF_Albedo_Band_Mandatory_Quality_Band1')
+    masked = albedo.updateMask(qa_band1.lte(qa_threshold)).multiply(0.001)
+    return masked.updateMask(masked.gte(0.0).And(masked.lte(1.0)))
+
+
+def _count_feature(date, roi, product, qa_threshold, use_advanced_qa, algorithm_flags):
+    """Server-side feature {date, qa_key, pixel_count} for one date and setting"""
+    import ee
+
+    date = ee.String(date)
+    if product == 'MCD43A3':
+        images = (ee.ImageCollection('MODIS/061/MCD43A3')
+                  .filterDate(ee.Date(date).advance(-1, 'day'), ee.Date(date).advance(1, 'day'))
+                  .filterBounds(roi))
+        processed = images.map(lambda image: _mask_mcd43a3(image, qa_threshold)).mean()
+    else:
+        start_date = ee.Date(date)
+        end_date = start_date.advance(1, 'day')
+        images = (ee.ImageCollection('MODIS/061/MOD10A1').filterDate(start_date, end_date).filterBounds(roi)
+                  .merge(ee.ImageCollection('MODIS/061/MYD10A1').filterDate(start_date, end_date).filterBounds(roi)))
+        processed = images.map(
+            lambda image: _mask_mod10a1(image, qa_threshold, use_advanced_qa, algorithm_flags)
+        ).mosaic()
+
+    # Centroid-based count, as in count_modis_pixels_for_date
+    samples = processed.sample(region=roi, scale=500, geometries=True)
+    inside = samples.map(lambda feature: feature.set('inside_glacier', roi.contains(feature.geometry())))
+    count = inside.filter(ee.Filter.eq('inside_glacier', True)).size()
+
+    return ee.Feature(None, {
+        'date': date,
+        'qa_key': build_qa_key(product, qa_threshold, use_advanced_qa, algorithm_flags),
+        'pixel_count': ee.Algorithms.If(images.size().eq(0), 0, count)
+    })
+
+
+@trace_phase('pixel_availability')
+def count_pixels_batch(dates, roi, settings):
+    """
+    Valid-pixel counts for every date and QA setting in one getInfo() call
+
+    Args:
+        dates: List of date strings (YYYY-MM-DD)
+        roi: Earth Engine geometry for glacier boundary
+        settings: List of dicts with product, qa_threshold, use_advanced_qa, algorithm_flags
+
+    Returns:
+        dict: {qa_key: {date: pixel_count}}
+    """
+    import ee
+
+    if not dates or not settings:
+        return {}
+
+    date_list = ee.List(list(dates))
+    collections = []
+    for setting in settings:
+        product = setting.get('product', 'MOD10A1')
+        qa_threshold = setting.get('qa_threshold', 1)
+        use_advanced_qa = setting.get('use_advanced_qa', False)
+        algorithm_flags = setting.get('algorithm_flags') or {}
+        collections.append(ee.FeatureCollection(date_list.map(
+            lambda date, product=product, qa_threshold=qa_threshold,
+            use_advanced_qa=use_advanced_qa, algorithm_flags=algorithm_flags:
+            _count_feature(date, roi, product, qa_threshold, use_advanced_qa, algorithm_flags)
+        )))
+
+    merged = ee.FeatureCollection(collections).flatten()
+    result = merged.reduceColumns(ee.Reducer.toList(3), ['qa_key', 'date', 'pixel_count']).get('list').getInfo()
+
+    counts = {}
+    for qa_key, date, pixel_count in result or []:
+        counts.setdefault(qa_key, {})[date] = int(pixel_count or 0)
+    return counts
+
+
+class PixelAvailabilityIndex:
+    """
+    Local JSON index of valid-pixel counts keyed by QA key and date
+
+    Shared by all dashboard sessions so analysed dates never hit Earth Engine twice.
+    """
+
+    def __init__(self, path=None):
+        self.path = os.path.normpath(path or DEFAULT_INDEX_PATH)
+        self._index = {}
+        try:
+            with open(self.path, 'r') as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+
+    def get(self, qa_key):
+        """Known counts {date: pixel_count} for a QA key"""
+        return dict(self._index.get(qa_key, {}))
+
+    def missing(self, qa_key, dates):
+        """Dates not yet analysed for a QA key"""
+        known = self._index.get(qa_key, {})
+        return [date for date in dates if date not in known]
+
+    def update(self, counts):
+        """Merge {qa_key: {date: count}} results and save"""
+        for qa_key, date_counts in counts.items():
+            self._index.setdefault(qa_key, {}).update(date_counts)
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.path)
+
+
+def analyze_pixel_availability(dates, roi, product, qa_thresholds, use_advanced_qa=False,
+                               algorithm_flags=None, index=None):
+    """
+    Fill the availability index for dates × QA thresholds, querying only what is missing
+
+    Args:
+        dates: Candidate date strings
+        roi: Earth Engine geometry for glacier boundary
+        product: 'MOD10A1' or 'MCD43A3'
+        qa_thresholds: QA thresholds to evaluate in the same request
+        use_advanced_qa: Enable advanced algorithm flags (MOD10A1 only)
+        algorithm_flags: Dictionary of algorithm flags to apply
+        index: PixelAvailabilityIndex (default location if None)
+
+    Returns:
+        PixelAvailabilityIndex: Updated index
+    """
+    index = index or PixelAvailabilityIndex()
+    settings = []
+    missing_dates = set()
+    for qa_threshold in qa_thresholds:
+        qa_key = build_qa_key(product, qa_threshold, use_advanced_qa, algorithm_flags)
+        missing = index.missing(qa_key, dates)
+        if missing:
+            missing_dates.update(missing)
+            settings.append({'product': product, 'qa_threshold': qa_threshold,
+                             'use_advanced_qa': use_advanced_qa, 'algorithm_flags': algorithm_flags})
+
+    if settings:
+        index.update(count_pixels_batch(sorted(missing_dates), roi, settings))
+    return index
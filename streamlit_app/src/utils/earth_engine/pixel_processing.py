@@ -4,6 +4,7 @@ Handles conversion of MODIS images to GeoJSON pixel features
 """
 
 import streamlit as st
+from .tracing import trace_phase
 
 
 def safe_int_conversion(value):
@@ -24,17 +25,66 @@ def safe_int_conversion(value):
         return int(value)
 
 
+def _process_pixels_with_local_grid(combined_image, roi, date, product_name, quality_description,
+                                    diffuse_fraction=None):
+    """
+    Pixel GeoJSON from the locally cached MODIS grid (one Earth Engine request)
+
+    Cell polygons, glacier clipping and intersection areas come from the
+    on-disk grid; only the pixel values (and the image band names, to detect
+    the satellite source band) are fetched from Earth Engine.
+
+    Returns:
+        tuple: (GeoJSON, has_satellite_source)
+    """
+    from .modis_grid import load_glacier_grid, sample_pixel_values, attach_pixel_values
+
+    cells = load_glacier_grid(roi.toGeoJSON())
+    values, band_names = sample_pixel_values(
+        combined_image, cells, ('albedo_daily',),
+        optional_bands=('satellite_source',), return_band_names=True
+    )
+
+    properties = {
+        'date': date,
+        'product': product_name,
+        'quality_filter': quality_description
+    }
+    if diffuse_fraction is not None and 'MCD43A3' in product_name:
+        properties['diffuse_fraction'] = diffuse_fraction
+        properties['bsa_percentage'] = (1 - diffuse_fraction) * 100
+        properties['wsa_percentage'] = diffuse_fraction * 100
+
+    return attach_pixel_values(cells, values, properties), 'satellite_source' in band_names
+
+
 def _process_pixels_to_geojson(combined_image, roi, date, product_name, quality_description, silent, diffuse_fraction=None):
     """Convert MODIS image to GeoJSON pixel features with detailed properties"""
     import ee
     
-    # Clip to glacier boundary (including satellite source band if present)
-    albedo_clipped = combined_image.select('albedo_daily').clip(roi)
+    # Fast path: local MODIS grid, falls back to server-side vectorization
+    try:
+        geojson, has_satellite_source = _process_pixels_with_local_grid(
+            combined_image, roi, date, product_name, quality_description, diffuse_fraction
+        )
+        if not geojson['features']:
+            if not silent:
+                with st.sidebar:
+                    st.warning(f"❌ No valid pixels found after quality filtering for {date}")
+            return None
+        if not silent:
+            _display_pixel_statistics(geojson, date, has_satellite_source)
+        return geojson
+    except Exception as grid_error:
+        print(f"Local grid path unavailable for {date}, using vectorization: {grid_error}")
     
     # Check if satellite source band exists
     band_names = combined_image.bandNames().getInfo()
     has_satellite_source = 'satellite_source' in band_names
     
+    # Clip to glacier boundary (including satellite source band if present)
+    albedo_clipped = combined_image.select('albedo_daily').clip(roi)
+    
     if has_satellite_source:
         satellite_clipped = combined_image.select('satellite_source').clip(roi)
     
@@ -308,6 +358,8 @@ def safe_int_conversion(value):
     else:
         return int(value)
 
+
+@trace_phase('pixel_count')
 def count_modis_pixels_for_date(date, roi, product='MOD10A1', qa_threshold=1, use_advanced_qa=False, algorithm_flags={}):
     print(f"DEBUG COUNT: Starting pixel count for {date} with product {product}")
     """
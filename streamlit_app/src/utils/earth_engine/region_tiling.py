@@ -0,0 +1,18 @@
+"""
+Grid-Aligned Region Tiling
+Shared tiling of large regions into MODIS grid-aligned tiles run as
+concurrent requests (src/region_tiling.py of the main codebase)
+"""
+
+import sys
+
+from .geometry_utils import _ROOT_SRC_DIR
+
+if _ROOT_SRC_DIR not in sys.path:
+    sys.path.append(_ROOT_SRC_DIR)
+
+from region_tiling import (  # noqa: E402
+    DEFAULT_TILE_CELLS, DEFAULT_TILE_WORKERS, RegionTile, plan_tiles, run_tiles, tile_key
+)
+
+__all__ = ['DEFAULT_TILE_CELLS', 'DEFAULT_TILE_WORKERS', 'RegionTile', 'plan_tiles', 'run_tiles', 'tile_key']
@@ -0,0 +1,18 @@
+"""
+Earth Engine Call Tracing
+Shared opt-in tracer of blocking Earth Engine calls (src/ee_trace.py of the
+main codebase), enabled with ALBEDO_EE_TRACE
+"""
+
+import sys
+
+from .geometry_utils import _ROOT_SRC_DIR
+
+if _ROOT_SRC_DIR not in sys.path:
+    sys.path.append(_ROOT_SRC_DIR)
+
+from ee_trace import (  # noqa: E402
+    enable_from_env, enable_tracing, finish_tracing, get_tracer, trace_phase, trace_run
+)
+
+__all__ = ['enable_from_env', 'enable_tracing', 'finish_tracing', 'get_tracer', 'trace_phase', 'trace_run']
@@ -8,7 +8,8 @@ from .earth_engine import (
     initialize_earth_engine,
     get_modis_pixels_for_date,
     count_modis_pixels_for_date, 
-    get_roi_from_geojson
+    get_roi_from_geojson,
+    load_glacier_geojson
 )
 
 # Re-export for backwards compatibility
@@ -16,5 +17,6 @@ __all__ = [
     'initialize_earth_engine',
     'get_modis_pixels_for_date',
     'count_modis_pixels_for_date',
-    'get_roi_from_geojson'
+    'get_roi_from_geojson',
+    'load_glacier_geojson'
 ]
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+Cold-Start Import Profiler
+Measures the import cost of the app and of each page in a fresh interpreter
+(`python -X importtime`), per module and per top-level package, so startup
+regressions are visible
+
+Usage (from streamlit_app/):
+    python -m src.utils.import_profiler                # startup + every page
+    python -m src.utils.import_profiler --top 30 src.dashboards.mcd43a3_dashboard
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+
+APP_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+STARTUP_MODULE = 'streamlit_main'
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def parse_importtime(output):
+    """
+    Rows of `-X importtime` output
+
+    Returns:
+        list: Dicts with module, self_ms, cumulative_ms and depth (0 = imported
+              directly by the profiled code)
+    """
+    rows = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append({
+                'module': match.group(4),
+                'self_ms': int(match.group(1)) / 1000,
+                'cumulative_ms': int(match.group(2)) / 1000,
+                'depth': len(match.group(3)) // 2
+            })
+    return rows
+
+
+def profile_imports(modules, baseline=(STARTUP_MODULE,), python=None, timeout=300):
+    """
+    Cold import cost of modules in a fresh interpreter
+
+    Baseline modules are imported first, so the reported cost of modules is
+    what they add on top of the app startup (shared dependencies excluded).
+
+    Args:
+        modules: Dotted module paths to measure
+        baseline: Modules imported (and measured) before modules
+        python: Interpreter to use (current one by default)
+        timeout: Seconds before giving up
+
+    Returns:
+        dict: 'modules' (rows from parse_importtime), 'costs' ({requested
+              module: cumulative ms}), 'packages' ({top-level package: self ms})
+              and 'errors' ({module: message} for imports that failed)
+    """
+    lines = [f"import sys; sys.path[:0] = [{APP_DIR!r}, {os.path.join(APP_DIR, 'src')!r}]"]
+    for module in list(baseline) + list(modules):
+        lines.append(f"try:\n    import {module}\nexcept Exception as e:\n"
+                     f"    print('PROFILE_ERROR {module} ' + repr(e))")
+
+    completed = subprocess.run(
+        [python or sys.executable, '-X', 'importtime', '-c', '\n'.join(lines)],
+        cwd=APP_DIR, capture_output=True, text=True, timeout=timeout
+    )
+    rows = parse_importtime(completed.stderr)
+
+    requested = set(baseline) | set(modules)
+    costs = {row['module']: row['cumulative_ms'] for row in rows if row['module'] in requested}
+    packages = {}
+    for row in rows:
+        package = row['module'].split('.')[0]
+        packages[package] = packages.get(package, 0.0) + row['self_ms']
+
+    errors = {}
+    for line in completed.stdout.splitlines():
+        if line.startswith('PROFILE_ERROR '):
+            _, module, message = line.split(' ', 2)
+            errors[module] = message
+    return {'modules': rows, 'costs': costs, 'packages': packages, 'errors': errors}
+
+
+def profile_pages(page_modules, python=None):
+    """
+    Startup cost and the added cost of each page, one interpreter per page
+
+    Returns:
+        dict: 'startup_ms', 'pages' ({module: ms added on first navigation}),
+              'packages' (startup package breakdown) and 'errors'
+    """
+    startup = profile_imports([], python=python)
+    result = {
+        'startup_ms': startup['costs'].get(STARTUP_MODULE),
+        'packages': startup['packages'],
+        'pages': {},
+        'errors': dict(startup['errors'])
+    }
+    for module in page_modules:
+        profile = profile_imports([module], python=python)
+        result['pages'][module] = profile['costs'].get(module)
+        result['errors'].update(profile['errors'])
+    return result
+
+
+def _top(mapping, n):
+    return sorted(mapping.items(), key=lambda item: -(item[1] or 0))[:n]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import profile of the dashboard")
+    parser.add_argument('modules', nargs='*', help="Modules to profile (default: every registered page)")
+    parser.add_argument('--top', type=int, default=15, help="Rows to show per table")
+    args = parser.parse_args(argv)
+
+    if args.modules:
+        pages = args.modules
+    else:
+        sys.path[:0] = [APP_DIR]
+        from src.utils.page_registry import page_modules
+        pages = page_modules()
+
+    print(f"⏱️ Profiling startup and {len(pages)} page module(s) in fresh interpreters...")
+    result = profile_pages(pages)
+
+    print(f"\n🚀 Startup ({STARTUP_MODULE}): {result['startup_ms'] or 0:.0f} ms")
+    print("\n📦 Startup cost by package (self time):")
+    for package, ms in _top(result['packages'], args.top):
+        print(f"   {ms:8.1f} ms  {package}")
+
+    print("\n📄 Added by first navigation to each page:")
+    for module, ms in _top(result['pages'], len(result['pages'])):
+        print(f"   {ms or 0:8.1f} ms  {module}")
+
+    if result['errors']:
+        print("\n⚠️ Imports that failed (missing optional dependencies?):")
+        for module, message in result['errors'].items():
+            print(f"   {module}: {message}")
+    return result
+
+
+def render_import_profile(current_module=None):
+    """
+    Sidebar diagnostic: in-process page import times and an on-demand
+    cold-start profile of the startup and the current page
+    """
+    import streamlit as st
+    from .page_registry import page_import_times
+
+    with st.sidebar.expander("⏱️ Startup profile", expanded=False):
+        loaded = page_import_times()
+        if loaded:
+            st.caption("First-navigation import cost (this server process):")
+            for module, seconds in sorted(loaded.items(), key=lambda item: -item[1]):
+                st.caption(f"{seconds * 1000:.0f} ms · {module.rsplit('.', 1)[-1]}")
+
+        if st.button("Profile cold start", key="profile_cold_start",
+                     help="Imports the app and this page in a fresh interpreter (python -X importtime)"):
+            with st.spinner("Profiling imports..."):
+                modules = [current_module] if current_module else []
+                st.session_state['import_profile'] = profile_imports(modules)
+
+        profile = st.session_state.get('import_profile')
+        if profile:
+            for module, ms in profile['costs'].items():
+                st.metric(module.rsplit('.', 1)[-1], f"{ms:.0f} ms")
+            st.caption("Slowest packages (self time):")
+            for package, ms in _top(profile['packages'], 8):
+                st.caption(f"{ms:.0f} ms · {package}")
+            for module, message in profile['errors'].items():
+                st.caption(f"⚠️ {module}: {message}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""
+Background Job Runner for Processing Workflows
+Runs ProcessingManager analyses in a pool of worker processes, with job state,
+progress and results persisted on disk so jobs outlive reruns and page reloads
+"""
+
+import json
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+
+DEFAULT_JOBS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'outputs', 'cache', 'jobs'
+)
+DEFAULT_MAX_WORKERS = int(os.environ.get('ALBEDO_JOB_WORKERS', 2))
+
+ACTIVE_STATES = ('queued', 'running')
+FINAL_STATES = ('completed', 'failed', 'cancelled', 'interrupted')
+
+
+class JobCancelled(BaseException):
+    """
+    Raised inside a worker when cancellation is requested
+
+    Derives from BaseException so the broad `except Exception` handlers in the
+    workflows and ProcessingManager do not swallow it.
+    """
+
+
+def _job_dir(jobs_dir, job_id):
+    return os.path.join(jobs_dir, job_id)
+
+
+def _read_status(jobs_dir, job_id):
+    try:
+        with open(os.path.join(_job_dir(jobs_dir, job_id), 'status.json'), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_status(jobs_dir, job_id, status):
+    path = os.path.join(_job_dir(jobs_dir, job_id), 'status.json')
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(status, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+def _update_status(jobs_dir, job_id, **fields):
+    status = _read_status(jobs_dir, job_id) or {'job_id': job_id}
+    status.update(fields)
+    _write_status(jobs_dir, job_id, status)
+    return status
+
+
+def _cancel_requested(jobs_dir, job_id):
+    return os.path.exists(os.path.join(_job_dir(jobs_dir, job_id), 'cancel'))
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except (OSError, TypeError):
+        return False
+
+
+def _run_job(job_id, analysis_type, parameters, jobs_dir):
+    """Worker entry point: run one analysis and persist its outcome"""
+    if _cancel_requested(jobs_dir, job_id):
+        _update_status(jobs_dir, job_id, state='cancelled', finished=datetime.now().isoformat())
+        return 'cancelled'
+
+    _update_status(jobs_dir, job_id, state='running', pid=os.getpid(),
+                   started=datetime.now().isoformat(), message='Starting worker...')
+
+    def progress_callback(progress, message):
+        if _cancel_requested(jobs_dir, job_id):
+            raise JobCancelled()
+        _update_status(jobs_dir, job_id, progress=progress, message=message)
+
+    try:
+        from src.utils.processing_manager import ProcessingManager
+        results = ProcessingManager().run_analysis(analysis_type, parameters, progress_callback)
+    except JobCancelled:
+        _update_status(jobs_dir, job_id, state='cancelled', message='Cancelled',
+                       finished=datetime.now().isoformat())
+        return 'cancelled'
+    except Exception as e:
+        _update_status(jobs_dir, job_id, state='failed', error=str(e), traceback=traceback.format_exc(),
+                       finished=datetime.now().isoformat())
+        return 'failed'
+
+    try:
+        payload = pickle.dumps(results)
+    except Exception:
+        # Keep the summary even if raw workflow objects cannot be pickled
+        payload = pickle.dumps(dict(results, workflow_results=None) if isinstance(results, dict) else None)
+    with open(os.path.join(_job_dir(jobs_dir, job_id), 'result.pkl'), 'wb') as f:
+        f.write(payload)
+
+    if isinstance(results, dict) and results.get('success') == False:
+        _update_status(jobs_dir, job_id, state='failed', error=results.get('error', 'Unknown error'),
+                       traceback=results.get('traceback'), finished=datetime.now().isoformat())
+        return 'failed'
+
+    _update_status(jobs_dir, job_id, state='completed', progress=100, message='Processing complete!',
+                   finished=datetime.now().isoformat())
+    return 'completed'
+
+
+class JobRunner:
+    """
+    Pool of worker processes executing ProcessingManager analyses
+
+    Each job has a directory under jobs_dir holding status.json (state,
+    progress, message, timestamps, error), result.pkl once finished and a
+    cancel marker when cancellation is requested. Status is updated from the
+    workflows' progress_callback hooks, which also act as cancellation points.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, jobs_dir=None):
+        self.jobs_dir = os.path.normpath(jobs_dir or DEFAULT_JOBS_DIR)
+        self.max_workers = max_workers
+        self._executor = None
+        self._futures = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+    def _get_executor(self):
+        if self._executor is None:
+            # Spawned workers: forking the multi-threaded Streamlit server is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    def submit(self, analysis_type, parameters):
+        """
+        Queue an analysis
+
+        Args:
+            analysis_type: Type of analysis to run
+            parameters: Dictionary of parameters
+
+        Returns:
+            str: Job ID
+        """
+        job_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        os.makedirs(_job_dir(self.jobs_dir, job_id), exist_ok=True)
+        _write_status(self.jobs_dir, job_id, {
+            'job_id': job_id,
+            'analysis_type': analysis_type,
+            'parameters': parameters,
+            'state': 'queued',
+            'progress': 0,
+            'message': 'Waiting for a worker...',
+            'created': datetime.now().isoformat(),
+            'started': None,
+            'finished': None,
+            'error': None
+        })
+
+        with self._lock:
+            future = self._get_executor().submit(_run_job, job_id, analysis_type, dict(parameters), self.jobs_dir)
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f, job_id=job_id: self._on_done(job_id, f))
+        return job_id
+
+    def _on_done(self, job_id, future):
+        with self._lock:
+            self._futures.pop(job_id, None)
+        if future.cancelled():
+            _update_status(self.jobs_dir, job_id, state='cancelled', message='Cancelled before start',
+                           finished=datetime.now().isoformat())
+        elif future.exception() is not None:
+            # Worker process died (e.g. out of memory) before recording an outcome
+            status = _read_status(self.jobs_dir, job_id) or {}
+            if status.get('state') in ACTIVE_STATES:
+                _update_status(self.jobs_dir, job_id, state='failed', error=str(future.exception()),
+                               finished=datetime.now().isoformat())
+
+    def status(self, job_id):
+        """
+        Current status record of a job
+
+        Jobs left active by a server that has since stopped are reported as
+        'interrupted'.
+        """
+        status = _read_status(self.jobs_dir, job_id)
+        if status is None or status.get('state') not in ACTIVE_STATES:
+            return status
+
+        with self._lock:
+            tracked = job_id in self._futures
+        if not tracked and not (status.get('state') == 'running' and _pid_alive(status.get('pid'))):
+            status = _update_status(self.jobs_dir, job_id, state='interrupted',
+                                    message='Server stopped before the job finished',
+                                    finished=datetime.now().isoformat())
+        return status
+
+    def result(self, job_id):
+        """Results dict of a finished job (None while running or if absent)"""
+        try:
+            with open(os.path.join(_job_dir(self.jobs_dir, job_id), 'result.pkl'), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def cancel(self, job_id):
+        """
+        Request cancellation
+
+        Queued jobs are dropped immediately; running jobs stop at their next
+        progress update.
+        """
+        open(os.path.join(_job_dir(self.jobs_dir, job_id), 'cancel'), 'w').close()
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.cancel()
+
+    def list_jobs(self, limit=20):
+        """Most recent job status records, newest first"""
+        job_ids = sorted(
+            (name for name in os.listdir(self.jobs_dir) if os.path.isdir(_job_dir(self.jobs_dir, name))),
+            reverse=True
+        )
+        return [status for status in (self.status(job_id) for job_id in job_ids[:limit]) if status]
+
+    def wait(self, job_id, timeout=None, poll_interval=1.0):
+        """Block until a job is final (for scripts); returns its status"""
+        start = time.time()
+        while True:
+            status = self.status(job_id)
+            if status is None or status.get('state') in FINAL_STATES:
+                return status
+            if timeout is not None and time.time() - start > timeout:
+                return status
+            time.sleep(poll_interval)
+
+
+_JOB_RUNNER = None
+_JOB_RUNNER_LOCK = threading.Lock()
+
+
+def get_job_runner():
+    """Process-wide job runner (shared by all sessions)"""
+    global _JOB_RUNNER
+    with _JOB_RUNNER_LOCK:
+        if _JOB_RUNNER is None:
+            _JOB_RUNNER = JobRunner()
+        return _JOB_RUNNER
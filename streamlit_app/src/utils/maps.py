@@ -10,6 +10,7 @@ import json
 import random
 import pandas as pd
 from .ee_utils import initialize_earth_engine, get_modis_pixels_for_date, get_roi_from_geojson
+from .earth_engine import get_glacier_roi, load_glacier_geojson
 
 
 def get_albedo_color_palette(albedo_value):
@@ -172,50 +173,11 @@ def create_fallback_albedo_visualization(map_obj, df_data):
 def _load_glacier_boundary_for_bounds():
     """
     Load glacier boundary for bounds calculation (without adding to map)
-    Same logic as add_glacier_boundary but just returns the geojson
+    Same source as add_glacier_boundary (shared cached ROI provider)
     """
-    import json
-    
-    # PRIORITY 1: Try to load from shapefile (most accurate)
-    shapefile_paths = [
-        '../data/geospatial/shapefiles/Masque_athabasca_2023_Arcgis.shp',  # New organized path
-        '../../data/geospatial/shapefiles/Masque_athabasca_2023_Arcgis.shp',  # Alternative organized path
-    ]
-    
-    for shp_path in shapefile_paths:
-        try:
-            import geopandas as gpd
-            
-            # Load shapefile with geopandas
-            gdf = gpd.read_file(shp_path)
-            
-            # Convert to WGS84 if needed
-            if gdf.crs and gdf.crs.to_epsg() != 4326:
-                gdf = gdf.to_crs(4326)
-            
-            # Convert to GeoJSON for compatibility
-            glacier_geojson = json.loads(gdf.to_json())
-            return glacier_geojson
-            
-        except (ImportError, Exception):
-            # Geopandas not available or shapefile loading failed, continue to GeoJSON fallback
-            continue
-    
-    # PRIORITY 2: Fallback to GeoJSON files
-    geojson_paths = [
-        '../data/geospatial/masks/Athabasca_mask_2023_cut.geojson',  # New organized path
-        '../../data/geospatial/masks/Athabasca_mask_2023_cut.geojson',  # Alternative organized path
-        '../Athabasca_mask_2023_cut.geojson',  # Legacy fallback
-        '../../Athabasca_mask_2023_cut.geojson',  # Legacy fallback
-        'Athabasca_mask_2023_cut.geojson'  # Same directory fallback
-    ]
-    
-    for path in geojson_paths:
-        try:
-            with open(path, 'r') as f:
-                return json.load(f)
-        except:
-            continue
+    glacier_geojson = load_glacier_geojson()
+    if glacier_geojson:
+        return glacier_geojson
     
     # If all paths failed, create a fallback boundary
     try:
@@ -372,28 +334,24 @@ def add_glacier_boundary(map_obj, glacier_geojson_path=None):
     Returns:
         dict: Loaded glacier GeoJSON data (None if failed)
     """
-    # PRIORITY 1: Try to load from shapefile (most accurate)
-    shapefile_paths = [
-        '../data/geospatial/shapefiles/Masque_athabasca_2023_Arcgis.shp',  # New organized path
-        '../../data/geospatial/shapefiles/Masque_athabasca_2023_Arcgis.shp',  # Alternative organized path
-    ]
-    
-    for shp_path in shapefile_paths:
-        try:
-            import geopandas as gpd
-            import json
-            
-            # Load shapefile with geopandas
-            gdf = gpd.read_file(shp_path)
-            
-            # Convert to WGS84 if needed
-            if gdf.crs and gdf.crs.to_epsg() != 4326:
-                gdf = gdf.to_crs(4326)
-            
-            # Convert to GeoJSON for folium
-            glacier_geojson = json.loads(gdf.to_json())
-            
-            # Add glacier boundary with enhanced styling
+    glacier_geojson = None
+    from_shapefile = False
+    try:
+        roi = get_glacier_roi()
+        glacier_geojson = roi.geojson
+        from_shapefile = roi.use_shapefile
+    except Exception:
+        # No readable mask: try the user provided path
+        if glacier_geojson_path:
+            try:
+                with open(glacier_geojson_path, 'r') as f:
+                    glacier_geojson = json.load(f)
+            except Exception:
+                pass
+    
+    if glacier_geojson is not None:
+        if from_shapefile:
+            # Enhanced styling for the shapefile boundary
             folium.GeoJson(
                 glacier_geojson,
                 style_function=lambda x: {
@@ -406,37 +364,8 @@ def add_glacier_boundary(map_obj, glacier_geojson_path=None):
                 popup=folium.Popup("Athabasca Glacier Boundary (Shapefile)", parse_html=True),
                 tooltip="Athabasca Glacier (2023 ArcGIS)"
             ).add_to(map_obj)
-            
-            
-            return glacier_geojson
-            
-        except ImportError:
-            # Geopandas not available, continue to GeoJSON fallback
-            continue
-        except Exception as e:
-            # Shapefile loading failed, continue to GeoJSON fallback
-            continue
-    
-    # PRIORITY 2: Fallback to GeoJSON files
-    geojson_paths = [
-        glacier_geojson_path,  # User provided path
-        '../data/geospatial/masks/Athabasca_mask_2023_cut.geojson',  # New organized path
-        '../../data/geospatial/masks/Athabasca_mask_2023_cut.geojson',  # Alternative organized path
-        '../Athabasca_mask_2023_cut.geojson',  # Legacy path (fallback)
-        '../../Athabasca_mask_2023_cut.geojson',  # Legacy path (fallback)
-        'Athabasca_mask_2023_cut.geojson',  # Same directory (fallback)
-    ]
-    
-    # Filter out None values
-    geojson_paths = [path for path in geojson_paths if path is not None]
-    
-    # Try to load from any of the GeoJSON paths
-    for path in geojson_paths:
-        try:
-            with open(path, 'r') as f:
-                glacier_geojson = json.load(f)
-            
-            # Add glacier boundary with standard styling
+        else:
+            # Standard styling for the GeoJSON boundary
             folium.GeoJson(
                 glacier_geojson,
                 style_function=lambda x: {
@@ -448,12 +377,8 @@ def add_glacier_boundary(map_obj, glacier_geojson_path=None):
                 popup=folium.Popup("Athabasca Glacier Boundary (GeoJSON)", parse_html=True),
                 tooltip="Athabasca Glacier Boundary"
             ).add_to(map_obj)
-            
-            
-            return glacier_geojson
-            
-        except Exception as e:
-            continue  # Try next path
+        
+        return glacier_geojson
     
     # If all paths failed, create a fallback boundary
     try:
@@ -500,6 +425,171 @@ def add_glacier_boundary(map_obj, glacier_geojson_path=None):
         return None
 
 
+PIXEL_TOOLTIP_FIELDS = ['albedo_display', 'product', 'date', 'source', 'quality_filter', 'center']
+PIXEL_TOOLTIP_ALIASES = ['Albedo', 'Product', 'Date', 'Source', 'Quality', 'Center']
+
+
+def _feature_center(geometry):
+    """Mean vertex position of a (Multi)Polygon or GeometryCollection, or None"""
+    lons, lats = [], []
+    
+    def collect(coords):
+        if len(coords) >= 2 and all(isinstance(c, (int, float)) for c in coords[:2]):
+            lons.append(coords[0])
+            lats.append(coords[1])
+        else:
+            for item in coords:
+                if isinstance(item, (list, tuple)):
+                    collect(item)
+    
+    geometries = geometry.get('geometries', [geometry]) if geometry else []
+    for part in geometries:
+        collect(part.get('coordinates', []))
+    if not lons:
+        return None
+    return sum(lons) / len(lons), sum(lats) / len(lats)
+
+
+def build_pixel_layer_data(modis_pixels, product, selected_date):
+    """
+    Compact GeoJSON carrying precomputed display properties for each pixel
+    
+    Colors, albedo labels and centers are computed once here so the map only
+    adds a single layer whose style and tooltip read feature properties.
+    
+    Args:
+        modis_pixels: Pixel GeoJSON from get_modis_pixels_for_date
+        product: MODIS product type ('MOD10A1' or 'MCD43A3')
+        selected_date: Date string of the pixels
+    
+    Returns:
+        dict: GeoJSON FeatureCollection with fill_color and tooltip fields
+    """
+    features = []
+    for feature in modis_pixels.get('features', []):
+        properties = feature.get('properties', {})
+        albedo_value = properties.get('albedo_value')
+        
+        # Skip invalid values
+        if albedo_value is None or albedo_value < 0 or albedo_value > 1:
+            continue
+        
+        product_display = properties.get('product', product)
+        
+        # Albedo type and band details depend on the product
+        if 'MCD43A3' in product_display:
+            if 'Visible' in product_display:
+                albedo_display = f"{albedo_value:.3f} (Visible, 0.3-0.7 μm BSA)"
+            elif 'NIR' in product_display:
+                albedo_display = f"{albedo_value:.3f} (NIR, 0.7-5.0 μm BSA)"
+            else:
+                bsa_pct = properties.get('bsa_percentage', 80)
+                wsa_pct = properties.get('wsa_percentage', 20)
+                albedo_display = f"{albedo_value:.3f} (Blue-sky, BSA {bsa_pct:.0f}% / WSA {wsa_pct:.0f}%)"
+        else:
+            albedo_display = f"{albedo_value:.3f}"
+        
+        # Satellite source - MCD43A3 combines both satellites
+        if product == 'MCD43A3':
+            satellite_source = 'Combined Terra+Aqua'
+        else:
+            satellite_source = properties.get('satellite', 'Terra/Aqua')
+        
+        center = _feature_center(feature.get('geometry'))
+        
+        features.append({
+            'type': 'Feature',
+            'geometry': feature['geometry'],
+            'properties': {
+                'albedo_value': albedo_value,
+                'fill_color': get_albedo_color_palette(albedo_value),
+                'albedo_display': albedo_display,
+                'product': product_display,
+                'date': selected_date,
+                'source': satellite_source,
+                'quality_filter': properties.get('quality_filter', 'Standard filtering'),
+                'center': f"{center[1]:.4f}°N, {abs(center[0]):.4f}°W" if center else "N/A"
+            }
+        })
+    
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+class _PixelQueryFailed(Exception):
+    """Earth Engine returned no pixel collection (raised so the failure is not cached)"""
+
+
+@st.cache_data(ttl=600, show_spinner=False)  # Cache for 10 minutes
+def _cached_pixel_layer_data(selected_date, product, qa_threshold, use_advanced_qa, algorithm_flags,
+                             selected_band, diffuse_fraction, glacier_geojson):
+    athabasca_roi = get_roi_from_geojson(glacier_geojson)
+    
+    modis_pixels = get_modis_pixels_for_date(
+        selected_date, athabasca_roi, product, qa_threshold,
+        use_advanced_qa=use_advanced_qa, algorithm_flags=algorithm_flags,
+        selected_band=selected_band, diffuse_fraction=diffuse_fraction
+    )
+    
+    if not modis_pixels or 'features' not in modis_pixels:
+        # st.cache_data does not store exceptions: the next rerun queries again
+        raise _PixelQueryFailed(selected_date)
+    return build_pixel_layer_data(modis_pixels, product, selected_date)
+
+
+def get_pixel_layer_data(selected_date, product, qa_threshold, use_advanced_qa, algorithm_flags,
+                         selected_band, diffuse_fraction, glacier_geojson):
+    """
+    Styled pixel layer data for one date, product, QA setting and band
+    
+    Cached so Streamlit reruns triggered by unrelated widgets reuse the
+    layer instead of querying Earth Engine and rebuilding it. Failed
+    queries are not cached.
+    
+    Returns:
+        dict or None: Layer GeoJSON from build_pixel_layer_data, None if the
+                      Earth Engine query returned nothing
+    """
+    try:
+        return _cached_pixel_layer_data(
+            selected_date, product, qa_threshold, use_advanced_qa, algorithm_flags,
+            selected_band, diffuse_fraction, glacier_geojson
+        )
+    except _PixelQueryFailed:
+        return None
+
+
+def _pixel_style(feature):
+    return {
+        'fillColor': feature['properties']['fill_color'],
+        'color': 'white',
+        'weight': 1,
+        'fillOpacity': 0.8,
+        'opacity': 1.0
+    }
+
+
+def add_pixel_layer(map_obj, layer_data):
+    """
+    Add all MODIS pixels to the map as a single GeoJSON layer
+    
+    Args:
+        map_obj: Folium map object
+        layer_data: GeoJSON from build_pixel_layer_data
+    """
+    folium.GeoJson(
+        layer_data,
+        name='MODIS pixels',
+        style_function=_pixel_style,
+        tooltip=folium.GeoJsonTooltip(
+            fields=PIXEL_TOOLTIP_FIELDS,
+            aliases=PIXEL_TOOLTIP_ALIASES,
+            sticky=True,
+            max_width=280,
+            style="font-family: Arial, sans-serif; font-size: 13px; padding: 8px;"
+        )
+    ).add_to(map_obj)
+
+
 def create_albedo_map(df_data, selected_date=None, product='MOD10A1', qa_threshold=1, use_advanced_qa=False, algorithm_flags={}, selected_band=None, diffuse_fraction=None):
     """
     Create interactive Folium map showing MODIS albedo pixels within glacier mask
@@ -575,127 +665,20 @@ def create_albedo_map(df_data, selected_date=None, product='MOD10A1', qa_thresho
             return m
             
         try:
-            import ee
-            
-            # Define Athabasca ROI from the geojson if available
-            athabasca_roi = get_roi_from_geojson(glacier_geojson)
-            
-            # Get MODIS data for the selected date
-            print(f"DEBUG MAPS: About to call get_modis_pixels_for_date for {selected_date}")
-            modis_pixels = get_modis_pixels_for_date(
-                selected_date, athabasca_roi, product, qa_threshold,
-                use_advanced_qa=use_advanced_qa, algorithm_flags=algorithm_flags,
-                selected_band=selected_band, diffuse_fraction=diffuse_fraction
+            # Styled pixel layer, cached per date/product/QA/band across reruns
+            pixel_layer = get_pixel_layer_data(
+                selected_date, product, qa_threshold, use_advanced_qa,
+                algorithm_flags, selected_band, diffuse_fraction, glacier_geojson
             )
-            print(f"DEBUG MAPS: Successfully got MODIS pixels for {selected_date}")
             
-            if modis_pixels and 'features' in modis_pixels:
-                pixel_count = len(modis_pixels['features'])
+            if pixel_layer and pixel_layer['features']:
+                pixel_count = len(pixel_layer['features'])
                 # Display final pixel count in sidebar
                 with st.sidebar:
                     st.write(f"🗺️ Displaying {pixel_count} MODIS pixels for {selected_date}")
                 
-                # Add each MODIS pixel as a colored polygon
-                for feature in modis_pixels['features']:
-                    if 'properties' in feature and 'albedo_value' in feature['properties']:
-                        albedo_value = feature['properties']['albedo_value']
-                        
-                        # Skip invalid values
-                        if albedo_value is None or albedo_value < 0 or albedo_value > 1:
-                            continue
-                            
-                        # Get color based on albedo value
-                        color = get_albedo_color_palette(albedo_value)
-                        
-                        # Create enhanced popup with detailed technical info
-                        product_display = feature['properties'].get('product', product)
-                        quality_filter = feature['properties'].get('quality_filter', 'Standard filtering')
-                        
-                        # Get satellite source - different for MCD43A3
-                        if product == 'MCD43A3':
-                            satellite_source = 'Combined Terra+Aqua'
-                        else:
-                            satellite_source = feature['properties'].get('satellite', 'Terra/Aqua')
-                        
-                        # Calculate pixel coordinates (approximate center) with safe handling
-                        try:
-                            coords = feature['geometry']['coordinates'][0]
-                            if coords and len(coords) > 0:
-                                # Get bounding box with safe coordinate extraction
-                                lons = []
-                                lats = []
-                                for coord in coords:
-                                    if isinstance(coord, (list, tuple)) and len(coord) >= 2:
-                                        # Ensure we get numbers, not nested lists
-                                        lon = coord[0]
-                                        lat = coord[1]
-                                        if isinstance(lon, (int, float)) and isinstance(lat, (int, float)):
-                                            lons.append(lon)
-                                            lats.append(lat)
-                                
-                                if lons and lats:
-                                    center_lon = sum(lons) / len(lons)
-                                    center_lat = sum(lats) / len(lats)
-                                else:
-                                    center_lon = center_lat = "N/A"
-                            else:
-                                center_lon = center_lat = "N/A"
-                        except Exception as coord_error:
-                            print(f"DEBUG COORDS ERROR: {coord_error} for feature: {feature.get('properties', {}).get('date', 'unknown')}")
-                            center_lon = center_lat = "N/A"
-                        
-                        # Format coordinates safely
-                        if isinstance(center_lat, (int, float)) and isinstance(center_lon, (int, float)):
-                            coord_text = f"{center_lat:.4f}°N, {abs(center_lon):.4f}°W"
-                        else:
-                            coord_text = "N/A"
-                        
-                        # Create appropriate tooltip content based on product
-                        if 'MCD43A3' in product_display:
-                            if 'Visible' in product_display:
-                                albedo_type = "Visible Albedo"
-                                extra_info = "<br><small style='color: #666;'>0.3-0.7 μm BSA</small>"
-                            elif 'NIR' in product_display:
-                                albedo_type = "NIR Albedo"
-                                extra_info = "<br><small style='color: #666;'>0.7-5.0 μm BSA</small>"
-                            else:
-                                albedo_type = "Blue-Sky Albedo"
-                                # Get dynamic BSA/WSA percentages from feature properties
-                                bsa_pct = feature['properties'].get('bsa_percentage', 80)
-                                wsa_pct = feature['properties'].get('wsa_percentage', 20)
-                                extra_info = f"<br><small style='color: #666;'>BSA: {bsa_pct:.0f}%, WSA: {wsa_pct:.0f}%</small>"
-                        else:
-                            albedo_type = "Albedo"
-                            extra_info = ""
-                        
-                        # Simple and concise HTML content for tooltip
-                        html_content = f"""
-                        <div style="font-family: Arial, sans-serif; padding: 10px; background: rgba(255,255,255,0.95); border-radius: 5px; box-shadow: 0 2px 4px rgba(0,0,0,0.2);">
-                            <div style="font-size: 18px; font-weight: bold; color: #e65100; margin-bottom: 8px;">
-                                {albedo_type}: {albedo_value:.3f}{extra_info}
-                            </div>
-                            <div style="font-size: 13px; line-height: 1.5;">
-                                <strong>Product:</strong> {product_display}<br>
-                                <strong>Date:</strong> {selected_date}<br>
-                                <strong>Source:</strong> {satellite_source}<br>
-                                <strong>Quality:</strong> {quality_filter}
-                            </div>
-                        </div>
-                        """
-                        
-                        # Use the full HTML content in tooltip (no popup needed)
-                        # Add pixel polygon to map with comprehensive tooltip only
-                        folium.GeoJson(
-                            feature,
-                            style_function=lambda x, color=color: {
-                                'fillColor': color,
-                                'color': 'white',
-                                'weight': 1,
-                                'fillOpacity': 0.8,
-                                'opacity': 1.0
-                            },
-                            tooltip=folium.Tooltip(html_content, max_width=280, sticky=True)
-                        ).add_to(m)
+                # All pixels as one GeoJSON layer with data-driven style and shared tooltip
+                add_pixel_layer(m, pixel_layer)
                 
                 # Create detailed color legend
                 # create_albedo_legend(m, selected_date, product)  # Commented out per user request
@@ -704,9 +687,6 @@ def create_albedo_map(df_data, selected_date=None, product='MOD10A1', qa_thresho
                 st.warning(f"No valid MODIS pixels found for {selected_date}")
                 
         except Exception as e:
-            print(f"DEBUG MAPS ERROR: {e}")
-            print(f"DEBUG MAPS ERROR TYPE: {type(e)}")
-            print(f"DEBUG MAPS ERROR STR: {str(e)}")
             st.error(f"Error loading MODIS pixels: {e}")
             st.info("Falling back to basic map view")
     
@@ -0,0 +1,23 @@
+"""
+Workflow Output Files
+Shared columnar output reader/writer (src/output_writer.py of the main
+codebase): compact Parquet outputs with the run metadata in the file, CSV
+from older runs or optional exports
+"""
+
+import os
+import sys
+
+
+_ROOT_SRC_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'src'))
+
+if _ROOT_SRC_DIR not in sys.path:
+    sys.path.append(_ROOT_SRC_DIR)
+
+from output_writer import (  # noqa: E402
+    EXTENSIONS, OUTPUT_EXTENSION, OUTPUT_FORMAT, columnar_path, csv_path, find_output,
+    read_output, read_output_metadata, write_output
+)
+
+__all__ = ['EXTENSIONS', 'OUTPUT_EXTENSION', 'OUTPUT_FORMAT', 'columnar_path', 'csv_path', 'find_output',
+           'read_output', 'read_output_metadata', 'write_output']
@@ -0,0 +1,59 @@
+"""
+Lazy Page Registry
+Dashboard pages are registered by module path and imported on first
+navigation instead of at startup, with the cost of each first import
+recorded for the startup diagnostics
+"""
+
+import importlib
+import sys
+import time
+
+
+# Sidebar label -> (module, entry point); None for pages rendered inline by streamlit_main
+PAGES = {
+    "🏠 Project Homepage": ('src.dashboards.homepage_dashboard', 'create_homepage_dashboard'),
+    "🎨 Interactive Albedo Map": ('src.dashboards.interactive_albedo_dashboard', 'create_interactive_albedo_dashboard'),
+    "🕰️ Unified Temporal Analysis": ('src.dashboards.unified_temporal_dashboard', 'create_unified_temporal_dashboard'),
+    "⚙️ Data Processing & Configuration": ('src.dashboards.processing_dashboard', 'create_processing_dashboard'),
+    "🛰️ MCD43A3 Broadband Albedo": ('src.dashboards.mcd43a3_dashboard', 'create_mcd43a3_dashboard'),
+    "❄️ MOD10A1/MYD10A1 Daily Snow Albedo": ('src.dashboards.melt_season_dashboard', 'create_melt_season_dashboard'),
+    "⛰️ Hypsometric Analysis": None,
+    "🔧 Real-time QA Comparison": ('src.dashboards.realtime_qa_dashboard', 'create_realtime_qa_dashboard'),
+}
+
+_IMPORT_TIMES = {}
+
+
+def load_page(module_name, function_name):
+    """
+    Entry point of a page module, importing the module on first use
+
+    Args:
+        module_name: Dotted module path (e.g. 'src.dashboards.mcd43a3_dashboard')
+        function_name: Function to return from the module
+
+    Returns:
+        callable: The page function
+    """
+    module = sys.modules.get(module_name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        _IMPORT_TIMES[module_name] = time.perf_counter() - start
+    return getattr(module, function_name)
+
+
+def page_modules():
+    """Module paths of all registered pages"""
+    return [entry[0] for entry in PAGES.values() if entry is not None]
+
+
+def page_import_times():
+    """
+    First-navigation import cost of the pages loaded so far in this process
+
+    Returns:
+        dict: {module: seconds}
+    """
+    return dict(_IMPORT_TIMES)
@@ -18,6 +18,7 @@ sys.path.insert(0, parent_dir)
 sys.path.insert(0, os.path.join(parent_dir, 'src'))
 
 from src.config.processing_presets import get_analysis_config, validate_parameters
+from src.utils.output_writer import OUTPUT_EXTENSION, find_output, read_output
 
 
 class ProcessingManager:
@@ -174,8 +175,9 @@ class ProcessingManager:
                 func_signature = inspect.signature(func)
                 
                 if 'progress_callback' in func_signature.parameters:
-                    # Pass the progress callback to the workflow
-                    results = func(progress_callback=progress_callback, **parameters)
+                    # Pass the progress callback to the workflow (its measured progress
+                    # fills the 20-90% band between loading and finalizing)
+                    results = func(progress_callback=self._workflow_progress(progress_callback), **parameters)
                 else:
                     # Workflow doesn't support progress callback
                     results = func(**parameters)
@@ -253,6 +255,15 @@ class ProcessingManager:
                 'parameters': parameters
             }
     
+    def _workflow_progress(self, progress_callback):
+        """Progress callback for the workflow, mapped into the 20-90% band"""
+        def report(progress, message):
+            overall = 20 + int(progress * 0.7)
+            self.processing_status.update({'progress': overall, 'current_step': message})
+            if progress_callback:
+                progress_callback(overall, message)
+        return report
+    
     def _process_results(self, results, analysis_type, parameters, config):
         """Process and enhance results with metadata"""
         processed = {
@@ -287,8 +298,8 @@ class ProcessingManager:
                 # First try to find QA-specific files
                 import glob
                 base_name = filename.replace('.csv', '')
-                qa_pattern = os.path.join(csv_dir, f"{base_name}_*.csv")
-                qa_files = glob.glob(qa_pattern)
+                qa_files = [path for extension in ('.csv', OUTPUT_EXTENSION)
+                            for path in glob.glob(os.path.join(csv_dir, f"{base_name}_*{extension}"))]
                 
                 if qa_files:
                     # Use the most recent QA file
@@ -298,6 +309,8 @@ class ProcessingManager:
                     # Fall back to original filename
                     file_path = os.path.normpath(os.path.join(csv_dir, filename))
                 
+                # Columnar output unless only the CSV export exists
+                file_path = find_output(file_path) or file_path
                 if os.path.exists(file_path):
                     try:
                         # Try to get file info safely
@@ -305,7 +318,7 @@ class ProcessingManager:
                         file_mtime = datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
                         
                         processed['output_files'].append({
-                            'filename': filename,
+                            'filename': base_name + os.path.splitext(file_path)[1],
                             'path': file_path,
                             'size': file_size,
                             'modified': file_mtime
@@ -327,6 +340,8 @@ class ProcessingManager:
                 processed['metadata']['dataset_info'] = results['dataset_info']
             if 'processing_info' in results:
                 processed['metadata']['processing_info'] = results['processing_info']
+            if 'run_record' in results:
+                processed['metadata']['run_record'] = results['run_record']
             
             # Extract Terra-Aqua fusion statistics from data files
             terra_aqua_stats = self._extract_terra_aqua_stats(processed['output_files'])
@@ -340,9 +355,10 @@ class ProcessingManager:
         try:
             for file_info in output_files:
                 file_path = file_info['path']
-                if file_path.endswith('.csv') and 'data' in os.path.basename(file_path):
+                if 'data' in os.path.basename(file_path):
                     try:
-                        df = pd.read_csv(file_path)
+                        # Fusion counts live in the file metadata of columnar outputs
+                        df = read_output(file_path, restore_metadata=True)
                         if 'terra_aqua_fusion' in df.columns and df['terra_aqua_fusion'].iloc[0]:
                             # Extract fusion statistics from first row
                             stats = {
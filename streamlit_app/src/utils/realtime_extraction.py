@@ -9,62 +9,72 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import json
-import ee
 import sys
 import os
 from .ee_utils import initialize_earth_engine
+from .earth_engine.tracing import trace_phase
 
 # Add parent directories to path for imports
 parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 sys.path.insert(0, os.path.join(parent_dir, 'src'))
 
-# Import Terra-Aqua fusion methodology from main codebase
-try:
-    from data.extraction import combine_terra_aqua_literature_method
-except ImportError:
-    # Fallback: inline implementation if import fails
-    def combine_terra_aqua_literature_method(terra_collection, aqua_collection):
-        """
-        Fallback Terra-Aqua fusion implementation
-        Prioritizes Terra over Aqua following literature best practices
-        """
-        def add_satellite_flag(collection, satellite_name):
-            return collection.map(lambda img: img.set('satellite', satellite_name))
-        
-        def create_daily_composite(date):
-            date = ee.Date(date)
-            next_date = date.advance(1, 'day')
-            
-            terra_day = terra_flagged.filterDate(date, next_date)
-            aqua_day = aqua_flagged.filterDate(date, next_date)
-            
-            terra_size = terra_day.size()
-            aqua_size = aqua_day.size()
-            
-            return ee.Algorithms.If(
-                terra_size.gt(0),
-                terra_day.first().set('system:time_start', date.millis()).set('source', 'Terra'),
-                ee.Algorithms.If(
-                    aqua_size.gt(0),
-                    aqua_day.first().set('system:time_start', date.millis()).set('source', 'Aqua'),
-                    None
-                )
+
+def combine_terra_aqua_literature_method(terra_collection, aqua_collection):
+    """
+    Terra-Aqua fusion from the main codebase, imported on first use (it pulls
+    in Earth Engine), with an inline fallback if the import fails
+    """
+    try:
+        from data.extraction import combine_terra_aqua_literature_method as combine
+    except ImportError:
+        combine = _combine_terra_aqua_fallback
+    return combine(terra_collection, aqua_collection)
+
+
+def _combine_terra_aqua_fallback(terra_collection, aqua_collection):
+    """
+    Fallback Terra-Aqua fusion implementation
+    Prioritizes Terra over Aqua following literature best practices
+    """
+    import ee
+
+    def add_satellite_flag(collection, satellite_name):
+        return collection.map(lambda img: img.set('satellite', satellite_name))
+    
+    def create_daily_composite(date):
+        date = ee.Date(date)
+        next_date = date.advance(1, 'day')
+        
+        terra_day = terra_flagged.filterDate(date, next_date)
+        aqua_day = aqua_flagged.filterDate(date, next_date)
+        
+        terra_size = terra_day.size()
+        aqua_size = aqua_day.size()
+        
+        return ee.Algorithms.If(
+            terra_size.gt(0),
+            terra_day.first().set('system:time_start', date.millis()).set('source', 'Terra'),
+            ee.Algorithms.If(
+                aqua_size.gt(0),
+                aqua_day.first().set('system:time_start', date.millis()).set('source', 'Aqua'),
+                None
             )
-        
-        terra_flagged = add_satellite_flag(terra_collection, 'Terra')
-        aqua_flagged = add_satellite_flag(aqua_collection, 'Aqua')
-        
-        terra_dates = terra_flagged.aggregate_array('system:time_start')
-        aqua_dates = aqua_flagged.aggregate_array('system:time_start')
-        
-        all_dates = terra_dates.cat(aqua_dates) \
-                              .map(lambda t: ee.Date(t).format('YYYY-MM-dd')) \
-                              .distinct().sort()
-        
-        daily_composites = all_dates.map(create_daily_composite)
-        valid_composites = daily_composites.removeAll([None])
-        
-        return ee.ImageCollection(valid_composites).sort('system:time_start')
+        )
+    
+    terra_flagged = add_satellite_flag(terra_collection, 'Terra')
+    aqua_flagged = add_satellite_flag(aqua_collection, 'Aqua')
+    
+    terra_dates = terra_flagged.aggregate_array('system:time_start')
+    aqua_dates = aqua_flagged.aggregate_array('system:time_start')
+    
+    all_dates = terra_dates.cat(aqua_dates) \
+                          .map(lambda t: ee.Date(t).format('YYYY-MM-dd')) \
+                          .distinct().sort()
+    
+    daily_composites = all_dates.map(create_daily_composite)
+    valid_composites = daily_composites.removeAll([None])
+    
+    return ee.ImageCollection(valid_composites).sort('system:time_start')
 
 
 # QA Level Configurations for Real-time Extraction (3 Optimal Levels)
@@ -208,6 +218,7 @@ def mask_mcd43a3_with_qa(image, qa_config):
 
 
 @st.cache_data(ttl=300, show_spinner=False)  # Cache for 5 minutes
+@trace_phase('realtime_time_series')
 def extract_modis_time_series_realtime(start_date, end_date, qa_level='advanced_standard', 
                                      product='MOD10A1', max_observations=200):
     """
@@ -224,6 +235,7 @@ def extract_modis_time_series_realtime(start_date, end_date, qa_level='advanced_
     Returns:
         pd.DataFrame: Time series data with real QA filtering applied
     """
+    import ee
     # Initialize Earth Engine
     if not initialize_earth_engine():
         st.error("❌ Earth Engine authentication failed")
@@ -416,6 +428,7 @@ def extract_modis_time_series_realtime(start_date, end_date, qa_level='advanced_
 
 
 @st.cache_data(ttl=600, show_spinner=False)  # Cache for 10 minutes
+@trace_phase('qa_comparison')
 def compare_qa_levels_realtime(start_date, end_date, product='MOD10A1'):
     """
     Compare different QA levels using real-time Earth Engine extraction
@@ -489,6 +502,7 @@ def mask_mod10a1_with_custom_qa(image, qa_config):
     Returns:
         ee.Image: Masked albedo image
     """
+    import ee
     albedo = image.select('Snow_Albedo_Daily_Tile')
     basic_qa = image.select('NDSI_Snow_Cover_Basic_QA')
     
@@ -554,6 +568,7 @@ def mask_mod10a1_with_custom_qa(image, qa_config):
 
 
 @st.cache_data(ttl=300, show_spinner=False)  # Cache for 5 minutes
+@trace_phase('custom_qa_time_series')
 def extract_modis_time_series_custom_qa(start_date, end_date, custom_qa_config, 
                                        product='MOD10A1', max_observations=200):
     """
@@ -569,6 +584,7 @@ def extract_modis_time_series_custom_qa(start_date, end_date, custom_qa_config,
     Returns:
         pd.DataFrame: Time series data with custom QA filtering applied
     """
+    import ee
     # Initialize Earth Engine
     if not initialize_earth_engine():
         st.error("❌ Earth Engine authentication failed")
@@ -720,6 +736,7 @@ def extract_modis_time_series_custom_qa(start_date, end_date, custom_qa_config,
 
 
 @st.cache_data(ttl=300, show_spinner=False)  # Cache for 5 minutes
+@trace_phase('custom_qa_diagnosis')
 def diagnose_custom_qa_impact(start_date, end_date, custom_qa_config):
     """
     Diagnose the impact of custom QA configuration on data retention
@@ -733,6 +750,7 @@ def diagnose_custom_qa_impact(start_date, end_date, custom_qa_config):
     Returns:
         dict: Detailed QA impact analysis
     """
+    import ee
     if not initialize_earth_engine():
         return {}
     
@@ -850,6 +868,7 @@ def diagnose_custom_qa_impact(start_date, end_date, custom_qa_config):
 
 
 @st.cache_data(ttl=600, show_spinner=False)  # Cache for 10 minutes
+@trace_phase('qa_distribution')
 def diagnose_qa_distribution(start_date, end_date):
     """
     Diagnose the actual QA distribution in MODIS data
@@ -862,6 +881,7 @@ def diagnose_qa_distribution(start_date, end_date):
     Returns:
         dict: QA distribution statistics
     """
+    import ee
     if not initialize_earth_engine():
         return {}
     
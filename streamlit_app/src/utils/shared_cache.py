@@ -0,0 +1,192 @@
+"""
+Process-wide Shared Dataset Cache
+One immutable copy of each dataset version shared by every browser session,
+bounded by a memory ceiling with LRU eviction
+"""
+
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+
+DEFAULT_MAX_BYTES = int(float(os.environ.get('ALBEDO_SHARED_CACHE_MB', 512)) * 1024 * 1024)
+
+
+def _frames(data):
+    """DataFrames contained in a cached value (DataFrame or dict of DataFrames)"""
+    if isinstance(data, pd.DataFrame):
+        return [data]
+    if isinstance(data, dict):
+        return [value for value in data.values() if isinstance(value, pd.DataFrame)]
+    return []
+
+
+def dataset_nbytes(data):
+    """Memory held by a dataset (deep, including string columns)"""
+    return int(sum(df.memory_usage(deep=True).sum() for df in _frames(data)))
+
+
+def dataset_fingerprint(data):
+    """
+    Content fingerprint identifying a dataset version
+
+    Two sessions loading the same data get the same fingerprint, so only one
+    copy is kept.
+    """
+    if isinstance(data, pd.DataFrame):
+        parts = [data]
+    elif isinstance(data, dict):
+        parts = [data[key] for key in sorted(data) if isinstance(data[key], pd.DataFrame)]
+    else:
+        return str(id(data))
+
+    fingerprint = []
+    for df in parts:
+        content = int(pd.util.hash_pandas_object(df, index=False).sum()) if len(df) else 0
+        fingerprint.append(f"{df.shape[0]}x{df.shape[1]}:{content & 0xFFFFFFFFFFFF:x}")
+    return '|'.join(fingerprint)
+
+
+def _shared_view(data):
+    """
+    Zero-copy view handed to a session
+
+    Shallow copies share the underlying buffers but not the column index, so
+    a session adding or replacing columns never alters the shared copy. With
+    copy-on-write (default from pandas 3) in-place edits are isolated too.
+    """
+    if isinstance(data, pd.DataFrame):
+        return data.copy(deep=False)
+    if isinstance(data, dict):
+        return {key: _shared_view(value) for key, value in data.items()}
+    return data
+
+
+class SharedDatasetCache:
+    """
+    Thread-safe LRU cache of datasets keyed by (data_type, fingerprint)
+
+    Values are stored once per process and handed out as shallow views.
+    Least recently used entries are evicted once the bytes held exceed
+    max_bytes.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # key -> (data, nbytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_held = 0
+        self._views = {}                # id(view frame) -> (weakref, key)
+
+    def put(self, data_type, data, version=None):
+        """
+        Store a dataset (or reuse the identical copy already held)
+
+        Args:
+            data_type: Dataset family ('melt_season', 'mcd43a3', 'hypsometric')
+            data: DataFrame or dict of DataFrames
+            version: Version token (content fingerprint if None)
+
+        Returns:
+            tuple: (key, shared view of the stored data)
+        """
+        key = (data_type, version or dataset_fingerprint(data))
+        with self._lock:
+            if key in self._entries:
+                # Another session already loaded this exact version
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return key, self._view(key, self._entries[key][0])
+
+            self.misses += 1
+            nbytes = dataset_nbytes(data)
+            self._entries[key] = (data, nbytes)
+            self.bytes_held += nbytes
+            self._evict()
+            return key, self._view(key, data)
+
+    def get(self, key):
+        """Shared view of a stored dataset, or None if absent/evicted"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._view(key, entry[0])
+
+    def _view(self, key, data):
+        """Shared view of data, remembering the key of each view frame (see key_of)"""
+        view = _shared_view(data)
+        frames = {None: view} if isinstance(view, pd.DataFrame) else \
+            {name: value for name, value in view.items() if isinstance(value, pd.DataFrame)} \
+            if isinstance(view, dict) else {}
+        for name, frame in frames.items():
+            view_id = id(frame)
+            # The entry goes away with the frame, before its id can be reused
+            ref = weakref.ref(frame, lambda _, view_id=view_id: self._views.pop(view_id, None))
+            self._views[view_id] = (ref, key if name is None else key + (name,))
+        return view
+
+    def key_of(self, df):
+        """
+        Version key of a frame handed out by this cache
+
+        Frames of a dict dataset get the dataset key extended by their name.
+        Derived frames (copies, filters) are not known and give None.
+        """
+        entry = self._views.get(id(df))
+        return entry[1] if entry is not None and entry[0]() is df else None
+
+    def contains(self, key):
+        """Whether key is held (does not count as a lookup)"""
+        with self._lock:
+            return key in self._entries
+
+    def _evict(self):
+        # Always keep the most recent entry, even if it alone exceeds the ceiling
+        while self.bytes_held > self.max_bytes and len(self._entries) > 1:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.bytes_held -= nbytes
+            self.evictions += 1
+
+    def set_max_bytes(self, max_bytes):
+        """Change the memory ceiling, evicting immediately if needed"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        """Drop every entry (all sessions)"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes_held = 0
+
+    def stats(self):
+        """Hit rate, bytes held and entry count"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes_held': self.bytes_held,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+
+_SHARED_CACHE = SharedDatasetCache()
+
+
+def get_shared_cache():
+    """Process-wide cache instance (shared by all sessions)"""
+    return _SHARED_CACHE
@@ -17,22 +17,15 @@ src_dir = os.path.join(current_dir, 'src')
 sys.path.insert(0, current_dir)
 sys.path.insert(0, src_dir)
 
-# Import dashboard modules
+# Import dashboard modules (page modules are imported on first navigation, see PAGES)
 from src.utils.data_loader import (
     load_all_melt_season_data, 
     load_hypsometric_data,
     get_data_source_info
 )
-from src.dashboards.mcd43a3_dashboard import create_mcd43a3_dashboard
-from src.dashboards.melt_season_dashboard import create_melt_season_dashboard
-from src.dashboards.statistical_analysis_dashboard import create_statistical_analysis_dashboard
-from src.dashboards.realtime_qa_dashboard import create_realtime_qa_dashboard
-from src.dashboards.interactive_data_dashboard import create_interactive_data_table_dashboard
-from src.dashboards.interactive_albedo_dashboard import create_interactive_albedo_dashboard
-from src.dashboards.homepage_dashboard import create_homepage_dashboard
-from src.dashboards.unified_temporal_dashboard import create_unified_temporal_dashboard
-from src.utils.csv_import import create_csv_import_interface
+from src.utils.page_registry import PAGES, load_page
 from src.utils.qa_config import QA_LEVELS
+from src.utils.shared_cache import get_shared_cache
 
 # Page configuration
 st.set_page_config(
@@ -63,7 +56,7 @@ def create_williamson_menounos_dashboard(df_data, df_results, df_focused, qa_con
     with tab1:
         st.subheader("🏔️ Melt Season Analysis - MOD10A1/MYD10A1")
         # Use the complete melt season dashboard
-        create_melt_season_dashboard(df_data, df_results, df_focused)
+        load_page(*PAGES["❄️ MOD10A1/MYD10A1 Daily Snow Albedo"])(df_data, df_results, df_focused)
     
     with tab2:
         # Prepare data for analysis
@@ -135,7 +128,7 @@ def create_williamson_menounos_dashboard(df_data, df_results, df_focused, qa_con
     with tab3:
         st.subheader("🔍 Interactive Data Explorer")
         # Add interactive data table as a sub-section
-        create_interactive_data_table_dashboard(df_data)
+        load_page('src.dashboards.interactive_data_dashboard', 'create_interactive_data_table_dashboard')(df_data)
     
     with tab4:
         st.subheader("ℹ️ Methodology & Documentation")
@@ -229,13 +222,19 @@ def create_qa_comparison_dashboard():
     
     # Load all datasets for comparison
     with st.spinner("Loading datasets for QA comparison..."):
+        from src.utils.csv_manager import load_uploaded_or_default_data
+        
         # Load MCD43A3 data
-        config_mcd43a3 = get_data_source_info()['mcd43a3']
-        from src.utils.data_loader import load_data_from_url
-        df_mcd43a3, _ = load_data_from_url(config_mcd43a3['url'], config_mcd43a3['local_fallback'], show_status=False)
+        df_mcd43a3 = load_cached_data(
+            'mcd43a3',
+            lambda show_status: load_uploaded_or_default_data('mcd43a3', load_default_mcd43a3, show_status)
+        )
         
         # Load melt season data
-        melt_data = load_all_melt_season_data(show_status=False)
+        melt_data = load_cached_data(
+            'melt_season',
+            lambda show_status: load_uploaded_or_default_data('melt_season', load_all_melt_season_data, show_status)
+        )
         df_modis_snow = melt_data['time_series']
     
     # Dataset selector
@@ -372,29 +371,96 @@ def create_qa_comparison_dashboard():
 
 
 def initialize_data_cache():
-    """Initialize global data cache in session state"""
+    """Initialize per-session references into the process-wide dataset cache"""
     if 'data_cache' not in st.session_state:
         st.session_state.data_cache = {
             'melt_season': None,
             'mcd43a3': None,
             'hypsometric': None,
-            'last_loaded': {}
+            'last_loaded': {},
+            'sources': {}
         }
 
 def cache_data(data_type, data):
-    """Cache data in session state"""
+    """
+    Cache data in the shared cache and keep only its key in session state
+    
+    Returns:
+        The shared copy, to be used instead of data (identical datasets loaded
+        by several sessions are held once)
+    """
     if 'data_cache' not in st.session_state:
         initialize_data_cache()
     
-    st.session_state.data_cache[data_type] = data
+    key, shared_data = get_shared_cache().put(data_type, data)
+    st.session_state.data_cache[data_type] = key
     st.session_state.data_cache['last_loaded'][data_type] = datetime.now()
+    return shared_data
 
 def get_cached_data(data_type):
-    """Get cached data from session state"""
+    """Get cached data from the shared cache (None if never loaded or evicted)"""
     if 'data_cache' not in st.session_state:
         initialize_data_cache()
     
-    return st.session_state.data_cache.get(data_type)
+    key = st.session_state.data_cache.get(data_type)
+    return get_shared_cache().get(key) if key is not None else None
+
+def is_data_cached(data_type):
+    """Whether this session's dataset is still held by the shared cache"""
+    if 'data_cache' not in st.session_state:
+        initialize_data_cache()
+    
+    key = st.session_state.data_cache.get(data_type)
+    return key is not None and get_shared_cache().contains(key)
+
+def _data_source(data_type):
+    """Where this session's data_type comes from: an uploaded file or the default source"""
+    uploaded = st.session_state.get('uploaded_data')
+    if uploaded and uploaded.get('type') == data_type:
+        return f"upload:{uploaded['filename']}:{uploaded.get('upload_timestamp', '')}"
+    return 'default'
+
+def _has_rows(data):
+    """Whether a loaded dataset (DataFrame or dict of DataFrames) holds any data"""
+    if isinstance(data, dict):
+        return any(isinstance(value, pd.DataFrame) and not value.empty for value in data.values())
+    return isinstance(data, pd.DataFrame) and not data.empty
+
+def load_cached_data(data_type, loader, show_status=False):
+    """
+    Session's dataset from the shared cache, loaded only when absent
+    
+    Args:
+        data_type: Dataset family ('melt_season', 'mcd43a3', 'hypsometric')
+        loader: Function(show_status) returning the dataset (uploaded or default)
+        show_status: Whether the loader shows status messages
+        
+    Returns:
+        Shared view of the dataset
+    """
+    if 'data_cache' not in st.session_state:
+        initialize_data_cache()
+    sources = st.session_state.data_cache.setdefault('sources', {})
+    
+    source = _data_source(data_type)
+    if sources.get(data_type) == source:
+        data = get_cached_data(data_type)
+        if data is not None:
+            return data
+    
+    data = loader(show_status=show_status)
+    if not _has_rows(data):
+        return data  # Failed loads are retried on the next run
+    shared_data = cache_data(data_type, data)
+    sources[data_type] = source
+    return shared_data
+
+def load_default_mcd43a3(show_status):
+    """MCD43A3 dataset from the default source"""
+    config = get_data_source_info()['mcd43a3']
+    from src.utils.data_loader import load_data_from_url
+    df, _ = load_data_from_url(config['url'], config['local_fallback'], show_status=show_status)
+    return df
 
 def main():
     """
@@ -412,11 +478,11 @@ def main():
     
     # Show cached data status
     cached_datasets = []
-    if get_cached_data('melt_season'):
+    if is_data_cached('melt_season'):
         cached_datasets.append("MOD10A1")
-    if get_cached_data('mcd43a3'):
+    if is_data_cached('mcd43a3'):
         cached_datasets.append("MCD43A3")
-    if get_cached_data('hypsometric'):
+    if is_data_cached('hypsometric'):
         cached_datasets.append("Hypsometric")
     
     if cached_datasets:
@@ -426,12 +492,30 @@ def main():
                 'melt_season': None,
                 'mcd43a3': None,
                 'hypsometric': None,
-                'last_loaded': {}
+                'last_loaded': {},
+                'sources': {}
             }
             st.rerun()
     else:
         st.sidebar.info("No data cached yet")
     
+    # Shared (all sessions) cache statistics
+    cache_stats = get_shared_cache().stats()
+    with st.sidebar.expander("📈 Shared cache stats", expanded=False):
+        st.caption(f"{cache_stats['entries']} dataset version(s) shared across sessions")
+        st.caption(f"Memory: {cache_stats['bytes_held'] / 1024**2:.1f} / "
+                   f"{cache_stats['max_bytes'] / 1024**2:.0f} MB")
+        st.caption(f"Hit rate: {cache_stats['hit_rate']:.0%} "
+                   f"({cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                   f"{cache_stats['evictions']} evictions)")
+        max_mb = st.number_input(
+            "Memory ceiling (MB)", min_value=64, max_value=8192,
+            value=int(cache_stats['max_bytes'] / 1024**2), step=64,
+            key="shared_cache_max_mb"
+        )
+        if max_mb * 1024**2 != cache_stats['max_bytes']:
+            get_shared_cache().set_max_bytes(int(max_mb * 1024**2))
+    
     
     # Use default QA settings (QA level selection disabled for now)
     selected_qa_level = "Standard QA"
@@ -444,17 +528,9 @@ def main():
     # Data source selection
     selected_dataset = st.sidebar.selectbox(
         "Analysis Type",
-        [
-            "🏠 Project Homepage",
-            "🎨 Interactive Albedo Map",
-            "🕰️ Unified Temporal Analysis",
-            "⚙️ Data Processing & Configuration",
-            "🛰️ MCD43A3 Broadband Albedo",
-            "❄️ MOD10A1/MYD10A1 Daily Snow Albedo", 
-            "⛰️ Hypsometric Analysis",
-            "🔧 Real-time QA Comparison"
-        ]
+        list(PAGES.keys())
     )
+    page = PAGES[selected_dataset]
     
     # Show main title for all pages except homepage
     if selected_dataset != "🏠 Project Homepage":
@@ -463,12 +539,11 @@ def main():
     # Load data based on selection
     if selected_dataset == "🏠 Project Homepage":
         # Show project homepage
-        create_homepage_dashboard()
+        load_page(*page)()
         
     elif selected_dataset == "⚙️ Data Processing & Configuration":
         # Create data processing and configuration dashboard
-        from src.dashboards.processing_dashboard import create_processing_dashboard
-        create_processing_dashboard()
+        load_page(*page)()
     
     elif selected_dataset == "🛰️ MCD43A3 Broadband Albedo":
         # Check for custom uploaded data first
@@ -482,18 +557,11 @@ def main():
             if st.button("📊 Import MCD43A3 Temporal CSV"):
                 st.info("💡 Use the Temporal Analysis tab in the MCD43A3 dashboard to import CSV data")
         
-        # Load data (uploaded or default)
+        # Load data (shared cache, else uploaded or default)
         with st.spinner("Loading MCD43A3 data..."):
-            def load_default_mcd43a3(show_status):
-                config = get_data_source_info()['mcd43a3']
-                from src.utils.data_loader import load_data_from_url
-                df, source = load_data_from_url(config['url'], config['local_fallback'], show_status=show_status)
-                return df
-            
-            df = load_uploaded_or_default_data(
+            df = load_cached_data(
                 'mcd43a3',
-                load_default_mcd43a3,
-                show_status=False
+                lambda show_status: load_uploaded_or_default_data('mcd43a3', load_default_mcd43a3, show_status)
             )
         
         if not df.empty:
@@ -501,10 +569,11 @@ def main():
             filtered_df = df
             
             # Show main dashboard with filtered data
-            create_mcd43a3_dashboard(filtered_df, qa_config, selected_qa_level)
+            load_page(*page)(filtered_df, qa_config, selected_qa_level)
     
     elif selected_dataset == "❄️ MOD10A1/MYD10A1 Daily Snow Albedo":
         # Try CSV import first
+        from src.utils.csv_import import create_csv_import_interface
         melt_data = create_csv_import_interface()
         
         if melt_data is None:
@@ -512,17 +581,17 @@ def main():
             from src.utils.csv_manager import load_uploaded_or_default_data, show_data_source_indicator
             show_data_source_indicator()
             
-            # Load data (uploaded or default)
+            # Load data (shared cache, else uploaded or default)
             with st.spinner("Loading melt season data..."):
-                melt_data = load_uploaded_or_default_data(
-                    'melt_season', 
-                    lambda show_status: load_all_melt_season_data(show_status=show_status),
-                    show_status=False
+                melt_data = load_cached_data(
+                    'melt_season',
+                    lambda show_status: load_uploaded_or_default_data('melt_season', load_all_melt_season_data, show_status)
                 )
         
-        # Cache the loaded data
-        if melt_data:
-            cache_data('melt_season', melt_data)
+        elif melt_data:
+            # Cache the imported data (identical imports share one copy)
+            melt_data = cache_data('melt_season', melt_data)
+            st.session_state.data_cache.setdefault('sources', {})['melt_season'] = 'csv_import'
             
             # Store source information if this came from CSV import
             if hasattr(st.session_state, 'uploaded_csv_info'):
@@ -546,10 +615,10 @@ def main():
         from src.utils.csv_manager import load_uploaded_or_default_data, show_data_source_indicator
         show_data_source_indicator()
         
-        # Load data (uploaded or default)
-        hyps_data = load_uploaded_or_default_data(
+        # Load data (shared cache, else uploaded or default)
+        hyps_data = load_cached_data(
             'hypsometric',
-            load_hypsometric_data,
+            lambda show_status: load_uploaded_or_default_data('hypsometric', load_hypsometric_data, show_status),
             show_status=True
         )
         
@@ -558,15 +627,19 @@ def main():
     
     elif selected_dataset == "🎨 Interactive Albedo Map":
         # Create dedicated interactive albedo visualization
-        create_interactive_albedo_dashboard(qa_config, selected_qa_level)
+        load_page(*page)(qa_config, selected_qa_level)
     
     elif selected_dataset == "🕰️ Unified Temporal Analysis":
         # Create unified temporal analysis dashboard
-        create_unified_temporal_dashboard()
+        load_page(*page)()
     
     elif selected_dataset == "🔧 Real-time QA Comparison":
         # Create real-time QA comparison dashboard
-        create_realtime_qa_dashboard()
+        load_page(*page)()
+    
+    # Import-time diagnostics
+    from src.utils.import_profiler import render_import_profile
+    render_import_profile(page[0] if page else None)
     
     # Minimal footer
     st.sidebar.markdown("---")